@@ -0,0 +1,107 @@
+"""
+Benchmark: patient-name enrichment in GET /appointments.
+
+Seeds moto-backed Appointments and PatientRecords tables with a fixed number of
+patients and a growing number of appointments per patient, invokes
+get_appointments.lambda_handler in-process and reports the DynamoDB round trips
+made per operation. With batched enrichment the GetItem count stays at zero and
+the BatchGetItem count depends only on the number of distinct patients.
+
+Usage:
+    python benchmarks/bench_appointment_enrichment.py [--patients 100] [--per-patient 1 5 20]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(BACKEND_DIR))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import boto3
+from moto import mock_aws
+
+from utils import db_utils
+from backend.src.handlers.appointments.get_appointments import lambda_handler
+
+APPOINTMENTS_TABLE = "bench-appointments"
+PATIENT_RECORDS_TABLE = "bench-patient-records"
+
+
+def create_tables(dynamodb):
+    appointments = dynamodb.create_table(
+        TableName=APPOINTMENTS_TABLE,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    patients = dynamodb.create_table(
+        TableName=PATIENT_RECORDS_TABLE,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"}
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"}
+        ],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    return appointments, patients
+
+
+def run_case(patient_count, per_patient):
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        appointments, patients = create_tables(dynamodb)
+
+        with patients.batch_writer() as batch:
+            for p in range(patient_count):
+                batch.put_item(Item={"PK": f"PATIENT#p{p}", "SK": "METADATA", "firstName": f"First{p}", "lastName": "Last"})
+        with appointments.batch_writer() as batch:
+            for a in range(patient_count * per_patient):
+                batch.put_item(Item={"id": f"a{a}", "patientId": f"p{a % patient_count}", "date": "2025-01-01"})
+
+        counts = {}
+
+        def _count(model, **kwargs):
+            counts[model.name] = counts.get(model.name, 0) + 1
+
+        db_utils.get_dynamodb_resource().meta.client.meta.events.register('before-call.dynamodb', _count)
+
+        started = time.perf_counter()
+        response = lambda_handler({"httpMethod": "GET", "queryStringParameters": None, "headers": {}}, {})
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        assert response["statusCode"] == 200, response
+
+        db_utils.DYNAMODB_RESOURCE = None
+        return counts, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=100)
+    parser.add_argument("--per-patient", type=int, nargs="+", default=[1, 5, 20])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    os.environ["APPOINTMENTS_TABLE"] = APPOINTMENTS_TABLE
+    os.environ["PATIENT_RECORDS_TABLE"] = PATIENT_RECORDS_TABLE
+
+    print(f"{'appointments':>12} {'per patient':>11} {'Scan':>5} {'GetItem':>8} {'BatchGetItem':>13} {'per-item GetItem (old)':>23} {'ms':>9}")
+    for per_patient in args.per_patient:
+        counts, elapsed_ms = run_case(args.patients, per_patient)
+        total = args.patients * per_patient
+        print(f"{total:>12} {per_patient:>11} {counts.get('Scan', 0):>5} {counts.get('GetItem', 0):>8} "
+              f"{counts.get('BatchGetItem', 0):>13} {total:>23} {elapsed_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: service price lookups for POST /billing.
+
+Prices invoices of 1, 10 and 100 lines against a moto-backed services table
+three ways and reports DynamoDB round trips and wall-clock time per invoice:
+
+- per-line: one GetItem per line item, the loop create_billing used to run
+- batched: services_cache.get_services_by_ids with an empty cache, i.e. one
+  BatchGetItem per 100 distinct services
+- warm cache: the same call once the services are cached in the container
+
+Every DynamoDB call is delayed by --latency-ms to stand in for the network
+round trip; moto answers in-process.
+
+Usage:
+    python benchmarks/bench_billing_prices.py [--lines 1 10 100] [--latency-ms 8] [--repeat 5]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import boto3
+from decimal import Decimal
+from moto import mock_aws
+
+from utils import db_utils, services_cache
+
+TABLE_NAME = "bench-services"
+SERVICE_COUNT = 200
+
+
+def seed(dynamodb):
+    table = dynamodb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    with table.batch_writer() as batch:
+        for i in range(SERVICE_COUNT):
+            batch.put_item(Item={"id": f"svc{i:04d}", "name": f"Service {i}", "price": Decimal("40.00") + i,
+                                 "description": "Standard consultation " * 10})
+
+
+def per_line(service_ids):
+    return {service_id: db_utils.get_item_by_id(TABLE_NAME, service_id) for service_id in service_ids}
+
+
+def batched(service_ids):
+    services_cache.clear_services_cache()
+    return services_cache.get_services_by_ids(TABLE_NAME, service_ids)
+
+
+def warm_cache(service_ids):
+    return services_cache.get_services_by_ids(TABLE_NAME, service_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--latency-ms", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        seed(boto3.resource("dynamodb", region_name="us-east-1"))
+        calls = []
+
+        def _simulate_round_trip(model, **kwargs):
+            calls.append(model.name)
+            time.sleep(args.latency_ms / 1000)
+
+        db_utils.get_dynamodb_resource().meta.client.meta.events.register('before-call.dynamodb', _simulate_round_trip)
+
+        print(f"{args.latency_ms:g} ms simulated latency per DynamoDB call, median of {args.repeat} invoices")
+        print(f"{'lines':>5} {'strategy':>11} {'calls':>6} {'ms':>9}")
+        for line_count in args.lines:
+            service_ids = [f"svc{i % SERVICE_COUNT:04d}" for i in range(line_count)]
+            for label, lookup in (("per-line", per_line), ("batched", batched), ("warm cache", warm_cache)):
+                timings = []
+                for _ in range(args.repeat):
+                    del calls[:]
+                    started = time.perf_counter()
+                    found = lookup(service_ids)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    assert len(found) == len(set(service_ids))
+                print(f"{line_count:>5} {label:>11} {len(calls):>6} {statistics.median(timings):>9.1f}")
+
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+if __name__ == "__main__":
+    main()
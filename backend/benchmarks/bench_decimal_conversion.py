@@ -0,0 +1,89 @@
+"""
+Benchmark: json round-trip vs single-pass Decimal conversion.
+
+Builds billing documents with a growing number of line items and times both
+directions of the conversion db_utils performs on every write and response:
+
+- write: json.loads(json.dumps(doc), parse_float=Decimal), which put_item and
+  _build_update_params used to run, against db_utils.to_dynamodb(doc)
+- read: json.dumps(doc, cls=DecimalEncoder), which generate_response used to
+  run, against json.dumps(db_utils.from_dynamodb(doc))
+
+Pure CPU, no AWS calls; each case reports the best of --repeat runs.
+
+Usage:
+    python benchmarks/bench_decimal_conversion.py [--lines 10 100 1000 5000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+
+from utils import db_utils
+
+
+def billing_document(line_count, number):
+    """A billing record shaped like create_billing's output, numbers built with number()."""
+    lines = [{
+        'serviceId': f'svc-{i:05d}',
+        'serviceName': 'Follow-up consultation',
+        'quantity': number(1 + i % 3),
+        'unitPrice': number(125.5 + i % 7),
+        'total': number((125.5 + i % 7) * (1 + i % 3)),
+        'modifiers': [number(0.15), number(2.5)]
+    } for i in range(line_count)]
+    subtotal = sum(float(line['total']) for line in lines)
+    return {
+        'id': 'bill-0001',
+        'patientId': 'patient-0001',
+        'items': lines,
+        'subtotal': number(subtotal),
+        'tax': number(subtotal * 0.0825),
+        'discount': number(0),
+        'paymentMethod': 'card',
+        'paymentStatus': 'pending'
+    }
+
+
+def best_ms(func, repeat):
+    number = max(1, int(2000 / max(1, len(func.__defaults__[0]['items']))))
+    runs = timeit.repeat(func, number=number, repeat=repeat)
+    return min(runs) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'lines':>6} {'write json ms':>14} {'write 1-pass ms':>16} {'read encoder ms':>16} {'read 1-pass ms':>15}")
+    for line_count in args.lines:
+        floats = billing_document(line_count, float)
+        decimals = billing_document(line_count, lambda value: Decimal(repr(float(value))))
+        assert db_utils.to_dynamodb(floats) == json.loads(json.dumps(floats), parse_float=Decimal)
+        assert json.dumps(db_utils.from_dynamodb(decimals)) == json.dumps(decimals, cls=db_utils.DecimalEncoder)
+
+        def write_round_trip(doc=floats):
+            return json.loads(json.dumps(doc), parse_float=Decimal)
+
+        def write_single_pass(doc=floats):
+            return db_utils.to_dynamodb(doc)
+
+        def read_encoder(doc=decimals):
+            return json.dumps(doc, cls=db_utils.DecimalEncoder)
+
+        def read_single_pass(doc=decimals):
+            return json.dumps(db_utils.from_dynamodb(doc))
+
+        timings = [best_ms(func, args.repeat) for func in (write_round_trip, write_single_pass, read_encoder, read_single_pass)]
+        print(f"{line_count:>6} {timings[0]:>14.3f} {timings[1]:>16.3f} {timings[2]:>16.3f} {timings[3]:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
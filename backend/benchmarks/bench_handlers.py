@@ -0,0 +1,320 @@
+"""
+Benchmark: latency, DynamoDB calls and memory of every CRUD Lambda handler.
+
+Seeds moto-backed PatientRecords, Appointments and Billing tables with
+--sizes records each from scripts/synthetic_data.py (the services catalogue
+gets --services records and the Cognito user pool --users users), then invokes each handler's
+lambda_handler in-process with API Gateway events for a list page, a
+legacy all=true drain, a lookup by id and the create/update/delete paths.
+
+For every scenario and size it records:
+- p50/p95/p99 and mean latency over --iterations warm invocations. Drain
+  scenarios run at most --drain-iterations times.
+- DynamoDB and Cognito calls, items read and consumed capacity per
+  invocation. These come from the EMF line utils.metrics writes, with
+  DYNAMODB_CAPACITY_METRICS switched on.
+- The peak Python heap during one more invocation, measured with
+  tracemalloc. This includes moto's own allocations, so compare it between
+  runs rather than reading it as the Lambda's memory.
+
+The results are written as JSON (by default to
+benchmarks/results/handlers-<commit>.json). --compare takes an earlier results
+file and prints the p50/p95 change per scenario. moto runs in-process, so
+absolute latencies are not Lambda latencies; the relative changes between
+commits and sizes are what to read.
+
+Usage:
+    python benchmarks/bench_handlers.py [--sizes 1000 10000 100000] [--iterations 30]
+        [--only get_appointments create_billing] [--output results.json] [--compare old.json]
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(BACKEND_DIR))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'scripts'))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import moto
+from moto import mock_aws
+
+from utils import aws_clients, db_utils, services_cache
+import synthetic_data
+
+TABLES = {
+    "PATIENT_RECORDS_TABLE": "bench-patient-records",
+    "APPOINTMENTS_TABLE": "bench-appointments",
+    "SERVICES_TABLE": "bench-services",
+    "BILLING_TABLE": "bench-billing",
+    "CATALOGUE_VERSIONS_TABLE": "bench-catalogue-versions",
+}
+
+# synthetic_data dataset stored in each table
+DATASET_TABLES = {
+    "patients": TABLES["PATIENT_RECORDS_TABLE"],
+    "appointments": TABLES["APPOINTMENTS_TABLE"],
+    "services": TABLES["SERVICES_TABLE"],
+    "billing": TABLES["BILLING_TABLE"],
+}
+
+
+class FakeContext:
+    function_name = "bench"
+    aws_request_id = "bench-request"
+
+
+def seed(dynamodb_client, cognito, size, args):
+    """Load synthetic_data records and Cognito users; return the ids the scenarios draw from."""
+    counts = dict(synthetic_data.default_counts(size), appointments=size, billing=size, services=args.services)
+    synthetic_data.create_tables(dynamodb_client, DATASET_TABLES)
+    dynamodb_client.create_table(TableName=TABLES["CATALOGUE_VERSIONS_TABLE"], BillingMode="PAY_PER_REQUEST",
+                                 KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                                 AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}])
+    for dataset, table_name in DATASET_TABLES.items():
+        synthetic_data.batch_write(dynamodb_client, table_name,
+                                   synthetic_data.generate_dataset(dataset, counts, args.seed))
+    ids = {dataset: [synthetic_data.make_id(dataset, i) for i in range(counts[dataset])] for dataset in DATASET_TABLES}
+    ids["doctors"] = [synthetic_data.make_id("doctors", i) for i in range(counts["doctors"])]
+
+    pool_id = cognito.create_user_pool(PoolName="bench")["UserPool"]["Id"]
+    ids["users"] = [f"user{i:04d}" for i in range(args.users)]
+    for username in ids["users"]:
+        cognito.admin_create_user(UserPoolId=pool_id, Username=username, UserAttributes=[
+            {"Name": "email", "Value": f"{username}@example.com"}, {"Name": "given_name", "Value": "Bench"},
+            {"Name": "family_name", "Value": username}, {"Name": "custom:role", "Value": "doctor"}])
+    return ids, pool_id
+
+
+def api_event(method, path, query=None, path_params=None, body=None):
+    return {
+        "httpMethod": method, "resource": path, "path": path,
+        "headers": {"Origin": "http://localhost:5173", "Accept": "application/json", "Accept-Encoding": "gzip"},
+        "queryStringParameters": query, "pathParameters": path_params,
+        "requestContext": {"requestId": "bench", "authorizer": {"claims": {"sub": "bench-admin", "custom:role": "admin"}}},
+        "body": json.dumps(body) if body is not None else None, "isBase64Encoded": False
+    }
+
+
+def scenarios(ids, rng):
+    """(handler module, scenario, drain, event factory) for every benchmarked call."""
+    pick = lambda key: (lambda: rng.choice(ids[key]))
+    deletable = {key: list(ids[key]) for key in ("patients", "appointments")}
+    for values in deletable.values():
+        rng.shuffle(values)
+
+    return [
+        ("patients.get_patients", "page", False, lambda: api_event("GET", "/patients", {"limit": "50"})),
+        ("patients.get_patients", "all", True, lambda: api_event("GET", "/patients", {"all": "true"})),
+        ("patients.get_patient_by_id", "by id", False,
+         lambda: api_event("GET", "/patients/{id}", path_params={"id": pick("patients")()})),
+        ("patients.create_patient", "create", False,
+         lambda: api_event("POST", "/patients", body={"firstName": "New", "lastName": "Patient", "email": "new@example.com"})),
+        ("patients.update_patient", "update", False,
+         lambda: api_event("PUT", "/patients/{id}", path_params={"id": pick("patients")()}, body={"phone": "555-0199"})),
+        ("appointments.get_appointments", "page", False, lambda: api_event("GET", "/appointments", {"limit": "50"})),
+        ("appointments.get_appointments", "date range", False,
+         lambda: api_event("GET", "/appointments", {"from": "2025-03-01", "to": "2025-03-07", "limit": "50"})),
+        ("appointments.get_appointments", "by patient", False,
+         lambda: api_event("GET", "/appointments", {"patientId": pick("patients")()})),
+        ("appointments.get_appointments", "all", True, lambda: api_event("GET", "/appointments", {"all": "true"})),
+        ("appointments.get_appointment_by_id", "by id", False,
+         lambda: api_event("GET", "/appointments/{id}", path_params={"id": pick("appointments")()})),
+        ("appointments.create_appointment", "create", False,
+         lambda: api_event("POST", "/appointments", body={
+             "patientId": pick("patients")(), "doctorId": pick("doctors")(), "date": "2025-06-02",
+             "startTime": "10:00", "endTime": "10:30", "type": "checkup"})),
+        ("appointments.update_appointment", "update", False,
+         lambda: api_event("PUT", "/appointments/{id}", path_params={"id": pick("appointments")()},
+                           body={"status": "completed"})),
+        ("services.get_services", "catalogue", False, lambda: api_event("GET", "/services")),
+        ("services.get_service_by_id", "by id", False,
+         lambda: api_event("GET", "/services/{id}", path_params={"id": pick("services")()})),
+        ("services.update_service", "update", False,
+         lambda: api_event("PUT", "/services/{id}", path_params={"id": pick("services")()}, body={"price": 75})),
+        ("billing.get_billing_records", "page", False, lambda: api_event("GET", "/billing", {"limit": "50"})),
+        ("billing.get_billing_records", "by patient", False,
+         lambda: api_event("GET", "/billing", {"patientId": pick("patients")(), "limit": "50"})),
+        ("billing.get_billing_records", "all", True, lambda: api_event("GET", "/billing", {"all": "true"})),
+        ("billing.get_billing_by_id", "by id", False,
+         lambda: api_event("GET", "/billing/{id}", path_params={"id": pick("billing")()})),
+        ("billing.create_billing", "create 5 lines", False,
+         lambda: api_event("POST", "/billing", body={
+             "patientId": pick("patients")(), "paymentMethod": "card",
+             "items": [{"serviceId": pick("services")(), "quantity": 1} for _ in range(5)]})),
+        ("billing.update_billing", "update", False,
+         lambda: api_event("PUT", "/billing/{id}", path_params={"id": pick("billing")()},
+                           body={"paymentStatus": "paid"})),
+        ("users.list_users", "page", False, lambda: api_event("GET", "/users", {"limit": "60"})),
+        ("users.disable_user", "disable", False,
+         lambda: api_event("POST", "/users/{username}/disable", path_params={"username": pick("users")()})),
+        ("users.enable_user", "enable", False,
+         lambda: api_event("POST", "/users/{username}/enable", path_params={"username": pick("users")()})),
+        # Deletes run last so the other scenarios only see seeded records
+        ("appointments.delete_appointment", "delete", False,
+         lambda: api_event("DELETE", "/appointments/{id}", path_params={"id": deletable["appointments"].pop()})),
+        ("patients.delete_patient", "delete", False,
+         lambda: api_event("DELETE", "/patients/{id}", path_params={"id": deletable["patients"].pop()})),
+    ]
+
+
+def invoke(handler, event):
+    """Run one invocation and return (elapsed ms, status code, EMF metric line)."""
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        started = time.perf_counter()
+        response = handler(event, FakeContext())
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    metric_line = {}
+    for line in stdout.getvalue().splitlines():
+        if line.startswith('{"_aws"'):
+            metric_line = json.loads(line)
+    return elapsed_ms, response.get("statusCode"), metric_line
+
+
+def percentile(samples, pct):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def run_scenario(handler, make_event, iterations):
+    invoke(handler, make_event())  # warm the container: clients, catalogue cache, imports
+
+    timings, statuses, lines = [], {}, []
+    for _ in range(iterations):
+        elapsed_ms, status, metric_line = invoke(handler, make_event())
+        timings.append(elapsed_ms)
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+        lines.append(metric_line)
+
+    tracemalloc.start()
+    invoke(handler, make_event())
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    per_call = lambda name: round(sum(line.get(name, 0) for line in lines) / iterations, 2)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "dynamodb_calls": per_call("DynamoDBCalls"),
+        "dynamodb_items": per_call("DynamoDBItems"),
+        "read_capacity": per_call("DynamoDBReadCapacity"),
+        "write_capacity": per_call("DynamoDBWriteCapacity"),
+        "cognito_calls": per_call("CognitoCalls"),
+        "response_bytes": per_call("ResponseBytes"),
+        "peak_memory_kb": round(peak_bytes / 1024, 1),
+        "status_codes": statuses,
+    }
+
+
+def run_size(size, args):
+    rng = random.Random(args.seed)
+    results = []
+    with mock_aws():
+        aws_clients.clear_cache()
+        services_cache.clear_services_cache()
+        db_utils.DYNAMODB_RESOURCE = None
+        started = time.perf_counter()
+        ids, pool_id = seed(aws_clients.get_client("dynamodb"), aws_clients.get_client("cognito-idp"), size, args)
+        print(f"seeded {size} records per table in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        os.environ["USER_POOL_ID"] = pool_id
+
+        for module_name, scenario, drain, make_event in scenarios(ids, rng):
+            if args.only and not any(name in module_name for name in args.only):
+                continue
+            module = importlib.import_module(f"backend.src.handlers.{module_name}")
+            iterations = min(args.iterations, args.drain_iterations) if drain else args.iterations
+            result = {"handler": module_name.split(".")[-1], "scenario": scenario, "records": size}
+            result.update(run_scenario(module.lambda_handler, make_event, iterations))
+            results.append(result)
+            print(f"{result['handler']:>22} {scenario:>15} {size:>7} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                  f"{result['p99_ms']:>9.2f} {result['dynamodb_calls']:>7} {result['read_capacity']:>9} "
+                  f"{result['peak_memory_kb']:>9.0f}")
+        db_utils.DYNAMODB_RESOURCE = None
+        aws_clients.clear_cache()
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r["handler"], r["scenario"], r["records"]): r for r in json.load(f)["results"]}
+    print(f"\nagainst {baseline_path}")
+    print(f"{'handler':>22} {'scenario':>15} {'records':>7} {'p50 change':>11} {'p95 change':>11} {'calls change':>13}")
+    for result in results:
+        old = baseline.get((result["handler"], result["scenario"], result["records"]))
+        if old is None:
+            continue
+        change = lambda key: f"{(result[key] / old[key] - 1) * 100 if old[key] else 0:+.1f}%"
+        print(f"{result['handler']:>22} {result['scenario']:>15} {result['records']:>7} {change('p50_ms'):>11} "
+              f"{change('p95_ms'):>11} {result['dynamodb_calls'] - old['dynamodb_calls']:>+13.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--drain-iterations", type=int, default=3)
+    parser.add_argument("--services", type=int, default=200)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="+", help="run only handlers whose module path contains one of these")
+    parser.add_argument("--output", help="results file (default benchmarks/results/handlers-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args()
+    # Handlers log a warning per unknown patient; failures show up in status_codes instead
+    logging.disable(logging.WARNING)
+
+    os.environ.update(TABLES)
+    aws_clients.DYNAMODB_CAPACITY_METRICS = True
+
+    commit = git_commit()
+    print(f"{'handler':>22} {'scenario':>15} {'records':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'DDB calls':>7} {'RCU':>9} {'peak KB':>9}")
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args))
+
+    output = args.output or os.path.join(BACKEND_DIR, "benchmarks", "results", f"handlers-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "benchmark": "handlers", "commit": commit, "timestamp": int(time.time()),
+            "python": platform.python_version(), "moto": moto.__version__,
+            "settings": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "results": results
+        }, f, indent=2)
+    print(f"wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
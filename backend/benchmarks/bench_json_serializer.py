@@ -0,0 +1,100 @@
+"""
+Benchmark: response body serializers for generate_response.
+
+Expands the records in data/seed_patients.json and data/seed_appointments.json
+to --count items each (ids and keys varied per copy, numbers kept as the
+Decimals DynamoDB returns), plus billing records whose line items are mostly
+Decimals, and times each way of encoding the list:
+
+- encoder: json.dumps(body, cls=DecimalEncoder), the original path
+- pre-convert: json.dumps(from_dynamodb(body)), the single-pass conversion
+  generate_response used before the serializer became pluggable
+- stdlib: json.dumps with a default hook, db_utils' fallback serializer
+- orjson: the serializer db_utils.get_json_serializer() picks when orjson is
+  installed (skipped otherwise)
+
+Every serializer's output is checked to decode to the same JSON values.
+Pure CPU, no AWS calls; each case reports the best of --repeat runs.
+
+Usage:
+    python benchmarks/bench_json_serializer.py [--count 10000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+
+from boto3.dynamodb.types import TypeDeserializer
+
+from utils import db_utils
+
+
+def load_seed(file_name):
+    deserializer = TypeDeserializer()
+    with open(os.path.join(BACKEND_DIR, 'data', file_name)) as f:
+        return [{key: deserializer.deserialize(value) for key, value in record.items()} for record in json.load(f)]
+
+
+def expand(records, count, numbers):
+    items = []
+    for i in range(count):
+        item = dict(records[i % len(records)])
+        item['id'] = str(1000 + i)
+        item['PK'] = item['PK'].split('#')[0] + f'#{1000 + i}'
+        item.update(numbers(i))
+        items.append(item)
+    return items
+
+
+def billing(count):
+    return [{
+        'id': f'bill-{i:06d}', 'patientId': str(1000 + i % 500), 'paymentStatus': 'pending',
+        'items': [{'serviceId': f'svc-{j}', 'quantity': Decimal(1 + j), 'unitPrice': Decimal('125.50'),
+                   'total': Decimal('125.50') * (1 + j)} for j in range(3)],
+        'subtotal': Decimal('753.00'), 'tax': Decimal('62.12'), 'discount': Decimal('0'), 'total': Decimal('815.12')
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = {
+        'patients': expand(load_seed('seed_patients.json'), args.count,
+                           lambda i: {'age': Decimal(20 + i % 70), 'balance': Decimal(i % 400) / 4}),
+        'appointments': expand(load_seed('seed_appointments.json'), args.count,
+                               lambda i: {'duration': Decimal(15 * (1 + i % 4))}),
+        'billing': billing(args.count)
+    }
+
+    serializers = [
+        ('encoder', lambda body: json.dumps(body, cls=db_utils.DecimalEncoder)),
+        ('pre-convert', lambda body: json.dumps(db_utils.from_dynamodb(body))),
+        ('stdlib', db_utils._stdlib_dumps),
+    ]
+    db_utils.JSON_SERIALIZER = 'auto'
+    db_utils._json_serializer = None
+    if db_utils.get_json_serializer()[0] is not db_utils._stdlib_dumps:
+        serializers.append(('orjson', db_utils.get_json_serializer()[0]))
+    else:
+        print("orjson not installed; reporting the standard library only")
+
+    print(f"{'payload':>12} {'items':>6} " + ' '.join(f"{name + ' ms':>14}" for name, _ in serializers) + f" {'speedup':>8}")
+    for name, body in payloads.items():
+        expected = json.loads(serializers[0][1](body))
+        timings = []
+        for _, dumps in serializers:
+            assert json.loads(dumps(body)) == expected
+            timings.append(min(timeit.repeat(lambda: dumps(body), number=1, repeat=args.repeat)) * 1000)
+        print(f"{name:>12} {len(body):>6} " + ' '.join(f"{ms:>14.1f}" for ms in timings) + f" {timings[0] / timings[-1]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
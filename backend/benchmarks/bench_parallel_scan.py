@@ -0,0 +1,87 @@
+"""
+Benchmark: sequential vs parallel segmented full-table scans.
+
+Seeds a moto-backed table and reads it end to end with
+db_utils.parallel_scan at 1, 4 and 8 segments, reporting wall-clock time,
+pages and the number of items returned. moto answers in-process, so every
+Scan call is delayed by --latency-ms to stand in for the network round trip
+to DynamoDB; without it the comparison only measures moto's own CPU time.
+moto's per-page work is pure Python and holds the GIL, so the speedup shown
+here is a lower bound on what segments buy against the real service.
+
+Usage:
+    python benchmarks/bench_parallel_scan.py [--items 2000] [--page-size 100] [--latency-ms 25] [--segments 1 4 8]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import boto3
+from moto import mock_aws
+
+from utils import db_utils
+
+TABLE_NAME = "bench-parallel-scan"
+
+
+def seed(dynamodb, item_count):
+    table = dynamodb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST"
+    )
+    with table.batch_writer() as batch:
+        for i in range(item_count):
+            batch.put_item(Item={"id": f"item-{i:06d}", "amount": i, "notes": "x" * 200})
+
+
+def run_case(total_segments, page_size):
+    stats = {}
+    started = time.perf_counter()
+    items = sum(1 for _ in db_utils.parallel_scan(TABLE_NAME, total_segments=total_segments, stats=stats, Limit=page_size))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return items, stats, elapsed_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        seed(boto3.resource("dynamodb", region_name="us-east-1"), args.items)
+
+        def _simulate_round_trip(**kwargs):
+            time.sleep(args.latency_ms / 1000)
+
+        db_utils.get_dynamodb_resource().meta.client.meta.events.register(
+            'before-call.dynamodb.Scan', _simulate_round_trip)
+
+        print(f"{args.items} items, page size {args.page_size}, {args.latency_ms:g} ms simulated latency per Scan")
+        print(f"{'segments':>8} {'items':>7} {'pages':>6} {'ms':>9} {'speedup':>8}")
+        baseline_ms = None
+        for total_segments in args.segments:
+            items, stats, elapsed_ms = run_case(total_segments, args.page_size)
+            baseline_ms = baseline_ms or elapsed_ms
+            print(f"{total_segments:>8} {items:>7} {stats['Pages']:>6} {elapsed_ms:>9.1f} {baseline_ms / elapsed_ms:>7.2f}x")
+
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+if __name__ == "__main__":
+    main()
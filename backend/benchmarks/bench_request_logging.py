@@ -0,0 +1,114 @@
+"""
+Benchmark: request logging cost on the upload and list paths.
+
+Logs realistic API Gateway events the old way and with
+utils.request_logging.log_request, writing to an in-memory stream with a
+CloudWatch-like format, and reports the time per request and the bytes
+written per request:
+
+- upload: POST /users/profile-image carrying a --image-kb base64 image.
+  The old path logged json.dumps(event), then the body again, then the
+  first 200 characters of the body.
+- list: GET /patients with a full set of browser and API Gateway headers.
+  The old path logged json.dumps(event).
+
+Pure CPU, no AWS calls; each case reports the best of --repeat runs.
+
+Usage:
+    python benchmarks/bench_request_logging.py [--image-kb 256 2048] [--repeat 20]
+"""
+import argparse
+import base64
+import io
+import json
+import logging
+import os
+import sys
+import timeit
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+
+from utils import request_logging
+
+
+class FakeContext:
+    aws_request_id = '8f0e3c1a-0000-4000-8000-000000000000'
+
+
+def api_event(method, path, body=None, query=None):
+    return {
+        'resource': path, 'path': path, 'httpMethod': method,
+        'headers': {
+            'Accept': 'application/json, text/plain, */*', 'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Language': 'en-US,en;q=0.9', 'Authorization': 'Bearer ' + 'e' * 1100,
+            'CloudFront-Forwarded-Proto': 'https', 'CloudFront-Is-Desktop-Viewer': 'true',
+            'Content-Type': 'application/json', 'Host': 'abc123.execute-api.us-east-2.amazonaws.com',
+            'Origin': 'https://d23hk32py5djal.cloudfront.net', 'Referer': 'https://d23hk32py5djal.cloudfront.net/',
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 Chrome/126.0 Safari/537.36',
+            'Via': '2.0 1a2b3c.cloudfront.net (CloudFront)', 'X-Amz-Cf-Id': 'A' * 56,
+            'X-Amzn-Trace-Id': 'Root=1-66a0c0de-0123456789abcdef01234567', 'X-Forwarded-For': '203.0.113.7, 130.176.0.1',
+            'X-Forwarded-Port': '443', 'X-Forwarded-Proto': 'https'
+        },
+        'multiValueHeaders': {},
+        'queryStringParameters': query,
+        'pathParameters': None,
+        'requestContext': {
+            'resourcePath': path, 'httpMethod': method, 'requestId': 'c6af9ac6-7b61-11e6-9a41-93e8deadbeef',
+            'stage': 'prod', 'identity': {'sourceIp': '203.0.113.7', 'userAgent': 'Mozilla/5.0'},
+            'authorizer': {'claims': {'sub': '5f2b6c1e-0000-4000-8000-000000000000', 'email': 'doctor@example.com',
+                                      'cognito:groups': 'doctor', 'custom:role': 'doctor'}}
+        },
+        'body': body,
+        'isBase64Encoded': False
+    }
+
+
+def old_upload(logger, event, context):
+    logger.info(f"Received event: {json.dumps(event)}")
+    logger.info(f"Event body: {event.get('body')}")
+    logger.info(f"Raw request body (first 200 chars): {event['body'][:200]}")
+
+
+def old_list(logger, event, context):
+    logger.info(f"Received event: {json.dumps(event)}")
+
+
+def new_log(logger, event, context):
+    request_logging.log_request(event, context)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--image-kb", type=int, nargs="+", default=[256, 2048])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('[%(levelname)s]\t%(asctime)s\t8f0e3c1a\t%(message)s'))
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(logging.INFO)
+    logger = logging.getLogger('handler')
+
+    cases = [('list', api_event('GET', '/patients', query={'limit': '50'}), old_list)]
+    for kb in args.image_kb:
+        image = 'data:image/jpeg;base64,' + base64.b64encode(os.urandom(kb * 1024)).decode('ascii')
+        cases.append((f'upload {kb}KB', api_event('POST', '/users/profile-image', body=json.dumps({'image': image})), old_upload))
+
+    print(f"{'path':>14} {'old ms':>9} {'new ms':>9} {'old bytes':>11} {'new bytes':>10}")
+    for name, event, old in cases:
+        results = []
+        for log in (old, new_log):
+            stream.seek(0)
+            stream.truncate()
+            log(logger, event, FakeContext())
+            written = len(stream.getvalue().encode('utf-8'))
+            ms = min(timeit.repeat(lambda: log(logger, event, FakeContext()), number=5, repeat=args.repeat)) / 5 * 1000
+            results.append((ms, written))
+        print(f"{name:>14} {results[0][0]:>9.3f} {results[1][0]:>9.3f} {results[0][1]:>11} {results[1][1]:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: CPU cost vs bytes saved by response compression.
+
+Builds GET /patients, /appointments and /billing response bodies of typical
+list sizes with db_utils.generate_response and compresses each one with
+utils.compression.compress_response at several gzip levels, plus brotli
+when the brotli package is installed. Reports the encoded JSON size, the
+bytes API Gateway sends after decoding the base64 body, the compression
+ratio and the CPU time per response.
+
+Pure CPU, no AWS calls; each case reports the best of --repeat runs.
+
+Usage:
+    python benchmarks/bench_response_compression.py [--items 10 100 1000] [--repeat 20]
+"""
+import argparse
+import base64
+import os
+import sys
+import timeit
+from decimal import Decimal
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+
+from utils import compression, db_utils
+
+
+def patient(i):
+    return {
+        'PK': f'PATIENT#{i:06d}', 'SK': 'METADATA', 'id': f'{i:06d}', 'type': 'patient',
+        'firstName': f'First{i}', 'lastName': ('Smith', 'Nguyen', 'Garcia', 'Okafor')[i % 4],
+        'dateOfBirth': f'19{50 + i % 50}-0{1 + i % 9}-1{i % 10}', 'gender': ('F', 'M')[i % 2],
+        'email': f'patient{i}@example.com', 'phone': f'555-01{i % 100:02d}',
+        'address': f'{i} Main Street, Springfield', 'insuranceProvider': 'Acme Health',
+        'insuranceNumber': f'ACM{i:08d}', 'status': 'active',
+        'createdAt': '2024-03-01T09:00:00Z', 'updatedAt': '2024-03-02T10:30:00Z'
+    }
+
+
+def appointment(i):
+    return {
+        'id': f'appt-{i:06d}', 'patientId': f'{i % 500:06d}', 'patientName': f'First{i % 500} Smith',
+        'doctorId': f'doc-{i % 12:02d}', 'date': f'2024-04-{1 + i % 28:02d}', 'time': f'{8 + i % 9:02d}:00',
+        'duration': 30, 'type': ('Check-up', 'Follow-up', 'Consultation')[i % 3], 'status': 'scheduled',
+        'notes': 'Patient requested a morning slot.', 'createdAt': '2024-03-20T14:00:00Z'
+    }
+
+
+def billing(i):
+    return {
+        'id': f'bill-{i:06d}', 'patientId': f'{i % 500:06d}', 'paymentMethod': 'card', 'paymentStatus': 'pending',
+        'items': [{'serviceId': f'svc-{j:03d}', 'serviceName': 'Consultation', 'quantity': 1,
+                   'unitPrice': Decimal('125.50'), 'total': Decimal('125.50')} for j in range(3)],
+        'subtotal': Decimal('376.50'), 'tax': Decimal('31.06'), 'discount': Decimal('0'), 'total': Decimal('407.56'),
+        'createdAt': '2024-04-01T12:00:00Z'
+    }
+
+
+def best_ms(func, repeat):
+    number = 10
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    settings = [('gzip', level) for level in (1, 5, 9)]
+    if compression._get_brotli() is not None:
+        settings += [('br', quality) for quality in (4, 8)]
+    else:
+        print("brotli not installed; reporting gzip only")
+
+    print(f"{'listing':>12} {'items':>6} {'json bytes':>11} {'coding':>8} {'wire bytes':>11} {'ratio':>6} {'cpu ms':>8}")
+    for name, build in (('patients', patient), ('appointments', appointment), ('billing', billing)):
+        for count in args.items:
+            response = db_utils.generate_response(200, {'items': [build(i) for i in range(count)], 'nextToken': None})
+            json_bytes = len(response['body'].encode('utf-8'))
+            for coding, level in settings:
+                event = {'headers': {'Accept': 'application/json', 'Accept-Encoding': coding}}
+                if coding == 'br':
+                    compression.BROTLI_QUALITY = level
+                else:
+                    compression.GZIP_LEVEL = level
+                compressed = compression.compress_response(event, response, min_bytes=0)
+                wire_bytes = len(base64.b64decode(compressed['body']))
+                cpu_ms = best_ms(lambda: compression.compress_response(event, response, min_bytes=0), args.repeat)
+                print(f"{name:>12} {count:>6} {json_bytes:>11} {f'{coding}-{level}':>8} {wire_bytes:>11} "
+                      f"{json_bytes / wire_bytes:>6.1f} {cpu_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
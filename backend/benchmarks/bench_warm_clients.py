@@ -0,0 +1,92 @@
+"""
+Benchmark: per-invocation boto3 clients vs the warm-container client registry.
+
+Invokes the list_users handler repeatedly against a moto-backed user pool,
+as a warm Lambda container would. In "per-invoke" mode utils.aws_clients is
+bypassed so every invocation builds a fresh cognito-idp client, which is what
+handlers did before the registry; in "registry" mode the client is built once
+and reused. Reported times are per invocation, so the difference between the
+two rows is the client construction cost saved on every warm request.
+
+Usage:
+    python benchmarks/bench_warm_clients.py [--invocations 200] [--users 20]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'lambda_layer', 'python'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'src', 'handlers', 'users'))
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+import boto3
+from moto import mock_aws
+
+from utils import aws_clients
+import list_users
+
+EVENT = {
+    "httpMethod": "GET",
+    "headers": {"Origin": "http://localhost:5173"},
+    "queryStringParameters": None,
+    "requestContext": {"authorizer": {"claims": {"cognito:groups": "admin"}}}
+}
+
+
+def seed(user_count):
+    cognito = boto3.client("cognito-idp", region_name="us-east-1")
+    pool_id = cognito.create_user_pool(PoolName="bench-pool")["UserPool"]["Id"]
+    for i in range(user_count):
+        cognito.admin_create_user(
+            UserPoolId=pool_id,
+            Username=f"user{i}@example.com",
+            UserAttributes=[{"Name": "email", "Value": f"user{i}@example.com"}]
+        )
+    return pool_id
+
+
+def run_case(invocations):
+    timings = []
+    for _ in range(invocations):
+        started = time.perf_counter()
+        response = list_users.lambda_handler(EVENT, None)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response["statusCode"] == 200, response
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invocations", type=int, default=200)
+    parser.add_argument("--users", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with mock_aws():
+        os.environ["USER_POOL_ID"] = seed(args.users)
+
+        def fresh_client(service_name, region_name=None):
+            return boto3.client(service_name, region_name=region_name or aws_clients._default_region())
+
+        cases = [("per-invoke", fresh_client), ("registry", aws_clients.get_client)]
+        print(f"{args.invocations} warm invocations of list_users, {args.users} users")
+        print(f"{'clients':>10} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+        for label, factory in cases:
+            aws_clients.clear_cache()
+            list_users.get_client = factory
+            run_case(5)  # first call in each mode pays the one-off loader and moto warm-up
+            timings = sorted(run_case(args.invocations))
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            print(f"{label:>10} {statistics.median(timings):>8.2f} {p95:>8.2f} {statistics.fmean(timings):>8.2f}")
+        list_users.get_client = aws_clients.get_client
+
+
+if __name__ == "__main__":
+    main()
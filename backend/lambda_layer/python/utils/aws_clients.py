@@ -0,0 +1,128 @@
+"""
+Warm-container registry for boto3 clients and resources.
+
+Building a boto3 client or resource loads service models and endpoint data,
+which costs tens of milliseconds. Handlers fetch them from here instead of
+calling boto3.client()/boto3.resource() in the request path: each one is
+created lazily on first use and then reused for the lifetime of the container,
+keyed by service and region. Every client and resource gets the
+utils.metrics timing hooks, so instrumented handlers report the time they
+spend waiting on each service, and every DynamoDB client also gets the
+consumed capacity hooks when DYNAMODB_CAPACITY_METRICS is on. Both are only
+installed here, so each client is instrumented exactly once whichever
+helper or handler asked for it.
+
+boto3 itself is only imported when the first client is built, so importing
+this module (and the handlers that use it) stays cheap for requests that
+never reach AWS, such as CORS preflights and validation failures.
+"""
+import os
+import threading
+
+from utils.metrics import instrument_client, instrument_dynamodb
+
+# Parallel scans and batch fan-out share one connection pool per client
+MAX_POOL_CONNECTIONS = int(os.environ.get('BOTO_MAX_POOL_CONNECTIONS', '25'))
+CONNECT_TIMEOUT_SECONDS = int(os.environ.get('BOTO_CONNECT_TIMEOUT', '5'))
+MAX_ATTEMPTS = int(os.environ.get('BOTO_MAX_ATTEMPTS', '5'))
+
+# Request consumed capacity on every DynamoDB call and report it, with
+# retries and throttles, in the handler's metrics line (see utils.metrics)
+DYNAMODB_CAPACITY_METRICS = os.environ.get('DYNAMODB_CAPACITY_METRICS', 'false').lower() == 'true'
+DYNAMODB_THROTTLING_ERROR_CODES = (
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded'
+)
+
+_CLIENTS = {}
+_RESOURCES = {}
+_LOCK = threading.Lock()
+_CLIENT_CONFIG = None
+
+def _default_region():
+    return os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION')
+
+def get_client_config():
+    """
+    Return the botocore Config shared by every client created through the registry.
+
+    Returns:
+        botocore.config.Config: Pool size, keep-alive, timeouts and adaptive retries
+    """
+    global _CLIENT_CONFIG
+    if _CLIENT_CONFIG is None:
+        from botocore.config import Config
+        _CLIENT_CONFIG = Config(
+            max_pool_connections=MAX_POOL_CONNECTIONS,
+            # Keep idle connections to AWS endpoints open between warm invocations
+            tcp_keepalive=True,
+            connect_timeout=CONNECT_TIMEOUT_SECONDS,
+            retries={
+                'max_attempts': MAX_ATTEMPTS,
+                # Client-side rate limiting backs off automatically when throttled
+                'mode': 'adaptive'
+            }
+        )
+    return _CLIENT_CONFIG
+
+def _instrument(service_name, client):
+    instrument_client(client)
+    if service_name == 'dynamodb' and DYNAMODB_CAPACITY_METRICS:
+        instrument_dynamodb(client, DYNAMODB_THROTTLING_ERROR_CODES)
+    return client
+
+def get_client(service_name, region_name=None):
+    """
+    Return the cached boto3 client for a service, creating it on first use.
+
+    Args:
+        service_name (str): AWS service name, e.g. 'cognito-idp' or 's3'
+        region_name (str): Optional region; defaults to AWS_REGION/AWS_DEFAULT_REGION
+
+    Returns:
+        botocore.client.BaseClient: Shared client configured with get_client_config()
+            and instrumented by utils.metrics
+    """
+    key = (service_name, region_name or _default_region())
+    client = _CLIENTS.get(key)
+    if client is None:
+        with _LOCK:
+            client = _CLIENTS.get(key)
+            if client is None:
+                import boto3
+                client = _instrument(
+                    service_name, boto3.client(service_name, region_name=key[1], config=get_client_config())
+                )
+                _CLIENTS[key] = client
+    return client
+
+def get_resource(service_name, region_name=None):
+    """
+    Return the cached boto3 resource for a service, creating it on first use.
+
+    Args:
+        service_name (str): AWS service name, e.g. 'dynamodb'
+        region_name (str): Optional region; defaults to AWS_REGION/AWS_DEFAULT_REGION
+
+    Returns:
+        boto3.resources.base.ServiceResource: Shared resource configured with get_client_config()
+            and instrumented by utils.metrics
+    """
+    key = (service_name, region_name or _default_region())
+    resource = _RESOURCES.get(key)
+    if resource is None:
+        with _LOCK:
+            resource = _RESOURCES.get(key)
+            if resource is None:
+                import boto3
+                resource = boto3.resource(service_name, region_name=key[1], config=get_client_config())
+                _instrument(service_name, resource.meta.client)
+                _RESOURCES[key] = resource
+    return resource
+
+def clear_cache():
+    """Drop every cached client and resource (used by tests between mocks)."""
+    with _LOCK:
+        _CLIENTS.clear()
+        _RESOURCES.clear()
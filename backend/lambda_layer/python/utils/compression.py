@@ -0,0 +1,149 @@
+"""
+Response compression negotiated from the request's Accept-Encoding header.
+
+compress_response() rewrites an API Gateway proxy response with a
+compressed, base64 encoded body (isBase64Encoded) when the client accepts
+br or gzip and the body is at least RESPONSE_COMPRESSION_MIN_BYTES long.
+API Gateway only decodes the body back to binary when the first media type
+in the request's Accept header is one of ClinicAPI's BinaryMediaTypes;
+otherwise the client would receive the base64 text, so responses are only
+compressed for requests whose first Accept type is application/json. Brotli is used only when the brotli
+package is importable; otherwise gzip is used. The compress_responses
+decorator applies it to everything a lambda_handler returns, including
+error responses and hand-built response dicts.
+"""
+import os
+import gzip
+import base64
+import functools
+
+# Bodies shorter than this are sent as-is; compressing them costs more CPU than it saves
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+
+# Fast levels: JSON compresses well at any level and the Lambda is billed for the CPU time
+GZIP_LEVEL = int(os.environ.get('RESPONSE_GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.environ.get('RESPONSE_BROTLI_QUALITY', '4'))
+
+# First Accept media types API Gateway decodes base64 bodies for (ClinicAPI's BinaryMediaTypes)
+BINARY_ACCEPT_TYPES = ('application/json',)
+
+_brotli = None
+
+def _get_brotli():
+    """Import brotli on first use; returns None when it is not installed."""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+        except ImportError:
+            brotli = False
+        _brotli = brotli
+    return _brotli or None
+
+def choose_encoding(accept_encoding):
+    """
+    Pick the content coding to use for an Accept-Encoding header value.
+
+    Args:
+        accept_encoding (str): e.g. 'gzip, deflate, br;q=0.9'
+
+    Returns:
+        str: 'br', 'gzip' or None when neither is acceptable
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    wildcard = weights.get('*', 0.0)
+    for coding in ('br', 'gzip'):
+        if coding == 'br' and _get_brotli() is None:
+            continue
+        if weights.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+def accepts_binary(accept):
+    """
+    True if API Gateway will decode a base64 body for this Accept header value.
+
+    Args:
+        accept (str): e.g. 'application/json, text/plain, */*'
+
+    Returns:
+        bool: True when the first media type is in BINARY_ACCEPT_TYPES
+    """
+    if not accept:
+        return False
+    first_type = accept.split(',')[0].partition(';')[0].strip().lower()
+    return first_type in BINARY_ACCEPT_TYPES
+
+def compress_response(event, response, min_bytes=None):
+    """
+    Compress a response body when the client accepts it, API Gateway will
+    decode it (see accepts_binary()) and it is large enough.
+
+    Args:
+        event (dict): Lambda event (API Gateway proxy request)
+        response (dict): API Gateway response object
+        min_bytes (int): Overrides RESPONSE_COMPRESSION_MIN_BYTES
+
+    Returns:
+        dict: The compressed response, or the original one unchanged
+    """
+    threshold = RESPONSE_COMPRESSION_MIN_BYTES if min_bytes is None else min_bytes
+    body = response.get('body')
+    if not isinstance(body, str) or response.get('isBase64Encoded'):
+        return response
+    headers = response.get('headers') or {}
+    if 'Content-Encoding' in headers:
+        return response
+
+    raw = body.encode('utf-8')
+    if len(raw) < threshold:
+        return response
+
+    request_headers = (event or {}).get('headers') or {}
+    if not accepts_binary(request_headers.get('Accept') or request_headers.get('accept')):
+        return response
+    encoding = choose_encoding(request_headers.get('Accept-Encoding') or request_headers.get('accept-encoding'))
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        compressed = _get_brotli().compress(raw, quality=BROTLI_QUALITY)
+    else:
+        compressed = gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+
+    headers = dict(headers)
+    headers['Content-Encoding'] = encoding
+    headers['Vary'] = 'Accept-Encoding' if not headers.get('Vary') else headers['Vary'] + ', Accept-Encoding'
+    etag = headers.get('ETag')
+    if etag and not etag.startswith('W/'):
+        # The bytes differ from the identity representation, so the validator becomes weak
+        headers['ETag'] = 'W/' + etag
+
+    compressed_response = dict(response)
+    compressed_response['headers'] = headers
+    compressed_response['body'] = base64.b64encode(compressed).decode('ascii')
+    compressed_response['isBase64Encoded'] = True
+    return compressed_response
+
+def compress_responses(handler):
+    """Decorator for lambda_handler that runs every response through compress_response()."""
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        response = handler(event, context)
+        if isinstance(response, dict):
+            return compress_response(event, response)
+        return response
+    return wrapper
@@ -45,7 +45,7 @@ def add_cors_headers(response, request_origin=None):
     cors_origin = get_cors_origin(request_origin)
     
     response['headers']['Access-Control-Allow-Origin'] = cors_origin
-    response['headers']['Access-Control-Allow-Headers'] = 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Requested-With,Origin,Accept'
+    response['headers']['Access-Control-Allow-Headers'] = 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Requested-With,Origin,Accept,If-None-Match'
     response['headers']['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
     response['headers']['Access-Control-Max-Age'] = '7200'  # Cache preflight for 2 hours
     
@@ -61,7 +61,7 @@ def build_cors_preflight_response(request_origin=None):
     
     headers = {
         'Access-Control-Allow-Origin': cors_origin,
-        'Access-Control-Allow-Headers': 'Content-Type,Authorization,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,X-Requested-With,Origin,Accept',
+        'Access-Control-Allow-Headers': 'Content-Type,Authorization,X-Amz-Date,X-Api-Key,X-Amz-Security-Token,X-Requested-With,Origin,Accept,If-None-Match',
         'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS',
         'Access-Control-Max-Age': '7200'
     }
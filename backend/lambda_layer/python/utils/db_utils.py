@@ -3,38 +3,47 @@ Database utility functions for DynamoDB operations
 """
 import os
 import json
+import base64
+import hashlib
 import logging
-import boto3
+import time
 import uuid
 import decimal
-from datetime import datetime
-from boto3.dynamodb.conditions import Key, Attr
+from datetime import date, datetime
 from botocore.exceptions import ClientError
 
+from utils.aws_clients import DYNAMODB_THROTTLING_ERROR_CODES, get_resource
+
 # Initialize Logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 DYNAMODB_RESOURCE = None
 
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_RETRIES = 5
+BATCH_GET_BASE_DELAY_SECONDS = 0.05
+
+# Parallel scan defaults; the segment count can be tuned per function through the environment
+PARALLEL_SCAN_SEGMENTS = int(os.environ.get('PARALLEL_SCAN_SEGMENTS', '4'))
+PARALLEL_SCAN_MAX_RETRIES = 5
+PARALLEL_SCAN_BASE_DELAY_SECONDS = 0.1
+# AppointmentDateIndex partition key shared by every appointment row; the
+# Node aggregated-reports handler queries the same constant
+APPOINTMENT_ENTITY_TYPE = 'APPOINTMENT_ENTITY'
+APPOINTMENT_DATE_INDEX = 'AppointmentDateIndex'
+
+# Upper bound on round trips fetch_page makes to fill one page behind a selective filter
+PAGE_FETCH_MAX_REQUESTS = 10
+
+THROTTLING_ERROR_CODES = DYNAMODB_THROTTLING_ERROR_CODES
+
 def get_dynamodb_resource():
+    # The metrics and consumed capacity hooks come from utils.aws_clients
     global DYNAMODB_RESOURCE
     if DYNAMODB_RESOURCE is None:
-        aws_access_key_id = os.environ.get("AWS_ACCESS_KEY_ID")
-        aws_secret_access_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
-        aws_session_token = os.environ.get("AWS_SESSION_TOKEN")
-        aws_region = os.environ.get("AWS_DEFAULT_REGION")
-
-        if aws_access_key_id:
-            DYNAMODB_RESOURCE = boto3.resource(
-                'dynamodb',
-                region_name=aws_region,
-                aws_access_key_id=aws_access_key_id,
-                aws_secret_access_key=aws_secret_access_key,
-                aws_session_token=aws_session_token
-            )
-        else:
-            DYNAMODB_RESOURCE = boto3.resource('dynamodb')
+        DYNAMODB_RESOURCE = get_resource('dynamodb')
     return DYNAMODB_RESOURCE
 
 # Helper class to convert a DynamoDB item to JSON
@@ -42,12 +51,141 @@ class DecimalEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, decimal.Decimal):
             # Convert Decimal to int if it's a whole number, otherwise float
-            if o % 1 == 0:
+            if o == o.to_integral_value():
                 return int(o)
             else:
                 return float(o)
         return super(DecimalEncoder, self).default(o)
 
+def to_dynamodb(value):
+    """
+    Convert a Python value into types the DynamoDB resource API accepts, in a
+    single walk over nested dicts and lists.
+
+    floats become Decimals (built from repr, so 0.1 is stored as 0.1), datetimes
+    and dates become ISO 8601 strings, tuples become lists and sets are converted
+    element by element. str, int, bool, bytes, Decimal and None pass through.
+
+    Args:
+        value: Item, attribute value or nested structure to convert
+
+    Returns:
+        The converted value; containers are copied, the input is not modified
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return {key: to_dynamodb(item) for key, item in value.items()}
+    if value_type is list or value_type is tuple:
+        return [to_dynamodb(item) for item in value]
+    if value_type is float:
+        return decimal.Decimal(repr(value))
+    if value_type is set or value_type is frozenset:
+        return {to_dynamodb(item) for item in value}
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def from_dynamodb(value):
+    """
+    Convert a value read from DynamoDB into JSON-serialisable Python types, in a
+    single walk over nested dicts and lists.
+
+    Decimals become int when whole and float otherwise (matching DecimalEncoder),
+    sets become lists, binary values become base64 strings and datetimes become
+    ISO 8601 strings.
+
+    Args:
+        value: Item, list of items or nested structure to convert
+
+    Returns:
+        The converted value; containers are copied, the input is not modified
+    """
+    value_type = type(value)
+    if value_type is dict:
+        return {key: from_dynamodb(item) for key, item in value.items()}
+    if value_type is list:
+        return [from_dynamodb(item) for item in value]
+    if value_type is decimal.Decimal:
+        return int(value) if value == value.to_integral_value() else float(value)
+    if value_type is str or value is None or value_type is bool or value_type is int or value_type is float:
+        return value
+    if value_type is set or value_type is frozenset or value_type is tuple:
+        return [from_dynamodb(item) for item in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)) or hasattr(value, '__bytes__'):
+        # bytes, or a boto3 Binary from a B attribute
+        return base64.b64encode(bytes(value)).decode('ascii')
+    return value
+
+# Response body serializer: 'auto' uses orjson when it is installed in the layer,
+# 'json' forces the standard library
+JSON_SERIALIZER = os.environ.get('JSON_SERIALIZER', 'auto')
+
+_json_serializer = None
+
+def _json_default(value):
+    # Both encoders call this only for types they cannot encode natively,
+    # so plain strings and numbers never reach Python code
+    if type(value) is decimal.Decimal:
+        return int(value) if value == value.to_integral_value() else float(value)
+    converted = from_dynamodb(value)
+    if converted is value:
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    return converted
+
+def _stdlib_dumps(value):
+    return json.dumps(value, default=_json_default)
+
+def _make_orjson_dumps(orjson):
+    def dumps(value):
+        try:
+            return orjson.dumps(value, default=_json_default).decode('utf-8')
+        except orjson.JSONEncodeError:
+            # e.g. whole Decimals beyond 64 bits, which orjson refuses
+            return _stdlib_dumps(value)
+    return dumps
+
+def get_json_serializer():
+    """
+    Return the (dumps, list_separator) pair used for response bodies, choosing
+    it from JSON_SERIALIZER on first use.
+
+    Both serializers produce the same JSON values: Decimals become int when
+    whole and float otherwise, exactly as from_dynamodb converts them. orjson
+    writes compact separators and unescaped UTF-8; the standard library path
+    is byte-for-byte the DecimalEncoder output.
+
+    Returns:
+        tuple: (dumps(value) -> str, separator for joining encoded list items)
+    """
+    global _json_serializer
+    if _json_serializer is None:
+        orjson = None
+        if JSON_SERIALIZER in ('auto', 'orjson'):
+            try:
+                import orjson
+            except ImportError:
+                if JSON_SERIALIZER == 'orjson':
+                    raise
+        if orjson is not None:
+            _json_serializer = (_make_orjson_dumps(orjson), ',')
+        else:
+            _json_serializer = (_stdlib_dumps, ', ')
+    return _json_serializer
+
+def json_dumps(value):
+    """
+    Encode a value read from DynamoDB as JSON with the configured serializer.
+
+    Args:
+        value: Item, list of items or nested structure, possibly holding Decimals
+
+    Returns:
+        str: JSON text
+    """
+    return get_json_serializer()[0](value)
+
 def _build_update_params(updates: dict, exclude_keys: list = None):
     """
     Builds parameters for a DynamoDB update_item call, excluding certain keys.
@@ -81,20 +219,247 @@ def _build_update_params(updates: dict, exclude_keys: list = None):
 
     update_expression = "SET " + ", ".join(update_expression_parts)
 
-    # Convert floats/ints in values to Decimals for DynamoDB
-    decimal_values = json.loads(json.dumps(expression_attribute_values), parse_float=decimal.Decimal)
-
     return {
         'UpdateExpression': update_expression,
         'ExpressionAttributeNames': expression_attribute_names,
-        'ExpressionAttributeValues': decimal_values
+        # Convert floats in values to Decimals for DynamoDB
+        'ExpressionAttributeValues': to_dynamodb(expression_attribute_values)
     }
 
+def _iter_pages(operation, table_name, params, stats):
+    """
+    Run a paginated Scan or Query, yielding one raw response page at a time.
+
+    Args:
+        operation (str): 'scan' or 'query'
+        table_name (str): DynamoDB table name
+        params (dict): Request parameters; not modified
+        stats (dict): Optional dict that accumulates 'Pages', 'Count',
+                      'ScannedCount' and 'ConsumedCapacityUnits'
+
+    Yields:
+        dict: The DynamoDB response for each page
+    """
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table(table_name)
+    call = getattr(table, operation)
+    params = dict(params)
+
+    if stats is not None:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+        for counter in ('Pages', 'Count', 'ScannedCount', 'ConsumedCapacityUnits'):
+            stats.setdefault(counter, 0)
+
+    while True:
+        try:
+            response = call(**params)
+        except ClientError as e:
+            logger.error(f"Error running {operation} on table {table_name} (index {params.get('IndexName')}): {e}", exc_info=True)
+            raise
+        if stats is not None:
+            stats['Pages'] += 1
+            stats['Count'] += response.get('Count', 0)
+            stats['ScannedCount'] += response.get('ScannedCount', 0)
+            stats['ConsumedCapacityUnits'] += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+        yield response
+        if 'LastEvaluatedKey' not in response:
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def iter_scan(table_name, stats=None, **kwargs):
+    """
+    Scan a DynamoDB table, yielding items as each page arrives instead of
+    collecting the whole table in memory.
+
+    Args:
+        table_name (str): DynamoDB table name
+        stats (dict): Optional dict filled with page, item and consumed-capacity totals
+        **kwargs: Scan parameters (e.g., FilterExpression, ProjectionExpression,
+                  Limit for the page size, Select='COUNT')
+
+    Yields:
+        dict: Items from the scan. With Select='COUNT' nothing is yielded and
+              the total is available in stats['Count'].
+    """
+    for page in _iter_pages('scan', table_name, kwargs, stats):
+        yield from page.get('Items', [])
+
+def iter_query(table_name, stats=None, **kwargs):
+    """
+    Query a DynamoDB table or index, yielding items as each page arrives.
+
+    Args:
+        table_name (str): DynamoDB table name
+        stats (dict): Optional dict filled with page, item and consumed-capacity totals
+        **kwargs: Query parameters (KeyConditionExpression is required;
+                  IndexName, FilterExpression, ProjectionExpression, Limit
+                  and Select='COUNT' are optional)
+
+    Yields:
+        dict: Items matching the query
+    """
+    for page in _iter_pages('query', table_name, kwargs, stats):
+        yield from page.get('Items', [])
+
+def count_items(table_name, operation='scan', **kwargs):
+    """
+    Count matching items with Select='COUNT', without transferring them.
+
+    Args:
+        table_name (str): DynamoDB table name
+        operation (str): 'scan' or 'query'
+        **kwargs: Scan or Query parameters
+
+    Returns:
+        int: Number of matching items
+    """
+    stats = {}
+    for _ in _iter_pages(operation, table_name, dict(kwargs, Select='COUNT'), stats):
+        pass
+    return stats['Count']
+
+def _scan_segment(table_name, segment, total_segments, params, stats):
+    """
+    Read one segment of a parallel scan to completion, retrying throttled pages.
+
+    Args:
+        table_name (str): DynamoDB table name
+        segment (int): Zero-based segment number
+        total_segments (int): Total number of segments
+        params (dict): Scan parameters shared by all segments; not modified
+        stats (dict): Per-segment dict filled with page, item and capacity totals
+
+    Returns:
+        list: Items from this segment
+    """
+    table = get_dynamodb_resource().Table(table_name)
+    params = dict(params, Segment=segment, TotalSegments=total_segments, ReturnConsumedCapacity='TOTAL')
+    items = []
+    attempt = 0
+
+    while True:
+        try:
+            response = table.scan(**params)
+        except ClientError as e:
+            error_code = e.response.get('Error', {}).get('Code')
+            if error_code in THROTTLING_ERROR_CODES and attempt < PARALLEL_SCAN_MAX_RETRIES:
+                attempt += 1
+                stats['Throttles'] += 1
+                delay = PARALLEL_SCAN_BASE_DELAY_SECONDS * (2 ** (attempt - 1))
+                logger.warning(f"Segment {segment}/{total_segments} of {table_name} throttled ({error_code}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            logger.error(f"Error scanning segment {segment}/{total_segments} of table {table_name}: {e}", exc_info=True)
+            raise
+        attempt = 0
+        stats['Pages'] += 1
+        stats['Count'] += response.get('Count', 0)
+        stats['ScannedCount'] += response.get('ScannedCount', 0)
+        stats['ConsumedCapacityUnits'] += response.get('ConsumedCapacity', {}).get('CapacityUnits', 0)
+        items.extend(response.get('Items', []))
+        if 'LastEvaluatedKey' not in response:
+            return items
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def parallel_scan(table_name, total_segments=None, ordered=True, max_workers=None, stats=None, **kwargs):
+    """
+    Scan a whole table with Segment/TotalSegments spread over a thread pool.
+    Meant for full-table reads such as exports and diagnostics, where the
+    sequential page-after-page latency of scan_table dominates.
+
+    Args:
+        table_name (str): DynamoDB table name
+        total_segments (int): Number of segments; defaults to PARALLEL_SCAN_SEGMENTS
+        ordered (bool): If True, yield segments in segment order (0, 1, ...);
+                        if False, yield each segment as soon as it finishes
+        max_workers (int): Thread pool size; defaults to total_segments
+        stats (dict): Optional dict filled with 'Pages', 'Count', 'ScannedCount',
+                      'ConsumedCapacityUnits', 'Throttles' and 'Segments'
+        **kwargs: Scan parameters (e.g., FilterExpression, ProjectionExpression,
+                  Select='COUNT')
+
+    Yields:
+        dict: Items from the scan
+    """
+    if total_segments is None:
+        total_segments = PARALLEL_SCAN_SEGMENTS
+    if total_segments < 1:
+        raise ValueError("total_segments must be at least 1")
+    counters = ('Pages', 'Count', 'ScannedCount', 'ConsumedCapacityUnits', 'Throttles')
+    segment_stats = [{counter: 0 for counter in counters} for _ in range(total_segments)]
+
+    # Only parallel scans need the thread pool, so keep it out of handler import time
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    # Create the shared resource before any worker thread can race to do it
+    get_dynamodb_resource()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or total_segments) as executor:
+            futures = [
+                executor.submit(_scan_segment, table_name, segment, total_segments, kwargs, segment_stats[segment])
+                for segment in range(total_segments)
+            ]
+            for future in (futures if ordered else as_completed(futures)):
+                yield from future.result()
+    finally:
+        if stats is not None:
+            for counter in counters:
+                stats[counter] = stats.get(counter, 0) + sum(s[counter] for s in segment_stats)
+            stats['Segments'] = total_segments
+
+def fetch_page(table_name, limit, operation='scan', exclusive_start_key=None,
+               max_requests=PAGE_FETCH_MAX_REQUESTS, **kwargs):
+    """
+    Fetch one client-facing page of at most `limit` items.
+
+    DynamoDB applies Limit before FilterExpression, so a single request can
+    come back short. Follow-up requests only ask for the number of items still
+    missing, which keeps the returned LastEvaluatedKey an exact resume point.
+    A page may still be short if max_requests is reached; the caller then
+    simply returns the key and the client continues from it.
+
+    Args:
+        table_name (str): DynamoDB table name
+        limit (int): Maximum number of items to return
+        operation (str): 'scan' or 'query'
+        exclusive_start_key (dict): Key to resume from, or None for the first page
+        max_requests (int): Maximum number of DynamoDB requests for this page
+        **kwargs: Scan or Query parameters (e.g., IndexName, KeyConditionExpression,
+                  FilterExpression, ProjectionExpression)
+
+    Returns:
+        tuple: (items, last_evaluated_key); last_evaluated_key is None on the last page
+    """
+    dynamodb = get_dynamodb_resource()
+    table = dynamodb.Table(table_name)
+    call = getattr(table, operation)
+    params = dict(kwargs)
+    if exclusive_start_key:
+        params['ExclusiveStartKey'] = exclusive_start_key
+    items = []
+
+    for _ in range(max_requests):
+        params['Limit'] = limit - len(items)
+        try:
+            response = call(**params)
+        except ClientError as e:
+            logger.error(f"Error fetching a page via {operation} on table {table_name} (index {params.get('IndexName')}): {e}", exc_info=True)
+            raise
+        items.extend(response.get('Items', []))
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if not last_evaluated_key or len(items) >= limit:
+            break
+        params['ExclusiveStartKey'] = last_evaluated_key
+
+    return items, last_evaluated_key
+
 def scan_table(table_name, **kwargs):
     """
     Perform a scan operation on a DynamoDB table.
     Warning: Scans read the entire table and can be inefficient and costly for large tables.
-    Use queries with specific keys and indexes whenever possible.
+    Use queries with specific keys and indexes whenever possible, and prefer
+    iter_scan when the items can be processed one page at a time.
 
     Args:
         table_name (str): DynamoDB table name
@@ -103,21 +468,43 @@ def scan_table(table_name, **kwargs):
     Returns:
         list: A list of items from the scan operation.
     """
-    dynamodb = get_dynamodb_resource()
-    table = dynamodb.Table(table_name)
+    return list(iter_scan(table_name, **kwargs))
 
-    try:
-        response = table.scan(**kwargs)
-        items = response.get('Items', [])
-        while 'LastEvaluatedKey' in response:
-            logger.info(f"Scanning {table_name} again for pagination...")
-            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
-            response = table.scan(**kwargs)
-            items.extend(response.get('Items', []))
-        return items
-    except ClientError as e:
-        logger.error(f"Error scanning table {table_name}: {e}", exc_info=True)
-        raise
+def query_table(table_name, **kwargs):
+    """
+    Perform a query operation on a DynamoDB table or one of its indexes.
+    Pages are fetched lazily: the next page is only requested once the caller
+    has consumed every item of the current one.
+
+    Args:
+        table_name (str): DynamoDB table name
+        **kwargs: Query parameters (KeyConditionExpression is required;
+                  IndexName, FilterExpression, etc. are optional)
+
+    Returns:
+        generator: Items matching the query
+    """
+    return iter_query(table_name, **kwargs)
+
+def query_index(table_name, index_name, key_condition_expression, **kwargs):
+    """
+    Query a global secondary index, paginating lazily.
+
+    Args:
+        table_name (str): DynamoDB table name
+        index_name (str): GSI name, e.g. 'PatientIdIndex'
+        key_condition_expression: Key condition, e.g. Key('patientId').eq(...)
+        **kwargs: Additional query parameters (e.g., FilterExpression)
+
+    Yields:
+        dict: Items matching the query
+    """
+    return query_table(
+        table_name,
+        IndexName=index_name,
+        KeyConditionExpression=key_condition_expression,
+        **kwargs
+    )
 
 def get_item_by_id(table_name, item_id, p_key='id'):
     """
@@ -145,6 +532,63 @@ def get_item_by_id(table_name, item_id, p_key='id'):
         logger.error(f"Error getting item {item_id} from table {table_name}: {e}", exc_info=True)
         raise
 
+def batch_get_items(table_name, keys, projection_expression=None, expression_attribute_names=None):
+    """
+    Fetch many items by primary key using BatchGetItem.
+
+    Keys are de-duplicated and sent in chunks of BATCH_GET_MAX_KEYS (the
+    DynamoDB limit). Any UnprocessedKeys returned by DynamoDB are retried with
+    exponential backoff up to BATCH_GET_MAX_RETRIES times.
+
+    Args:
+        table_name (str): DynamoDB table name
+        keys (list): List of primary key dicts, e.g. [{'PK': ..., 'SK': ...}]
+        projection_expression (str): Optional ProjectionExpression
+        expression_attribute_names (dict): Optional ExpressionAttributeNames
+
+    Returns:
+        list: The items that were found. Missing keys are simply absent.
+    """
+    dynamodb = get_dynamodb_resource()
+
+    unique_keys = []
+    seen = set()
+    for key in keys:
+        marker = tuple(sorted(key.items()))
+        if marker not in seen:
+            seen.add(marker)
+            unique_keys.append(key)
+
+    items = []
+    for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+        request = {'Keys': unique_keys[start:start + BATCH_GET_MAX_KEYS]}
+        if projection_expression:
+            request['ProjectionExpression'] = projection_expression
+        if expression_attribute_names:
+            request['ExpressionAttributeNames'] = expression_attribute_names
+
+        request_items = {table_name: request}
+        attempt = 0
+        while request_items:
+            try:
+                response = dynamodb.batch_get_item(RequestItems=request_items)
+            except ClientError as e:
+                logger.error(f"Error batch getting items from table {table_name}: {e}", exc_info=True)
+                raise
+            items.extend(response.get('Responses', {}).get(table_name, []))
+
+            request_items = response.get('UnprocessedKeys') or {}
+            if not request_items:
+                break
+            attempt += 1
+            if attempt > BATCH_GET_MAX_RETRIES:
+                unprocessed = len(request_items.get(table_name, {}).get('Keys', []))
+                logger.warning(f"Giving up on {unprocessed} unprocessed keys from table {table_name} after {BATCH_GET_MAX_RETRIES} retries")
+                break
+            time.sleep(BATCH_GET_BASE_DELAY_SECONDS * (2 ** (attempt - 1)))
+
+    return items
+
 def put_item(table_name, item):
     """
     Put item in DynamoDB table (creates or replaces)
@@ -161,8 +605,7 @@ def put_item(table_name, item):
 
     try:
         # Convert floats to Decimals for DynamoDB
-        item_decimal = json.loads(json.dumps(item), parse_float=decimal.Decimal)
-        table.put_item(Item=item_decimal)
+        table.put_item(Item=to_dynamodb(item))
         return item # Return original item before decimal conversion for consistency
     except ClientError as e:
         logger.error(f"Error putting item in table {table_name}: {e}", exc_info=True)
@@ -263,9 +706,32 @@ def delete_item(table_name, item_id, p_key='id'):
         logger.error(f"Error deleting item {item_id} from table {table_name}: {e}", exc_info=True)
         raise
 
+def _response_headers():
+    return {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',  # Basic CORS header
+        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,If-None-Match',
+        'Access-Control-Allow-Methods': 'OPTIONS,POST,GET,PUT,DELETE',
+        'Access-Control-Expose-Headers': 'ETag'
+    }
+
+def _build_response(status_code, body):
+    headers = _response_headers()
+    if status_code == 200:
+        # Strong validator over the exact bytes sent, for If-None-Match revalidation.
+        # Browsers must revalidate before reuse and shared caches must not store PHI.
+        headers['ETag'] = '"' + hashlib.blake2b(body.encode('utf-8'), digest_size=16).hexdigest() + '"'
+        headers['Cache-Control'] = 'private, no-cache'
+    return {
+        'statusCode': status_code,
+        'headers': headers,
+        'body': body
+    }
+
 def generate_response(status_code, body):
     """
-    Generate standardized API Gateway proxy response object
+    Generate standardized API Gateway proxy response object. 200 responses
+    carry an ETag hashed from the encoded body.
 
     Args:
         status_code (int): HTTP status code
@@ -274,18 +740,74 @@ def generate_response(status_code, body):
     Returns:
         dict: API Gateway response object
     """
+    # DynamoDB numbers come back as Decimal; json_dumps converts them while encoding
+    return _build_response(status_code, json_dumps(body))
+
+def generate_list_response(status_code, items):
+    """
+    Generate an API Gateway response whose body is a JSON array, encoding the
+    items one at a time. Passing a generator such as iter_scan() means only the
+    current page of items and the encoded JSON are held in memory, never the
+    full item list. The body is identical to generate_response(status_code, list(items)).
+
+    Args:
+        status_code (int): HTTP status code
+        items (iterable): Items to encode
+
+    Returns:
+        dict: API Gateway response object
+    """
+    dumps, separator = get_json_serializer()
+    return _build_response(status_code, '[' + separator.join(dumps(item) for item in items) + ']')
+
+def conditional_response(event, response):
+    """
+    Answer a conditional GET: when the request's If-None-Match names the
+    response's ETag, return 304 Not Modified with an empty body so the client
+    reuses its copy. Any other response is returned unchanged.
+
+    Args:
+        event (dict): Lambda event (API Gateway proxy request)
+        response (dict): Response built by generate_response or generate_list_response
+
+    Returns:
+        dict: API Gateway response object
+    """
+    etag = response.get('headers', {}).get('ETag')
+    headers = event.get('headers') or {}
+    if_none_match = headers.get('If-None-Match') or headers.get('if-none-match')
+    if not etag or not if_none_match:
+        return response
+
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip() for tag in if_none_match.split(',')}
+    if etag not in candidates and '*' not in candidates:
+        return response
+
+    headers = dict(response['headers'])
+    headers.pop('Content-Type', None)
     return {
-        'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',  # Basic CORS header
-            'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
-            'Access-Control-Allow-Methods': 'OPTIONS,POST,GET,PUT,DELETE'
-        },
-        # Use the custom DecimalEncoder to handle DynamoDB numbers
-        'body': json.dumps(body, cls=DecimalEncoder)
+        'statusCode': 304,
+        'headers': headers,
+        'body': ''
     }
 
+def appointment_date_index_keys(appointment):
+    """
+    Build the AppointmentDateIndex key attributes for an appointment.
+
+    Args:
+        appointment (dict): Appointment with a 'date' (YYYY-MM-DD) or an ISO 'start'
+
+    Returns:
+        dict: {'entityType': ..., 'appointmentDate': ...}, or {} when the
+              appointment has no usable date
+    """
+    appointment_date = appointment.get('date') or (appointment.get('start') or '')[:10]
+    if not appointment_date:
+        return {}
+    return {'entityType': APPOINTMENT_ENTITY_TYPE, 'appointmentDate': appointment_date}
+
 def get_patient_by_pk_sk(table_name, pk, sk):
     """
     Get a patient or record by PK/SK from the PatientRecordsTable
@@ -343,7 +865,7 @@ def update_item_by_pk_sk(table_name, pk, sk, updates):
         logger.error(f"Error updating item PK={pk}, SK={sk} in table {table_name}: {e}", exc_info=True)
         raise
 
-def query_by_type(table_name, type_value, last_evaluated_key=None):
+def query_by_type(table_name, type_value, last_evaluated_key=None, limit=None, projection=None):
     """
     Query items by type using the type-index GSI
     
@@ -351,6 +873,10 @@ def query_by_type(table_name, type_value, last_evaluated_key=None):
         table_name (str): DynamoDB table name
         type_value (str): The type value to query for
         last_evaluated_key (dict): Key to start from for pagination
+        limit (int): Optional maximum number of items to evaluate
+        projection (dict): Optional ProjectionExpression and
+                           ExpressionAttributeNames, as built by
+                           pagination.build_projection
     
     Returns:
         dict: Query results with Items and LastEvaluatedKey
@@ -367,6 +893,11 @@ def query_by_type(table_name, type_value, last_evaluated_key=None):
             ':type_val': type_value
         }
     }
+    if limit:
+        query_params['Limit'] = limit
+    if projection:
+        query_params['ProjectionExpression'] = projection['ProjectionExpression']
+        query_params['ExpressionAttributeNames'].update(projection['ExpressionAttributeNames'])
     
     if last_evaluated_key:
         query_params['ExclusiveStartKey'] = last_evaluated_key
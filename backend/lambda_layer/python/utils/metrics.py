@@ -0,0 +1,316 @@
+"""
+Per-invocation timing metrics written in CloudWatch Embedded Metric Format.
+
+instrument_handler wraps a lambda_handler and, once it returns, prints one
+EMF JSON line to stdout. CloudWatch Logs turns that line into metrics under
+METRICS_NAMESPACE with a Handler dimension (the handler's module name, e.g.
+get_appointments), so no PutMetricData calls are made in the request path:
+
+- Duration: wall time of the handler, in milliseconds
+- DynamoDBTime, CognitoTime, S3Time, BedrockTime: time spent waiting on each
+  AWS service, with matching ...Calls and ...Bytes (response payload) counts
+- DynamoDBItems: items returned by DynamoDB reads
+- RequestBytes and ResponseBytes: API Gateway request and response bodies
+- ColdStart: 1 on the first invocation in a container, 0 afterwards
+- Error: 1 when the handler raised or returned a 5xx
+
+The AWS timings come from botocore before-call/after-call hooks that
+utils.aws_clients installs on every client and resource it builds; they
+cover retries and only record while an instrumented invocation is running.
+Sections of a handler can be timed with timed(name), reported as <name>Time,
+and extra counts added with add_metric(). The request IDs, route and status
+code are written as properties of the same line, so they can be searched in
+Logs Insights without becoming dimensions.
+
+instrument_dynamodb() adds opt-in DynamoDB hooks (utils.aws_clients installs
+them on every DynamoDB client when DYNAMODB_CAPACITY_METRICS is true). They set
+ReturnConsumedCapacity=TOTAL on every call that accepts it and report
+DynamoDBReadCapacity, DynamoDBWriteCapacity, DynamoDBRetries and
+DynamoDBThrottles. The same line also gets a DynamoDBOperations property:
+calls, time, capacity, retries and throttles per operation and table.
+"""
+import os
+import sys
+import json
+import time
+import functools
+import threading
+import contextlib
+
+# Namespace the EMF metrics are published under
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'ClinnetEMR')
+
+# Set to false to stop writing metric lines (the hooks then record nothing)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() != 'false'
+
+# Metric name prefixes for the AWS services the handlers call
+SERVICE_LABELS = {
+    'dynamodb': 'DynamoDB',
+    'cognito-idp': 'Cognito',
+    's3': 'S3',
+    'bedrock': 'Bedrock',
+    'bedrock-runtime': 'Bedrock',
+}
+
+# DynamoDB operations whose consumed capacity is reported as read capacity
+READ_OPERATIONS = frozenset(('GetItem', 'BatchGetItem', 'Query', 'Scan', 'TransactGetItems'))
+
+_START_KEY = 'clinnet_metrics_start'
+_TABLE_KEY = 'clinnet_metrics_table'
+
+_cold_start = True
+_current = None
+_LOCK = threading.Lock()
+
+class _Invocation:
+    """Metric values collected during one handler invocation."""
+
+    def __init__(self, handler_name):
+        self.handler_name = handler_name
+        self.values = {}
+        self.units = {}
+        self.operations = {}
+
+    def add(self, name, value, unit):
+        with _LOCK:
+            self.values[name] = self.values.get(name, 0) + value
+            self.units[name] = unit
+
+    def add_operation(self, key, **counters):
+        with _LOCK:
+            totals = self.operations.setdefault(key, {})
+            for name, value in counters.items():
+                totals[name] = totals.get(name, 0) + value
+
+def add_metric(name, value, unit='Count'):
+    """
+    Add a value to a metric of the running invocation. Values added under
+    the same name are summed. Does nothing outside an instrumented handler.
+
+    Args:
+        name (str): Metric name
+        value (float): Value to add
+        unit (str): CloudWatch unit, e.g. 'Count', 'Milliseconds' or 'Bytes'
+    """
+    invocation = _current
+    if invocation is not None:
+        invocation.add(name, value, unit)
+
+@contextlib.contextmanager
+def timed(name):
+    """
+    Context manager that adds the time spent in its block to <name>Time.
+
+    Args:
+        name (str): Section name, e.g. 'Enrichment'
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_metric(f'{name}Time', (time.perf_counter() - start) * 1000, 'Milliseconds')
+
+def _service_label(service_name):
+    return SERVICE_LABELS.get(service_name) or ''.join(part.title() for part in service_name.split('-'))
+
+def _count_items(parsed):
+    """Number of items in a parsed DynamoDB response."""
+    if 'Items' in parsed:
+        return len(parsed['Items'])
+    if 'Item' in parsed:
+        return 1
+    responses = parsed.get('Responses')
+    if isinstance(responses, dict):
+        return sum(len(items) for items in responses.values())
+    if isinstance(responses, list):
+        return len(responses)
+    return 0
+
+def _before_call(context=None, **kwargs):
+    if _current is not None and context is not None:
+        context[_START_KEY] = time.perf_counter()
+
+def _response_bytes(http_response, model):
+    if http_response is None:
+        return 0
+    if model is not None and model.has_streaming_output:
+        # The body of a streaming response has not been read yet; use its declared length
+        length = str(http_response.headers.get('content-length', ''))
+        return int(length) if length.isdigit() else 0
+    return len(http_response.content or b'')
+
+def _after_call(label, http_response=None, parsed=None, model=None, context=None, **kwargs):
+    invocation = _current
+    start = (context or {}).get(_START_KEY)
+    if invocation is None or start is None:
+        return
+    invocation.add(f'{label}Time', (time.perf_counter() - start) * 1000, 'Milliseconds')
+    invocation.add(f'{label}Calls', 1, 'Count')
+    invocation.add(f'{label}Bytes', _response_bytes(http_response, model), 'Bytes')
+    if label == 'DynamoDB' and isinstance(parsed, dict):
+        invocation.add('DynamoDBItems', _count_items(parsed), 'Count')
+
+def _after_call_error(label, context=None, **kwargs):
+    _after_call(label, context=context)
+
+def instrument_client(client):
+    """
+    Register the timing hooks on a boto3 client (idempotent).
+
+    Args:
+        client (botocore.client.BaseClient): Client to instrument
+
+    Returns:
+        The same client
+    """
+    label = _service_label(client.meta.service_model.service_name)
+    events = client.meta.events
+    events.register('before-call', _before_call, unique_id='clinnet-metrics-before-call')
+    events.register('after-call', functools.partial(_after_call, label), unique_id='clinnet-metrics-after-call')
+    events.register('after-call-error', functools.partial(_after_call_error, label),
+                    unique_id='clinnet-metrics-after-call-error')
+    return client
+
+def _table_names(params):
+    if params.get('TableName'):
+        return params['TableName']
+    tables = params.get('RequestItems') or {}
+    if not tables and params.get('TransactItems'):
+        tables = {next(iter(item.values())).get('TableName') for item in params['TransactItems']}
+    return ','.join(sorted(name for name in tables if name)) or '-'
+
+def _capacity_units(consumed):
+    if isinstance(consumed, dict):
+        return consumed.get('CapacityUnits', 0)
+    if isinstance(consumed, list):
+        return sum(entry.get('CapacityUnits', 0) for entry in consumed)
+    return 0
+
+def _request_consumed_capacity(params=None, model=None, context=None, **kwargs):
+    input_shape = getattr(model, 'input_shape', None)
+    if params is None or input_shape is None:
+        return
+    if 'ReturnConsumedCapacity' in input_shape.members:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+    if context is not None:
+        context[_TABLE_KEY] = _table_names(params)
+
+def _record_dynamodb_call(parsed=None, model=None, context=None, **kwargs):
+    invocation = _current
+    start = (context or {}).get(_START_KEY)
+    if invocation is None or start is None or not isinstance(parsed, dict):
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    capacity = _capacity_units(parsed.get('ConsumedCapacity'))
+    retries = (parsed.get('ResponseMetadata') or {}).get('RetryAttempts', 0)
+    if model.name in READ_OPERATIONS:
+        invocation.add('DynamoDBReadCapacity', capacity, 'Count')
+    else:
+        invocation.add('DynamoDBWriteCapacity', capacity, 'Count')
+    invocation.add('DynamoDBRetries', retries, 'Count')
+    invocation.add_operation(f"{model.name} {context.get(_TABLE_KEY, '-')}",
+                             calls=1, ms=elapsed_ms, capacity=capacity, retries=retries)
+
+def _record_throttle(throttling_error_codes, response=None, operation=None, request_dict=None, **kwargs):
+    invocation = _current
+    if invocation is None or not response:
+        return
+    code = ((response[1] or {}).get('Error') or {}).get('Code')
+    if code in throttling_error_codes:
+        table = ((request_dict or {}).get('context') or {}).get(_TABLE_KEY, '-')
+        invocation.add('DynamoDBThrottles', 1, 'Count')
+        invocation.add_operation(f'{operation.name} {table}', throttles=1)
+
+def instrument_dynamodb(client, throttling_error_codes=()):
+    """
+    Register the consumed capacity, retry and throttle hooks on a DynamoDB
+    client (idempotent). The client must also carry instrument_client()'s
+    hooks, which every client from utils.aws_clients does.
+
+    Args:
+        client (botocore.client.BaseClient): DynamoDB client
+        throttling_error_codes (tuple): Error codes counted as throttles
+
+    Returns:
+        The same client
+    """
+    events = client.meta.events
+    events.register('before-parameter-build.dynamodb', _request_consumed_capacity,
+                    unique_id='clinnet-metrics-consumed-capacity')
+    events.register('after-call.dynamodb', _record_dynamodb_call, unique_id='clinnet-metrics-dynamodb-call')
+    events.register('needs-retry.dynamodb', functools.partial(_record_throttle, frozenset(throttling_error_codes)),
+                    unique_id='clinnet-metrics-dynamodb-throttle')
+    return client
+
+def _body_bytes(message):
+    body = message.get('body') if isinstance(message, dict) else None
+    return len(body) if isinstance(body, str) else 0
+
+def build_metric_line(invocation, event, context, response, duration_ms, error, cold_start):
+    """
+    Build the EMF document for one invocation.
+
+    Returns:
+        dict: EMF document ready to be written as one JSON line
+    """
+    status = response.get('statusCode') if isinstance(response, dict) else None
+    invocation.add('Duration', duration_ms, 'Milliseconds')
+    invocation.add('ColdStart', int(cold_start), 'Count')
+    invocation.add('Error', int(error or (isinstance(status, int) and status >= 500)), 'Count')
+    invocation.add('RequestBytes', _body_bytes(event), 'Bytes')
+    invocation.add('ResponseBytes', _body_bytes(response), 'Bytes')
+
+    request_context = (event.get('requestContext') if isinstance(event, dict) else None) or {}
+    document = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Handler']],
+                'Metrics': [{'Name': name, 'Unit': invocation.units[name]} for name in invocation.values]
+            }]
+        },
+        'Handler': invocation.handler_name,
+        'functionName': getattr(context, 'function_name', None),
+        'awsRequestId': getattr(context, 'aws_request_id', None),
+        'requestId': request_context.get('requestId'),
+        'method': event.get('httpMethod') if isinstance(event, dict) else None,
+        'resource': event.get('resource') if isinstance(event, dict) else None,
+        'statusCode': status,
+    }
+    document.update({name: round(value, 3) for name, value in invocation.values.items()})
+    if invocation.operations:
+        document['DynamoDBOperations'] = {
+            key: {name: round(value, 3) for name, value in totals.items()}
+            for key, totals in sorted(invocation.operations.items())
+        }
+    return {key: value for key, value in document.items() if value is not None}
+
+def instrument_handler(handler):
+    """Decorator for lambda_handler that writes one EMF metric line per invocation."""
+    handler_name = handler.__module__.rsplit('.', 1)[-1]
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        global _current, _cold_start
+        if not METRICS_ENABLED:
+            return handler(event, context)
+
+        cold_start, _cold_start = _cold_start, False
+        previous, _current = _current, _Invocation(handler_name)
+        invocation = _current
+        start = time.perf_counter()
+        response = None
+        error = False
+        try:
+            response = handler(event, context)
+            return response
+        except Exception:
+            error = True
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            _current = previous
+            document = build_metric_line(invocation, event, context, response, duration_ms, error, cold_start)
+            sys.stdout.write(json.dumps(document, separators=(',', ':')) + '\n')
+    return wrapper
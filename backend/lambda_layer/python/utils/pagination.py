@@ -0,0 +1,182 @@
+"""
+Cursor pagination helpers shared by the list endpoints.
+
+A continuation token wraps a DynamoDB LastEvaluatedKey in an opaque,
+URL-safe base64 string signed with HMAC-SHA256, so clients can pass it back
+unchanged but cannot forge or edit the start key. Every token is bound to a
+scope (e.g. 'patients') so a token issued by one listing is rejected by
+another.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_PROJECTED_FIELDS = 50
+
+# Used only when PAGINATION_TOKEN_SECRET is not configured in a development
+# environment (local runs and tests); deployed stacks always generate a secret
+_DEVELOPMENT_SECRET = 'clinnet-dev-pagination-secret'
+_DEVELOPMENT_ENVIRONMENTS = ('dev', 'local')
+_FIELD_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+_TRUE_VALUES = ('true', '1', 'yes')
+
+_serializer = None
+_deserializer = None
+_warned_missing_secret = False
+
+class InvalidPaginationParameter(ValueError):
+    """Raised when limit, nextToken or fields cannot be used for a request."""
+
+def _token_secret():
+    global _warned_missing_secret
+    secret = os.environ.get('PAGINATION_TOKEN_SECRET')
+    if not secret:
+        environment = os.environ.get('ENVIRONMENT', 'local')
+        if environment not in _DEVELOPMENT_ENVIRONMENTS:
+            # A shared, public key would let clients forge start keys
+            raise RuntimeError(f"PAGINATION_TOKEN_SECRET must be set in the {environment} environment")
+        if not _warned_missing_secret:
+            logger.warning("PAGINATION_TOKEN_SECRET is not set; signing continuation tokens with the development secret")
+            _warned_missing_secret = True
+        secret = _DEVELOPMENT_SECRET
+    return secret.encode('utf-8')
+
+def _type_serializers():
+    # boto3 is imported on first use so listing handlers load without it
+    global _serializer, _deserializer
+    if _serializer is None:
+        from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+        _serializer, _deserializer = TypeSerializer(), TypeDeserializer()
+    return _serializer, _deserializer
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def _sign(payload):
+    return hmac.new(_token_secret(), payload, hashlib.sha256).digest()
+
+def encode_next_token(last_evaluated_key, scope):
+    """
+    Wrap a LastEvaluatedKey in a signed continuation token.
+
+    Args:
+        last_evaluated_key (dict): LastEvaluatedKey from a Query or Scan, or None
+        scope (str): Listing the token belongs to, e.g. 'patients'
+
+    Returns:
+        str: Opaque token, or None when there are no more pages
+    """
+    if not last_evaluated_key:
+        return None
+    serializer, _ = _type_serializers()
+    key = {name: serializer.serialize(value) for name, value in last_evaluated_key.items()}
+    payload = json.dumps({'s': scope, 'k': key}, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+def decode_next_token(token, scope):
+    """
+    Verify a continuation token and return the ExclusiveStartKey it wraps.
+
+    Args:
+        token (str): Token from the nextToken query parameter, or None
+        scope (str): Listing the request is for; must match the token's scope
+
+    Returns:
+        dict: ExclusiveStartKey, or None when no token was given
+
+    Raises:
+        InvalidPaginationParameter: If the token is malformed, tampered with,
+                                    or was issued for a different scope
+    """
+    if not token:
+        return None
+    try:
+        encoded_payload, encoded_signature = token.split('.')
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except ValueError:
+        raise InvalidPaginationParameter('nextToken is malformed')
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidPaginationParameter('nextToken signature is invalid')
+
+    data = json.loads(payload)
+    if data.get('s') != scope:
+        raise InvalidPaginationParameter('nextToken was issued for a different listing')
+    _, deserializer = _type_serializers()
+    return {name: deserializer.deserialize(value) for name, value in data['k'].items()}
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Parse the limit query parameter.
+
+    Args:
+        value (str): Raw query parameter value, or None
+        default (int): Page size when no limit is given
+        maximum (int): Largest page size a client may ask for
+
+    Returns:
+        int: Page size between 1 and maximum
+
+    Raises:
+        InvalidPaginationParameter: If the value is not an integer in range
+    """
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise InvalidPaginationParameter(f"limit must be an integer, got {value!r}")
+    if not 1 <= limit <= maximum:
+        raise InvalidPaginationParameter(f"limit must be between 1 and {maximum}")
+    return limit
+
+def build_projection(fields, always_include=()):
+    """
+    Turn the fields query parameter into ProjectionExpression kwargs.
+
+    Args:
+        fields (str): Comma-separated attribute names, or None for all attributes
+        always_include (iterable): Attributes returned even if not requested,
+                                   typically the key attributes clients rely on
+
+    Returns:
+        dict: ProjectionExpression and ExpressionAttributeNames, or {} when
+              no projection was requested
+
+    Raises:
+        InvalidPaginationParameter: If a field name is not a plain attribute name
+    """
+    if not fields:
+        return {}
+    names = []
+    for name in list(always_include) + fields.split(','):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if not _FIELD_NAME_PATTERN.match(name):
+            raise InvalidPaginationParameter(f"fields contains an invalid attribute name: {name!r}")
+        names.append(name)
+    if len(names) > MAX_PROJECTED_FIELDS:
+        raise InvalidPaginationParameter(f"fields may name at most {MAX_PROJECTED_FIELDS} attributes")
+
+    placeholders = {f"#f{i}": name for i, name in enumerate(names)}
+    return {
+        'ProjectionExpression': ', '.join(placeholders),
+        'ExpressionAttributeNames': placeholders
+    }
+
+def is_flag_set(query_params, name):
+    """Return True if a boolean query parameter such as all=true is set."""
+    return str((query_params or {}).get(name, '')).lower() in _TRUE_VALUES
@@ -0,0 +1,236 @@
+"""
+Caches that keep profile image lookups off Cognito and S3.
+
+Image keys are cached in USERS_TABLE, one item per username with the id
+'PROFILE_IMAGE#<username>', so every container and function shares them:
+imageKey ('' for a user without an image), variants (the thumbnail keys
+known to exist) and cacheExpiresAt (epoch seconds, also the table's TTL
+attribute). get_image_entries() answers a whole list of usernames with one
+BatchGetItem and only calls AdminGetUser, which Cognito rate limits, for the
+ones it has no live entry for. The handlers that change an image write the
+new key through with set_image_key() straight after updating Cognito, and
+entries loaded from Cognito are only stored if no such write got there first,
+so a racing reader cannot put an old key back. Entries still expire after
+PROFILE_IMAGE_KEY_TTL_SECONDS to pick up changes made outside the API, e.g.
+in the Cognito console. Without USERS_TABLE every lookup goes to Cognito.
+
+Presigned image URLs are cached per container by object key and reused until
+PRESIGNED_URL_REFRESH_SECONDS before they expire. Handing out the same URL
+for the same image also lets browsers cache the image itself.
+"""
+import os
+import time
+import logging
+
+from botocore.exceptions import ClientError
+
+from utils.db_utils import batch_get_items, get_dynamodb_resource
+from utils.profile_images import (
+    MISSING_OBJECT_ERROR_CODES, PROFILE_IMAGE_ATTRIBUTE, PROFILE_IMAGE_URL_EXPIRES, variant_key
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached image key may be used; 0 disables the shared cache
+PROFILE_IMAGE_KEY_TTL_SECONDS = int(os.environ.get('PROFILE_IMAGE_KEY_TTL_SECONDS', '86400'))
+
+# A cached presigned URL is replaced once it has less than this many seconds left
+PRESIGNED_URL_REFRESH_SECONDS = 600
+
+# Cached presigned URLs kept per container
+PRESIGNED_URL_CACHE_MAX_ENTRIES = 5000
+
+# Prefix of the cache items' ids in USERS_TABLE
+CACHE_ID_PREFIX = 'PROFILE_IMAGE#'
+
+# (bucket_name, key) -> (url, expires_at)
+_urls = {}
+
+_stats = {'key_hits': 0, 'key_misses': 0, 'url_hits': 0, 'url_misses': 0}
+
+def _table_name():
+    return os.environ.get('USERS_TABLE') if PROFILE_IMAGE_KEY_TTL_SECONDS > 0 else None
+
+def cache_id(username):
+    """Id of a user's cache item in USERS_TABLE."""
+    return f'{CACHE_ID_PREFIX}{username}'
+
+def _key_from_cognito(cognito, user_pool_id, username):
+    user = cognito.admin_get_user(UserPoolId=user_pool_id, Username=username)
+    for attr in user.get('UserAttributes', []):
+        if attr['Name'] == PROFILE_IMAGE_ATTRIBUTE:
+            return attr['Value'] or ''
+    return ''
+
+def _store_loaded_key(table_name, username, image_key, now):
+    try:
+        get_dynamodb_resource().Table(table_name).put_item(
+            Item={'id': cache_id(username), 'imageKey': image_key,
+                  'cacheExpiresAt': now + PROFILE_IMAGE_KEY_TTL_SECONDS},
+            # A live entry was written through by an upload or removal after our Cognito read
+            ConditionExpression='attribute_not_exists(#id) OR cacheExpiresAt < :now',
+            ExpressionAttributeNames={'#id': 'id'},
+            ExpressionAttributeValues={':now': now}
+        )
+    except ClientError as e:
+        # Only a cache fill: the key read from Cognito is still served
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            logger.warning(f"Could not cache the profile image key of {username}: {e}")
+
+def get_image_entries(usernames, cognito, user_pool_id, skip_failed_users=False):
+    """
+    Look up the current profile image of many users.
+
+    Args:
+        usernames (iterable): Cognito usernames; duplicates are looked up once
+        cognito (botocore.client.BaseClient): Cognito client, used for cache misses
+        user_pool_id (str): User pool ID
+        skip_failed_users (bool): Leave out users Cognito does not know or
+                                  could not be looked up for (logged) instead
+                                  of raising, so one user cannot fail a list
+
+    Returns:
+        dict: username -> {'imageKey': key or '', 'variants': set of thumbnail
+              keys known to exist, 'cached': False when just loaded from Cognito}
+    """
+    usernames = [username for username in dict.fromkeys(usernames) if username]
+    table_name = _table_name()
+    now = int(time.time())
+
+    entries = {}
+    if table_name and usernames:
+        for item in batch_get_items(table_name, [{'id': cache_id(username)} for username in usernames]):
+            if int(item.get('cacheExpiresAt', 0)) > now:
+                entries[item['id'][len(CACHE_ID_PREFIX):]] = {
+                    'imageKey': item.get('imageKey', ''),
+                    'variants': set(item.get('variants', ())),
+                    'cached': True
+                }
+
+    missing = [username for username in usernames if username not in entries]
+    _stats['key_hits'] += len(entries)
+    _stats['key_misses'] += len(missing)
+    for username in missing:
+        try:
+            image_key = _key_from_cognito(cognito, user_pool_id, username)
+        except Exception as e:
+            if not skip_failed_users:
+                raise
+            if not isinstance(e, ClientError) or e.response.get('Error', {}).get('Code') != 'UserNotFoundException':
+                logger.warning(f"Could not look up the profile image of {username}: {e}")
+            continue
+        entries[username] = {'imageKey': image_key, 'variants': set(), 'cached': False}
+        if table_name:
+            _store_loaded_key(table_name, username, image_key, now)
+    return entries
+
+def set_image_key(usernames, image_key):
+    """
+    Write a user's new image key (or '' after a removal) through to the cache
+    under every username the user is looked up by.
+
+    Args:
+        usernames (iterable): Usernames of the user, e.g. email and cognito:username
+        image_key (str): The new key, '' for no image
+    """
+    table_name = _table_name()
+    if not table_name:
+        return
+    expires_at = int(time.time()) + PROFILE_IMAGE_KEY_TTL_SECONDS
+    with get_dynamodb_resource().Table(table_name).batch_writer() as batch:
+        for username in dict.fromkeys(usernames):
+            if username:
+                batch.put_item(Item={'id': cache_id(username), 'imageKey': image_key, 'cacheExpiresAt': expires_at})
+
+def record_variant(username, image_key, thumbnail_key):
+    """Remember that a thumbnail of the user's current image exists."""
+    table_name = _table_name()
+    if not table_name:
+        return
+    try:
+        get_dynamodb_resource().Table(table_name).update_item(
+            Key={'id': cache_id(username)},
+            UpdateExpression='ADD variants :variant',
+            ConditionExpression='imageKey = :image',
+            ExpressionAttributeValues={':variant': {thumbnail_key}, ':image': image_key}
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            raise
+
+def presigned_url(s3, bucket_name, key):
+    """
+    Presigned GET URL for an object, reused while it has more than
+    PRESIGNED_URL_REFRESH_SECONDS left.
+
+    Args:
+        s3 (botocore.client.BaseClient): S3 client
+        bucket_name (str): Bucket name
+        key (str): Object key
+
+    Returns:
+        str: URL valid for at least PRESIGNED_URL_REFRESH_SECONDS
+    """
+    now = time.time()
+    cached = _urls.get((bucket_name, key))
+    if cached and cached[1] - PRESIGNED_URL_REFRESH_SECONDS > now:
+        _stats['url_hits'] += 1
+        return cached[0]
+
+    _stats['url_misses'] += 1
+    url = s3.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket_name, 'Key': key},
+        ExpiresIn=PROFILE_IMAGE_URL_EXPIRES
+    )
+    if len(_urls) >= PRESIGNED_URL_CACHE_MAX_ENTRIES:
+        for stale in [entry for entry, (_, expires_at) in _urls.items() if expires_at - PRESIGNED_URL_REFRESH_SECONDS <= now]:
+            del _urls[stale]
+        if len(_urls) >= PRESIGNED_URL_CACHE_MAX_ENTRIES:
+            _urls.clear()
+    _urls[(bucket_name, key)] = (url, now + PROFILE_IMAGE_URL_EXPIRES)
+    return url
+
+def resolve_image(s3, bucket_name, username, entry, size=None, image_format='webp'):
+    """
+    Pick the object to serve for a cached image entry: the requested
+    thumbnail once it exists, otherwise the original. A thumbnail not yet
+    known to exist costs one HeadObject, and is remembered once found.
+
+    Args:
+        s3 (botocore.client.BaseClient): S3 client
+        bucket_name (str): Bucket holding the images
+        username (str): Username the entry was looked up by
+        entry (dict): Entry from get_image_entries() with a non-empty imageKey
+        size (int): Thumbnail edge length, None for the original
+        image_format (str): Thumbnail format
+
+    Returns:
+        tuple: (key to serve, size served or None for the original)
+    """
+    image_key = entry['imageKey']
+    if size is None:
+        return image_key, None
+    thumbnail_key = variant_key(image_key, size, image_format)
+    if thumbnail_key in entry['variants']:
+        return thumbnail_key, size
+    try:
+        s3.head_object(Bucket=bucket_name, Key=thumbnail_key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in MISSING_OBJECT_ERROR_CODES:
+            raise
+        logger.info(f"Thumbnail not rendered yet, serving original: {thumbnail_key}")
+        return image_key, None
+    entry['variants'].add(thumbnail_key)
+    record_variant(username, image_key, thumbnail_key)
+    return thumbnail_key, size
+
+def get_cache_stats():
+    """Return this container's key and URL hit and miss counts."""
+    return dict(_stats)
+
+def clear_profile_image_cache():
+    """Drop every cached presigned URL and reset the counters."""
+    _urls.clear()
+    for counter in _stats:
+        _stats[counter] = 0
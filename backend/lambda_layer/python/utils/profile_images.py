@@ -0,0 +1,197 @@
+"""
+Keys, limits and Cognito bookkeeping for user profile images.
+
+Profile images live in DOCUMENTS_BUCKET under profile-images/<sub>/<uuid>.<ext>
+and the key of a user's current image is stored in their custom:profile_image
+Cognito attribute.
+
+Browsers upload in two steps so the image never passes through Lambda or API
+Gateway: POST /users/profile-image/upload-url returns a presigned POST from
+build_upload_form(), whose policy pins the key, the Content-Type and a size
+range of 1 to PROFILE_IMAGE_MAX_BYTES, and the browser posts the file straight
+to S3. POST /users/profile-image/confirm then checks the object with
+check_uploaded_image() (one HeadObject) and records it with
+set_profile_image_key(). The older base64 POST /users/profile-image keeps
+working for clients that have not moved over.
+
+Once an image is recorded, request_variants() asks the profile image
+processor (an async Lambda invoke, so the upload does not wait for it) to
+render square VARIANT_SIZES thumbnails in every VARIANT_FORMATS format. Their
+keys follow from the original's, e.g. profile-images/<sub>/<uuid>/128.webp
+for profile-images/<sub>/<uuid>.png, so readers find them with variant_key()
+and never need to list the bucket.
+"""
+import os
+import json
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Largest profile image accepted, in bytes
+PROFILE_IMAGE_MAX_BYTES = int(os.environ.get('PROFILE_IMAGE_MAX_BYTES', str(5 * 1024 * 1024)))
+
+# Seconds a presigned upload form stays valid
+PROFILE_IMAGE_UPLOAD_EXPIRES = int(os.environ.get('PROFILE_IMAGE_UPLOAD_EXPIRES', '300'))
+
+# Seconds a presigned image URL stays valid
+PROFILE_IMAGE_URL_EXPIRES = 3600
+
+# HeadObject error codes meaning the object does not exist. Without
+# s3:ListBucket on the bucket, S3 answers 403 rather than 404 for a missing
+# key, and the profile image functions are only granted object actions.
+MISSING_OBJECT_ERROR_CODES = ('403', '404', 'AccessDenied', 'Forbidden', 'NoSuchKey', 'NotFound')
+
+# Key prefix of every profile image
+PROFILE_IMAGE_PREFIX = 'profile-images/'
+
+# Cognito attribute holding the key of the current image
+PROFILE_IMAGE_ATTRIBUTE = 'custom:profile_image'
+
+# Accepted content types and the extension their keys get
+IMAGE_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+
+# Edge lengths, in pixels, of the square thumbnails rendered for every image
+VARIANT_SIZES = (64, 128, 512)
+
+# Thumbnail formats and their content types; the first is the default
+VARIANT_FORMATS = {
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+# Name of the function that renders the thumbnails; unset disables them
+PROFILE_IMAGE_PROCESSOR_FUNCTION = os.environ.get('PROFILE_IMAGE_PROCESSOR_FUNCTION')
+
+def new_image_key(user_sub, content_type):
+    """
+    Build a fresh object key for a user's profile image.
+
+    Args:
+        user_sub (str): Cognito sub of the user
+        content_type (str): One of IMAGE_EXTENSIONS
+
+    Returns:
+        str: profile-images/<sub>/<uuid>.<ext>
+    """
+    return f"{PROFILE_IMAGE_PREFIX}{user_sub}/{uuid.uuid4()}.{IMAGE_EXTENSIONS[content_type]}"
+
+def is_user_image_key(user_sub, key):
+    """True if key is an image key new_image_key() could have built for this user."""
+    prefix = f"{PROFILE_IMAGE_PREFIX}{user_sub}/"
+    if not isinstance(key, str) or not key.startswith(prefix):
+        return False
+    name = key[len(prefix):]
+    return bool(name) and '/' not in name and name.rsplit('.', 1)[-1] in IMAGE_EXTENSIONS.values()
+
+def build_upload_form(s3, bucket_name, key, content_type):
+    """
+    Presign a browser POST upload of one profile image.
+
+    Args:
+        s3 (botocore.client.BaseClient): S3 client
+        bucket_name (str): Bucket to upload to
+        key (str): Object key from new_image_key()
+        content_type (str): Content-Type the upload must be sent with
+
+    Returns:
+        dict: 'url' and 'fields' to send as multipart/form-data, with the file last
+    """
+    return s3.generate_presigned_post(
+        Bucket=bucket_name,
+        Key=key,
+        Fields={'Content-Type': content_type},
+        Conditions=[
+            {'Content-Type': content_type},
+            ['content-length-range', 1, PROFILE_IMAGE_MAX_BYTES],
+        ],
+        ExpiresIn=PROFILE_IMAGE_UPLOAD_EXPIRES
+    )
+
+def check_uploaded_image(s3, bucket_name, key):
+    """
+    Check that an uploaded object exists and is an acceptable image.
+
+    Args:
+        s3 (botocore.client.BaseClient): S3 client
+        bucket_name (str): Bucket the image was uploaded to
+        key (str): Object key
+
+    Returns:
+        str: None if the object is fine, otherwise why it was rejected
+
+    Raises:
+        ClientError: For S3 errors other than a missing object
+    """
+    from botocore.exceptions import ClientError
+    try:
+        head = s3.head_object(Bucket=bucket_name, Key=key)
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in MISSING_OBJECT_ERROR_CODES:
+            return 'Uploaded image not found'
+        raise
+    if head.get('ContentType') not in IMAGE_EXTENSIONS:
+        return f"Unsupported image type: {head.get('ContentType')}"
+    if not 0 < head.get('ContentLength', 0) <= PROFILE_IMAGE_MAX_BYTES:
+        return f"Image must be between 1 and {PROFILE_IMAGE_MAX_BYTES} bytes"
+    return None
+
+def set_profile_image_key(cognito, user_pool_id, username, key):
+    """Store key as the user's current profile image."""
+    cognito.admin_update_user_attributes(
+        UserPoolId=user_pool_id,
+        Username=username,
+        UserAttributes=[{'Name': PROFILE_IMAGE_ATTRIBUTE, 'Value': key}]
+    )
+
+def variant_key(key, size, image_format='webp'):
+    """
+    Key of one thumbnail of an image.
+
+    Args:
+        key (str): Key of the original image
+        size (int): One of VARIANT_SIZES
+        image_format (str): One of VARIANT_FORMATS
+
+    Returns:
+        str: <key without extension>/<size>.<format>
+    """
+    return f"{key.rsplit('.', 1)[0]}/{size}.{image_format}"
+
+def variant_keys(key):
+    """Keys of every thumbnail of an image."""
+    return [variant_key(key, size, image_format) for size in VARIANT_SIZES for image_format in VARIANT_FORMATS]
+
+def request_variants(lambda_client, bucket_name, key, function_name=None):
+    """
+    Ask the profile image processor to render the thumbnails of an image.
+    Failures are logged and swallowed: readers fall back to the original.
+
+    Args:
+        lambda_client (botocore.client.BaseClient): Lambda client
+        bucket_name (str): Bucket holding the image
+        key (str): Key of the original image
+        function_name (str): Processor function; defaults to PROFILE_IMAGE_PROCESSOR_FUNCTION
+
+    Returns:
+        bool: True if the processor was invoked
+    """
+    function_name = function_name or PROFILE_IMAGE_PROCESSOR_FUNCTION
+    if not function_name:
+        return False
+    try:
+        lambda_client.invoke(
+            FunctionName=function_name,
+            InvocationType='Event',
+            Payload=json.dumps({'bucket': bucket_name, 'key': key})
+        )
+        return True
+    except Exception as e:
+        logger.warning(f"Could not request thumbnails for {key}: {e}")
+        return False
@@ -0,0 +1,127 @@
+"""
+Structured, sampled request logging for Lambda handlers.
+
+log_request() replaces logging the whole API Gateway event. It writes one
+JSON line per sampled request with the fields needed to correlate and
+debug a call: API Gateway's requestId next to Lambda's awsRequestId (which
+the Lambda runtime stamps on every other log line of the invocation), the
+route, path and query parameters, a few request headers, the caller's
+Cognito sub and the body size. Bodies are never logged. Values under
+PHI or credential keys are replaced with REDACTED, long strings are cut and
+the line is capped at LOG_EVENT_MAX_BYTES. The summary is only built when it
+will be written: INFO must be enabled and the request must fall inside
+LOG_EVENT_SAMPLE_RATE. With DEBUG enabled the redacted event itself is
+logged too, under the same cap.
+"""
+import os
+import json
+import random
+import logging
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Fraction of requests whose summary is logged, from 0.0 (none) to 1.0 (all)
+LOG_EVENT_SAMPLE_RATE = float(os.environ.get('LOG_EVENT_SAMPLE_RATE', '1.0'))
+
+# Longest log line written for a request, in bytes
+LOG_EVENT_MAX_BYTES = int(os.environ.get('LOG_EVENT_MAX_BYTES', '2048'))
+
+# Longest string value kept in a summary
+MAX_VALUE_CHARS = 128
+
+REDACTED = '[REDACTED]'
+
+# Keys, compared case-insensitively, whose values are never logged
+SENSITIVE_KEYS = frozenset(key.lower() for key in (
+    'body', 'image', 'Authorization', 'Cookie', 'X-Amz-Security-Token', 'X-Api-Key', 'password',
+    'name', 'firstName', 'lastName', 'given_name', 'family_name', 'patientName', 'patient',
+    'dateOfBirth', 'dob', 'email', 'phone', 'phoneNumber', 'phone_number', 'address',
+    'insuranceProvider', 'insuranceNumber', 'ssn', 'notes', 'note', 'diagnosis', 'medicalHistory',
+    'search', 'q', 'username', 'cognito:username'
+))
+
+# Request headers worth keeping in the summary
+_SUMMARY_HEADERS = ('origin', 'user-agent', 'content-type', 'content-length', 'accept-encoding', 'if-none-match')
+
+def redact(value, depth=0):
+    """
+    Copy a JSON-like value, replacing anything under a sensitive key with
+    REDACTED and cutting strings to MAX_VALUE_CHARS.
+
+    Args:
+        value: dict, list or scalar from an event
+
+    Returns:
+        The redacted copy
+    """
+    if isinstance(value, dict):
+        if depth > 6:
+            return '...'
+        return {key: REDACTED if str(key).lower() in SENSITIVE_KEYS else redact(item, depth + 1)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        return [redact(item, depth + 1) for item in value[:20]]
+    if isinstance(value, str) and len(value) > MAX_VALUE_CHARS:
+        return value[:MAX_VALUE_CHARS] + f'...(+{len(value) - MAX_VALUE_CHARS} chars)'
+    return value
+
+def summarize_event(event, context=None):
+    """
+    Build the structured summary log_request() writes for an API Gateway event.
+
+    Args:
+        event (dict): Lambda event
+        context (LambdaContext): Lambda context, optional
+
+    Returns:
+        dict: Summary without request bodies or PHI
+    """
+    request_context = event.get('requestContext') or {}
+    headers = {key.lower(): value for key, value in (event.get('headers') or {}).items()}
+    claims = (request_context.get('authorizer') or {}).get('claims') or {}
+    body = event.get('body')
+
+    summary = {
+        'message': 'request',
+        'requestId': request_context.get('requestId'),
+        'awsRequestId': getattr(context, 'aws_request_id', None),
+        'method': event.get('httpMethod'),
+        'resource': event.get('resource'),
+        'path': event.get('path'),
+        'pathParameters': redact(event.get('pathParameters')),
+        'queryStringParameters': redact(event.get('queryStringParameters')),
+        'headers': redact({key: headers[key] for key in _SUMMARY_HEADERS if key in headers}),
+        'userSub': claims.get('sub'),
+        'bodyBytes': len(body) if isinstance(body, str) else 0,
+        'isBase64Encoded': bool(event.get('isBase64Encoded'))
+    }
+    return {key: value for key, value in summary.items() if value not in (None, {})}
+
+def _capped_json(value):
+    text = json.dumps(value, default=str, separators=(',', ':'))
+    if len(text) > LOG_EVENT_MAX_BYTES:
+        text = text[:LOG_EVENT_MAX_BYTES] + '...(truncated)'
+    return text
+
+def log_request(event, context=None, sample_rate=None):
+    """
+    Log a structured, redacted summary of the request for a sampled fraction
+    of invocations.
+
+    Args:
+        event (dict): Lambda event
+        context (LambdaContext): Lambda context, optional
+        sample_rate (float): Overrides LOG_EVENT_SAMPLE_RATE for this call
+
+    Returns:
+        bool: True if the summary was written
+    """
+    rate = LOG_EVENT_SAMPLE_RATE if sample_rate is None else sample_rate
+    if not logger.isEnabledFor(logging.INFO) or rate <= 0 or (rate < 1 and random.random() >= rate):
+        return False
+
+    logger.info('%s', _capped_json(summarize_event(event, context)))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('event %s', _capped_json(redact(event)))
+    return True
@@ -0,0 +1,183 @@
+"""
+Warm-container cache of the services catalogue and of service records used
+to price billing line items.
+
+The catalogue version lives in the catalogue versions table
+($CATALOGUE_VERSIONS_TABLE), one item per services table keyed by its name,
+so the services table only ever holds services. The create, update and
+delete service handlers bump its 'version' counter with
+bump_catalogue_version() after every write. Readers revalidate a cached copy
+with a single strongly consistent GetItem on that item, so a change made
+through any container is seen by every other container on its next read,
+and the full catalogue scan only runs when the version has moved or the
+entry has expired. Without a versions table nothing can be revalidated, and
+get_catalogue() scans on every call.
+
+get_catalogue() serves GET /services. get_services_by_ids() answers from a
+module-global store first and fetches everything it is missing with a single
+BatchGetItem, so pricing an invoice costs at most one round trip however
+many lines it has. Entries expire after SERVICE_CACHE_TTL_SECONDS and are
+also refetched when the caller passes a catalogue version that differs from
+the one they were cached under. Services that do not exist are never cached,
+so a newly created service is usable straight away.
+
+Hit, miss and version-check counts are kept per container and returned by
+get_cache_stats().
+"""
+import os
+import time
+import logging
+
+from utils.db_utils import batch_get_items, get_dynamodb_resource, iter_scan
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached service record or catalogue may be used; 0 disables the cache
+SERVICE_CACHE_TTL_SECONDS = int(os.environ.get('SERVICE_CACHE_TTL_SECONDS', '60'))
+
+
+# Attributes billing reads from a service record
+_PROJECTION = 'id, #name, price'
+_PROJECTION_NAMES = {'#name': 'name'}
+
+# (table_name, service_id) -> (service, version, expires_at)
+_services = {}
+
+# table_name -> (services, version, expires_at)
+_catalogues = {}
+
+_stats = {'hits': 0, 'misses': 0, 'version_checks': 0}
+
+def _versions_table_name():
+    return os.environ.get('CATALOGUE_VERSIONS_TABLE')
+
+def get_catalogue_version(table_name):
+    """
+    Read the current catalogue version with one consistent GetItem.
+
+    Args:
+        table_name (str): Services table name
+
+    Returns:
+        int: The version, 0 if the catalogue has never been written, or None
+             when no catalogue versions table is configured
+    """
+    versions_table_name = _versions_table_name()
+    if not versions_table_name:
+        return None
+    _stats['version_checks'] += 1
+    table = get_dynamodb_resource().Table(versions_table_name)
+    response = table.get_item(
+        Key={'id': table_name},
+        ProjectionExpression='version',
+        ConsistentRead=True
+    )
+    return int(response.get('Item', {}).get('version', 0))
+
+def bump_catalogue_version(table_name):
+    """
+    Increment the catalogue version after a service is created, updated or
+    deleted, and drop this container's cached copies of the table.
+
+    Args:
+        table_name (str): Services table name
+
+    Returns:
+        int: The new version, or None when no catalogue versions table is configured
+    """
+    _catalogues.pop(table_name, None)
+    for key in [key for key in _services if key[0] == table_name]:
+        del _services[key]
+    versions_table_name = _versions_table_name()
+    if not versions_table_name:
+        return None
+    table = get_dynamodb_resource().Table(versions_table_name)
+    response = table.update_item(
+        Key={'id': table_name},
+        UpdateExpression='ADD version :one',
+        ExpressionAttributeValues={':one': 1},
+        ReturnValues='UPDATED_NEW'
+    )
+    return int(response['Attributes']['version'])
+
+def get_catalogue(table_name, ttl_seconds=None):
+    """
+    Return every service in the table, from the cache while its version is current.
+
+    Args:
+        table_name (str): Services table name
+        ttl_seconds (int): Overrides SERVICE_CACHE_TTL_SECONDS for this call
+
+    Returns:
+        list: Service records
+    """
+    ttl = SERVICE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    version = get_catalogue_version(table_name)
+    now = time.monotonic()
+
+    entry = _catalogues.get(table_name)
+    if entry and entry[2] > now and version is not None and entry[1] == version:
+        _stats['hits'] += 1
+        logger.info(f"Services catalogue v{version} served from cache ({_stats['hits']} hits, {_stats['misses']} misses)")
+        return entry[0]
+
+    _stats['misses'] += 1
+    services = list(iter_scan(table_name))
+    if ttl > 0 and version is not None:
+        _catalogues[table_name] = (services, version, now + ttl)
+    logger.info(f"Services catalogue v{version} loaded from DynamoDB ({_stats['hits']} hits, {_stats['misses']} misses)")
+    return services
+
+def get_services_by_ids(table_name, service_ids, version=None, ttl_seconds=None):
+    """
+    Look up services by ID, serving fresh entries from the cache.
+
+    Args:
+        table_name (str): Services table name
+        service_ids (iterable): Service IDs; duplicates are looked up once
+        version: Optional catalogue version; cached entries stored under a
+                 different version are treated as stale
+        ttl_seconds (int): Overrides SERVICE_CACHE_TTL_SECONDS for this call
+
+    Returns:
+        dict: service_id -> service (id, name, price); IDs that do not exist
+              are absent
+    """
+    ttl = SERVICE_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now = time.monotonic()
+
+    found = {}
+    to_fetch = []
+    for service_id in dict.fromkeys(service_ids):
+        entry = _services.get((table_name, service_id))
+        if entry and entry[2] > now and entry[1] == version:
+            found[service_id] = entry[0]
+        else:
+            to_fetch.append(service_id)
+
+    _stats['hits'] += len(found)
+    _stats['misses'] += len(to_fetch)
+    if to_fetch:
+        items = batch_get_items(
+            table_name,
+            [{'id': service_id} for service_id in to_fetch],
+            projection_expression=_PROJECTION,
+            expression_attribute_names=_PROJECTION_NAMES
+        )
+        for item in items:
+            found[item['id']] = item
+            if ttl > 0:
+                _services[(table_name, item['id'])] = (item, version, now + ttl)
+
+    return found
+
+def get_cache_stats():
+    """Return this container's hit, miss and version-check counts."""
+    return dict(_stats)
+
+def clear_services_cache():
+    """Drop every cached service record and catalogue and reset the counters."""
+    _services.clear()
+    _catalogues.clear()
+    for counter in _stats:
+        _stats[counter] = 0
@@ -0,0 +1,324 @@
+"""
+Mirror of the Cognito user pool in USER_DIRECTORY_TABLE, so user listings do
+not page through Cognito's rate-limited ListUsers.
+
+Every user has one item keyed by their Cognito username (id) holding the
+fields GET /users returns, plus entityType 'USER', sortName (lower-cased
+"last first email") and searchText (lower-cased names, email and phone).
+Three indexes serve the listings; the state item carries none of their keys,
+so it never shows up in them:
+
+- DirectoryIndex (entityType, sortName): every user in name order
+- RoleIndex (role, sortName): the users of one role in name order
+- EmailIndex (email): the username behind an email
+
+The mirror is written by the user and profile image handlers straight after
+their Cognito call, by the Cognito PostConfirmation and PostAuthentication
+triggers (self sign-ups and sign-ins), and by reconcile(), which a scheduled
+job runs to re-read the whole pool and repair whatever the others missed,
+such as edits made in the Cognito console. Handler writes never fail the
+request: the Cognito change has already happened, so a failed write is logged
+and left to the next reconciliation.
+
+GET /users only reads the mirror once reconcile() has completed at least
+once (it records a state item), so a fresh deployment keeps listing from
+Cognito until the directory has been filled.
+"""
+import os
+import logging
+
+from botocore.exceptions import ClientError
+
+from utils.db_utils import fetch_page, get_dynamodb_resource, iter_query
+
+logger = logging.getLogger(__name__)
+
+# entityType of directory items
+DIRECTORY_ENTITY_TYPE = 'USER'
+
+# Index names, see the module docstring
+DIRECTORY_INDEX = 'DirectoryIndex'
+ROLE_INDEX = 'RoleIndex'
+EMAIL_INDEX = 'EmailIndex'
+
+# Id of the item recording the last completed reconciliation
+STATE_ID = 'USER_DIRECTORY#STATE'
+
+# Role of users without a custom:role attribute
+DEFAULT_ROLE = 'user'
+
+# Page size of the Cognito ListUsers calls made by reconcile() (the API maximum)
+RECONCILE_PAGE_SIZE = 60
+
+# Cognito attribute -> directory field
+_ATTRIBUTE_FIELDS = {
+    'sub': 'sub',
+    'email': 'email',
+    'given_name': 'firstName',
+    'family_name': 'lastName',
+    'phone_number': 'phone',
+    'custom:role': 'role',
+    'custom:profile_image': 'profileImage',
+}
+
+# Set once this container has seen a completed reconciliation
+_ready = False
+
+def _table_name():
+    return os.environ.get('USER_DIRECTORY_TABLE')
+
+def _isoformat(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+def build_item(username, attributes, **fields):
+    """
+    Build the directory item of a user.
+
+    Args:
+        username (str): Cognito username
+        attributes (dict): Cognito attribute name -> value
+        **fields: Other fields to store, e.g. enabled, userStatus, userCreateDate
+
+    Returns:
+        dict: Directory item; empty values are left out, as index keys cannot be empty
+    """
+    item = {'id': username, 'entityType': DIRECTORY_ENTITY_TYPE}
+    for name, field in _ATTRIBUTE_FIELDS.items():
+        if attributes.get(name):
+            item[field] = attributes[name]
+    if 'email' in item:
+        item['email'] = item['email'].lower()
+    item.setdefault('role', DEFAULT_ROLE)
+    for field, value in fields.items():
+        value = _isoformat(value)
+        if value is not None and value != '':
+            item[field] = value
+
+    first_name, last_name, email = item.get('firstName', ''), item.get('lastName', ''), item.get('email', '')
+    item['sortName'] = ' '.join(part for part in (last_name, first_name, email or username) if part).lower()
+    item['searchText'] = ' '.join(part for part in (first_name, last_name, email, item.get('phone', '')) if part).lower()
+    return item
+
+def item_from_cognito(user):
+    """Directory item of a user from ListUsers (Attributes) or AdminGetUser (UserAttributes)."""
+    attributes = {attr['Name']: attr['Value'] for attr in user.get('Attributes') or user.get('UserAttributes') or []}
+    return build_item(
+        user['Username'],
+        attributes,
+        enabled=user.get('Enabled'),
+        userStatus=user.get('UserStatus'),
+        userCreateDate=user.get('UserCreateDate'),
+        userLastModifiedDate=user.get('UserLastModifiedDate')
+    )
+
+def user_from_item(item):
+    """The GET /users representation of a directory item."""
+    return {
+        'username': item['id'],
+        'enabled': item.get('enabled'),
+        'userStatus': item.get('userStatus'),
+        'userCreateDate': item.get('userCreateDate'),
+        'userLastModifiedDate': item.get('userLastModifiedDate'),
+        'firstName': item.get('firstName', ''),
+        'lastName': item.get('lastName', ''),
+        'email': item.get('email', ''),
+        'phone': item.get('phone', ''),
+        'role': item.get('role', DEFAULT_ROLE),
+        'sub': item.get('sub', '')
+    }
+
+def matches(user, role=None, search=None):
+    """True if a GET /users user has the role and contains the search text."""
+    if role and user.get('role') != role:
+        return False
+    if search:
+        text = ' '.join(user.get(field) or '' for field in ('firstName', 'lastName', 'email', 'phone')).lower()
+        return search.lower() in text
+    return True
+
+def get_user(username):
+    """Directory item of a username, or None."""
+    table_name = _table_name()
+    if not table_name:
+        return None
+    return get_dynamodb_resource().Table(table_name).get_item(Key={'id': username}).get('Item')
+
+def find_username(email):
+    """Username of the user with this email, or None."""
+    table_name = _table_name()
+    if not table_name or not email:
+        return None
+    response = get_dynamodb_resource().Table(table_name).query(
+        IndexName=EMAIL_INDEX,
+        KeyConditionExpression='email = :email',
+        ExpressionAttributeValues={':email': email.lower()},
+        Limit=1
+    )
+    items = response.get('Items', [])
+    return items[0]['id'] if items else None
+
+def _directory_id(username):
+    # Cognito accepts the email in place of the username, the directory does not
+    if '@' in username and not get_user(username):
+        return find_username(username) or username
+    return username
+
+def save_user(cognito_user):
+    """
+    Write a user returned by AdminGetUser or ListUsers to the directory.
+
+    Returns:
+        bool: True if written; failures are logged and swallowed
+    """
+    table_name = _table_name()
+    if not table_name:
+        return False
+    try:
+        get_dynamodb_resource().Table(table_name).put_item(Item=item_from_cognito(cognito_user))
+        return True
+    except Exception as e:
+        logger.warning(f"Could not update the user directory for {cognito_user.get('Username')}: {e}")
+        return False
+
+def update_user_fields(username, attributes=None, **fields):
+    """
+    Update some fields of a user already in the directory.
+
+    Args:
+        username (str): Cognito username or email
+        attributes (dict): Changed Cognito attributes, e.g. from a trigger
+        **fields: Other changed fields, e.g. enabled=False
+
+    Returns:
+        bool: True if written; failures are logged and swallowed, and users
+              not in the directory yet are left for reconciliation
+    """
+    table_name = _table_name()
+    if not table_name:
+        return False
+    try:
+        username = _directory_id(username)
+        updates = dict(fields)
+        if attributes:
+            # Rebuild the derived fields from the stored item merged with the changes
+            current = get_user(username) or {}
+            merged = {name: current.get(field) for name, field in _ATTRIBUTE_FIELDS.items() if current.get(field)}
+            merged.update(attributes)
+            updates = {**build_item(username, merged), **updates}
+        updates.pop('id', None)
+        names = {f'#f{i}': name for i, name in enumerate(updates)}
+        values = {f':v{i}': value for i, value in enumerate(updates.values())}
+        get_dynamodb_resource().Table(table_name).update_item(
+            Key={'id': username},
+            UpdateExpression='SET ' + ', '.join(f'{name} = {value}' for name, value in zip(names, values)),
+            ConditionExpression='attribute_exists(#id)',
+            ExpressionAttributeNames={'#id': 'id', **names},
+            ExpressionAttributeValues=values
+        )
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            logger.info(f"{username} is not in the user directory yet; left for reconciliation")
+        else:
+            logger.warning(f"Could not update the user directory for {username}: {e}")
+        return False
+    except Exception as e:
+        logger.warning(f"Could not update the user directory for {username}: {e}")
+        return False
+
+def remove_user(username):
+    """Remove a deleted user from the directory; failures are logged and swallowed."""
+    table_name = _table_name()
+    if not table_name:
+        return False
+    try:
+        get_dynamodb_resource().Table(table_name).delete_item(Key={'id': _directory_id(username)})
+        return True
+    except Exception as e:
+        logger.warning(f"Could not remove {username} from the user directory: {e}")
+        return False
+
+def is_ready():
+    """True once the directory has been filled by a completed reconciliation."""
+    global _ready
+    if not _ready:
+        _ready = bool(_table_name()) and get_user(STATE_ID) is not None
+    return _ready
+
+def list_page(limit, exclusive_start_key=None, role=None, search=None, descending=False):
+    """
+    Fetch one page of users in name order.
+
+    Args:
+        limit (int): Maximum number of users
+        exclusive_start_key (dict): Key to resume from, or None for the first page
+        role (str): Only users with this role (RoleIndex)
+        search (str): Only users whose names, email or phone contain this text
+        descending (bool): Reverse name order
+
+    Returns:
+        tuple: (directory items, last_evaluated_key or None)
+    """
+    from boto3.dynamodb.conditions import Attr, Key
+    if role:
+        kwargs = {'IndexName': ROLE_INDEX, 'KeyConditionExpression': Key('role').eq(role)}
+    else:
+        kwargs = {'IndexName': DIRECTORY_INDEX, 'KeyConditionExpression': Key('entityType').eq(DIRECTORY_ENTITY_TYPE)}
+    if search:
+        kwargs['FilterExpression'] = Attr('searchText').contains(search.lower())
+    return fetch_page(_table_name(), limit, operation='query', exclusive_start_key=exclusive_start_key,
+                      ScanIndexForward=not descending, **kwargs)
+
+def token_scope(role=None):
+    """Continuation token scope of a listing; keys of one index cannot resume another."""
+    return f"users:{ROLE_INDEX if role else DIRECTORY_INDEX}"
+
+def reconcile(cognito, user_pool_id):
+    """
+    Make the directory match the user pool: write users that are missing or
+    differ, delete users that no longer exist, then record the run.
+
+    Args:
+        cognito (botocore.client.BaseClient): Cognito client
+        user_pool_id (str): User pool ID
+
+    Returns:
+        dict: Numbers of users 'written', 'deleted' and 'unchanged'
+    """
+    import time
+    from boto3.dynamodb.conditions import Key
+    table_name = _table_name()
+    table = get_dynamodb_resource().Table(table_name)
+    stored = {item['id']: item for item in iter_query(
+        table_name, IndexName=DIRECTORY_INDEX,
+        KeyConditionExpression=Key('entityType').eq(DIRECTORY_ENTITY_TYPE))}
+
+    stats = {'written': 0, 'deleted': 0, 'unchanged': 0}
+    seen = set()
+    params = {'UserPoolId': user_pool_id, 'Limit': RECONCILE_PAGE_SIZE}
+    with table.batch_writer() as batch:
+        while True:
+            result = cognito.list_users(**params)
+            for user in result.get('Users', []):
+                item = item_from_cognito(user)
+                seen.add(item['id'])
+                if stored.get(item['id']) == item:
+                    stats['unchanged'] += 1
+                else:
+                    batch.put_item(Item=item)
+                    stats['written'] += 1
+            if not result.get('PaginationToken'):
+                break
+            params['PaginationToken'] = result['PaginationToken']
+        for username in stored.keys() - seen:
+            batch.delete_item(Key={'id': username})
+            stats['deleted'] += 1
+
+    table.put_item(Item={'id': STATE_ID, 'reconciledAt': int(time.time()), **stats})
+    logger.info(f"User directory reconciled: {stats}")
+    return stats
+
+def clear_user_directory_cache():
+    """Forget that the directory was seen ready."""
+    global _ready
+    _ready = False
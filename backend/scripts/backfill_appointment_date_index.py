@@ -0,0 +1,94 @@
+"""
+Backfill the AppointmentDateIndex keys (entityType, appointmentDate) on
+appointments written before create_appointment started setting them.
+
+Rows are found with a Scan filtered on the missing attributes, and each one is
+updated in place with a conditional UpdateItem, so the script is safe to
+re-run and never recreates a row deleted while it was running. Rows without a
+'date' or ISO 'start' are reported and left alone.
+
+Usage:
+    python scripts/backfill_appointment_date_index.py [--table clinnet-appointments-dev] [--dry-run]
+
+The table defaults to $APPOINTMENTS_TABLE, then clinnet-appointments-$ENVIRONMENT.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_layer', 'python'))
+
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
+
+from utils.db_utils import iter_scan, get_dynamodb_resource, appointment_date_index_keys
+
+
+def backfill_appointment_date_index(table_name, dry_run=False):
+    """
+    Set entityType/appointmentDate on every appointment that lacks them.
+
+    Args:
+        table_name (str): Appointments table name
+        dry_run (bool): If True, only count the rows that would change
+
+    Returns:
+        dict: Counts of 'scanned', 'updated', 'skipped' (no usable date)
+              and 'vanished' (deleted before the update landed)
+    """
+    table = get_dynamodb_resource().Table(table_name)
+    stats = {}
+    counts = {'updated': 0, 'skipped': 0, 'vanished': 0}
+
+    missing_keys = Attr('entityType').not_exists() | Attr('appointmentDate').not_exists()
+    for appointment in iter_scan(
+        table_name,
+        stats=stats,
+        FilterExpression=missing_keys,
+        ProjectionExpression='id, #date, #start',
+        ExpressionAttributeNames={'#date': 'date', '#start': 'start'}
+    ):
+        keys = appointment_date_index_keys(appointment)
+        if not keys:
+            print(f"Skipping appointment {appointment['id']}: no date or start attribute")
+            counts['skipped'] += 1
+            continue
+        if dry_run:
+            counts['updated'] += 1
+            continue
+        try:
+            table.update_item(
+                Key={'id': appointment['id']},
+                UpdateExpression='SET entityType = :entity_type, appointmentDate = :appointment_date',
+                ConditionExpression='attribute_exists(id)',
+                ExpressionAttributeValues={
+                    ':entity_type': keys['entityType'],
+                    ':appointment_date': keys['appointmentDate']
+                }
+            )
+            counts['updated'] += 1
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                raise
+            counts['vanished'] += 1
+
+    counts['scanned'] = stats.get('ScannedCount', 0)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", default=os.environ.get(
+        "APPOINTMENTS_TABLE", f"clinnet-appointments-{os.environ.get('ENVIRONMENT', 'dev')}"))
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    counts = backfill_appointment_date_index(args.table, dry_run=args.dry_run)
+    action = "Would update" if args.dry_run else "Updated"
+    print(f"{action} {counts['updated']} appointments in {args.table} "
+          f"(scanned {counts['scanned']}, skipped {counts['skipped']} without a date, "
+          f"{counts['vanished']} deleted during the run)")
+
+
+if __name__ == "__main__":
+    main()
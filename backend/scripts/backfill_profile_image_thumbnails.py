@@ -0,0 +1,114 @@
+"""
+Render the profile image thumbnails of images uploaded before the profile
+image processor existed.
+
+Users are read from the Cognito user pool, and for every custom:profile_image
+key whose thumbnails are missing the script invokes the processor function
+asynchronously, exactly as the upload handlers do. Thumbnails are checked for
+with one HeadObject on the last variant the processor writes, so the script
+is safe to re-run and skips images that are already done. Keys that are not
+original profile images are reported and left alone.
+
+Usage:
+    python scripts/backfill_profile_image_thumbnails.py --user-pool-id <id> --bucket <name> --function <name> [--dry-run]
+
+The user pool defaults to $USER_POOL_ID, the bucket to $DOCUMENTS_BUCKET and
+the function to $PROFILE_IMAGE_PROCESSOR_FUNCTION. The stack outputs
+UserPoolId, DocumentsBucket and ProcessProfileImageFunctionName give all three.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_layer', 'python'))
+
+from botocore.exceptions import ClientError
+
+from utils.aws_clients import get_client
+from utils.profile_images import (
+    MISSING_OBJECT_ERROR_CODES, PROFILE_IMAGE_ATTRIBUTE, PROFILE_IMAGE_PREFIX, VARIANT_FORMATS, VARIANT_SIZES,
+    request_variants, variant_key
+)
+
+# Page size of the Cognito ListUsers calls (the API maximum)
+LIST_USERS_PAGE_SIZE = 60
+
+
+def profile_image_keys(cognito, user_pool_id):
+    """Yield (username, key) for every user with a profile image."""
+    params = {'UserPoolId': user_pool_id, 'Limit': LIST_USERS_PAGE_SIZE}
+    while True:
+        result = cognito.list_users(**params)
+        for user in result.get('Users', []):
+            attributes = {attr['Name']: attr['Value'] for attr in user.get('Attributes', [])}
+            if attributes.get(PROFILE_IMAGE_ATTRIBUTE):
+                yield user['Username'], attributes[PROFILE_IMAGE_ATTRIBUTE]
+        if not result.get('PaginationToken'):
+            return
+        params['PaginationToken'] = result['PaginationToken']
+
+
+def has_thumbnails(s3, bucket_name, key):
+    """True if the last thumbnail the processor writes for key exists."""
+    # The processor renders the largest size first and every format per size
+    try:
+        s3.head_object(Bucket=bucket_name, Key=variant_key(key, min(VARIANT_SIZES), list(VARIANT_FORMATS)[-1]))
+        return True
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in MISSING_OBJECT_ERROR_CODES:
+            raise
+        return False
+
+
+def backfill_profile_image_thumbnails(user_pool_id, bucket_name, function_name, dry_run=False):
+    """
+    Ask the processor to render the thumbnails of every profile image lacking them.
+
+    Args:
+        user_pool_id (str): Cognito user pool ID
+        bucket_name (str): Bucket holding the profile images
+        function_name (str): Profile image processor function
+        dry_run (bool): If True, only count the images that would be rendered
+
+    Returns:
+        dict: Counts of 'users' with an image, 'requested', 'rendered' (already
+              had thumbnails), 'skipped' (not an original image) and 'failed'
+    """
+    cognito, s3, lambda_client = get_client('cognito-idp'), get_client('s3'), get_client('lambda')
+    counts = {'users': 0, 'requested': 0, 'rendered': 0, 'skipped': 0, 'failed': 0}
+
+    for username, key in profile_image_keys(cognito, user_pool_id):
+        counts['users'] += 1
+        # Originals are profile-images/<sub>/<name>; thumbnails sit one level deeper
+        if not key.startswith(PROFILE_IMAGE_PREFIX) or key[len(PROFILE_IMAGE_PREFIX):].count('/') != 1:
+            print(f"Skipping {username}: {key} is not an original profile image")
+            counts['skipped'] += 1
+        elif has_thumbnails(s3, bucket_name, key):
+            counts['rendered'] += 1
+        elif dry_run or request_variants(lambda_client, bucket_name, key, function_name):
+            counts['requested'] += 1
+        else:
+            counts['failed'] += 1
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-pool-id", default=os.environ.get("USER_POOL_ID"))
+    parser.add_argument("--bucket", default=os.environ.get("DOCUMENTS_BUCKET"))
+    parser.add_argument("--function", default=os.environ.get("PROFILE_IMAGE_PROCESSOR_FUNCTION"))
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be rendered without invoking")
+    args = parser.parse_args()
+    missing = [name for name in ("user_pool_id", "bucket", "function") if not getattr(args, name)]
+    if missing:
+        parser.error(f"missing {', '.join('--' + name.replace('_', '-') for name in missing)}")
+
+    counts = backfill_profile_image_thumbnails(args.user_pool_id, args.bucket, args.function, dry_run=args.dry_run)
+    action = "Would request" if args.dry_run else "Requested"
+    print(f"{action} thumbnails for {counts['requested']} of {counts['users']} profile images "
+          f"({counts['rendered']} already rendered, {counts['skipped']} skipped, {counts['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -69,6 +69,24 @@ prepare_batch_write_request() {
   echo "Successfully prepared batch write request: $output_file"
 }
 
+# Synthetic data at scale instead of the static seed files (see synthetic_data.py):
+#   SEED_SCALE=10000 [SEED=42] [DYNAMODB_ENDPOINT_URL=http://localhost:8000] ./seed_data.sh
+# SEED_DATASETS picks the tables to fill; billing is left out by default because
+# the template does not deploy a billing table.
+if [ -n "$SEED_SCALE" ]; then
+  ENDPOINT_ARGS=()
+  if [ -n "$DYNAMODB_ENDPOINT_URL" ]; then
+    ENDPOINT_ARGS=(--endpoint-url "$DYNAMODB_ENDPOINT_URL")
+  fi
+  echo "Loading synthetic data for ${SEED_SCALE} patients (seed ${SEED:-42})..."
+  PATIENT_RECORDS_TABLE="$PATIENT_RECORDS_TABLE" SERVICES_TABLE="$SERVICES_TABLE" APPOINTMENTS_TABLE="$APPOINTMENTS_TABLE" \
+    python3 "${SCRIPT_DIR}/synthetic_data.py" load --scale "$SEED_SCALE" --seed "${SEED:-42}" \
+    --environment "$ENVIRONMENT" --region "$AWS_REGION" \
+    --datasets ${SEED_DATASETS:-patients appointments services reports} "${ENDPOINT_ARGS[@]}"
+  echo "Synthetic data seeding complete!"
+  exit 0
+fi
+
 # Prepare and seed services
 SERVICES_BATCH_FILE="${DATA_DIR}/services_batch_request.json"
 prepare_batch_write_request "${DATA_DIR}/seed_services.json" "$SERVICES_TABLE" "$SERVICES_BATCH_FILE"
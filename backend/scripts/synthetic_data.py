@@ -0,0 +1,469 @@
+"""
+Generate deterministic synthetic seed data at any scale and load it into
+DynamoDB, DynamoDB Local or moto.
+
+The same seed and counts always produce the same records, so benchmark runs
+and seeded environments can be compared. Each dataset is generated from its
+own random stream (derived from the seed and the dataset name), so changing
+one count never changes the records of another dataset. Records have the
+shapes the handlers write:
+
+- patients: PatientRecordsTable METADATA rows. The type attribute feeds
+  type-index.
+- appointments: AppointmentsTable rows with the AppointmentDateIndex keys.
+  Doctor load follows a Zipf curve (a few doctors carry most of the
+  bookings), patients book repeatedly with a long tail, Mondays are the
+  busiest weekdays, weekends are quiet and mornings fill first. Rows before
+  the middle of the date window are completed, cancelled or no-shows; the
+  rest are scheduled.
+- services: the catalogue, with popular services billed far more often.
+- billing: invoices of 1 to 5 lines priced from the generated services.
+- reports: MedicalReportsTable rows.
+
+Records stream as generators, so writing JSONL or loading a table never holds
+a dataset in memory. Loading uses BatchWriteItem in 25-item requests and
+retries UnprocessedItems with backoff.
+
+Usage:
+    python scripts/synthetic_data.py generate --scale 10000 [--seed 42] [--out-dir data/generated]
+    python scripts/synthetic_data.py load --scale 10000 [--seed 42] [--environment dev]
+        [--in-dir data/generated] [--endpoint-url http://localhost:8000] [--create-tables]
+
+--scale is the patient count; the other datasets scale with it unless their
+counts are given (--appointments, --services, --billing, --reports, --doctors).
+Table names default to $PATIENT_RECORDS_TABLE, $APPOINTMENTS_TABLE,
+$SERVICES_TABLE, $BILLING_TABLE and $MEDICAL_REPORTS_TABLE, then to
+clinnet-<name>-$ENVIRONMENT.
+"""
+import argparse
+import bisect
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+DEFAULT_SEED = 42
+
+# First day of the generated appointment window; fixed so output never depends on the clock
+DEFAULT_START_DATE = date(2025, 1, 1)
+DEFAULT_DAYS = 365
+
+# BatchWriteItem accepts at most 25 put requests per call
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_WRITE_MAX_RETRIES = 8
+BATCH_WRITE_BASE_DELAY_SECONDS = 0.05
+
+DATASETS = ('patients', 'appointments', 'services', 'billing', 'reports')
+
+# Environment variable and default table suffix for each dataset
+TABLES = {
+    'patients': ('PATIENT_RECORDS_TABLE', 'patient-records'),
+    'appointments': ('APPOINTMENTS_TABLE', 'appointments'),
+    'services': ('SERVICES_TABLE', 'services'),
+    'billing': ('BILLING_TABLE', 'billing'),
+    'reports': ('MEDICAL_REPORTS_TABLE', 'medical-reports'),
+}
+
+ID_FORMATS = {
+    'patients': 'pat-{:07d}',
+    'appointments': 'appt-{:07d}',
+    'services': 'svc-{:05d}',
+    'billing': 'bill-{:07d}',
+    'reports': 'rpt-{:07d}',
+    'doctors': 'doc-{:04d}',
+}
+
+FIRST_NAMES = (
+    'Olivia', 'Liam', 'Emma', 'Noah', 'Ava', 'Elijah', 'Sophia', 'James', 'Isabella', 'Lucas',
+    'Mia', 'Mateo', 'Amelia', 'Benjamin', 'Harper', 'Wei', 'Priya', 'Mohammed', 'Fatima', 'Hiroshi',
+    'Yuki', 'Carlos', 'Lucia', 'Kwame', 'Amara', 'Ivan', 'Olga', 'Aiden', 'Chloe', 'Ethan'
+)
+LAST_NAMES = (
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Nguyen', 'Kim',
+    'Patel', 'Chen', 'Okafor', 'Ivanova', 'Tanaka', 'Haddad', 'Silva', 'Cohen', 'Novak', 'Larsen'
+)
+STREETS = ('Main St', 'Oak Ave', 'Pine Rd', 'Maple Dr', 'Cedar Ln', 'Elm St', 'Lakeview Blvd', 'Hillcrest Way')
+CITIES = (('Springfield', 'IL'), ('Riverside', 'CA'), ('Franklin', 'TN'), ('Greenville', 'SC'), ('Madison', 'WI'))
+INSURANCE_PROVIDERS = ('Acme Health', 'BlueShield', 'CareFirst', 'Medicare', 'UnitedCare', None)
+
+SERVICE_CATEGORIES = {
+    'General': ('Checkup', 'Follow-up Visit', 'Annual Physical', 'Vaccination'),
+    'Specialist': ('Cardiology Consultation', 'Dermatology Consultation', 'Neurology Consultation'),
+    'Diagnostics': ('Blood Panel', 'X-Ray', 'Ultrasound', 'ECG', 'MRI'),
+    'Procedures': ('Minor Surgery', 'Wound Care', 'Injection', 'Suture Removal'),
+    'Therapy': ('Physical Therapy Session', 'Counselling Session'),
+}
+APPOINTMENT_TYPES = ('Checkup', 'Consultation', 'Follow-up', 'Procedure', 'Lab Work')
+PAYMENT_METHODS = ('card', 'cash', 'insurance', 'bank_transfer')
+REPORT_FINDINGS = (
+    'Vitals within normal limits.', 'Mild hypertension noted; lifestyle changes advised.',
+    'Lab results pending.', 'No acute distress.', 'Patient reports improved sleep.',
+    'Medication dosage adjusted.', 'Referral to specialist recommended.', 'Follow-up in six weeks.'
+)
+
+# Zipf exponents: how strongly the busiest doctors, most frequent patients and
+# most billed services dominate (0 is uniform)
+DOCTOR_SKEW = 0.8
+PATIENT_SKEW = 0.3
+SERVICE_SKEW = 1.0
+
+# Relative booking volume Monday..Sunday
+WEEKDAY_WEIGHTS = (1.3, 1.2, 1.1, 1.0, 0.9, 0.25, 0.05)
+
+# Clinic slots every 15 minutes from 08:00 to 17:30, mornings filling first
+SLOTS = [(hour, minute) for hour in range(8, 18) for minute in (0, 15, 30, 45)][:-2]
+SLOT_WEIGHTS = [2.0 if hour < 12 else 1.0 for hour, _ in SLOTS]
+
+def make_id(dataset, index):
+    """Deterministic id of the index-th record of a dataset (or 'doctors')."""
+    return ID_FORMATS[dataset].format(index)
+
+def default_counts(scale):
+    """
+    Counts of every dataset for a patient count.
+
+    Args:
+        scale (int): Number of patients
+
+    Returns:
+        dict: Counts keyed by dataset name, plus 'doctors'
+    """
+    return {
+        'patients': scale,
+        'appointments': scale * 4,
+        'services': min(500, max(20, scale // 100)),
+        'billing': scale * 2,
+        'reports': scale,
+        'doctors': max(5, scale // 400),
+    }
+
+def _rng(seed, dataset):
+    return random.Random(f'{seed}:{dataset}')
+
+def _zipf_cum_weights(count, exponent):
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+def _weighted_index(rng, cum_weights):
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+def _iso(day, hour=0, minute=0):
+    return f'{day.isoformat()}T{hour:02d}:{minute:02d}:00Z'
+
+def generate_patients(count, seed=DEFAULT_SEED):
+    """Yield count PatientRecordsTable METADATA rows."""
+    rng = _rng(seed, 'patients')
+    for index in range(count):
+        patient_id = make_id('patients', index)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        city, state = rng.choice(CITIES)
+        created = DEFAULT_START_DATE - timedelta(days=rng.randrange(3 * 365))
+        item = {
+            'PK': f'PATIENT#{patient_id}',
+            'SK': 'METADATA',
+            'type': 'patient',
+            'id': patient_id,
+            'firstName': first,
+            'lastName': last,
+            'dateOfBirth': (date(2024, 1, 1) - timedelta(days=rng.randrange(95 * 365))).isoformat(),
+            'gender': rng.choice(('female', 'male', 'other')),
+            'phone': f'555-{rng.randrange(10000):04d}',
+            'email': f'{first}.{last}.{index}@example.com'.lower(),
+            'address': {'street': f'{rng.randrange(1, 9999)} {rng.choice(STREETS)}', 'city': city,
+                        'state': state, 'zipCode': f'{rng.randrange(10000, 99999)}'},
+            'status': 'active' if rng.random() < 0.93 else rng.choice(('inactive', 'archived')),
+            'createdAt': _iso(created),
+            'updatedAt': _iso(created),
+        }
+        insurance = rng.choice(INSURANCE_PROVIDERS)
+        if insurance:
+            item['insuranceProvider'] = insurance
+            item['insuranceNumber'] = f'{insurance[:2].upper()}{rng.randrange(10 ** 8):08d}'
+        yield item
+
+def generate_services(count, seed=DEFAULT_SEED):
+    """Yield count ServicesTable rows."""
+    rng = _rng(seed, 'services')
+    catalogue = [(category, name) for category, names in SERVICE_CATEGORIES.items() for name in names]
+    for index in range(count):
+        category, name = catalogue[index % len(catalogue)]
+        if index >= len(catalogue):
+            name = f'{name} {index // len(catalogue) + 1}'
+        yield {
+            'id': make_id('services', index),
+            'name': name,
+            'description': f'{category} service: {name}',
+            'category': category,
+            'price': Decimal(rng.randrange(2500, 90000, 50)) / 100,
+            'duration': rng.choice((15, 30, 30, 45, 60)),
+            'active': rng.random() < 0.95,
+        }
+
+def generate_appointments(count, patient_count, doctor_count, seed=DEFAULT_SEED,
+                          start_date=DEFAULT_START_DATE, days=DEFAULT_DAYS):
+    """Yield count AppointmentsTable rows spread over days from start_date."""
+    rng = _rng(seed, 'appointments')
+    doctor_weights = _zipf_cum_weights(doctor_count, DOCTOR_SKEW)
+    patient_weights = _zipf_cum_weights(patient_count, PATIENT_SKEW)
+    day_weights = list(itertools.accumulate(
+        WEEKDAY_WEIGHTS[(start_date + timedelta(days=offset)).weekday()] for offset in range(days)))
+    slot_weights = list(itertools.accumulate(SLOT_WEIGHTS))
+    today = start_date + timedelta(days=days // 2)
+
+    for index in range(count):
+        day = start_date + timedelta(days=_weighted_index(rng, day_weights))
+        hour, minute = SLOTS[_weighted_index(rng, slot_weights)]
+        length = rng.choice((15, 30, 30, 30, 45, 60))
+        end = hour * 60 + minute + length
+        if day < today:
+            status = rng.choices(('completed', 'cancelled', 'no-show'), weights=(85, 10, 5))[0]
+        else:
+            status = 'scheduled' if rng.random() < 0.9 else 'cancelled'
+        created = day - timedelta(days=rng.randrange(1, 60))
+        yield {
+            'id': make_id('appointments', index),
+            'patientId': make_id('patients', _weighted_index(rng, patient_weights)),
+            'doctorId': make_id('doctors', _weighted_index(rng, doctor_weights)),
+            'date': day.isoformat(),
+            'startTime': f'{hour:02d}:{minute:02d}',
+            'endTime': f'{end // 60:02d}:{end % 60:02d}',
+            'type': rng.choice(APPOINTMENT_TYPES),
+            'status': status,
+            'notes': '',
+            'reason': '',
+            'services': [],
+            'entityType': 'APPOINTMENT_ENTITY',
+            'appointmentDate': day.isoformat(),
+            'createdAt': _iso(created),
+            'updatedAt': _iso(created),
+        }
+
+def generate_billing(count, patient_count, service_count, seed=DEFAULT_SEED):
+    """Yield count billing records whose lines use the generated services' prices."""
+    rng = _rng(seed, 'billing')
+    services = list(generate_services(service_count, seed))
+    service_weights = _zipf_cum_weights(service_count, SERVICE_SKEW)
+    for index in range(count):
+        lines = []
+        for _ in range(rng.choice((1, 1, 2, 2, 3, 4, 5))):
+            service = services[_weighted_index(rng, service_weights)]
+            quantity = Decimal(rng.choice((1, 1, 1, 2, 3)))
+            lines.append({'serviceId': service['id'], 'serviceName': service['name'], 'quantity': quantity,
+                          'unitPrice': service['price'], 'total': service['price'] * quantity})
+        subtotal = sum(line['total'] for line in lines)
+        tax = (subtotal * Decimal('0.0825')).quantize(Decimal('0.01'))
+        day = DEFAULT_START_DATE + timedelta(days=rng.randrange(DEFAULT_DAYS))
+        yield {
+            'id': make_id('billing', index),
+            'patientId': make_id('patients', rng.randrange(patient_count)),
+            'appointmentId': None,
+            'items': lines,
+            'subtotal': subtotal,
+            'tax': tax,
+            'discount': Decimal(0),
+            'total': subtotal + tax,
+            'paymentMethod': rng.choice(PAYMENT_METHODS),
+            'paymentStatus': rng.choices(('paid', 'pending', 'overdue'), weights=(70, 22, 8))[0],
+            'notes': '',
+            'createdAt': _iso(day),
+            'updatedAt': _iso(day),
+        }
+
+def generate_reports(count, patient_count, doctor_count, seed=DEFAULT_SEED):
+    """Yield count MedicalReportsTable rows."""
+    rng = _rng(seed, 'reports')
+    doctor_weights = _zipf_cum_weights(doctor_count, DOCTOR_SKEW)
+    for index in range(count):
+        day = DEFAULT_START_DATE + timedelta(days=rng.randrange(DEFAULT_DAYS))
+        yield {
+            'reportId': make_id('reports', index),
+            'patientId': make_id('patients', rng.randrange(patient_count)),
+            'doctorId': make_id('doctors', _weighted_index(rng, doctor_weights)),
+            'reportContent': ' '.join(rng.sample(REPORT_FINDINGS, rng.randint(2, 5))),
+            'doctorNotes': '',
+            'imageReferences': [],
+            'createdAt': _iso(day, rng.randrange(8, 18)),
+            'updatedAt': _iso(day, 18),
+        }
+
+def generate_dataset(dataset, counts, seed=DEFAULT_SEED):
+    """
+    Yield the records of one dataset.
+
+    Args:
+        dataset (str): One of DATASETS
+        counts (dict): Counts as returned by default_counts()
+        seed (int): Random seed
+
+    Returns:
+        iterator: Records with Decimal numbers, ready for the DynamoDB resource API
+    """
+    if dataset == 'patients':
+        return generate_patients(counts['patients'], seed)
+    if dataset == 'appointments':
+        return generate_appointments(counts['appointments'], counts['patients'], counts['doctors'], seed)
+    if dataset == 'services':
+        return generate_services(counts['services'], seed)
+    if dataset == 'billing':
+        return generate_billing(counts['billing'], counts['patients'], counts['services'], seed)
+    if dataset == 'reports':
+        return generate_reports(counts['reports'], counts['patients'], counts['doctors'], seed)
+    raise ValueError(f'Unknown dataset: {dataset}')
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def write_jsonl(items, path):
+    """Write records to a JSONL file, one per line. Returns the number written."""
+    written = 0
+    with open(path, 'w') as f:
+        for item in items:
+            f.write(json.dumps(item, default=_json_default, separators=(',', ':')) + '\n')
+            written += 1
+    return written
+
+def read_jsonl(path):
+    """Yield the records of a JSONL file with numbers as Decimal."""
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line, parse_float=Decimal, parse_int=Decimal)
+
+def batch_write(client, table_name, items):
+    """
+    Put records into a table with BatchWriteItem, 25 per request, retrying
+    UnprocessedItems with exponential backoff.
+
+    Args:
+        client (botocore.client.BaseClient): Low-level DynamoDB client
+        table_name (str): Table to write to
+        items (iterable): Records with Decimal numbers
+
+    Returns:
+        int: Number of records written
+
+    Raises:
+        RuntimeError: If items are still unprocessed after BATCH_WRITE_MAX_RETRIES retries
+    """
+    from boto3.dynamodb.types import TypeSerializer
+    serializer = TypeSerializer()
+    written = 0
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, BATCH_WRITE_MAX_ITEMS))
+        if not chunk:
+            return written
+        requests = {table_name: [
+            {'PutRequest': {'Item': {key: serializer.serialize(value) for key, value in item.items() if value is not None}}}
+            for item in chunk
+        ]}
+        for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+            requests = client.batch_write_item(RequestItems=requests).get('UnprocessedItems') or {}
+            if not requests:
+                break
+            time.sleep(BATCH_WRITE_BASE_DELAY_SECONDS * (2 ** attempt))
+        else:
+            raise RuntimeError(f'{len(requests[table_name])} items still unprocessed for {table_name}')
+        written += len(chunk)
+
+def table_names(environment):
+    """Table name for every dataset, from the environment or clinnet-<name>-<environment>."""
+    return {dataset: os.environ.get(variable) or f'clinnet-{suffix}-{environment}'
+            for dataset, (variable, suffix) in TABLES.items()}
+
+def create_tables(client, names):
+    """
+    Create the tables (with the template's keys and GSIs) for the given
+    datasets, for DynamoDB Local and moto.
+
+    Args:
+        client (botocore.client.BaseClient): Low-level DynamoDB client
+        names (dict): Table name keyed by dataset name
+    """
+    string = lambda *attributes: [{'AttributeName': name, 'AttributeType': 'S'} for name in attributes]
+    hash_key = lambda name: [{'AttributeName': name, 'KeyType': 'HASH'}]
+    gsi = lambda name, key_schema: {'IndexName': name, 'KeySchema': key_schema, 'Projection': {'ProjectionType': 'ALL'}}
+    definitions = {
+        'patients': {
+            'KeySchema': [{'AttributeName': 'PK', 'KeyType': 'HASH'}, {'AttributeName': 'SK', 'KeyType': 'RANGE'}],
+            'AttributeDefinitions': string('PK', 'SK', 'type'),
+            'GlobalSecondaryIndexes': [gsi('type-index', hash_key('type'))],
+        },
+        'appointments': {
+            'KeySchema': hash_key('id'),
+            'AttributeDefinitions': string('id', 'patientId', 'doctorId', 'appointmentDate', 'entityType'),
+            'GlobalSecondaryIndexes': [
+                gsi('AppointmentDateIndex', [{'AttributeName': 'entityType', 'KeyType': 'HASH'},
+                                             {'AttributeName': 'appointmentDate', 'KeyType': 'RANGE'}]),
+                gsi('PatientIdIndex', hash_key('patientId')),
+                gsi('DoctorIdIndex', hash_key('doctorId')),
+            ],
+        },
+        'services': {'KeySchema': hash_key('id'), 'AttributeDefinitions': string('id')},
+        'billing': {'KeySchema': hash_key('id'), 'AttributeDefinitions': string('id')},
+        'reports': {
+            'KeySchema': hash_key('reportId'),
+            'AttributeDefinitions': string('reportId', 'patientId', 'doctorId'),
+            'GlobalSecondaryIndexes': [gsi('PatientIdIndex', hash_key('patientId')),
+                                       gsi('DoctorIdIndex', hash_key('doctorId'))],
+        },
+    }
+    for dataset, table_name in names.items():
+        client.create_table(TableName=table_name, BillingMode='PAY_PER_REQUEST', **definitions[dataset])
+
+def _counts_from_args(args):
+    counts = default_counts(args.scale)
+    for name in list(counts):
+        if getattr(args, name, None) is not None:
+            counts[name] = getattr(args, name)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('generate', 'load'))
+    parser.add_argument('--scale', type=int, default=1000, help='number of patients')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    for name in ('appointments', 'services', 'billing', 'reports', 'doctors'):
+        parser.add_argument(f'--{name}', type=int)
+    parser.add_argument('--datasets', nargs='+', choices=DATASETS, default=list(DATASETS))
+    parser.add_argument('--out-dir', default=os.path.join('data', 'generated'))
+    parser.add_argument('--in-dir', help='load JSONL files written by generate instead of generating')
+    parser.add_argument('--environment', default=os.environ.get('ENVIRONMENT', 'dev'))
+    parser.add_argument('--region', default=os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION'))
+    parser.add_argument('--endpoint-url', default=os.environ.get('DYNAMODB_ENDPOINT_URL'),
+                        help='e.g. http://localhost:8000 for DynamoDB Local')
+    parser.add_argument('--create-tables', action='store_true')
+    args = parser.parse_args()
+    counts = _counts_from_args(args)
+
+    if args.command == 'generate':
+        os.makedirs(args.out_dir, exist_ok=True)
+        for dataset in args.datasets:
+            path = os.path.join(args.out_dir, f'{dataset}.jsonl')
+            written = write_jsonl(generate_dataset(dataset, counts, args.seed), path)
+            print(f'{dataset}: wrote {written} records to {path}')
+        return
+
+    import boto3
+    client = boto3.client('dynamodb', region_name=args.region, endpoint_url=args.endpoint_url)
+    names = {dataset: name for dataset, name in table_names(args.environment).items() if dataset in args.datasets}
+    if args.create_tables:
+        create_tables(client, names)
+    for dataset, table_name in names.items():
+        if args.in_dir:
+            items = read_jsonl(os.path.join(args.in_dir, f'{dataset}.jsonl'))
+        else:
+            items = generate_dataset(dataset, counts, args.seed)
+        started = time.perf_counter()
+        written = batch_write(client, table_name, items)
+        print(f'{dataset}: loaded {written} records into {table_name} in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,23 +1,35 @@
 # backend/src/handlers/ai/summarize_note.py
 
 import json
-import boto3
 import os
-
-# Initialize the Bedrock runtime client
-# It's good practice to initialize outside the handler for potential reuse
-# if the Lambda container is warm.
-bedrock_runtime = boto3.client(
-    service_name='bedrock-runtime',
-    region_name=os.environ.get('AWS_REGION', 'us-east-1') # Ensure region is correctly set
-)
+from utils.aws_clients import get_client
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*', # Adjust for specific origins if needed
+    'Access-Control-Allow-Methods': 'POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
+}
+
+def get_bedrock_runtime():
+    # Created on first use from the warm-container registry, so preflights and
+    # invalid requests are answered without loading the AWS SDK
+    return get_client(
+        'bedrock-runtime',
+        region_name=os.environ.get('AWS_REGION', 'us-east-1') # Ensure region is correctly set
+    )
 
 # Define the model ID for summarization
 MODEL_ID = 'anthropic.claude-instant-v1'
 # MODEL_ID = 'amazon.titan-text-express-v1' # Alternative
 
+@instrument_handler
 def lambda_handler(event, context):
-    print(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
+
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return {'statusCode': 200, 'headers': CORS_HEADERS, 'body': ''}
 
     try:
         # 1. Parse input from the event body
@@ -67,7 +79,7 @@ def lambda_handler(event, context):
         # }
 
         # 4. Invoke the Bedrock model
-        response = bedrock_runtime.invoke_model(
+        response = get_bedrock_runtime().invoke_model(
             body=json.dumps(payload),
             modelId=MODEL_ID,
             accept='application/json',
@@ -8,12 +8,16 @@ from datetime import datetime # ensure datetime is imported
 import logging
 from botocore.exceptions import ClientError
 
-from utils.db_utils import create_item, generate_response
+from utils.db_utils import create_item, appointment_date_index_keys, generate_response
+from utils.cors import build_cors_preflight_response
 from utils.responser_helper import handle_exception, build_error_response
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
 logger = logging.getLogger(__name__)
 
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for POST /appointments
@@ -25,7 +29,11 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: %s", json.dumps(event))
+    log_request(event, context)
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
     
     table_name = os.environ.get('APPOINTMENTS_TABLE')
     if not table_name:
@@ -77,6 +85,8 @@ def lambda_handler(event, context):
             'createdAt': timestamp,
             'updatedAt': timestamp
         }
+        # Populate the AppointmentDateIndex keys so date-range queries see the new row
+        appointment_item.update(appointment_date_index_keys(appointment_item))
         
         # Create the appointment record in DynamoDB
         create_item(table_name, appointment_item)
@@ -7,10 +7,14 @@ import logging # Added
 from botocore.exceptions import ClientError
 
 from utils.db_utils import delete_item, get_item_by_id, generate_response
+from utils.cors import build_cors_preflight_response
 from utils.responser_helper import handle_exception, build_error_response
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
 logger = logging.getLogger(__name__)
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for DELETE /appointments/{id}
@@ -22,26 +26,30 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info("Received event: %s", json.dumps(event)) # Changed from print
+    log_request(event, context)
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
     
     table_name = os.environ.get('APPOINTMENTS_TABLE')
     if not table_name:
-        return build_error_response(500, 'Configuration Error: Appointments table name not configured')
+        return build_error_response(500, 'Configuration Error', 'Appointments table name not configured')
     
     # Get appointment ID from path parameters
     path_params = event.get('pathParameters', {})
     if 'id' not in path_params: # Check if 'id' key itself is missing
-        return build_error_response(400, 'Validation Error: Missing appointment ID path parameter.')
+        return build_error_response(400, 'Validation Error', 'Missing appointment ID path parameter.')
     appointment_id = path_params.get('id')
     if not appointment_id: # Check if id is None (already caught if key missing) or an empty string
-        return build_error_response(400, 'Validation Error: Appointment ID must be a non-empty string.')
+        return build_error_response(400, 'Validation Error', 'Appointment ID must be a non-empty string.')
     
     try:
         # Check if appointment exists
         existing_appointment = get_item_by_id(table_name, appointment_id)
         
         if not existing_appointment:
-            return build_error_response(404, f'Not Found: Appointment with ID {appointment_id} not found')
+            return build_error_response(404, 'Not Found', f'Appointment with ID {appointment_id} not found')
         
         # Delete appointment
         delete_item(table_name, appointment_id)
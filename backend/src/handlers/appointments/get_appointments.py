@@ -4,54 +4,178 @@ Lambda function to get all appointments
 import os
 import json
 import logging
-import boto3 # Added boto3
+from datetime import datetime
 from botocore.exceptions import ClientError
-from boto3.dynamodb.conditions import Key, Attr # Added Key, Attr for safety, though may not be strictly needed for the new code
 
-from utils.db_utils import scan_table, generate_response
+from utils.db_utils import (
+    scan_table, query_index, fetch_page, batch_get_items, generate_response, conditional_response,
+    APPOINTMENT_ENTITY_TYPE, APPOINTMENT_DATE_INDEX
+)
 from utils.responser_helper import handle_exception, build_error_response
 from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.pagination import (
+    InvalidPaginationParameter, build_projection, decode_next_token,
+    encode_next_token, is_flag_set, parse_limit
+)
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler, timed
 
 logger = logging.getLogger(__name__)
 
+DATE_FORMAT = '%Y-%m-%d'
 
+# Returned even with ?fields= so clients can address rows and names can be joined
+KEY_FIELDS = ('id', 'patientId')
+
+
+def _patient_pk(patient_id):
+    """Build the PatientRecordsTable partition key for an appointment's patientId."""
+    if patient_id.startswith("PATIENT#"):
+        return patient_id
+    return f"PATIENT#{patient_id}"
+
+
+def enrich_with_patient_names(appointments, patient_records_table_name):
+    """
+    Add a 'patientName' field to each appointment.
+
+    Patient IDs are de-duplicated and fetched with BatchGetItem (see
+    utils.db_utils.batch_get_items), then joined back in memory, so the number
+    of DynamoDB round trips depends on the number of distinct patients rather
+    than the number of appointments.
+
+    Args:
+        appointments (list): Appointment items
+        patient_records_table_name (str): PatientRecordsTable name
+
+    Returns:
+        list: Copies of the appointments with 'patientName' set
+    """
+    patient_pks = {
+        _patient_pk(appt['patientId'])
+        for appt in appointments
+        if appt.get('patientId')
+    }
+
+    names_by_pk = {}
+    fetch_failed = False
+    if patient_pks:
+        try:
+            patients = batch_get_items(
+                patient_records_table_name,
+                [{'PK': pk, 'SK': 'METADATA'} for pk in patient_pks],
+                projection_expression='PK, firstName, lastName'
+            )
+            for patient_item in patients:
+                firstName = patient_item.get('firstName', '')
+                lastName = patient_item.get('lastName', '')
+                patient_name = f"{firstName} {lastName}".strip()
+                names_by_pk[patient_item['PK']] = patient_name if patient_name else "Name N/A"
+        except Exception as e:
+            logging.error(f"Error fetching patient details for {len(patient_pks)} patients: {str(e)}")
+            fetch_failed = True
+
+    enriched_appointments = []
+    for appt in appointments:
+        new_appt = appt.copy() # Work on a copy
+        patient_id_from_appt = new_appt.get('patientId')
+
+        if not patient_id_from_appt:
+            new_appt['patientName'] = "No Patient ID"
+        elif fetch_failed:
+            new_appt['patientName'] = "Error fetching name"
+        else:
+            pk_value = _patient_pk(patient_id_from_appt)
+            if pk_value in names_by_pk:
+                new_appt['patientName'] = names_by_pk[pk_value]
+            else:
+                new_appt['patientName'] = "Unknown Patient"
+                logging.warning(f"Patient record not found for patientId: {patient_id_from_appt} (PK used: {pk_value})")
+        enriched_appointments.append(new_appt)
+
+    return enriched_appointments
+
+
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /appointments
+
+    Filters: patientId, doctorId, date, status, and an inclusive from/to date
+    range (YYYY-MM-DD) served by AppointmentDateIndex. Paging: limit (default 50),
+    nextToken, fields (id and patientId are always returned); all=true
+    returns every match as a bare JSON array for the legacy frontend.
     
     Args:
         event (dict): Lambda event
         context (LambdaContext): Lambda context
         
     Returns:
-        dict: API Gateway response
+        dict: API Gateway response with {"items": [...], "nextToken": ...}
     """
     # Assuming logger is configured elsewhere or using root logger
     # For explicit logger:
     # logger = logging.getLogger(__name__)
     # logger.setLevel(logging.INFO) # Or as configured
-    logging.info("Received event: %s", json.dumps(event))
+    log_request(event, context)
+    headers = event.get('headers') or {}
+    request_origin = headers.get('Origin') or headers.get('origin')
     
     # --- Handle CORS preflight (OPTIONS) requests ---
     if event.get('httpMethod', '').upper() == 'OPTIONS':
-        return build_cors_preflight_response()
+        return build_cors_preflight_response(request_origin)
 
     table_name = os.environ.get('APPOINTMENTS_TABLE')
     if not table_name:
-        return build_error_response(500, 'Configuration Error: Appointments table name not configured')
+        return build_error_response(500, 'Configuration Error', 'Appointments table name not configured', request_origin)
     
     try:
         # Get query parameters
         query_params = event.get('queryStringParameters', {}) or {}
         kwargs = {} # Initialize kwargs for query_table
 
-        # GSI usage
-        if 'patientId' in query_params:
-            kwargs['IndexName'] = 'PatientIdIndex'
-            kwargs['KeyConditionExpression'] = Key('patientId').eq(query_params['patientId'])
+        # Validate the date range before touching DynamoDB
+        date_from = query_params.get('from')
+        date_to = query_params.get('to')
+        try:
+            for value in (date_from, date_to):
+                # strptime also accepts unpadded dates such as 2024-7-1, which
+                # would compare and sort wrongly against the stored dates
+                if value and datetime.strptime(value, DATE_FORMAT).strftime(DATE_FORMAT) != value:
+                    raise ValueError(value)
+        except ValueError:
+            return build_error_response(400, 'Bad Request', "from and to must be dates in YYYY-MM-DD format", request_origin)
+        if date_from and date_to and date_from > date_to:
+            return build_error_response(400, 'Bad Request', "from must not be after to", request_origin)
+
+        # Imported here so that preflight and validation failures never load boto3
+        from boto3.dynamodb.conditions import Key, Attr
+
+        # GSI usage: an indexed filter becomes a Query on that index instead of a Scan.
+        # A date range (from/to) wins so that a calendar view is a single key-range Query.
+        index_name = None
+        key_condition = None
+        if date_from or date_to:
+            index_name = APPOINTMENT_DATE_INDEX
+            key_condition = Key('entityType').eq(APPOINTMENT_ENTITY_TYPE)
+            if date_from and date_to:
+                key_condition = key_condition & Key('appointmentDate').between(date_from, date_to)
+            elif date_from:
+                key_condition = key_condition & Key('appointmentDate').gte(date_from)
+            else:
+                key_condition = key_condition & Key('appointmentDate').lte(date_to)
+        elif 'patientId' in query_params:
+            index_name = 'PatientIdIndex'
+            key_condition = Key('patientId').eq(query_params['patientId'])
         elif 'doctorId' in query_params:
-            kwargs['IndexName'] = 'DoctorIdIndex'
-            kwargs['KeyConditionExpression'] = Key('doctorId').eq(query_params['doctorId'])
+            index_name = 'DoctorIdIndex'
+            key_condition = Key('doctorId').eq(query_params['doctorId'])
+        elif 'date' in query_params:
+            index_name = APPOINTMENT_DATE_INDEX
+            key_condition = (Key('entityType').eq(APPOINTMENT_ENTITY_TYPE) &
+                             Key('appointmentDate').eq(query_params['date']))
 
         # Building FilterExpression for remaining parameters
         filter_expressions = []
@@ -59,12 +183,18 @@ def lambda_handler(event, context):
         # Create a mutable copy of query_params to remove keys used in GSI
         active_query_params = dict(query_params)
 
-        if 'patientId' in active_query_params and kwargs.get('IndexName') == 'PatientIdIndex':
+        if index_name == 'PatientIdIndex':
             del active_query_params['patientId']
-        if 'doctorId' in active_query_params and kwargs.get('IndexName') == 'DoctorIdIndex':
+        if index_name == 'DoctorIdIndex':
             del active_query_params['doctorId']
+        if index_name == APPOINTMENT_DATE_INDEX and not (date_from or date_to):
+            del active_query_params['date']
 
         # Now build filter_expressions from active_query_params
+        if 'patientId' in active_query_params:
+            filter_expressions.append(Attr('patientId').eq(active_query_params['patientId']))
+        if 'doctorId' in active_query_params:
+            filter_expressions.append(Attr('doctorId').eq(active_query_params['doctorId']))
         if 'date' in active_query_params:
             filter_expressions.append(Attr('date').eq(active_query_params['date']))
         if 'status' in active_query_params:
@@ -77,64 +207,49 @@ def lambda_handler(event, context):
                 combined_filter_expr = combined_filter_expr & expr
             kwargs['FilterExpression'] = combined_filter_expr
 
-        appointments = scan_table(table_name, **kwargs)
+        # Tokens are scoped per access path: a key from one index cannot resume another
+        token_scope = f"appointments:{index_name or 'table'}"
+        fetch_all = is_flag_set(query_params, 'all')
+        try:
+            kwargs.update(build_projection(query_params.get('fields'), always_include=KEY_FIELDS))
+            limit = None if fetch_all else parse_limit(query_params.get('limit'))
+            start_key = None if fetch_all else decode_next_token(query_params.get('nextToken'), token_scope)
+        except InvalidPaginationParameter as e:
+            return build_error_response(400, 'Bad Request', str(e), request_origin)
+
+        next_token = None
+        if fetch_all:
+            if index_name:
+                appointments = list(query_index(table_name, index_name, key_condition, **kwargs))
+            else:
+                appointments = scan_table(table_name, **kwargs)
+        elif index_name:
+            appointments, last_key = fetch_page(
+                table_name, limit, operation='query', exclusive_start_key=start_key,
+                IndexName=index_name, KeyConditionExpression=key_condition, **kwargs
+            )
+            next_token = encode_next_token(last_key, token_scope)
+        else:
+            appointments, last_key = fetch_page(table_name, limit, exclusive_start_key=start_key, **kwargs)
+            next_token = encode_next_token(last_key, token_scope)
 
         # --- Start of Patient Name Enrichment ---
-        enriched_appointments = []
         patient_records_table_name = os.environ.get('PATIENT_RECORDS_TABLE')
 
         if not patient_records_table_name:
             logging.warning("PATIENT_RECORDS_TABLE environment variable not set. Skipping patient name enrichment.")
             enriched_appointments = appointments # Proceed without enrichment
         else:
-            try:
-                dynamodb_resource = boto3.resource('dynamodb')
-                patient_table = dynamodb_resource.Table(patient_records_table_name)
-
-                for appt in appointments:
-                    new_appt = appt.copy() # Work on a copy
-                    patient_id_from_appt = new_appt.get('patientId')
-
-                    if patient_id_from_appt:
-                        try:
-                            # Construct the key for PatientRecordsTable
-                            # Assumption: patient_id_from_appt is the UUID part, e.g., "123e4567-e89b-12d3-a456-426614174000"
-                            # PatientRecordsTable PK and SK are "PATIENT#<uuid>"
-                            # If patient_id_from_appt already has "PATIENT#" prefix, this logic needs adjustment.
-                            # For now, assuming it's just the UUID.
-                            if not patient_id_from_appt.startswith("PATIENT#"):
-                                pk_value = f"PATIENT#{patient_id_from_appt}"
-                            else:
-                                pk_value = patient_id_from_appt
-
-                            key_for_patient = {'PK': pk_value, 'SK': pk_value}
-
-                            patient_response = patient_table.get_item(Key=key_for_patient)
-                            patient_item = patient_response.get('Item')
-
-                            if patient_item:
-                                firstName = patient_item.get('firstName', '')
-                                lastName = patient_item.get('lastName', '')
-                                patient_name = f"{firstName} {lastName}".strip()
-                                new_appt['patientName'] = patient_name if patient_name else "Name N/A"
-                            else:
-                                new_appt['patientName'] = "Unknown Patient"
-                                logging.warning(f"Patient record not found for patientId: {patient_id_from_appt} (Key used: {key_for_patient})")
-                        except Exception as e:
-                            logging.error(f"Error fetching patient details for patientId {patient_id_from_appt}: {str(e)}")
-                            new_appt['patientName'] = "Error fetching name"
-                    else:
-                        new_appt['patientName'] = "No Patient ID"
-                    enriched_appointments.append(new_appt)
-            except Exception as e:
-                logging.error(f"Error during patient enrichment setup (e.g. accessing table resource): {str(e)}")
-                enriched_appointments = appointments # Fallback to original appointments
+            with timed('Enrichment'):
+                enriched_appointments = enrich_with_patient_names(appointments, patient_records_table_name)
         # --- End of Patient Name Enrichment ---
         
-        return generate_response(200, enriched_appointments) # Use enriched data
+        if fetch_all:
+            return conditional_response(event, generate_response(200, enriched_appointments)) # Use enriched data
+        return conditional_response(event, generate_response(200, {'items': enriched_appointments, 'nextToken': next_token}))
     
     except ClientError as e:
-        return handle_exception(e)
+        return handle_exception(e, request_origin)
     except Exception as e:
         print(f"Error fetching appointments: {e}")
-        return handle_exception(e)
+        return handle_exception(e, request_origin)
@@ -7,11 +7,15 @@ import json
 from datetime import datetime # Added
 from botocore.exceptions import ClientError
 
-from utils.db_utils import get_item_by_id, update_item, generate_response
+from utils.db_utils import get_item_by_id, update_item, appointment_date_index_keys, generate_response
+from utils.cors import build_cors_preflight_response
 from utils.responser_helper import handle_exception, build_error_response
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
 logger = logging.getLogger(__name__)
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for PUT /appointments/{id}
@@ -23,16 +27,20 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info("Received event: %s", json.dumps(event)) # Changed from print to logger.info
+    log_request(event, context)
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
     
     table_name = os.environ.get('APPOINTMENTS_TABLE')
     if not table_name:
-        return build_error_response(500, 'Configuration Error: Appointments table name not configured')
+        return build_error_response(500, 'Configuration Error', 'Appointments table name not configured')
     
     # Get appointment ID from path parameters
     appointment_id = event.get('pathParameters', {}).get('id')
     if not appointment_id:
-        return build_error_response(400, 'Validation Error: Missing appointment ID')
+        return build_error_response(400, 'Validation Error', 'Missing appointment ID')
     
     try:
         # Parse request body
@@ -42,14 +50,14 @@ def lambda_handler(event, context):
         existing_appointment = get_item_by_id(table_name, appointment_id)
         
         if not existing_appointment:
-            return build_error_response(404, f'Not Found: Appointment with ID {appointment_id} not found')
+            return build_error_response(404, 'Not Found', f'Appointment with ID {appointment_id} not found')
         
         # Validate date format if 'date' is in body
         if 'date' in body:
             try:
                 datetime.strptime(body['date'], '%Y-%m-%d')
             except ValueError:
-                return build_error_response(400, 'Validation Error: Invalid date format. Expected YYYY-MM-DD.')
+                return build_error_response(400, 'Validation Error', 'Invalid date format. Expected YYYY-MM-DD.')
 
         # Validate time format if 'startTime' or 'endTime' is in body
         if 'startTime' in body or 'endTime' in body:
@@ -59,7 +67,7 @@ def lambda_handler(event, context):
                 if 'endTime' in body:
                     datetime.strptime(body['endTime'], '%H:%M')
             except ValueError:
-                return build_error_response(400, 'Validation Error: Invalid time format. Expected HH:MM.')
+                return build_error_response(400, 'Validation Error', 'Invalid time format. Expected HH:MM.')
 
         # Ensure endTime is after startTime if both are present and valid
         # This logic needs to handle cases where one might be in existing_appointment and the other in body
@@ -79,9 +87,9 @@ def lambda_handler(event, context):
                 new_startTime_dt = datetime.strptime(new_startTime_str, '%H:%M')
                 new_endTime_dt = datetime.strptime(new_endTime_str, '%H:%M')
                 if new_endTime_dt <= new_startTime_dt:
-                    return build_error_response(400, 'Validation Error: End time must be after start time.')
+                    return build_error_response(400, 'Validation Error', 'End time must be after start time.')
             except ValueError: # Should not happen if stored data is valid and body data was validated
-                 return build_error_response(400, 'Validation Error: Invalid time format for comparison (startTime/endTime).')
+                 return build_error_response(400, 'Validation Error', 'Invalid time format for comparison (startTime/endTime).')
 
         # Fields that can be updated
         updatable_fields = [
@@ -96,7 +104,11 @@ def lambda_handler(event, context):
                 updates[field] = body[field]
 
         if not updates:
-            return build_error_response(400, 'Validation Error: No valid fields provided for update.')
+            return build_error_response(400, 'Validation Error', 'No valid fields provided for update.')
+
+        # Keep the AppointmentDateIndex keys in step with the date
+        if 'date' in updates:
+            updates.update(appointment_date_index_keys(updates))
         
         # Update appointment
         updated_appointment = update_item(table_name, appointment_id, updates)
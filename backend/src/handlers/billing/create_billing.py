@@ -5,12 +5,18 @@ import os
 import json
 import uuid
 from datetime import datetime
+from decimal import Decimal
 from botocore.exceptions import ClientError
 
 # Import utility functions
-from utils.db_utils import create_item, get_item_by_id, generate_response
+from utils.db_utils import create_item, generate_response
+from utils.services_cache import get_catalogue_version, get_services_by_ids
+from utils.cors import build_cors_preflight_response
 from utils.responser_helper import handle_exception, build_error_response
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler, timed
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for POST /billing
@@ -22,10 +28,14 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    print(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     # Get table names from environment variables
     billing_table = os.environ.get('BILLING_TABLE')
@@ -36,8 +46,8 @@ def lambda_handler(event, context):
         return build_error_response(500, 'Configuration Error', 'Billing table name not configured', request_origin)
     
     try:
-        # Parse request body
-        body = json.loads(event.get('body', '{}'))
+        # Parse request body; decimals stay Decimal so they combine with prices read from DynamoDB
+        body = json.loads(event.get('body') or '{}', parse_float=Decimal)
         
         # Validate required fields
         required_fields = ['patientId', 'items', 'paymentMethod']
@@ -53,8 +63,22 @@ def lambda_handler(event, context):
         for item in items:
             if 'serviceId' not in item or 'quantity' not in item:
                 return build_error_response(400, 'Validation Error', 'Each item must have serviceId and quantity', request_origin)
+            if not isinstance(item['serviceId'], str) or not item['serviceId']:
+                return build_error_response(400, 'Validation Error', 'serviceId must be a non-empty string', request_origin)
+        
+        # Fetch every distinct service in one BatchGetItem (or from the warm cache
+        # while the catalogue version is unchanged) and report all unknown
+        # services together
+        services = {}
+        if services_table:
+            service_ids = [item['serviceId'] for item in items]
+            with timed('Pricing'):
+                services = get_services_by_ids(services_table, service_ids, version=get_catalogue_version(services_table))
+            missing = [service_id for service_id in dict.fromkeys(service_ids) if service_id not in services]
+            if missing:
+                return build_error_response(404, 'Not Found', f"Services not found: {', '.join(missing)}", request_origin)
         
-        # Calculate total amount by fetching service prices
+        # Calculate total amount from the service prices
         total_amount = 0
         billing_items = []
         
@@ -62,36 +86,25 @@ def lambda_handler(event, context):
             service_id = item.get('serviceId')
             quantity = item.get('quantity', 1)
             
-            # Get service details to get price
             if services_table:
-                service = get_item_by_id(services_table, service_id)
-                if service:
-                    price = service.get('price', 0)
-                    item_total = price * quantity
-                    total_amount += item_total
-                    
-                    billing_items.append({
-                        'serviceId': service_id,
-                        'serviceName': service.get('name', 'Unknown Service'),
-                        'quantity': quantity,
-                        'unitPrice': price,
-                        'total': item_total
-                    })
-                else:
-                    return build_error_response(404, 'Not Found', f'Service with ID {service_id} not found', request_origin)
+                service = services[service_id]
+                price = service.get('price', 0)
+                service_name = service.get('name', 'Unknown Service')
             else:
                 # If services table is not configured, use the price from the request
                 price = item.get('price', 0)
-                item_total = price * quantity
-                total_amount += item_total
-                
-                billing_items.append({
-                    'serviceId': service_id,
-                    'serviceName': item.get('serviceName', 'Unknown Service'),
-                    'quantity': quantity,
-                    'unitPrice': price,
-                    'total': item_total
-                })
+                service_name = item.get('serviceName', 'Unknown Service')
+            
+            item_total = price * quantity
+            total_amount += item_total
+            
+            billing_items.append({
+                'serviceId': service_id,
+                'serviceName': service_name,
+                'quantity': quantity,
+                'unitPrice': price,
+                'total': item_total
+            })
         
         # Create billing record
         billing_id = str(uuid.uuid4())
@@ -7,8 +7,14 @@ from botocore.exceptions import ClientError
 
 # Import utility functions
 from utils.db_utils import get_item_by_id, generate_response
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
 from utils.responser_helper import handle_exception, build_error_response
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /billing/{id}
@@ -20,10 +26,14 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    print(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     table_name = os.environ.get('BILLING_TABLE')
     if not table_name:
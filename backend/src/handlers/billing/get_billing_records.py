@@ -3,27 +3,53 @@ Lambda function to get all billing records
 """
 import os
 import json
+import logging
 from botocore.exceptions import ClientError
 
 # Import utility functions
-from utils.db_utils import scan_table, generate_response
+from utils.db_utils import iter_scan, fetch_page, generate_response, generate_list_response
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
 from utils.responser_helper import handle_exception, build_error_response
+from utils.pagination import (
+    InvalidPaginationParameter, build_projection, decode_next_token,
+    encode_next_token, is_flag_set, parse_limit
+)
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
+logger = logging.getLogger(__name__)
+
+# Continuation tokens issued here are only accepted by this listing
+TOKEN_SCOPE = 'billing'
+# Returned even with ?fields= so clients can address each record
+KEY_FIELDS = ('id',)
+
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /billing
+
+    Filters: patientId, appointmentId, paymentStatus. Paging: limit (default 50),
+    nextToken, fields (id is always returned); all=true returns every match as
+    a bare JSON array for the legacy frontend.
     
     Args:
         event (dict): Lambda event
         context (LambdaContext): Lambda context
         
     Returns:
-        dict: API Gateway response
+        dict: API Gateway response with {"items": [...], "nextToken": ...}
     """
-    print(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     table_name = os.environ.get('BILLING_TABLE')
     if not table_name:
@@ -33,38 +59,55 @@ def lambda_handler(event, context):
         # Get query parameters
         query_params = event.get('queryStringParameters', {}) or {}
         
+        # Imported here so that preflight requests never load boto3
+        from boto3.dynamodb.conditions import Attr
+
         # Initialize filter expression
         filter_expressions = []
         
         # Add filters based on query parameters
         if 'patientId' in query_params:
-            from boto3.dynamodb.conditions import Attr
             filter_expressions.append(Attr('patientId').eq(query_params['patientId']))
         
         if 'appointmentId' in query_params:
-            from boto3.dynamodb.conditions import Attr
             filter_expressions.append(Attr('appointmentId').eq(query_params['appointmentId']))
         
         if 'paymentStatus' in query_params:
-            from boto3.dynamodb.conditions import Attr
             filter_expressions.append(Attr('paymentStatus').eq(query_params['paymentStatus']))
         
         # Combine filter expressions if any
         kwargs = {}
         if filter_expressions:
-            from boto3.dynamodb.conditions import Attr
             filter_expr = filter_expressions[0]
             for expr in filter_expressions[1:]:
                 filter_expr = filter_expr & expr
             kwargs['FilterExpression'] = filter_expr
         
-        # Query billing records
-        billing_records = scan_table(table_name, **kwargs)
+        fetch_all = is_flag_set(query_params, 'all')
+        try:
+            kwargs.update(build_projection(query_params.get('fields'), always_include=KEY_FIELDS))
+            limit = None if fetch_all else parse_limit(query_params.get('limit'))
+            start_key = None if fetch_all else decode_next_token(query_params.get('nextToken'), TOKEN_SCOPE)
+        except InvalidPaginationParameter as e:
+            return build_error_response(400, 'Bad Request', str(e), request_origin)
+
+        if not fetch_all:
+            billing_records, last_key = fetch_page(table_name, limit, exclusive_start_key=start_key, **kwargs)
+            return generate_response(200, {
+                'items': billing_records,
+                'nextToken': encode_next_token(last_key, TOKEN_SCOPE)
+            })
+
+        # Stream billing records page by page into the response body
+        scan_stats = {}
+        response = generate_list_response(200, iter_scan(table_name, stats=scan_stats, **kwargs))
+        logger.debug(f"Fetched {scan_stats['Count']} billing records in {scan_stats['Pages']} pages "
+                     f"({scan_stats['ConsumedCapacityUnits']} RCUs consumed)")
         
-        return generate_response(200, billing_records)
+        return response
     
     except ClientError as e:
         return handle_exception(e, request_origin)
     except Exception as e:
-        print(f"Error fetching billing records: {e}")
+        logger.error(f"Error fetching billing records: {e}")
         return build_error_response(500, 'Internal Server Error', f'Error fetching billing records: {str(e)}', request_origin)
\ No newline at end of file
@@ -1,13 +1,20 @@
 import json
-import boto3
 import os
 import uuid
 import time
+from utils.aws_clients import get_client
+from utils.cors import build_cors_preflight_response
+from utils.metrics import instrument_handler
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Lambda handler to perform CRUD operations on a Cognito user.
     """
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
+
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": "*"  # CORS header
@@ -22,7 +29,7 @@ def lambda_handler(event, context):
         }
 
     try:
-        client = boto3.client('cognito-idp')
+        client = get_client('cognito-idp')
     except Exception as e:
         return {
             "statusCode": 500,
@@ -1,17 +1,24 @@
 import json
-import boto3
+from utils.aws_clients import get_client
+from utils.cors import build_cors_preflight_response
+from utils.metrics import instrument_handler
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Lambda handler to check DynamoDB connectivity by listing tables.
     """
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
+
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": "*"  # CORS header
     }
 
     try:
-        dynamodb = boto3.client('dynamodb')
+        dynamodb = get_client('dynamodb')
         response = dynamodb.list_tables()  # Example operation
         
         table_count = len(response.get('TableNames', []))
@@ -1,17 +1,48 @@
 import json
-import boto3
+import logging
 import os
+import time
 import uuid
 
+from utils.db_utils import parallel_scan
+from utils.cors import build_cors_preflight_response
+from utils.metrics import instrument_handler
+from utils.aws_clients import get_resource
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the ?segments= query parameter of the optional full-table scan check
+MAX_SCAN_SEGMENTS = 16
+
+@instrument_handler
 def lambda_handler(event, context):
     """
     Lambda handler to perform CRUD operations on a specified DynamoDB table.
+    With ?scan=true it also counts every item in the table using a parallel
+    segmented scan (?segments=N, default PARALLEL_SCAN_SEGMENTS) and reports
+    the elapsed time and consumed capacity.
     """
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
+
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": "*"  # CORS header
     }
 
+    # Validate the scan options before touching the table
+    query_params = event.get('queryStringParameters') or {}
+    run_scan = str(query_params.get('scan', '')).lower() == 'true'
+    try:
+        segments = parse_segments(query_params.get('segments')) if run_scan else None
+    except ValueError as e:
+        return {
+            "statusCode": 400,
+            "headers": headers,
+            "body": json.dumps({"success": False, "error": str(e)})
+        }
+
     try:
         service_name_path = event.get('pathParameters', {}).get('serviceName')
         if not service_name_path:
@@ -36,7 +67,7 @@ def lambda_handler(event, context):
                 "body": json.dumps({"success": False, "error": f"Unknown or unsupported serviceName for CRUD test: {service_name_path}"})
             }
 
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = get_resource('dynamodb')
         table = dynamodb.Table(table_name)
         
     except Exception as e:
@@ -135,12 +166,67 @@ def lambda_handler(event, context):
             print(f"Skipping cleanup delete for item {item_id_for_status} as create operation was not successful.")
 
 
+    if run_scan:
+        crud_status['scan'] = run_scan_check(table_name, segments)
+
     return {
         "statusCode": 200,
         "headers": headers,
         "body": json.dumps(crud_status)
     }
 
+def parse_segments(segments_param):
+    """
+    Parse the ?segments= query parameter of the scan check.
+
+    Args:
+        segments_param (str): Segment count from the query string, or None
+
+    Returns:
+        int: The segment count, or None to use PARALLEL_SCAN_SEGMENTS
+
+    Raises:
+        ValueError: If the value is not an integer between 1 and MAX_SCAN_SEGMENTS
+    """
+    if not segments_param:
+        return None
+    try:
+        segments = int(segments_param)
+    except ValueError:
+        raise ValueError(f"segments must be an integer, got {segments_param!r}")
+    if not 1 <= segments <= MAX_SCAN_SEGMENTS:
+        raise ValueError(f"segments must be between 1 and {MAX_SCAN_SEGMENTS}")
+    return segments
+
+def run_scan_check(table_name, segments=None):
+    """
+    Count all items in a table with a parallel Select='COUNT' scan.
+
+    Args:
+        table_name (str): DynamoDB table name
+        segments (int): Optional segment count, already validated by parse_segments()
+
+    Returns:
+        dict: Item count, segment count, pages, consumed capacity, throttles
+              and elapsed milliseconds, or an error message
+    """
+    try:
+        stats = {}
+        started = time.perf_counter()
+        for _ in parallel_scan(table_name, total_segments=segments, stats=stats, Select='COUNT'):
+            pass
+        return {
+            "itemCount": stats['Count'],
+            "segments": stats['Segments'],
+            "pages": stats['Pages'],
+            "consumedCapacityUnits": stats['ConsumedCapacityUnits'],
+            "throttles": stats['Throttles'],
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 1)
+        }
+    except Exception as e:
+        logger.error(f"Error during parallel scan of {table_name}: {str(e)}")
+        return {"error": str(e)}
+
 if __name__ == '__main__':
     # Example local test (requires AWS credentials and region to be configured)
     # Replace with actual table names if not using environment variables locally
@@ -1,17 +1,24 @@
 import json
-import boto3
+from utils.aws_clients import get_client
+from utils.cors import build_cors_preflight_response
+from utils.metrics import instrument_handler
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Lambda handler to check S3 connectivity by listing buckets.
     """
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
+
     headers = {
         "Content-Type": "application/json",
         "Access-Control-Allow-Origin": "*"  # CORS header
     }
 
     try:
-        s3 = boto3.client('s3')
+        s3 = get_client('s3')
         response = s3.list_buckets()  # Example operation
         
         bucket_count = len(response.get('Buckets', []))
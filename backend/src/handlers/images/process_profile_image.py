@@ -0,0 +1,123 @@
+"""
+Lambda function to render the fixed-size thumbnails of a profile image.
+
+Invoked asynchronously by the profile image upload handlers (see
+utils.profile_images.request_variants) with {"bucket": ..., "key": ...}; S3
+event notifications are accepted too. Every image gets a square, centre-cropped
+thumbnail for each VARIANT_SIZES and VARIANT_FORMATS pair, written next to the
+original under variant_key(). The keys contain the upload's UUID, so the
+thumbnails never change and are stored with an immutable Cache-Control.
+"""
+import io
+import logging
+from urllib.parse import unquote_plus
+
+from utils.aws_clients import get_client
+from utils.metrics import instrument_handler, timed
+from utils.profile_images import PROFILE_IMAGE_PREFIX, VARIANT_FORMATS, VARIANT_SIZES, variant_key
+
+# Setup logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Encoder settings per thumbnail format
+SAVE_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+# Thumbnails are never rewritten, so browsers and CDNs may keep them for a year
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Largest decoded image accepted, in pixels (guards against decompression bombs)
+MAX_IMAGE_PIXELS = 40_000_000
+
+def _objects(event):
+    """(bucket, key) pairs from a direct invoke or an S3 event."""
+    if 'Records' in event:
+        return [(record['s3']['bucket']['name'], unquote_plus(record['s3']['object']['key']))
+                for record in event['Records'] if 's3' in record]
+    return [(event['bucket'], event['key'])]
+
+def render_variants(data):
+    """
+    Render every thumbnail of an image.
+
+    Args:
+        data (bytes): Encoded original image
+
+    Returns:
+        dict: Encoded thumbnail bytes keyed by (size, format)
+    """
+    from PIL import Image, ImageOps
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+    image = Image.open(io.BytesIO(data))
+    # Let the JPEG decoder scale down while decoding; the result is never smaller than requested
+    image.draft('RGB', (max(VARIANT_SIZES), max(VARIANT_SIZES)))
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+    variants = {}
+    # Largest first, so each smaller size is resampled from an already reduced image
+    for size in sorted(VARIANT_SIZES, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        for image_format in VARIANT_FORMATS:
+            frame = image
+            if image_format == 'jpeg' and frame.mode == 'RGBA':
+                # JPEG has no alpha channel; flatten onto white
+                background = Image.new('RGB', frame.size, (255, 255, 255))
+                background.paste(frame, mask=frame.getchannel('A'))
+                frame = background
+            buffer = io.BytesIO()
+            frame.save(buffer, **SAVE_OPTIONS[image_format])
+            variants[(size, image_format)] = buffer.getvalue()
+    return variants
+
+def process_image(s3, bucket_name, key):
+    """
+    Render and store the thumbnails of one original image.
+
+    Returns:
+        list: Keys written
+    """
+    original = s3.get_object(Bucket=bucket_name, Key=key)['Body'].read()
+    with timed('Render'):
+        variants = render_variants(original)
+    written = []
+    for (size, image_format), body in variants.items():
+        target = variant_key(key, size, image_format)
+        s3.put_object(
+            Bucket=bucket_name,
+            Key=target,
+            Body=body,
+            ContentType=VARIANT_FORMATS[image_format],
+            CacheControl=CACHE_CONTROL
+        )
+        written.append(target)
+    logger.info(f"Rendered {len(written)} thumbnails of {key} ({len(original)} bytes)")
+    return written
+
+@instrument_handler
+def lambda_handler(event, context):
+    """
+    Handle an async invoke or S3 event for newly uploaded profile images
+
+    Args:
+        event (dict): {"bucket": ..., "key": ...} or an S3 event
+        context (LambdaContext): Lambda context
+
+    Returns:
+        dict: Keys written per original image
+    """
+    s3 = get_client('s3')
+    results = {}
+    for bucket_name, key in _objects(event):
+        # Ignore anything outside profile images, including our own thumbnails
+        name = key[len(PROFILE_IMAGE_PREFIX):] if key.startswith(PROFILE_IMAGE_PREFIX) else ''
+        if name.count('/') != 1:
+            logger.info(f"Skipping {key}: not an original profile image")
+            continue
+        results[key] = process_image(s3, bucket_name, key)
+    return {'processed': results}
@@ -6,11 +6,13 @@ import json
 import uuid
 import logging # Added
 from datetime import datetime
-import boto3
 from botocore.exceptions import ClientError
-from utils.db_utils import generate_response
+from utils.db_utils import generate_response, to_dynamodb
 from utils.responser_helper import handle_exception, build_error_response
-from utils.cors import add_cors_headers
+from utils.cors import add_cors_headers, build_cors_preflight_response
+from utils.aws_clients import get_resource
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
 
 # Initialize Logger
@@ -28,7 +30,7 @@ def create_patient(table_name, patient_data):
     Returns:
         dict: Created patient item
     """
-    dynamodb = boto3.resource('dynamodb')
+    dynamodb = get_resource('dynamodb')
     table = dynamodb.Table(table_name)
     
     # Generate ID and timestamps
@@ -54,9 +56,10 @@ def create_patient(table_name, patient_data):
         'updatedAt': timestamp
     }
     
-    table.put_item(Item=item)
+    table.put_item(Item=to_dynamodb(item))
     return item
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for POST /patients
@@ -68,11 +71,15 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}") # Changed
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
 
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
+
     # Get table name from environment
     table_name = os.environ.get('PATIENT_RECORDS_TABLE')
     if not table_name:
@@ -88,7 +95,7 @@ def lambda_handler(event, context):
             request_body = json.loads(decoded)
         else:
             request_body = json.loads(event.get('body', '{}'))
-        logger.info(f"Decoded request body: {request_body}") # Changed
+        logger.info("Request body fields: %s", list(request_body) if isinstance(request_body, dict) else type(request_body).__name__)
         # Validate required fields
         required_fields = ['firstName', 'lastName']
         missing_fields = [field for field in required_fields if field not in request_body]
@@ -4,17 +4,21 @@ Lambda function to delete a patient
 import os
 import json
 import logging # Added
-import boto3
 from botocore.exceptions import ClientError
 
 # Import utility functions
 from utils.db_utils import get_patient_by_pk_sk, generate_response
+from utils.cors import build_cors_preflight_response
 from utils.responser_helper import handle_exception, build_error_response
+from utils.aws_clients import get_resource
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
 # Initialize Logger
 logger = logging.getLogger() # Added
 logger.setLevel(logging.INFO) # Added
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for DELETE /patients/{id}
@@ -26,10 +30,14 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}") # Changed
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     table_name = os.environ.get('PATIENT_RECORDS_TABLE')
     if not table_name:
@@ -54,7 +62,7 @@ def lambda_handler(event, context):
             return build_error_response(404, 'Not Found', f'Patient with ID {patient_id} not found', request_origin)
         
         # Initialize DynamoDB client
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = get_resource('dynamodb')
         table = dynamodb.Table(table_name)
         
         # Delete the patient record
@@ -11,14 +11,19 @@ from botocore.exceptions import ClientError
 # Add the parent directory to sys.path
 # sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) # Removed
 
-from utils.db_utils import get_patient_by_pk_sk, generate_response
+from utils.db_utils import get_patient_by_pk_sk, generate_response, conditional_response
 from utils.responser_helper import handle_exception, build_error_response # Added for consistency
-from utils.cors import add_cors_headers # Added for CORS
+from utils.cors import add_cors_headers, build_cors_preflight_response # Added for CORS
+from utils.compression import compress_responses
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
 # Initialize Logger
 logger = logging.getLogger() # Added
 logger.setLevel(logging.INFO) # Added
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /patients/{id}
@@ -30,10 +35,14 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}") # Changed
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     # Extract patient ID from path parameters
     patient_id = event.get('pathParameters', {}).get('id') # Safer access
@@ -58,7 +67,7 @@ def lambda_handler(event, context):
             return build_error_response(404, 'Not Found', f'Patient with ID {patient_id} not found', request_origin)
         
         logger.info(f"Successfully fetched patient {patient_id}")
-        return generate_response(200, patient)
+        return conditional_response(event, generate_response(200, patient))
     except ClientError as ce: # More specific exception handling
         logger.error(f"ClientError fetching patient {patient_id}: {ce}", exc_info=True)
         return handle_exception(ce, request_origin)
@@ -6,52 +6,115 @@ import json
 import logging
 from botocore.exceptions import ClientError
 from utils.responser_helper import handle_exception, build_error_response # Added for consistency
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
 
 # Import utility functions
-from utils.db_utils import query_by_type, generate_response # Changed query_table to query_by_type
+from utils.db_utils import query_by_type, generate_response, conditional_response # Changed query_table to query_by_type
+from utils.pagination import (
+    InvalidPaginationParameter, build_projection, decode_next_token,
+    encode_next_token, is_flag_set, parse_limit
+)
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 # DecimalEncoder is used by generate_response in db_utils
 
+# Continuation tokens issued here are only accepted by this listing
+TOKEN_SCOPE = 'patients'
+# Attributes the frontend needs to address a patient, returned even with ?fields=
+KEY_FIELDS = ('PK', 'SK', 'id')
+
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context=None):
     """
     Handle Lambda event for GET /patients
+
+    Query parameters:
+        limit: Page size (default 50, max 500)
+        nextToken: Continuation token from the previous page
+        fields: Comma-separated attributes to return (key attributes are always included)
+        all: 'true' to return every patient as a bare JSON array (legacy frontend)
+
+    Returns:
+        dict: {"items": [...], "nextToken": str or null}, or a bare list with all=true
     """
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
 
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
+
     table_name = os.environ.get('PATIENT_RECORDS_TABLE')
     if not table_name:
         logger.error('PatientRecords table name not configured')
         return build_error_response(500, 'Configuration Error', 'PatientRecords table name not configured', request_origin)
 
+    query_params = event.get('queryStringParameters') or {}
+    fetch_all = is_flag_set(query_params, 'all')
     try:
-        all_patients = []
-        last_evaluated_key = None
-        
-        while True:
-            logger.info(f"Querying for patients. LastEvaluatedKey: {last_evaluated_key}")
-            response_data = query_by_type(
-                table_name,
-                type_value='patient', # Querying for 'patient' type
-                last_evaluated_key=last_evaluated_key
-            )
-            
-            items = response_data.get('Items', [])
-            all_patients.extend(items)
-            
-            last_evaluated_key = response_data.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break # Exit loop if no more items to fetch
-                
-        logger.info(f"Fetched {len(all_patients)} patients from DynamoDB using type-index GSI")
-        return generate_response(200, all_patients)
+        projection = build_projection(query_params.get('fields'), always_include=KEY_FIELDS)
+        limit = None if fetch_all else parse_limit(query_params.get('limit'))
+        start_key = None if fetch_all else decode_next_token(query_params.get('nextToken'), TOKEN_SCOPE)
+    except InvalidPaginationParameter as e:
+        return build_error_response(400, 'Bad Request', str(e), request_origin)
+
+    try:
+        if fetch_all:
+            return conditional_response(event, generate_response(200, fetch_all_patients(table_name, projection)))
+
+        response_data = query_by_type(
+            table_name,
+            type_value='patient',
+            last_evaluated_key=start_key,
+            limit=limit,
+            projection=projection
+        )
+        items = response_data.get('Items', [])
+        logger.info(f"Fetched a page of {len(items)} patients from DynamoDB using type-index GSI")
+        return conditional_response(event, generate_response(200, {
+            'items': items,
+            'nextToken': encode_next_token(response_data.get('LastEvaluatedKey'), TOKEN_SCOPE)
+        }))
         
     except ClientError as ce:
         logger.error(f"ClientError fetching patients: {ce}", exc_info=True)
         return handle_exception(ce, request_origin) # Use imported helper
     except Exception as e:
         logger.error(f"Error fetching patients: {e}", exc_info=True)
-        return build_error_response(500, 'Internal Server Error', f'Error fetching patients: {str(e)}', request_origin)
\ No newline at end of file
+        return build_error_response(500, 'Internal Server Error', f'Error fetching patients: {str(e)}', request_origin)
+
+def fetch_all_patients(table_name, projection=None):
+    """
+    Drain the type-index for every patient (legacy, unbounded response).
+
+    Args:
+        table_name (str): PatientRecords table name
+        projection (dict): Optional projection from build_projection
+
+    Returns:
+        list: All patient records
+    """
+    all_patients = []
+    last_evaluated_key = None
+    
+    while True:
+        response_data = query_by_type(
+            table_name,
+            type_value='patient', # Querying for 'patient' type
+            last_evaluated_key=last_evaluated_key,
+            projection=projection
+        )
+        all_patients.extend(response_data.get('Items', []))
+        
+        last_evaluated_key = response_data.get('LastEvaluatedKey')
+        if not last_evaluated_key:
+            break # Exit loop if no more items to fetch
+            
+    logging.getLogger().info(f"Fetched {len(all_patients)} patients from DynamoDB using type-index GSI")
+    return all_patients
@@ -6,19 +6,23 @@ import json
 import logging
 import base64 # Added for profile image processing
 import uuid # Added for generating unique file names
-import boto3 # Added for S3 interaction
 from datetime import datetime
 from botocore.exceptions import ClientError, NoCredentialsError, PartialCredentialsError
 
 from utils.db_utils import get_patient_by_pk_sk, update_item_by_pk_sk, generate_response
+from utils.cors import add_cors_headers, build_cors_preflight_response
 
 from utils.responser_helper import handle_exception, build_error_response # Added
+from utils.aws_clients import get_client
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
 
 # Initialize Logger
 logger = logging.getLogger() # Added
 logger.setLevel(logging.INFO) # Added
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for PUT /patients/{id}
@@ -30,10 +34,14 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}") # Changed
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     headers = event.get('headers', {}) # Added
     request_origin = headers.get('Origin') or headers.get('origin') # Added
@@ -68,7 +76,7 @@ def lambda_handler(event, context):
             # import base64 # Removed, top-level import is used
             body_str = base64.b64decode(body_str).decode('utf-8')
         request_body = json.loads(body_str)
-        logger.info(f"Decoded request body: {request_body}")
+        logger.info("Request body fields: %s", list(request_body) if isinstance(request_body, dict) else type(request_body).__name__)
     except json.JSONDecodeError as je:
         logger.error(f"Invalid JSON in request body: {je}", exc_info=True)
 
@@ -219,7 +227,7 @@ def lambda_handler(event, context):
                 # Format: patients/{patient_id}/profile/{uuid}.{extension}
                 file_key = f"patients/{patient_id}/profile/{uuid.uuid4()}.{image_extension}"
                 
-                s3_client = boto3.client('s3')
+                s3_client = get_client('s3')
                 s3_client.put_object(
                     Bucket=s3_bucket_name,
                     Key=file_key,
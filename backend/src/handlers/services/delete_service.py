@@ -8,8 +8,13 @@ from botocore.exceptions import ClientError
 
 # Import utility functions
 from utils.db_utils import delete_item, get_item_by_id, generate_response
+from utils.cors import build_cors_preflight_response
 from utils.responser_helper import handle_exception, build_error_response
+from utils.services_cache import bump_catalogue_version
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for DELETE /services/{id}
@@ -23,10 +28,14 @@ def lambda_handler(event, context):
     """
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     table_name = os.environ.get('SERVICES_TABLE')
     if not table_name:
@@ -47,6 +56,7 @@ def lambda_handler(event, context):
         
         # Delete service
         delete_item(table_name, service_id)
+        bump_catalogue_version(table_name)
         
         return generate_response(200, {'message': f'Service with ID {service_id} deleted successfully'})
     
@@ -4,17 +4,18 @@ Lambda function to get a service by ID
 import os
 import json
 import logging
-import time
 from botocore.exceptions import ClientError
 
 # Import utility functions
 from utils.db_utils import get_item_by_id, generate_response
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
 from utils.responser_helper import handle_exception, build_error_response
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
-_cache = {}  # Stores {service_id: data}
-_cache_ttl_seconds = 300  # 5 minutes
-_cache_expiry_times = {} # Stores {service_id: expiry_timestamp}
-
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /services/{id}
@@ -28,10 +29,14 @@ def lambda_handler(event, context):
     """
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
     
     table_name = os.environ.get('SERVICES_TABLE')
     if not table_name:
@@ -43,23 +48,13 @@ def lambda_handler(event, context):
     if not service_id:
         return build_error_response(400, 'Validation Error', 'Missing service ID', request_origin)
 
-    # Check cache
-    cached_service = _cache.get(service_id)
-    if cached_service and time.time() < _cache_expiry_times.get(service_id, 0):
-        logger.info(f"Returning service {service_id} from cache")
-        return generate_response(200, cached_service)
-    
     try:
-        # Get service by ID
+        # Get service by ID. Not cached: revalidating against the catalogue
+        # version would cost the same single GetItem.
         service = get_item_by_id(table_name, service_id)
         
         if not service:
             return build_error_response(404, 'Not Found', f'Service with ID {service_id} not found', request_origin)
-
-        if service: # Only cache if service was found
-            _cache[service_id] = service
-            _cache_expiry_times[service_id] = time.time() + _cache_ttl_seconds
-            logger.info(f"Cached service {service_id}. New expiry: {_cache_expiry_times[service_id]}")
         
         return generate_response(200, service)
     
@@ -4,18 +4,19 @@ Lambda function to get all services
 import os
 import json
 import logging
-import time
 from botocore.exceptions import ClientError
 
 # Import utility functions
-from utils.db_utils import scan_table, generate_response
+from utils.db_utils import iter_scan, generate_list_response, conditional_response
 from utils.responser_helper import handle_exception, build_error_response
-from utils.cors import add_cors_headers, build_cors_preflight_response
-
-_cache = {}
-_cache_ttl_seconds = 300  # 5 minutes
-_cache_expiry_time = 0
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.services_cache import get_catalogue
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /services
@@ -29,30 +30,28 @@ def lambda_handler(event, context):
     """
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    logger.info(f"Received event: {json.dumps(event)}")
-    logger.info(f"Context: {context}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
 
+    # Handle CORS preflight requests
+    if event.get('httpMethod') == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
+
     table_name = os.environ.get('SERVICES_TABLE')
     if not table_name:
         logger.error('Services table name not configured')
         return build_error_response(500, 'Configuration Error', 'Services table name not configured', request_origin)
-    
-    # Handle CORS preflight requests
-    if event.get('httpMethod') == 'OPTIONS':
-        return build_cors_preflight_response(request_origin)
 
     # Get query parameters
     query_params = event.get('queryStringParameters', {}) or {}
 
-    # Only cache if no query parameters are present
-    if not query_params and 'all_services' in _cache and time.time() < _cache_expiry_time:
-        logger.info("Returning all services from cache")
-        return generate_response(200, _cache['all_services'])
-
     try:
+        # The unfiltered catalogue is cached and revalidated against its version stamp
+        if not query_params:
+            return conditional_response(event, generate_list_response(200, get_catalogue(table_name)))
+
         # Initialize filter expression
         filter_expressions = []
         
@@ -75,17 +74,13 @@ def lambda_handler(event, context):
                 filter_expr = filter_expr & expr
             kwargs['FilterExpression'] = filter_expr
         
-        # Query services
-        services = scan_table(table_name, **kwargs)
-        logger.info(f"Fetched {len(services)} services from DynamoDB")
+        # Query services, streaming pages straight into the response body
+        scan_stats = {}
+        services = iter_scan(table_name, stats=scan_stats, **kwargs)
 
-        # Cache the result only if no query parameters were used
-        if not query_params:
-            _cache['all_services'] = services
-            _cache_expiry_time = time.time() + _cache_ttl_seconds
-            logger.info(f"Cached all_services. New expiry: {_cache_expiry_time}")
-        
-        response = generate_response(200, services)
+        response = conditional_response(event, generate_list_response(200, services))
+        logger.info(f"Fetched {scan_stats['Count']} services from DynamoDB in {scan_stats['Pages']} pages "
+                    f"({scan_stats['ConsumedCapacityUnits']} RCUs consumed)")
         
         return response
     
@@ -8,8 +8,13 @@ from botocore.exceptions import ClientError
 
 # Import utility functions
 from utils.db_utils import get_item_by_id, update_item, generate_response
+from utils.cors import build_cors_preflight_response
 from utils.responser_helper import handle_exception, build_error_response
+from utils.services_cache import bump_catalogue_version
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
 
+@instrument_handler
 def lambda_handler(event, context):
     """
     Handle Lambda event for PUT /services/{id}
@@ -23,12 +28,15 @@ def lambda_handler(event, context):
     """
     logger = logging.getLogger()
     logger.setLevel(logging.INFO)
-    logger.info(f"Received event: {json.dumps(event)}")
-    logger.info(f"Context: {context}")
+    log_request(event, context)
 
     headers = event.get('headers', {})
     request_origin = headers.get('Origin') or headers.get('origin')
 
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
+
     table_name = os.environ.get('SERVICES_TABLE')
     if not table_name:
         logger.error('Services table name not configured')
@@ -75,6 +83,7 @@ def lambda_handler(event, context):
             return generate_response(200, existing_service)
 
         updated_service = update_item(table_name, service_id, updates)
+        bump_catalogue_version(table_name)
         logger.info(f"Service {service_id} updated successfully.")
         return generate_response(200, updated_service)
     except json.JSONDecodeError as je:
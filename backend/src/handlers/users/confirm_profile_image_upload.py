@@ -0,0 +1,178 @@
+"""
+Lambda function to confirm a direct-to-S3 profile image upload and record it on the user's profile.
+"""
+import os
+import json
+import base64
+import logging
+from botocore.exceptions import ClientError
+from utils.cors import add_cors_headers, build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.aws_clients import get_client
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.profile_images import (
+    PROFILE_IMAGE_URL_EXPIRES, check_uploaded_image, is_user_image_key, request_variants, set_profile_image_key
+)
+from utils.profile_image_cache import set_image_key
+from utils.user_directory import update_user_fields
+
+# Setup logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+def build_error_response(status_code, error_type, message, exception=None, request_origin=None):
+    """
+    Build a standardized error response
+    
+    Args:
+        status_code (int): HTTP status code
+        error_type (str): Type of error
+        message (str): Error message
+        exception: Optional exception object
+        request_origin (str): Origin header from the request
+        
+    Returns:
+        dict: API Gateway response with error details
+    """
+    response = {
+        'statusCode': status_code,
+        'body': json.dumps({
+            'error': error_type,
+            'message': message,
+            'exception': str(exception) if exception else None
+        }),
+        'headers': {
+            'Content-Type': 'application/json'
+        }
+    }
+    return add_cors_headers(response, request_origin)
+
+def handle_exception(exception, request_origin=None):
+    """
+    Handle exceptions and return appropriate responses
+    
+    Args:
+        exception: The exception to handle
+        request_origin (str): Origin header from the request
+        
+    Returns:
+        dict: API Gateway response with error details
+    """
+    if isinstance(exception, ClientError):
+        error_code = exception.response.get('Error', {}).get('Code', 'UnknownError')
+        
+        if error_code == 'ResourceNotFoundException':
+            return build_error_response(404, 'Not Found', str(exception), exception, request_origin)
+        elif error_code == 'ValidationException':
+            return build_error_response(400, 'Validation Error', str(exception), exception, request_origin)
+        elif error_code == 'AccessDeniedException':
+            return build_error_response(403, 'Access Denied', str(exception), exception, request_origin)
+        elif error_code == 'NoSuchKey':
+            return build_error_response(404, 'Not Found', 'Profile image not found', exception, request_origin)
+        else:
+            logger.error(f"AWS ClientError: {error_code} - {str(exception)}")
+            return build_error_response(500, 'AWS Error', str(exception), exception, request_origin)
+    else:
+        logger.error(f"Unexpected error: {str(exception)}")
+        return build_error_response(500, 'Internal Server Error', str(exception), exception, request_origin)
+
+@instrument_handler
+@compress_responses
+def lambda_handler(event, context):
+    """
+    Handle Lambda event for POST /users/profile-image/confirm (Records an uploaded profile image)
+    
+    Args:
+        event (dict): Lambda event
+        context (LambdaContext): Lambda context
+        
+    Returns:
+        dict: API Gateway response
+    """
+    log_request(event, context)
+    
+    # Extract the Origin header for CORS handling
+    request_origin = event.get('headers', {}).get('Origin') or event.get('headers', {}).get('origin')
+    
+    # Check if this is an OPTIONS request and return early with just the headers
+    if event.get('httpMethod') == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
+    
+    try:
+        # The image always belongs to the caller, identified by the token's sub
+        claims = ((event.get('requestContext') or {}).get('authorizer') or {}).get('claims') or {}
+        user_sub = claims.get('sub')
+        if not user_sub:
+            logger.error("User sub not found in authorizer claims")
+            return build_error_response(401, 'Unauthorized', 'User identifier not found in request', None, request_origin)
+        
+        # Handle base64-encoded body
+        body = event.get('body') or '{}'
+        try:
+            if event.get('isBase64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            body = json.loads(body)
+        except ValueError as e:
+            return build_error_response(400, 'Validation Error', 'Request body must be valid JSON', e, request_origin)
+        
+        # Get S3 bucket name from environment variable
+        bucket_name = os.environ.get('DOCUMENTS_BUCKET')
+        if not bucket_name:
+            logger.error("Environment variable DOCUMENTS_BUCKET not set")
+            return build_error_response(500, 'Configuration Error', 'Document storage not configured', None, request_origin)
+        
+        image_key = body.get('imageKey')
+        if not is_user_image_key(user_sub, image_key):
+            return build_error_response(400, 'Validation Error',
+                                        'imageKey must be a key returned by /users/profile-image/upload-url', None, request_origin)
+        
+        # Get user pool ID from environment variable
+        user_pool_id = os.environ.get('USER_POOL_ID')
+        if not user_pool_id:
+            logger.error("Environment variable USER_POOL_ID not set")
+            return build_error_response(500, 'Configuration Error', 'User pool ID not configured', None, request_origin)
+        
+        s3 = get_client('s3')
+        problem = check_uploaded_image(s3, bucket_name, image_key)
+        if problem:
+            logger.warning(f"Rejected profile image {image_key}: {problem}")
+            return build_error_response(400, 'Validation Error', problem, None, request_origin)
+        
+        # Cognito accepts the sub as a username too, but the token normally carries the username itself
+        username = claims.get('cognito:username') or user_sub
+        set_profile_image_key(get_client('cognito-idp'), user_pool_id, username, image_key)
+        # Readers look the user up by email; keep their cached key in step
+        set_image_key([claims.get('email'), username], image_key)
+        update_user_fields(username, profileImage=image_key)
+        request_variants(get_client('lambda'), bucket_name, image_key)
+        
+        image_url = s3.generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket_name, 'Key': image_key},
+            ExpiresIn=PROFILE_IMAGE_URL_EXPIRES
+        )
+        
+        # Same shape as the legacy base64 upload response
+        response = {
+            'statusCode': 200,
+            'body': json.dumps({
+                'success': True,
+                'message': 'Profile image uploaded successfully',
+                'imageUrl': image_url,
+                'imageKey': image_key
+            }),
+            'headers': {
+                'Content-Type': 'application/json'
+            }
+        }
+        
+        logger.info(f"Profile image confirmed for user: {user_sub}")
+        return add_cors_headers(response, request_origin)
+    
+    except ClientError as ce:
+        logger.error(f"AWS ClientError confirming profile image upload: {ce}")
+        return handle_exception(ce, request_origin)
+    except Exception as e:
+        logger.error(f"Unexpected error confirming profile image upload: {e}", exc_info=True)
+        return handle_exception(e, request_origin)
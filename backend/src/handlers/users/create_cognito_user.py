@@ -5,10 +5,15 @@ This function provides admin functionality to create users with specific roles.
 """
 import os
 import json
-import boto3
 import logging
 import base64
 from botocore.exceptions import ClientError
+from utils.aws_clients import get_client
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.user_directory import save_user
 
 # Setup logging
 logger = logging.getLogger()
@@ -65,6 +70,8 @@ def handle_exception(exception):
         logger.error(f"Unexpected error: {str(exception)}")
         return build_error_response(500, 'Internal Server Error', str(exception))
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for POST /users (Creates a new user in Cognito)
@@ -76,7 +83,11 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
     
     try:
         # Parse the request body
@@ -87,8 +98,8 @@ def lambda_handler(event, context):
         body = event['body']
         if event.get('isBase64Encoded'):
             body = base64.b64decode(body).decode('utf-8')
-        logger.info(f"Decoded request body: {body}")  # Debug log
         request_body = json.loads(body)
+        logger.info("Request body fields: %s", list(request_body) if isinstance(request_body, dict) else type(request_body).__name__)
         
         # Validate required fields
         required_fields = ['username', 'password', 'firstName', 'lastName', 'role']
@@ -118,7 +129,7 @@ def lambda_handler(event, context):
             return build_error_response(500, 'Configuration Error', 'User pool ID not configured.')
         
         # Initialize Cognito client
-        cognito = boto3.client('cognito-idp')
+        cognito = get_client('cognito-idp')
         
         # Prepare user attributes
         user_attributes = []
@@ -174,6 +185,7 @@ def lambda_handler(event, context):
         }
         
         user_result = cognito.admin_get_user(**get_user_params)
+        save_user(user_result)
         
         # Format the response
         attributes = {}
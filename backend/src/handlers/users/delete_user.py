@@ -5,16 +5,25 @@ This function provides admin functionality to remove users from the system.
 """
 import os
 import json
-import boto3
 import logging
 from botocore.exceptions import ClientError
 
 # Attempt to import CORS utilities from utils.cors, fallback to lambda_layer.python.utils.cors for local testing
 try:
     from utils.cors import add_cors_headers, build_cors_preflight_response
+    from utils.aws_clients import get_client
+    from utils.request_logging import log_request
+    from utils.metrics import instrument_handler
+    from utils.compression import compress_responses
+    from utils.user_directory import remove_user
 except ImportError:
     # For local testing if Lambda layer is not in path
     from lambda_layer.python.utils.cors import add_cors_headers, build_cors_preflight_response
+    from lambda_layer.python.utils.aws_clients import get_client
+    from lambda_layer.python.utils.request_logging import log_request
+    from lambda_layer.python.utils.metrics import instrument_handler
+    from lambda_layer.python.utils.compression import compress_responses
+    from lambda_layer.python.utils.user_directory import remove_user
 
 # Setup logging
 logger = logging.getLogger()
@@ -71,6 +80,8 @@ def handle_exception(exception):
         logger.error(f"Unexpected error: {str(exception)}")
         return build_error_response(500, 'Internal Server Error', str(exception))
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for DELETE /users/{username} (Deletes a user from Cognito)
@@ -82,7 +93,11 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
     
     try:
         # Get the username from path parameters
@@ -98,7 +113,7 @@ def lambda_handler(event, context):
             return build_error_response(500, 'Configuration Error', 'User pool ID not configured.')
         
         # Initialize Cognito client
-        cognito = boto3.client('cognito-idp')
+        cognito = get_client('cognito-idp')
         
         # Delete the user
         params = {
@@ -108,6 +123,7 @@ def lambda_handler(event, context):
         
         logger.info(f"Deleting user: {username}")
         cognito.admin_delete_user(**params)
+        remove_user(username)
         
         # Return success response
         response = {
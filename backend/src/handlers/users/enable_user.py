@@ -5,9 +5,14 @@ This function provides admin functionality to activate disabled users.
 """
 import os
 import json
-import boto3
 import logging
 from botocore.exceptions import ClientError
+from utils.aws_clients import get_client
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.user_directory import update_user_fields
 
 # Setup logging
 logger = logging.getLogger()
@@ -64,6 +69,8 @@ def handle_exception(exception):
         logger.error(f"Unexpected error: {str(exception)}")
         return build_error_response(500, 'Internal Server Error', str(exception))
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for POST /users/{username}/enable (Enables a user in Cognito)
@@ -75,7 +82,11 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
     
     try:
         # Get the username from path parameters
@@ -91,7 +102,7 @@ def lambda_handler(event, context):
             return build_error_response(500, 'Configuration Error', 'User pool ID not configured.')
         
         # Initialize Cognito client
-        cognito = boto3.client('cognito-idp')
+        cognito = get_client('cognito-idp')
         
         # Enable the user
         params = {
@@ -101,6 +112,7 @@ def lambda_handler(event, context):
         
         logger.info(f"Enabling user: {username}")
         cognito.admin_enable_user(**params)
+        update_user_fields(username, enabled=True)
         
         # Return success response
         response = {
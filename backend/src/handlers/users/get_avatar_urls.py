@@ -0,0 +1,185 @@
+"""
+Lambda function to get the profile image URLs of many users in one request.
+
+Avatar lists (user tables, appointment views) would otherwise call
+GET /users/profile-image once per user. Image keys come from the shared cache
+in utils.profile_image_cache, one BatchGetItem for the whole list, and the URLs
+are presigned locally, so only users missing from the cache cost a Cognito call.
+"""
+import os
+import json
+import base64
+import logging
+from botocore.exceptions import ClientError
+from utils.cors import add_cors_headers, build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.aws_clients import get_client
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.profile_images import VARIANT_FORMATS, VARIANT_SIZES
+from utils.profile_image_cache import get_image_entries, presigned_url, resolve_image
+
+# Setup logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Most users resolved per request
+MAX_USERNAMES = 100
+
+def build_error_response(status_code, error_type, message, exception=None, request_origin=None):
+    """
+    Build a standardized error response
+    
+    Args:
+        status_code (int): HTTP status code
+        error_type (str): Type of error
+        message (str): Error message
+        exception: Optional exception object
+        request_origin (str): Origin header from the request
+        
+    Returns:
+        dict: API Gateway response with error details
+    """
+    response = {
+        'statusCode': status_code,
+        'body': json.dumps({
+            'error': error_type,
+            'message': message,
+            'exception': str(exception) if exception else None
+        }),
+        'headers': {
+            'Content-Type': 'application/json'
+        }
+    }
+    return add_cors_headers(response, request_origin)
+
+def handle_exception(exception, request_origin=None):
+    """
+    Handle exceptions and return appropriate responses
+    
+    Args:
+        exception: The exception to handle
+        request_origin (str): Origin header from the request
+        
+    Returns:
+        dict: API Gateway response with error details
+    """
+    if isinstance(exception, ClientError):
+        error_code = exception.response.get('Error', {}).get('Code', 'UnknownError')
+        
+        if error_code == 'ResourceNotFoundException':
+            return build_error_response(404, 'Not Found', str(exception), exception, request_origin)
+        elif error_code == 'ValidationException':
+            return build_error_response(400, 'Validation Error', str(exception), exception, request_origin)
+        elif error_code == 'AccessDeniedException':
+            return build_error_response(403, 'Access Denied', str(exception), exception, request_origin)
+        else:
+            logger.error(f"AWS ClientError: {error_code} - {str(exception)}")
+            return build_error_response(500, 'AWS Error', str(exception), exception, request_origin)
+    else:
+        logger.error(f"Unexpected error: {str(exception)}")
+        return build_error_response(500, 'Internal Server Error', str(exception), exception, request_origin)
+
+@instrument_handler
+@compress_responses
+def lambda_handler(event, context):
+    """
+    Handle Lambda event for POST /users/avatars (Gets the profile image URLs of many users)
+    
+    Request body:
+        usernames (list): Up to MAX_USERNAMES usernames (emails)
+        size (int): Optional thumbnail edge length, one of VARIANT_SIZES
+        format (str): Thumbnail format, one of VARIANT_FORMATS (default webp)
+    
+    Args:
+        event (dict): Lambda event
+        context (LambdaContext): Lambda context
+        
+    Returns:
+        dict: API Gateway response; avatars maps each username to
+              {'imageUrl', 'size'}, or None if the user has no image
+    """
+    log_request(event, context)
+    
+    # Extract the Origin header for CORS handling
+    request_origin = event.get('headers', {}).get('Origin') or event.get('headers', {}).get('origin')
+    
+    # Check if this is an OPTIONS request and return early with just the headers
+    if event.get('httpMethod') == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
+    
+    try:
+        # Handle base64-encoded body
+        body = event.get('body') or '{}'
+        try:
+            if event.get('isBase64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            body = json.loads(body)
+        except (TypeError, ValueError):
+            return build_error_response(400, 'Validation Error', 'Request body must be JSON', None, request_origin)
+        if not isinstance(body, dict):
+            return build_error_response(400, 'Validation Error', 'Request body must be a JSON object', None, request_origin)
+        
+        usernames = body.get('usernames')
+        if (not isinstance(usernames, list) or not usernames
+                or not all(isinstance(username, str) and username for username in usernames)):
+            return build_error_response(400, 'Validation Error', 'usernames must be a non-empty list of usernames',
+                                        None, request_origin)
+        if len(usernames) > MAX_USERNAMES:
+            return build_error_response(400, 'Validation Error',
+                                        f"At most {MAX_USERNAMES} usernames per request", None, request_origin)
+        
+        size = body.get('size')
+        image_format = str(body.get('format') or next(iter(VARIANT_FORMATS))).lower()
+        if size is not None and (not str(size).isdigit() or int(size) not in VARIANT_SIZES):
+            return build_error_response(400, 'Validation Error',
+                                        f"size must be one of: {', '.join(map(str, VARIANT_SIZES))}", None, request_origin)
+        if image_format not in VARIANT_FORMATS:
+            return build_error_response(400, 'Validation Error',
+                                        f"format must be one of: {', '.join(VARIANT_FORMATS)}", None, request_origin)
+        
+        user_pool_id = os.environ.get('USER_POOL_ID')
+        bucket_name = os.environ.get('DOCUMENTS_BUCKET')
+        if not user_pool_id or not bucket_name:
+            logger.error("Environment variable USER_POOL_ID or DOCUMENTS_BUCKET not set")
+            return build_error_response(500, 'Configuration Error', 'Profile images not configured', None, request_origin)
+        
+        # Unknown users and failed lookups are reported as having no image rather than failing the whole list
+        entries = get_image_entries(usernames, get_client('cognito-idp'), user_pool_id, skip_failed_users=True)
+        
+        s3 = get_client('s3')
+        avatars = {}
+        for username in usernames:
+            entry = entries.get(username)
+            if not entry or not entry['imageKey']:
+                avatars[username] = None
+                continue
+            # Originals are not checked against S3 here; a broken URL just shows the placeholder
+            try:
+                image_key, served_size = resolve_image(
+                    s3, bucket_name, username, entry, int(size) if size is not None else None, image_format)
+                avatars[username] = {'imageUrl': presigned_url(s3, bucket_name, image_key), 'size': served_size}
+            except Exception as e:
+                logger.warning(f"Could not resolve the avatar of {username}: {e}")
+                avatars[username] = None
+        
+        response = {
+            'statusCode': 200,
+            'body': json.dumps({
+                'success': True,
+                'avatars': avatars
+            }),
+            'headers': {
+                'Content-Type': 'application/json'
+            }
+        }
+        
+        logger.info(f"Resolved {len(avatars)} avatar URLs ({len(entries)} users found)")
+        return add_cors_headers(response, request_origin)
+    
+    except ClientError as ce:
+        logger.error(f"AWS ClientError getting avatar URLs: {ce}")
+        return handle_exception(ce, request_origin)
+    except Exception as e:
+        logger.error(f"Unexpected error getting avatar URLs: {e}", exc_info=True)
+        return handle_exception(e, request_origin)
@@ -3,10 +3,15 @@ Lambda function to get a user's profile image URL from S3.
 """
 import os
 import json
-import boto3
 import logging
 from botocore.exceptions import ClientError
 from utils.cors import add_cors_headers, build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.aws_clients import get_client
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.profile_images import MISSING_OBJECT_ERROR_CODES, VARIANT_FORMATS, VARIANT_SIZES
+from utils.profile_image_cache import get_image_entries, presigned_url, resolve_image, set_image_key
 
 # Setup logging
 logger = logging.getLogger()
@@ -68,10 +73,16 @@ def handle_exception(exception, request_origin=None):
         logger.error(f"Unexpected error: {str(exception)}")
         return build_error_response(500, 'Internal Server Error', str(exception), exception, request_origin)
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /users/profile-image (Gets a user's profile image URL)
     
+    Query parameters:
+        size (int): Optional thumbnail edge length, one of VARIANT_SIZES
+        format (str): Thumbnail format, one of VARIANT_FORMATS (default webp)
+    
     Args:
         event (dict): Lambda event
         context (LambdaContext): Lambda context
@@ -79,7 +90,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
     
     # Extract the Origin header for CORS handling
     request_origin = event.get('headers', {}).get('Origin') or event.get('headers', {}).get('origin')
@@ -102,6 +113,17 @@ def lambda_handler(event, context):
                 logger.error("Could not extract username from request context or path parameters")
                 return build_error_response(401, 'Unauthorized', 'User identity not found in request', None, request_origin)
         
+        # Optional thumbnail, e.g. ?size=64 for avatars in lists
+        query = event.get('queryStringParameters') or {}
+        size = query.get('size')
+        image_format = (query.get('format') or next(iter(VARIANT_FORMATS))).lower()
+        if size is not None and (not str(size).isdigit() or int(size) not in VARIANT_SIZES):
+            return build_error_response(400, 'Validation Error',
+                                        f"size must be one of: {', '.join(map(str, VARIANT_SIZES))}", None, request_origin)
+        if image_format not in VARIANT_FORMATS:
+            return build_error_response(400, 'Validation Error',
+                                        f"format must be one of: {', '.join(VARIANT_FORMATS)}", None, request_origin)
+        
         # Get user pool ID from environment variable
         user_pool_id = os.environ.get('USER_POOL_ID')
         if not user_pool_id:
@@ -109,20 +131,11 @@ def lambda_handler(event, context):
             return build_error_response(500, 'Configuration Error', 'User pool ID not configured', None, request_origin)
         
         # Initialize Cognito client
-        cognito = boto3.client('cognito-idp')
+        cognito = get_client('cognito-idp')
         
-        # Get user attributes to find the profile image key
-        user_result = cognito.admin_get_user(
-            UserPoolId=user_pool_id,
-            Username=username
-        )
-        
-        # Extract the profile image key from user attributes
-        profile_image_key = None
-        for attr in user_result.get('UserAttributes', []):
-            if attr['Name'] == 'custom:profile_image':
-                profile_image_key = attr['Value']
-                break
+        # Find the profile image key; AdminGetUser only runs when the shared cache has no entry
+        entry = get_image_entries([username], cognito, user_pool_id)[username]
+        profile_image_key = entry['imageKey']
         
         # If no profile image is set, return a default response
         if not profile_image_key:
@@ -147,35 +160,37 @@ def lambda_handler(event, context):
             return build_error_response(500, 'Configuration Error', 'Document storage not configured', None, request_origin)
         
         # Initialize S3 client
-        s3 = boto3.client('s3')
+        s3 = get_client('s3')
         
-        # Check if the image exists in S3
-        try:
-            s3.head_object(Bucket=bucket_name, Key=profile_image_key)
-        except ClientError as e:
-            if e.response['Error']['Code'] == '404':
-                logger.warning(f"Profile image not found in S3: {profile_image_key}")
-                response = {
-                    'statusCode': 200,
-                    'body': json.dumps({
-                        'success': True,
-                        'hasImage': False,
-                        'message': 'Profile image not found in storage'
-                    }),
-                    'headers': {
-                        'Content-Type': 'application/json'
+        # A key just read from Cognito is checked against S3 once; cached keys were written by the upload handlers
+        if not entry['cached']:
+            try:
+                s3.head_object(Bucket=bucket_name, Key=profile_image_key)
+            except ClientError as e:
+                if e.response['Error']['Code'] in MISSING_OBJECT_ERROR_CODES:
+                    logger.warning(f"Profile image not found in S3: {profile_image_key}")
+                    set_image_key([username], '')
+                    response = {
+                        'statusCode': 200,
+                        'body': json.dumps({
+                            'success': True,
+                            'hasImage': False,
+                            'message': 'Profile image not found in storage'
+                        }),
+                        'headers': {
+                            'Content-Type': 'application/json'
+                        }
                     }
-                }
-                return add_cors_headers(response, request_origin)
-            else:
-                raise
+                    return add_cors_headers(response, request_origin)
+                else:
+                    raise
+        
+        # Serve the thumbnail once it has been rendered, otherwise fall back to the original
+        image_key, served_size = resolve_image(
+            s3, bucket_name, username, entry, int(size) if size is not None else None, image_format)
         
-        # Generate a pre-signed URL for the image
-        image_url = s3.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': bucket_name, 'Key': profile_image_key},
-            ExpiresIn=3600  # URL valid for 1 hour
-        )
+        # Pre-signed URL for the image, reused across requests while it has time left
+        image_url = presigned_url(s3, bucket_name, image_key)
         
         # Return success response with the image URL
         response = {
@@ -184,7 +199,9 @@ def lambda_handler(event, context):
                 'success': True,
                 'hasImage': True,
                 'imageUrl': image_url,
-                'imageKey': profile_image_key
+                'imageKey': profile_image_key,
+                # Edge length of the image served, None for the original
+                'size': served_size
             }),
             'headers': {
                 'Content-Type': 'application/json'
@@ -2,24 +2,46 @@
 """
 Lambda function to list all users from AWS Cognito.
 This function provides admin functionality to view all users in the system.
+
+Users are read from the user directory in USER_DIRECTORY_TABLE (see
+utils.user_directory), which can filter by role, search and sort by name,
+once it has been filled; until then they are listed from Cognito itself.
 """
 import os
 import json
-import boto3
 import logging
 from botocore.exceptions import ClientError
 
 # Attempt to import CORS utilities from utils.cors, fallback to lambda_layer.python.utils.cors for local testing
 try:
     from utils.cors import add_cors_headers, build_cors_preflight_response
+    from utils.aws_clients import get_client
+    from utils.request_logging import log_request
+    from utils.metrics import instrument_handler
+    from utils.compression import compress_responses
+    from utils.profile_images import PROFILE_IMAGE_ATTRIBUTE, VARIANT_SIZES, variant_key
+    from utils.profile_image_cache import presigned_url
+    from utils.pagination import InvalidPaginationParameter, decode_next_token, encode_next_token, parse_limit
+    from utils.user_directory import is_ready, list_page, matches, token_scope, user_from_item
 except ImportError:
     # For local testing if Lambda layer is not in path
     from lambda_layer.python.utils.cors import add_cors_headers, build_cors_preflight_response
+    from lambda_layer.python.utils.aws_clients import get_client
+    from lambda_layer.python.utils.request_logging import log_request
+    from lambda_layer.python.utils.metrics import instrument_handler
+    from lambda_layer.python.utils.compression import compress_responses
+    from lambda_layer.python.utils.profile_images import PROFILE_IMAGE_ATTRIBUTE, VARIANT_SIZES, variant_key
+    from lambda_layer.python.utils.profile_image_cache import presigned_url
+    from lambda_layer.python.utils.pagination import InvalidPaginationParameter, decode_next_token, encode_next_token, parse_limit
+    from lambda_layer.python.utils.user_directory import is_ready, list_page, matches, token_scope, user_from_item
 
 # Setup logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Users per page; also the most Cognito's ListUsers returns at once
+COGNITO_PAGE_SIZE = 60
+
 def build_error_response(status_code, error_type, message, exception=None, request_origin=None):
     """
     Build a standardized error response
@@ -77,10 +99,90 @@ def handle_exception(exception, request_origin=None):
         logger.error(f"Unexpected error: {str(exception)}")
         return build_error_response(500, 'Internal Server Error', str(exception), exception, request_origin)
 
+def list_from_cognito(user_pool_id, next_token, role=None, search=None):
+    """
+    List one page of users straight from Cognito, used until the user
+    directory has been filled. Cognito cannot filter on custom attributes or
+    sort, so role and search only filter the page that was returned.
+    
+    Args:
+        user_pool_id (str): User pool ID
+        next_token (str): Cognito PaginationToken, or None
+        role (str): Only users with this role
+        search (str): Only users whose names, email or phone contain this text
+        
+    Returns:
+        tuple: ([(user, profile image key)], PaginationToken or None)
+    """
+    cognito = get_client('cognito-idp')
+    
+    # Set up parameters for listing users
+    params = {
+        'UserPoolId': user_pool_id,
+        'Limit': COGNITO_PAGE_SIZE
+    }
+    
+    # Add pagination token if provided
+    if next_token:
+        params['PaginationToken'] = next_token
+    
+    # Call Cognito to list users
+    logger.info(f"Calling Cognito with params: {params}")
+    result = cognito.list_users(**params)
+    logger.info(f"Cognito returned {len(result.get('Users', []))} users")
+    
+    # Transform the response to match our expected format
+    listed = []
+    for user in result.get('Users', []):
+        attributes = {}
+        for attr in user.get('Attributes', []):
+            attributes[attr['Name']] = attr['Value']
+        
+        # Convert datetime objects to ISO format strings for JSON serialization
+        user_create_date = user.get('UserCreateDate')
+        if hasattr(user_create_date, 'isoformat'):
+            user_create_date = user_create_date.isoformat()
+            
+        user_last_modified_date = user.get('UserLastModifiedDate')
+        if hasattr(user_last_modified_date, 'isoformat'):
+            user_last_modified_date = user_last_modified_date.isoformat()
+        
+        formatted = {
+            'username': user.get('Username'),
+            'enabled': user.get('Enabled'),
+            'userStatus': user.get('UserStatus'),
+            'userCreateDate': user_create_date,
+            'userLastModifiedDate': user_last_modified_date,
+            'firstName': attributes.get('given_name', ''),
+            'lastName': attributes.get('family_name', ''),
+            'email': attributes.get('email', ''),
+            'phone': attributes.get('phone_number', ''),
+            'role': attributes.get('custom:role', 'user'),
+            'sub': attributes.get('sub', '')
+        }
+        if matches(formatted, role, search):
+            listed.append((formatted, attributes.get(PROFILE_IMAGE_ATTRIBUTE)))
+    return listed, result.get('PaginationToken')
+
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for GET /users (Lists all users in Cognito)
     
+    Query parameters:
+        nextToken (str): Pagination token from the previous page
+        limit (int): Users per page from the directory (default 60)
+        role (str): Only users with this role
+        search (str): Only users whose names, email or phone contain this text
+        order (str): 'asc' (default) or 'desc' by last name, first name, email
+        includeAvatars (str): 'true' to add each user's avatarUrl, presigned
+                              from the custom:profile_image attribute already
+                              returned by ListUsers (null without an image)
+        avatarSize (int): With includeAvatars, also add avatarThumbnailUrl for
+                          that thumbnail size; it is not checked against S3,
+                          so clients fall back to avatarUrl until it is rendered
+    
     Args:
         event (dict): Lambda event
         context (LambdaContext): Lambda context
@@ -88,7 +190,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
     
     # Extract request origin for CORS handling
     request_origin = event.get('headers', {}).get('origin') or event.get('headers', {}).get('Origin')
@@ -104,60 +206,54 @@ def lambda_handler(event, context):
             logger.error("Environment variable USER_POOL_ID not set.")
             return build_error_response(500, 'Configuration Error', 'User pool ID not configured.', None, request_origin)
         
-        # Initialize Cognito client
-        cognito = boto3.client('cognito-idp')
+        query = event.get('queryStringParameters') or {}
+        include_avatars = str(query.get('includeAvatars', '')).lower() == 'true'
+        avatar_size = query.get('avatarSize')
+        if avatar_size is not None and (not str(avatar_size).isdigit() or int(avatar_size) not in VARIANT_SIZES):
+            return build_error_response(400, 'Validation Error',
+                                        f"avatarSize must be one of: {', '.join(map(str, VARIANT_SIZES))}", None, request_origin)
+        bucket_name = os.environ.get('DOCUMENTS_BUCKET')
+        if include_avatars and not bucket_name:
+            logger.error("Environment variable DOCUMENTS_BUCKET not set.")
+            return build_error_response(500, 'Configuration Error', 'Document storage not configured.', None, request_origin)
         
-        # Set up parameters for listing users
-        params = {
-            'UserPoolId': user_pool_id,
-            'Limit': 60
-        }
-        
-        # Add pagination token if provided
-        if event.get('queryStringParameters') and event['queryStringParameters'].get('nextToken') and event['queryStringParameters']['nextToken'] != 'null':
-            params['PaginationToken'] = event['queryStringParameters']['nextToken']
+        role = query.get('role') or None
+        search = (query.get('search') or '').strip() or None
+        order = (query.get('order') or 'asc').lower()
+        if order not in ('asc', 'desc'):
+            return build_error_response(400, 'Validation Error', "order must be 'asc' or 'desc'", None, request_origin)
+        next_token = query.get('nextToken') if query.get('nextToken') != 'null' else None
         
-        # Call Cognito to list users
-        logger.info(f"Calling Cognito with params: {params}")
-        result = cognito.list_users(**params)
-        logger.info(f"Cognito returned {len(result.get('Users', []))} users")
+        if is_ready():
+            try:
+                limit = parse_limit(query.get('limit'), default=COGNITO_PAGE_SIZE)
+                start_key = decode_next_token(next_token, token_scope(role))
+            except InvalidPaginationParameter as e:
+                return build_error_response(400, 'Validation Error', str(e), None, request_origin)
+            items, last_key = list_page(limit, start_key, role=role, search=search, descending=order == 'desc')
+            logger.info(f"User directory returned {len(items)} users")
+            listed = [(user_from_item(item), item.get('profileImage')) for item in items]
+            next_token = encode_next_token(last_key, token_scope(role))
+        else:
+            listed, next_token = list_from_cognito(user_pool_id, next_token, role, search)
         
-        # Transform the response to match our expected format
+        # Presigning is local signing only; no S3 request is made per user
+        s3 = get_client('s3') if include_avatars else None
         users = []
-        for user in result.get('Users', []):
-            attributes = {}
-            for attr in user.get('Attributes', []):
-                attributes[attr['Name']] = attr['Value']
-            
-            # Convert datetime objects to ISO format strings for JSON serialization
-            user_create_date = user.get('UserCreateDate')
-            if hasattr(user_create_date, 'isoformat'):
-                user_create_date = user_create_date.isoformat()
-                
-            user_last_modified_date = user.get('UserLastModifiedDate')
-            if hasattr(user_last_modified_date, 'isoformat'):
-                user_last_modified_date = user_last_modified_date.isoformat()
-            
-            users.append({
-                'username': user.get('Username'),
-                'enabled': user.get('Enabled'),
-                'userStatus': user.get('UserStatus'),
-                'userCreateDate': user_create_date,
-                'userLastModifiedDate': user_last_modified_date,
-                'firstName': attributes.get('given_name', ''),
-                'lastName': attributes.get('family_name', ''),
-                'email': attributes.get('email', ''),
-                'phone': attributes.get('phone_number', ''),
-                'role': attributes.get('custom:role', 'user'),
-                'sub': attributes.get('sub', '')
-            })
+        for user, image_key in listed:
+            if include_avatars:
+                user['avatarUrl'] = presigned_url(s3, bucket_name, image_key) if image_key else None
+                if avatar_size is not None:
+                    user['avatarThumbnailUrl'] = (
+                        presigned_url(s3, bucket_name, variant_key(image_key, int(avatar_size))) if image_key else None)
+            users.append(user)
         
         # Return the formatted response
         response = {
             'statusCode': 200,
             'body': json.dumps({
                 'users': users,
-                'nextToken': result.get('PaginationToken')
+                'nextToken': next_token
             })
         }
         
@@ -0,0 +1,36 @@
+"""
+Lambda function to reconcile the user directory with the Cognito user pool.
+
+Runs on a schedule and re-reads the whole pool, writing users that are
+missing from the directory in USER_DIRECTORY_TABLE or differ from Cognito and deleting
+users that no longer exist. This repairs drift the handlers and triggers
+cannot see, e.g. edits in the Cognito console or a failed directory write.
+The first completed run also switches GET /users over to the directory.
+"""
+import os
+import logging
+
+from utils.aws_clients import get_client
+from utils.metrics import instrument_handler
+from utils.user_directory import reconcile
+
+# Setup logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+@instrument_handler
+def lambda_handler(event, context):
+    """
+    Handle a scheduled event (or a manual invoke) by reconciling the directory
+    
+    Args:
+        event (dict): EventBridge scheduled event; its content is not used
+        context (LambdaContext): Lambda context
+        
+    Returns:
+        dict: Numbers of users written, deleted and unchanged
+    """
+    user_pool_id = os.environ.get('USER_POOL_ID')
+    if not user_pool_id or not os.environ.get('USER_DIRECTORY_TABLE'):
+        raise RuntimeError('USER_POOL_ID and USER_DIRECTORY_TABLE must be set')
+    return reconcile(get_client('cognito-idp'), user_pool_id)
@@ -3,10 +3,16 @@ Lambda function to remove a user's profile image from S3 and clear the user's pr
 """
 import os
 import json
-import boto3
 import logging
 from botocore.exceptions import ClientError
 from utils.cors import add_cors_headers, build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.aws_clients import get_client
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.profile_images import variant_keys
+from utils.profile_image_cache import set_image_key
+from utils.user_directory import update_user_fields
 
 # Setup logging
 logger = logging.getLogger()
@@ -64,6 +70,8 @@ def handle_exception(exception):
         logger.error(f"Unexpected error: {str(exception)}")
         return build_error_response(500, 'Internal Server Error', str(exception), exception)
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for DELETE /users/profile-image (Removes a user's profile image)
@@ -75,7 +83,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
     
     # Check if this is an OPTIONS request and return early with just the headers
     if event.get('httpMethod') == 'OPTIONS':
@@ -99,8 +107,8 @@ def lambda_handler(event, context):
             logger.error("Environment variable DOCUMENTS_BUCKET not set")
             return build_error_response(500, 'Configuration Error', 'Document storage not configured')
 
-        cognito = boto3.client('cognito-idp')
-        s3 = boto3.client('s3')
+        cognito = get_client('cognito-idp')
+        s3 = get_client('s3')
 
         # Get user attributes to find the profile image key
         user_result = cognito.admin_get_user(
@@ -122,6 +130,7 @@ def lambda_handler(event, context):
                     {'Name': 'custom:profile_image', 'Value': ''}
                 ]
             )
+            set_image_key([username], '')
             response = {
                 'statusCode': 200,
                 'body': json.dumps({
@@ -140,6 +149,11 @@ def lambda_handler(event, context):
         except ClientError as e:
             if e.response['Error']['Code'] != 'NoSuchKey':
                 raise
+        # Remove its thumbnails too; DeleteObjects ignores the ones never rendered
+        s3.delete_objects(
+            Bucket=bucket_name,
+            Delete={'Objects': [{'Key': key} for key in variant_keys(profile_image_key)], 'Quiet': True}
+        )
         # Clear the profile image attribute in Cognito
         cognito.admin_update_user_attributes(
             UserPoolId=user_pool_id,
@@ -148,6 +162,9 @@ def lambda_handler(event, context):
                 {'Name': 'custom:profile_image', 'Value': ''}
             ]
         )
+        # Cached lookups must stop returning the deleted key
+        set_image_key([username], '')
+        update_user_fields(username, profileImage='')
         
         response = {
             'statusCode': 200,
@@ -0,0 +1,159 @@
+"""
+Lambda function to issue a presigned S3 POST for uploading a user profile image directly from the browser.
+"""
+import os
+import json
+import base64
+import logging
+from botocore.exceptions import ClientError
+from utils.cors import add_cors_headers, build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.aws_clients import get_client
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.profile_images import (
+    IMAGE_EXTENSIONS, PROFILE_IMAGE_MAX_BYTES, PROFILE_IMAGE_UPLOAD_EXPIRES, build_upload_form, new_image_key
+)
+
+# Setup logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+def build_error_response(status_code, error_type, message, exception=None, request_origin=None):
+    """
+    Build a standardized error response
+    
+    Args:
+        status_code (int): HTTP status code
+        error_type (str): Type of error
+        message (str): Error message
+        exception: Optional exception object
+        request_origin (str): Origin header from the request
+        
+    Returns:
+        dict: API Gateway response with error details
+    """
+    response = {
+        'statusCode': status_code,
+        'body': json.dumps({
+            'error': error_type,
+            'message': message,
+            'exception': str(exception) if exception else None
+        }),
+        'headers': {
+            'Content-Type': 'application/json'
+        }
+    }
+    return add_cors_headers(response, request_origin)
+
+def handle_exception(exception, request_origin=None):
+    """
+    Handle exceptions and return appropriate responses
+    
+    Args:
+        exception: The exception to handle
+        request_origin (str): Origin header from the request
+        
+    Returns:
+        dict: API Gateway response with error details
+    """
+    if isinstance(exception, ClientError):
+        error_code = exception.response.get('Error', {}).get('Code', 'UnknownError')
+        
+        if error_code == 'ResourceNotFoundException':
+            return build_error_response(404, 'Not Found', str(exception), exception, request_origin)
+        elif error_code == 'ValidationException':
+            return build_error_response(400, 'Validation Error', str(exception), exception, request_origin)
+        elif error_code == 'AccessDeniedException':
+            return build_error_response(403, 'Access Denied', str(exception), exception, request_origin)
+        elif error_code == 'NoSuchKey':
+            return build_error_response(404, 'Not Found', 'Profile image not found', exception, request_origin)
+        else:
+            logger.error(f"AWS ClientError: {error_code} - {str(exception)}")
+            return build_error_response(500, 'AWS Error', str(exception), exception, request_origin)
+    else:
+        logger.error(f"Unexpected error: {str(exception)}")
+        return build_error_response(500, 'Internal Server Error', str(exception), exception, request_origin)
+
+@instrument_handler
+@compress_responses
+def lambda_handler(event, context):
+    """
+    Handle Lambda event for POST /users/profile-image/upload-url (Issues a presigned upload form)
+    
+    Args:
+        event (dict): Lambda event
+        context (LambdaContext): Lambda context
+        
+    Returns:
+        dict: API Gateway response
+    """
+    log_request(event, context)
+    
+    # Extract the Origin header for CORS handling
+    request_origin = event.get('headers', {}).get('Origin') or event.get('headers', {}).get('origin')
+    
+    # Check if this is an OPTIONS request and return early with just the headers
+    if event.get('httpMethod') == 'OPTIONS':
+        return build_cors_preflight_response(request_origin)
+    
+    try:
+        # The image always belongs to the caller, identified by the token's sub
+        claims = ((event.get('requestContext') or {}).get('authorizer') or {}).get('claims') or {}
+        user_sub = claims.get('sub')
+        if not user_sub:
+            logger.error("User sub not found in authorizer claims")
+            return build_error_response(401, 'Unauthorized', 'User identifier not found in request', None, request_origin)
+        
+        # Handle base64-encoded body
+        body = event.get('body') or '{}'
+        try:
+            if event.get('isBase64Encoded'):
+                body = base64.b64decode(body).decode('utf-8')
+            body = json.loads(body)
+        except ValueError as e:
+            return build_error_response(400, 'Validation Error', 'Request body must be valid JSON', e, request_origin)
+        
+        # Get S3 bucket name from environment variable
+        bucket_name = os.environ.get('DOCUMENTS_BUCKET')
+        if not bucket_name:
+            logger.error("Environment variable DOCUMENTS_BUCKET not set")
+            return build_error_response(500, 'Configuration Error', 'Document storage not configured', None, request_origin)
+        
+        content_type = str(body.get('contentType') or '').lower()
+        if content_type not in IMAGE_EXTENSIONS:
+            return build_error_response(400, 'Validation Error',
+                                        f"contentType must be one of: {', '.join(IMAGE_EXTENSIONS)}", None, request_origin)
+        
+        # The size is optional; S3 enforces the same limit through the POST policy
+        size = body.get('size')
+        if size is not None and (not isinstance(size, int) or not 0 < size <= PROFILE_IMAGE_MAX_BYTES):
+            return build_error_response(400, 'Validation Error',
+                                        f"size must be between 1 and {PROFILE_IMAGE_MAX_BYTES} bytes", None, request_origin)
+        
+        image_key = new_image_key(user_sub, content_type)
+        upload = build_upload_form(get_client('s3'), bucket_name, image_key, content_type)
+        
+        response = {
+            'statusCode': 200,
+            'body': json.dumps({
+                'success': True,
+                'imageKey': image_key,
+                'upload': {'url': upload['url'], 'fields': upload['fields']},
+                'maxBytes': PROFILE_IMAGE_MAX_BYTES,
+                'expiresIn': PROFILE_IMAGE_UPLOAD_EXPIRES
+            }),
+            'headers': {
+                'Content-Type': 'application/json'
+            }
+        }
+        
+        logger.info(f"Profile image upload form issued for user: {user_sub}")
+        return add_cors_headers(response, request_origin)
+    
+    except ClientError as ce:
+        logger.error(f"AWS ClientError issuing profile image upload form: {ce}")
+        return handle_exception(ce, request_origin)
+    except Exception as e:
+        logger.error(f"Unexpected error issuing profile image upload form: {e}", exc_info=True)
+        return handle_exception(e, request_origin)
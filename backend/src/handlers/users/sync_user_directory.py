@@ -0,0 +1,53 @@
+"""
+Lambda function to keep the user directory in step with Cognito sign-ups and sign-ins.
+
+Attached to the user pool as its PostConfirmation and PostAuthentication
+trigger. Confirmed self sign-ups are added to the directory in USER_DIRECTORY_TABLE
+and every sign-in refreshes the user's attributes, which picks up changes the
+user made themselves. The user handlers write their own changes; see
+utils.user_directory. Cognito fails the sign-in if a trigger raises, so
+directory errors are only logged.
+"""
+import logging
+
+from utils.metrics import instrument_handler
+from utils.user_directory import save_user, update_user_fields
+
+# Setup logging
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Trigger sources that add a newly confirmed user
+CONFIRMATION_TRIGGERS = ('PostConfirmation_ConfirmSignUp',)
+
+# Trigger sources that refresh an existing user
+AUTHENTICATION_TRIGGERS = ('PostAuthentication_Authentication', 'PostConfirmation_ConfirmForgotPassword')
+
+@instrument_handler
+def lambda_handler(event, context):
+    """
+    Handle a Cognito PostConfirmation or PostAuthentication trigger
+    
+    Args:
+        event (dict): Cognito trigger event
+        context (LambdaContext): Lambda context
+        
+    Returns:
+        dict: The event, unchanged, as Cognito requires
+    """
+    trigger_source = event.get('triggerSource')
+    username = event.get('userName')
+    attributes = (event.get('request') or {}).get('userAttributes') or {}
+
+    if trigger_source in CONFIRMATION_TRIGGERS:
+        save_user({
+            'Username': username,
+            'UserAttributes': [{'Name': name, 'Value': value} for name, value in attributes.items()],
+            'Enabled': True,
+            'UserStatus': 'CONFIRMED'
+        })
+    elif trigger_source in AUTHENTICATION_TRIGGERS:
+        update_user_fields(username, attributes)
+    else:
+        logger.info(f"Ignoring trigger {trigger_source} for {username}")
+    return event
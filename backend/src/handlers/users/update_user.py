@@ -5,11 +5,16 @@ This function provides admin functionality to update user attributes and status.
 """
 import os
 import json
-import boto3
 import logging
 import base64
 import re
 from botocore.exceptions import ClientError
+from utils.aws_clients import get_client
+from utils.cors import build_cors_preflight_response
+from utils.compression import compress_responses
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.user_directory import get_user, is_ready, save_user
 
 # Setup logging
 logger = logging.getLogger()
@@ -69,6 +74,8 @@ def handle_exception(exception):
 def is_email(value):
     return bool(re.match(r"[^@]+@[^@]+\.[^@]+", value))
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for PUT /users/{username} (Updates a user in Cognito)
@@ -80,7 +87,11 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
+    log_request(event, context)
+
+    # --- Handle CORS preflight (OPTIONS) requests ---
+    if event.get('httpMethod', '').upper() == 'OPTIONS':
+        return build_cors_preflight_response()
     
     try:
         # Parse the request body and get the username from path parameters
@@ -97,22 +108,6 @@ def lambda_handler(event, context):
         if not event.get('pathParameters') or not event['pathParameters'].get('userId'):
             return build_error_response(400, 'Bad Request', 'UserId path parameter is required')
         username = event['pathParameters']['userId']
-        # If username is not an email, look up the user in DynamoDB to get the email
-        if not is_email(username):
-            import boto3
-            dynamodb = boto3.resource('dynamodb')
-            users_table_name = os.environ.get('USERS_TABLE_NAME', 'UsersTable')
-            users_table = dynamodb.Table(users_table_name)
-            # Try to get user by id (assume id is username)
-            db_resp = users_table.get_item(Key={'id': username})
-            user_item = db_resp.get('Item')
-            if not user_item or not user_item.get('email'):
-                logger.error(f"Could not find user or email for username: {username}")
-                return build_error_response(404, 'Not Found', 'User not found or missing email in database')
-            cognito_username = user_item['email']
-            logger.info(f"Mapped username '{username}' to email '{cognito_username}' for Cognito operations.")
-        else:
-            cognito_username = username
         
         # Extract user pool ID from environment variable
         user_pool_id = os.environ.get('USER_POOL_ID')
@@ -121,7 +116,24 @@ def lambda_handler(event, context):
             return build_error_response(500, 'Configuration Error', 'User pool ID not configured.')
         
         # Initialize Cognito client
-        cognito = boto3.client('cognito-idp')
+        cognito = get_client('cognito-idp')
+        
+        # If username is not an email, look up the user in the directory to get the email,
+        # and ask Cognito when the directory is not filled yet or has no entry for it
+        cognito_username = username
+        if not is_email(username):
+            user_item = get_user(username) if is_ready() else None
+            if user_item and user_item.get('email'):
+                cognito_username = user_item['email']
+                logger.info(f"Mapped username '{username}' to email '{cognito_username}' for Cognito operations.")
+            else:
+                try:
+                    cognito_username = cognito.admin_get_user(UserPoolId=user_pool_id, Username=username)['Username']
+                except ClientError as e:
+                    if e.response.get('Error', {}).get('Code') != 'UserNotFoundException':
+                        raise
+                    logger.error(f"Could not find user in the directory or Cognito for username: {username}")
+                    return build_error_response(404, 'Not Found', 'User not found')
         
         # Prepare user attributes
         user_attributes = []
@@ -196,6 +208,7 @@ def lambda_handler(event, context):
         }
         
         user_result = cognito.admin_get_user(**get_user_params)
+        save_user(user_result)
         
         # Format the response
         attributes = {}
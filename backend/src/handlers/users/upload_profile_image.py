@@ -1,14 +1,24 @@
 # backend/src/handlers/users/upload_profile_image.py
 """
 Lambda function to upload a user profile image to S3 and update the user's profile.
+
+Kept for older clients that send the image as a base64 data URL. New clients
+upload straight to S3 through /users/profile-image/upload-url and
+/users/profile-image/confirm instead.
 """
 import os
 import json
-import boto3
 import base64
 import uuid
 import logging
 from botocore.exceptions import ClientError
+from utils.aws_clients import get_client
+from utils.compression import compress_responses
+from utils.request_logging import log_request
+from utils.metrics import instrument_handler
+from utils.profile_images import request_variants
+from utils.profile_image_cache import set_image_key
+from utils.user_directory import update_user_fields
 
 # Try to import CORS utilities, fallback to inline implementation if not available
 try:
@@ -98,6 +108,8 @@ def handle_exception(exception, request_origin=None):
         logger.error(f"Unexpected error: {str(exception)}")
         return build_error_response(500, 'Internal Server Error', str(exception), exception, request_origin)
 
+@instrument_handler
+@compress_responses
 def lambda_handler(event, context):
     """
     Handle Lambda event for POST /users/profile-image (Uploads a profile image)
@@ -109,8 +121,7 @@ def lambda_handler(event, context):
     Returns:
         dict: API Gateway response
     """
-    logger.info(f"Received event: {json.dumps(event)}")
-    logger.info(f"Event body: {event.get('body')}")
+    log_request(event, context)
     
     # Extract the Origin header for CORS handling
     request_origin = event.get('headers', {}).get('Origin') or event.get('headers', {}).get('origin')
@@ -152,7 +163,7 @@ def lambda_handler(event, context):
                 logger.error("Request body is empty")
                 return {'statusCode': 400, 'headers': cors_headers, 'body': json.dumps({'message': 'Request body is empty'})}
 
-            logger.info(f"Raw request body (first 200 chars): {request_body_str[:200]}")
+            logger.info("Request body: %d chars", len(request_body_str))
 
             if event.get('isBase64Encoded', False):
                 logger.info("Request body is base64 encoded by API Gateway. Decoding...")
@@ -161,12 +172,8 @@ def lambda_handler(event, context):
                     logger.info("Successfully decoded base64 body.")
                 except Exception as e:
                     logger.error(f"Failed to decode base64 body: {e}")
-                    original_body_snippet = event.get('body', '')[:100]
-                    logger.error(f"Original body snippet (first 100 chars): {original_body_snippet}")
                     return {'statusCode': 400, 'headers': cors_headers, 'body': json.dumps({'message': 'Failed to decode base64 request body', 'error': str(e)})}
             
-            logger.info(f"Request body for JSON parsing (first 200 chars): {request_body_str[:200]}")
-            
             body = json.loads(request_body_str)
             image_data_base64 = body.get('image')
             
@@ -210,7 +217,7 @@ def lambda_handler(event, context):
                 return {'statusCode': 500, 'headers': cors_headers, 'body': json.dumps({'message': 'Document storage not configured'})}
             
             # Initialize S3 client
-            s3 = boto3.client('s3')
+            s3 = get_client('s3')
             
             # Upload the image to S3
             logger.info(f"Uploading image to S3: {bucket_name}/{filename}")
@@ -235,7 +242,7 @@ def lambda_handler(event, context):
                 logger.error("Environment variable USER_POOL_ID not set")
                 return {'statusCode': 500, 'headers': cors_headers, 'body': json.dumps({'message': 'User pool ID not configured'})}
             
-            cognito = boto3.client('cognito-idp')
+            cognito = get_client('cognito-idp')
             
             # Update user attributes with the profile image URL
             # We'll use a custom attribute 'custom:profile_image' to store the image key
@@ -249,6 +256,11 @@ def lambda_handler(event, context):
                     }
                 ]
             )
+            # Readers look the user up by email; keep their cached key in step
+            claims = event['requestContext']['authorizer']['claims']
+            set_image_key([claims.get('email'), claims.get('cognito:username')], filename)
+            update_user_fields(user_sub, profileImage=filename)
+            request_variants(get_client('lambda'), bucket_name, filename)
             
             # Return success response with the image URL
             response = {
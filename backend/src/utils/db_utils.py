@@ -1,5 +1,8 @@
 # db_utils.py - Python utility stubs for appointment handler tests
 
+APPOINTMENT_ENTITY_TYPE = 'APPOINTMENT_ENTITY'
+APPOINTMENT_DATE_INDEX = 'AppointmentDateIndex'
+
 def create_item(table, item):
     # Stub: Simulate DynamoDB put_item
     return {"ResponseMetadata": {"HTTPStatusCode": 200}}
@@ -12,10 +15,28 @@ def get_item_by_id(table, item_id):
     # Stub: Simulate DynamoDB get_item
     return {"Item": {"id": item_id}}
 
+def batch_get_items(table, keys, **kwargs):
+    # Stub: Simulate DynamoDB batch_get_item
+    return []
+
 def scan_table(table, **kwargs):
     # Stub: Simulate DynamoDB scan
     return {"Items": []}
 
+def query_index(table, index_name, key_condition_expression, **kwargs):
+    # Stub: Simulate DynamoDB query on a GSI
+    return iter([])
+
+def fetch_page(table, limit, **kwargs):
+    # Stub: Simulate one page of a DynamoDB scan/query
+    return [], None
+
+def appointment_date_index_keys(appointment):
+    # Stub: Simulate AppointmentDateIndex key attributes
+    if not appointment.get('date'):
+        return {}
+    return {'entityType': APPOINTMENT_ENTITY_TYPE, 'appointmentDate': appointment['date']}
+
 def update_item(table, key, update_expr, expr_attr_vals):
     # Stub: Simulate DynamoDB update_item
     return {"Attributes": {}}
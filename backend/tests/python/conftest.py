@@ -0,0 +1,31 @@
+import sys
+import pytest
+
+# Module-global caches that live for a warm container and must not leak between tests
+_WARM_CACHES = (
+    ('utils.aws_clients', 'clear_cache'),
+    ('lambda_layer.python.utils.aws_clients', 'clear_cache'),
+    ('utils.services_cache', 'clear_services_cache'),
+    ('utils.profile_image_cache', 'clear_profile_image_cache'),
+    ('utils.user_directory', 'clear_user_directory_cache'),
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_warm_container_caches():
+    """Drop cached boto3 clients and service records so each test sees its own moto mock."""
+    def clear():
+        for module_name, function_name in _WARM_CACHES:
+            module = sys.modules.get(module_name)
+            if module is not None:
+                getattr(module, function_name)()
+
+    clear()
+    yield
+    clear()
+
+
+@pytest.fixture(autouse=True)
+def pagination_token_secret(monkeypatch):
+    """Sign continuation tokens as a deployed stack does; most fixtures set ENVIRONMENT=test."""
+    monkeypatch.setenv("PAGINATION_TOKEN_SECRET", "test-pagination-secret")
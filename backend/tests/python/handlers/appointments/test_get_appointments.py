@@ -38,7 +38,7 @@ class TestGetAppointmentsHandler:
     @patch('backend.src.handlers.appointments.get_appointments.scan_table')
     def test_get_appointments_no_params(self, mock_scan_table, lambda_environment):
         mock_scan_table.return_value = [{'id': 'appt1'}]
-        event = create_api_gateway_event()
+        event = create_api_gateway_event(queryStringParameters={'all': 'true'})
 
         response = lambda_handler(event, {})
 
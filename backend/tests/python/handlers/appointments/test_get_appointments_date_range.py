@@ -0,0 +1,176 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from backend.src.handlers.appointments.get_appointments import lambda_handler
+from backend.src.handlers.appointments.create_appointment import lambda_handler as create_handler
+from backend.src.handlers.appointments.update_appointment import lambda_handler as update_handler
+from utils import db_utils
+
+TEST_APPOINTMENTS_TABLE_NAME = "clinnet-appointments-test-date-range"
+
+
+def create_api_gateway_event(queryStringParameters=None, method="GET", path_params=None, body=None):
+    event = {
+        "httpMethod": method,
+        "pathParameters": path_params or {},
+        "queryStringParameters": queryStringParameters,
+        "headers": {"Origin": "http://localhost:5173"},
+        "requestContext": {
+            "requestId": "test-request-id-get-appointments-date-range",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+    if body is not None:
+        event["body"] = json.dumps(body)
+    return event
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def appointments_table(aws_credentials, monkeypatch):
+    monkeypatch.setenv("APPOINTMENTS_TABLE", TEST_APPOINTMENTS_TABLE_NAME)
+    monkeypatch.delenv("PATIENT_RECORDS_TABLE", raising=False)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_APPOINTMENTS_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "id", "AttributeType": "S"},
+                {"AttributeName": "entityType", "AttributeType": "S"},
+                {"AttributeName": "appointmentDate", "AttributeType": "S"},
+                {"AttributeName": "patientId", "AttributeType": "S"},
+                {"AttributeName": "doctorId", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "AppointmentDateIndex",
+                    "KeySchema": [
+                        {"AttributeName": "entityType", "KeyType": "HASH"},
+                        {"AttributeName": "appointmentDate", "KeyType": "RANGE"}
+                    ],
+                    "Projection": {"ProjectionType": "ALL"}
+                },
+                {
+                    "IndexName": "PatientIdIndex",
+                    "KeySchema": [{"AttributeName": "patientId", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"}
+                },
+                {
+                    "IndexName": "DoctorIdIndex",
+                    "KeySchema": [{"AttributeName": "doctorId", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"}
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        with table.batch_writer() as batch:
+            for day in range(1, 15):
+                date = f"2024-07-{day:02d}"
+                batch.put_item(Item={
+                    "id": f"a{day:02d}",
+                    "patientId": f"P{day % 2}",
+                    "doctorId": "D1" if day % 3 else "D2",
+                    "date": date,
+                    "status": "scheduled",
+                    **db_utils.appointment_date_index_keys({"date": date})
+                })
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+def record_dynamodb_calls():
+    calls = []
+
+    def _record(model, params, **kwargs):
+        calls.append((model.name, params.get("IndexName")))
+
+    db_utils.get_dynamodb_resource().meta.client.meta.events.register('before-parameter-build.dynamodb', _record)
+    return calls
+
+
+def ids(response):
+    assert response["statusCode"] == 200, response
+    return sorted(item["id"] for item in json.loads(response["body"])["items"])
+
+
+class TestGetAppointmentsDateRange:
+    def test_week_view_is_one_query_on_the_date_index(self, appointments_table):
+        calls = record_dynamodb_calls()
+
+        response = lambda_handler(create_api_gateway_event({"from": "2024-07-08", "to": "2024-07-14"}), {})
+
+        assert ids(response) == [f"a{day:02d}" for day in range(8, 15)]
+        assert calls == [("Query", "AppointmentDateIndex")]
+
+    @pytest.mark.parametrize("query_params, expected_days", [
+        ({"from": "2024-07-12"}, [12, 13, 14]),
+        ({"to": "2024-07-02"}, [1, 2]),
+        ({"from": "2024-07-05", "to": "2024-07-05"}, [5]),
+        ({"from": "2024-08-01", "to": "2024-08-31"}, [])
+    ])
+    def test_range_bounds_are_inclusive(self, appointments_table, query_params, expected_days):
+        response = lambda_handler(create_api_gateway_event(query_params), {})
+
+        assert ids(response) == [f"a{day:02d}" for day in expected_days]
+
+    def test_other_filters_apply_within_the_range(self, appointments_table):
+        calls = record_dynamodb_calls()
+
+        response = lambda_handler(create_api_gateway_event(
+            {"from": "2024-07-01", "to": "2024-07-14", "doctorId": "D2", "patientId": "P1"}), {})
+
+        assert ids(response) == ["a03", "a09"]
+        assert calls == [("Query", "AppointmentDateIndex")]
+
+    def test_single_date_uses_the_date_index(self, appointments_table):
+        calls = record_dynamodb_calls()
+
+        response = lambda_handler(create_api_gateway_event({"date": "2024-07-04"}), {})
+
+        assert ids(response) == ["a04"]
+        assert calls == [("Query", "AppointmentDateIndex")]
+
+    @pytest.mark.parametrize("query_params", [
+        {"from": "07/01/2024"},
+        {"to": "2024-13-01"},
+        {"from": "2024-07-10", "to": "2024-07-01"},
+        {"from": "2024-7-1"},
+        {"from": "2024-07-02", "to": "2024-7-10"}
+    ])
+    def test_invalid_ranges_return_400(self, appointments_table, query_params):
+        response = lambda_handler(create_api_gateway_event(query_params), {})
+
+        assert response["statusCode"] == 400
+
+    def test_created_and_rescheduled_appointments_are_indexed(self, appointments_table):
+        created = create_handler(create_api_gateway_event(method="POST", body={
+            "patientId": "P9", "doctorId": "D9", "date": "2024-09-01",
+            "startTime": "09:00", "endTime": "09:30", "type": "checkup"
+        }), {})
+        assert created["statusCode"] == 201
+        appointment_id = json.loads(created["body"])["id"]
+
+        september = {"from": "2024-09-01", "to": "2024-09-30"}
+        assert ids(lambda_handler(create_api_gateway_event(september), {})) == [appointment_id]
+
+        updated = update_handler(create_api_gateway_event(
+            method="PUT", path_params={"id": appointment_id}, body={"date": "2024-10-02"}), {})
+        assert updated["statusCode"] == 200
+
+        assert ids(lambda_handler(create_api_gateway_event(september), {})) == []
+        assert ids(lambda_handler(create_api_gateway_event({"from": "2024-10-01"}), {})) == [appointment_id]
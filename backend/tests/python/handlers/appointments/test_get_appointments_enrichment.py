@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from backend.src.handlers.appointments.get_appointments import lambda_handler
+from utils import db_utils
+
+TEST_APPOINTMENTS_TABLE_NAME = "clinnet-appointments-test"
+TEST_PATIENT_RECORDS_TABLE_NAME = "clinnet-patient-records-test"
+
+
+def create_api_gateway_event(queryStringParameters=None):
+    return {
+        "httpMethod": "GET",
+        "pathParameters": {},
+        "queryStringParameters": queryStringParameters,
+        "headers": {"Origin": "http://localhost:5173"},
+        "requestContext": {
+            "requestId": "test-request-id-get-appointments-enrichment",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def tables(aws_credentials, monkeypatch):
+    monkeypatch.setenv("APPOINTMENTS_TABLE", TEST_APPOINTMENTS_TABLE_NAME)
+    monkeypatch.setenv("PATIENT_RECORDS_TABLE", TEST_PATIENT_RECORDS_TABLE_NAME)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        appointments = dynamodb.create_table(
+            TableName=TEST_APPOINTMENTS_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        patients = dynamodb.create_table(
+            TableName=TEST_PATIENT_RECORDS_TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"}
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        yield appointments, patients
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+def count_dynamodb_calls():
+    counts = {}
+
+    def _count(model, **kwargs):
+        counts[model.name] = counts.get(model.name, 0) + 1
+
+    db_utils.get_dynamodb_resource().meta.client.meta.events.register('before-call.dynamodb', _count)
+    return counts
+
+
+class TestGetAppointmentsPatientEnrichment:
+    def test_names_are_joined_from_patient_records(self, tables):
+        appointments, patients = tables
+        patients.put_item(Item={"PK": "PATIENT#p1", "SK": "METADATA", "firstName": "Ada", "lastName": "Lovelace"})
+        patients.put_item(Item={"PK": "PATIENT#p2", "SK": "METADATA", "firstName": "", "lastName": ""})
+        appointments.put_item(Item={"id": "a1", "patientId": "p1"})
+        appointments.put_item(Item={"id": "a2", "patientId": "PATIENT#p1"})
+        appointments.put_item(Item={"id": "a3", "patientId": "p2"})
+        appointments.put_item(Item={"id": "a4", "patientId": "missing"})
+        appointments.put_item(Item={"id": "a5"})
+
+        response = lambda_handler(create_api_gateway_event({"all": "true"}), {})
+
+        assert response["statusCode"] == 200
+        names = {item["id"]: item["patientName"] for item in json.loads(response["body"])}
+        assert names == {
+            "a1": "Ada Lovelace",
+            "a2": "Ada Lovelace",
+            "a3": "Name N/A",
+            "a4": "Unknown Patient",
+            "a5": "No Patient ID"
+        }
+
+    def test_round_trips_scale_with_distinct_patients_not_appointments(self, tables):
+        appointments, patients = tables
+        with patients.batch_writer() as batch:
+            for p in range(150):
+                batch.put_item(Item={"PK": f"PATIENT#p{p}", "SK": "METADATA", "firstName": f"F{p}", "lastName": "L"})
+        with appointments.batch_writer() as batch:
+            for a in range(600):
+                batch.put_item(Item={"id": f"a{a}", "patientId": f"p{a % 150}"})
+        counts = count_dynamodb_calls()
+
+        response = lambda_handler(create_api_gateway_event({"all": "true"}), {})
+
+        assert response["statusCode"] == 200
+        body = json.loads(response["body"])
+        assert len(body) == 600
+        assert all(item["patientName"] != "Unknown Patient" for item in body)
+        assert counts.get("GetItem", 0) == 0
+        assert counts["BatchGetItem"] == 2
@@ -0,0 +1,116 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from backend.src.handlers.appointments.get_appointments import lambda_handler
+from utils import db_utils
+
+TEST_APPOINTMENTS_TABLE_NAME = "clinnet-appointments-test"
+
+SAMPLE_APPOINTMENTS = [
+    {"id": "f1", "patientId": "P1", "doctorId": "D1", "date": "2024-07-01", "status": "scheduled"},
+    {"id": "f2", "patientId": "P1", "doctorId": "D2", "date": "2024-07-01", "status": "confirmed"},
+    {"id": "f3", "patientId": "P2", "doctorId": "D1", "date": "2024-07-02", "status": "scheduled"},
+    {"id": "f4", "patientId": "P2", "doctorId": "D2", "date": "2024-07-02", "status": "cancelled"},
+    {"id": "f5", "patientId": "P1", "doctorId": "D1", "date": "2024-07-03", "status": "scheduled"}
+]
+
+
+def create_api_gateway_event(queryStringParameters=None):
+    return {
+        "httpMethod": "GET",
+        "pathParameters": {},
+        "queryStringParameters": queryStringParameters,
+        "headers": {"Origin": "http://localhost:5173"},
+        "requestContext": {
+            "requestId": "test-request-id-get-appointments-index",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def appointments_table(aws_credentials, monkeypatch):
+    monkeypatch.setenv("APPOINTMENTS_TABLE", TEST_APPOINTMENTS_TABLE_NAME)
+    monkeypatch.delenv("PATIENT_RECORDS_TABLE", raising=False)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_APPOINTMENTS_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "id", "AttributeType": "S"},
+                {"AttributeName": "patientId", "AttributeType": "S"},
+                {"AttributeName": "doctorId", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "PatientIdIndex",
+                    "KeySchema": [{"AttributeName": "patientId", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"}
+                },
+                {
+                    "IndexName": "DoctorIdIndex",
+                    "KeySchema": [{"AttributeName": "doctorId", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"}
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        for appt in SAMPLE_APPOINTMENTS:
+            table.put_item(Item=appt)
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+def record_dynamodb_calls():
+    calls = []
+
+    def _record(model, params, **kwargs):
+        calls.append((model.name, params.get("IndexName")))
+
+    db_utils.get_dynamodb_resource().meta.client.meta.events.register('before-parameter-build.dynamodb', _record)
+    return calls
+
+
+class TestGetAppointmentsIndexQueries:
+    @pytest.mark.parametrize("query_params, expected_index, expected_ids", [
+        ({"patientId": "P1"}, "PatientIdIndex", ["f1", "f2", "f5"]),
+        ({"patientId": "P3"}, "PatientIdIndex", []),
+        ({"doctorId": "D1"}, "DoctorIdIndex", ["f1", "f3", "f5"]),
+        ({"patientId": "P1", "date": "2024-07-01"}, "PatientIdIndex", ["f1", "f2"]),
+        ({"doctorId": "D2", "status": "cancelled"}, "DoctorIdIndex", ["f4"]),
+        ({"patientId": "P2", "doctorId": "D1"}, "PatientIdIndex", ["f3"])
+    ])
+    def test_indexed_filters_query_without_scanning(self, appointments_table, query_params, expected_index, expected_ids):
+        calls = record_dynamodb_calls()
+
+        response = lambda_handler(create_api_gateway_event(query_params), {})
+
+        assert response["statusCode"] == 200
+        assert sorted(item["id"] for item in json.loads(response["body"])["items"]) == expected_ids
+        assert [name for name, _ in calls if name == "Scan"] == []
+        assert ("Query", expected_index) in calls
+
+    def test_unindexed_filters_still_scan(self, appointments_table):
+        calls = record_dynamodb_calls()
+
+        response = lambda_handler(create_api_gateway_event({"status": "scheduled"}), {})
+
+        assert response["statusCode"] == 200
+        assert sorted(item["id"] for item in json.loads(response["body"])["items"]) == ["f1", "f3", "f5"]
+        assert [name for name, _ in calls] == ["Scan"]
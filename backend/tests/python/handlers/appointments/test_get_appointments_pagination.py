@@ -0,0 +1,131 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from backend.src.handlers.appointments.get_appointments import lambda_handler
+from utils import db_utils
+from utils.pagination import decode_next_token, encode_next_token
+
+TEST_APPOINTMENTS_TABLE_NAME = "clinnet-appointments-test-pagination"
+
+
+def create_api_gateway_event(queryStringParameters=None):
+    return {
+        "httpMethod": "GET",
+        "pathParameters": {},
+        "queryStringParameters": queryStringParameters,
+        "headers": {"Origin": "http://localhost:5173"},
+        "requestContext": {
+            "requestId": "test-request-id-get-appointments-pagination",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def appointments_table(aws_credentials, monkeypatch):
+    monkeypatch.setenv("APPOINTMENTS_TABLE", TEST_APPOINTMENTS_TABLE_NAME)
+    monkeypatch.delenv("PATIENT_RECORDS_TABLE", raising=False)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_APPOINTMENTS_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "id", "AttributeType": "S"},
+                {"AttributeName": "patientId", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "PatientIdIndex",
+                    "KeySchema": [{"AttributeName": "patientId", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"}
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        with table.batch_writer() as batch:
+            for i in range(30):
+                batch.put_item(Item={
+                    "id": f"a{i:02d}",
+                    "patientId": f"P{i % 3}",
+                    "doctorId": "D1",
+                    "date": "2024-07-01",
+                    "status": "scheduled" if i % 2 else "cancelled",
+                    "notes": "Follow-up visit to review lab results and adjust medication. " * 3
+                })
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+def collect_pages(query_params, page_size):
+    seen = []
+    params = dict(query_params, limit=str(page_size))
+    for _ in range(50):
+        response = lambda_handler(create_api_gateway_event(params), {})
+        assert response["statusCode"] == 200
+        body = json.loads(response["body"])
+        assert len(body["items"]) <= page_size
+        seen.extend(body["items"])
+        if not body["nextToken"]:
+            return seen
+        params = dict(query_params, limit=str(page_size), nextToken=body["nextToken"])
+    raise AssertionError("pagination did not terminate")
+
+
+class TestGetAppointmentsPagination:
+    def test_scan_pages_round_trip_every_appointment(self, appointments_table):
+        items = collect_pages({}, 7)
+
+        assert sorted(item["id"] for item in items) == [f"a{i:02d}" for i in range(30)]
+
+    def test_index_pages_round_trip_with_filter(self, appointments_table):
+        items = collect_pages({"patientId": "P1", "status": "scheduled"}, 2)
+
+        expected = [f"a{i:02d}" for i in range(30) if i % 3 == 1 and i % 2]
+        assert sorted(item["id"] for item in items) == expected
+
+    def test_token_is_scoped_to_the_access_path(self, appointments_table):
+        first = lambda_handler(create_api_gateway_event({"patientId": "P1", "limit": "2"}), {})
+        token = json.loads(first["body"])["nextToken"]
+
+        assert decode_next_token(token, "appointments:PatientIdIndex")
+        response = lambda_handler(create_api_gateway_event({"limit": "2", "nextToken": token}), {})
+        assert response["statusCode"] == 400
+
+    def test_billing_tokens_are_rejected(self, appointments_table):
+        token = encode_next_token({"id": "b1"}, "billing")
+
+        response = lambda_handler(create_api_gateway_event({"nextToken": token}), {})
+
+        assert response["statusCode"] == 400
+
+    def test_projection_reduces_response_bytes(self, appointments_table):
+        full = lambda_handler(create_api_gateway_event({"limit": "30"}), {})
+        projected = lambda_handler(create_api_gateway_event({"limit": "30", "fields": "date,status"}), {})
+
+        items = json.loads(projected["body"])["items"]
+        assert len(items) == 30
+        assert all(set(item) == {"id", "patientId", "date", "status"} for item in items)
+        assert len(projected["body"]) < len(full["body"]) / 2
+
+    def test_all_flag_returns_legacy_bare_list(self, appointments_table):
+        response = lambda_handler(create_api_gateway_event({"all": "true"}), {})
+
+        body = json.loads(response["body"])
+        assert isinstance(body, list)
+        assert len(body) == 30
@@ -0,0 +1,187 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from decimal import Decimal
+from moto import mock_aws
+from backend.src.handlers.billing.create_billing import lambda_handler
+from utils import db_utils, services_cache
+
+TEST_BILLING_TABLE_NAME = "clinnet-billing-test-create"
+TEST_SERVICES_TABLE_NAME = "clinnet-services-test-create-billing"
+TEST_VERSIONS_TABLE_NAME = "clinnet-catalogue-versions-test-create-billing"
+
+SERVICES = [
+    {"id": f"svc{i:03d}", "name": f"Service {i}", "price": Decimal("12.50") + i}
+    for i in range(120)
+]
+
+
+def create_api_gateway_event(body):
+    return {
+        "httpMethod": "POST",
+        "headers": {"Origin": "http://localhost:5173"},
+        "body": json.dumps(body),
+        "requestContext": {
+            "requestId": "test-request-id-create-billing",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+
+
+def invoice(service_ids, **extra):
+    body = {
+        "patientId": "P1",
+        "paymentMethod": "card",
+        "items": [{"serviceId": service_id, "quantity": 2} for service_id in service_ids]
+    }
+    body.update(extra)
+    return body
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def billing_tables(aws_credentials, monkeypatch):
+    monkeypatch.setenv("BILLING_TABLE", TEST_BILLING_TABLE_NAME)
+    monkeypatch.setenv("SERVICES_TABLE", TEST_SERVICES_TABLE_NAME)
+    monkeypatch.setenv("CATALOGUE_VERSIONS_TABLE", TEST_VERSIONS_TABLE_NAME)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        tables = {}
+        for name in (TEST_BILLING_TABLE_NAME, TEST_SERVICES_TABLE_NAME, TEST_VERSIONS_TABLE_NAME):
+            tables[name] = dynamodb.create_table(
+                TableName=name,
+                KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST"
+            )
+        with tables[TEST_SERVICES_TABLE_NAME].batch_writer() as batch:
+            for service in SERVICES:
+                batch.put_item(Item=service)
+        yield tables
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+def count_calls():
+    counts = {}
+
+    def _count(model, **kwargs):
+        counts[model.name] = counts.get(model.name, 0) + 1
+
+    db_utils.get_dynamodb_resource().meta.client.meta.events.register('before-call.dynamodb', _count)
+    return counts
+
+
+class TestCreateBilling:
+    def test_prices_every_line_with_one_batch_get(self, billing_tables):
+        counts = count_calls()
+        service_ids = [f"svc{i:03d}" for i in range(40)]
+
+        response = lambda_handler(create_api_gateway_event(invoice(service_ids)), {})
+
+        assert response["statusCode"] == 201
+        body = json.loads(response["body"])
+        assert len(body["items"]) == 40
+        assert body["items"][3] == {
+            "serviceId": "svc003", "serviceName": "Service 3", "quantity": 2, "unitPrice": 15.5, "total": 31
+        }
+        assert body["subtotal"] == sum((12.5 + i) * 2 for i in range(40))
+        assert counts.get("BatchGetItem") == 1
+        assert counts.get("GetItem") == 1  # the catalogue version check
+
+    def test_more_than_100_services_are_chunked(self, billing_tables):
+        counts = count_calls()
+
+        response = lambda_handler(create_api_gateway_event(invoice([s["id"] for s in SERVICES])), {})
+
+        assert response["statusCode"] == 201
+        assert counts.get("BatchGetItem") == 2
+
+    def test_duplicate_services_are_fetched_once(self, billing_tables, monkeypatch):
+        requested = []
+        original = services_cache.batch_get_items
+
+        def recording_batch_get(table_name, keys, **kwargs):
+            requested.extend(key["id"] for key in keys)
+            return original(table_name, keys, **kwargs)
+
+        monkeypatch.setattr(services_cache, "batch_get_items", recording_batch_get)
+
+        response = lambda_handler(create_api_gateway_event(invoice(["svc001", "svc002", "svc001"])), {})
+
+        assert response["statusCode"] == 201
+        assert requested == ["svc001", "svc002"]
+
+    def test_all_missing_services_are_reported_together(self, billing_tables):
+        response = lambda_handler(create_api_gateway_event(invoice(["svc001", "nope-1", "svc002", "nope-2"])), {})
+
+        assert response["statusCode"] == 404
+        assert json.loads(response["body"])["message"] == "Services not found: nope-1, nope-2"
+        assert billing_tables[TEST_BILLING_TABLE_NAME].scan()["Count"] == 0
+
+    def test_warm_cache_skips_the_lookup(self, billing_tables):
+        service_ids = [f"svc{i:03d}" for i in range(10)]
+        lambda_handler(create_api_gateway_event(invoice(service_ids)), {})
+        counts = count_calls()
+
+        response = lambda_handler(create_api_gateway_event(invoice(service_ids)), {})
+
+        assert response["statusCode"] == 201
+        assert "BatchGetItem" not in counts
+
+    def test_decimal_quantities_and_tax_combine_with_stored_prices(self, billing_tables):
+        body = invoice(["svc000"], tax=1.25, discount=0.5)
+        body["items"][0]["quantity"] = 1.5
+
+        response = lambda_handler(create_api_gateway_event(body), {})
+
+        assert response["statusCode"] == 201
+        created = json.loads(response["body"])
+        assert created["subtotal"] == 18.75
+        assert created["total"] == 19.5
+        stored = billing_tables[TEST_BILLING_TABLE_NAME].get_item(Key={"id": created["id"]})["Item"]
+        assert stored["total"] == Decimal("19.50")
+
+    def test_non_string_service_id_is_rejected(self, billing_tables):
+        response = lambda_handler(create_api_gateway_event(invoice([42])), {})
+
+        assert response["statusCode"] == 400
+
+
+class TestServicesCache:
+    def test_expired_entries_are_refetched(self, billing_tables):
+        services_cache.get_services_by_ids(TEST_SERVICES_TABLE_NAME, ["svc001"], ttl_seconds=0)
+        counts = count_calls()
+
+        services_cache.get_services_by_ids(TEST_SERVICES_TABLE_NAME, ["svc001"], ttl_seconds=0)
+
+        assert counts.get("BatchGetItem") == 1
+
+    def test_version_change_invalidates_cached_prices(self, billing_tables):
+        assert services_cache.get_services_by_ids(TEST_SERVICES_TABLE_NAME, ["svc001"], version=1)["svc001"]["price"] == Decimal("13.5")
+        billing_tables[TEST_SERVICES_TABLE_NAME].update_item(
+            Key={"id": "svc001"}, UpdateExpression="SET price = :p", ExpressionAttributeValues={":p": Decimal("99")})
+
+        cached = services_cache.get_services_by_ids(TEST_SERVICES_TABLE_NAME, ["svc001"], version=1)
+        refreshed = services_cache.get_services_by_ids(TEST_SERVICES_TABLE_NAME, ["svc001"], version=2)
+
+        assert cached["svc001"]["price"] == Decimal("13.5")
+        assert refreshed["svc001"]["price"] == Decimal("99")
+
+    def test_missing_services_are_not_cached(self, billing_tables):
+        assert services_cache.get_services_by_ids(TEST_SERVICES_TABLE_NAME, ["new"]) == {}
+        billing_tables[TEST_SERVICES_TABLE_NAME].put_item(Item={"id": "new", "name": "New", "price": 5})
+
+        assert services_cache.get_services_by_ids(TEST_SERVICES_TABLE_NAME, ["new"])["new"]["price"] == 5
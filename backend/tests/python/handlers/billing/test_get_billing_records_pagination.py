@@ -0,0 +1,107 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from backend.src.handlers.billing.get_billing_records import lambda_handler
+from utils import db_utils
+from utils.pagination import encode_next_token
+
+TEST_BILLING_TABLE_NAME = "clinnet-billing-test-pagination"
+
+
+def create_api_gateway_event(queryStringParameters=None):
+    return {
+        "httpMethod": "GET",
+        "pathParameters": {},
+        "queryStringParameters": queryStringParameters,
+        "headers": {"Origin": "http://localhost:5173"},
+        "requestContext": {
+            "requestId": "test-request-id-get-billing-pagination",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def billing_table(aws_credentials, monkeypatch):
+    monkeypatch.setenv("BILLING_TABLE", TEST_BILLING_TABLE_NAME)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_BILLING_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        with table.batch_writer() as batch:
+            for i in range(25):
+                batch.put_item(Item={
+                    "id": f"b{i:02d}",
+                    "patientId": f"P{i % 5}",
+                    "paymentStatus": "paid" if i % 2 else "pending",
+                    "total": i * 10,
+                    "items": [{"serviceId": f"s{j}", "description": "Consultation and follow-up", "price": 50} for j in range(3)]
+                })
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+class TestGetBillingRecordsPagination:
+    def test_pages_round_trip_every_record(self, billing_table):
+        seen = []
+        params = {"limit": "4"}
+        for _ in range(20):
+            response = lambda_handler(create_api_gateway_event(params), {})
+            assert response["statusCode"] == 200
+            body = json.loads(response["body"])
+            assert len(body["items"]) <= 4
+            seen.extend(item["id"] for item in body["items"])
+            if not body["nextToken"]:
+                break
+            params = {"limit": "4", "nextToken": body["nextToken"]}
+
+        assert sorted(seen) == [f"b{i:02d}" for i in range(25)]
+
+    def test_filtered_pages_are_full(self, billing_table):
+        response = lambda_handler(create_api_gateway_event({"paymentStatus": "paid", "limit": "5"}), {})
+
+        body = json.loads(response["body"])
+        assert len(body["items"]) == 5
+        assert all(item["paymentStatus"] == "paid" for item in body["items"])
+
+    def test_projection_reduces_response_bytes(self, billing_table):
+        full = lambda_handler(create_api_gateway_event({"limit": "25"}), {})
+        projected = lambda_handler(create_api_gateway_event({"limit": "25", "fields": "total,paymentStatus"}), {})
+
+        items = json.loads(projected["body"])["items"]
+        assert all(set(item) == {"id", "total", "paymentStatus"} for item in items)
+        assert len(projected["body"]) < len(full["body"]) / 2
+
+    def test_patient_tokens_are_rejected(self, billing_table):
+        token = encode_next_token({"PK": "PATIENT#1", "SK": "METADATA"}, "patients")
+
+        response = lambda_handler(create_api_gateway_event({"nextToken": token}), {})
+
+        assert response["statusCode"] == 400
+        assert response["headers"]["Access-Control-Allow-Origin"] == "http://localhost:5173"
+
+    def test_all_flag_returns_legacy_bare_list(self, billing_table):
+        response = lambda_handler(create_api_gateway_event({"all": "true"}), {})
+
+        body = json.loads(response["body"])
+        assert isinstance(body, list)
+        assert len(body) == 25
@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from backend.src.handlers.diagnostics.check_dynamodb_crud import lambda_handler
+from utils import db_utils
+
+TEST_PATIENT_RECORDS_TABLE = "clinnet-patient-records-test-diag-scan"
+TEST_SERVICES_TABLE = "clinnet-services-test-diag-scan"
+TEST_APPOINTMENTS_TABLE = "clinnet-appointments-test-diag-scan"
+
+
+def create_api_gateway_event(service_name, query_params=None):
+    return {
+        "httpMethod": "GET",
+        "pathParameters": {"serviceName": service_name},
+        "queryStringParameters": query_params,
+        "requestContext": {
+            "requestId": "test-request-id-check-dynamodb-scan",
+            "authorizer": {"claims": {"cognito:username": "testadmin"}}
+        }
+    }
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def services_table(aws_credentials, monkeypatch):
+    monkeypatch.setenv("PATIENT_RECORDS_TABLE", TEST_PATIENT_RECORDS_TABLE)
+    monkeypatch.setenv("SERVICES_TABLE", TEST_SERVICES_TABLE)
+    monkeypatch.setenv("APPOINTMENTS_TABLE", TEST_APPOINTMENTS_TABLE)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_SERVICES_TABLE,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        with table.batch_writer() as batch:
+            for i in range(30):
+                batch.put_item(Item={"id": f"svc-{i}", "name": f"Service {i}"})
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+class TestCheckDynamoDBCrudScan:
+    def test_scan_is_opt_in(self, services_table):
+        response = lambda_handler(create_api_gateway_event("services"), {})
+
+        assert response["statusCode"] == 200
+        assert "scan" not in json.loads(response["body"])
+
+    def test_scan_counts_items_with_requested_segments(self, services_table):
+        response = lambda_handler(create_api_gateway_event("services", {"scan": "true", "segments": "8"}), {})
+
+        assert response["statusCode"] == 200
+        body = json.loads(response["body"])
+        assert body["create"] == "OK"
+        assert body["scan"]["itemCount"] == 30
+        assert body["scan"]["segments"] == 8
+        assert body["scan"]["throttles"] == 0
+
+    @pytest.mark.parametrize("segments", ["0", "99", "abc"])
+    def test_invalid_segments_are_rejected(self, services_table, segments):
+        response = lambda_handler(create_api_gateway_event("services", {"scan": "true", "segments": segments}), {})
+
+        assert response["statusCode"] == 400
+        assert "segments must" in json.loads(response["body"])["error"]
+        # Rejected before the CRUD check wrote anything
+        assert services_table.scan(Select="COUNT")["Count"] == 30
+
+    def test_segments_are_ignored_without_scan(self, services_table):
+        response = lambda_handler(create_api_gateway_event("services", {"segments": "abc"}), {})
+
+        assert response["statusCode"] == 200
+        assert "scan" not in json.loads(response["body"])
@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import io
+
+import boto3
+import pytest
+from moto import mock_aws
+
+Image = pytest.importorskip("PIL.Image")
+
+from backend.src.handlers.images import process_profile_image
+from utils import profile_images
+
+TEST_BUCKET_NAME = "clinnet-documents-test-thumbnails"
+ORIGINAL_KEY = "profile-images/sub-123/0b6f3c1e.png"
+
+
+def encode(image, image_format):
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def s3(aws_credentials):
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=TEST_BUCKET_NAME)
+        yield client
+
+
+class TestRenderVariants:
+    def test_every_size_and_format_is_a_square_of_that_size(self):
+        variants = process_profile_image.render_variants(encode(Image.new("RGB", (1600, 900), "navy"), "JPEG"))
+
+        assert set(variants) == {(size, image_format) for size in profile_images.VARIANT_SIZES
+                                 for image_format in profile_images.VARIANT_FORMATS}
+        for (size, image_format), data in variants.items():
+            rendered = Image.open(io.BytesIO(data))
+            assert rendered.size == (size, size)
+            assert rendered.format == {"webp": "WEBP", "jpeg": "JPEG"}[image_format]
+
+    def test_transparent_images_keep_alpha_in_webp_and_are_flattened_in_jpeg(self):
+        variants = process_profile_image.render_variants(encode(Image.new("RGBA", (300, 300), (255, 0, 0, 0)), "PNG"))
+
+        assert Image.open(io.BytesIO(variants[(64, "webp")])).mode == "RGBA"
+        flattened = Image.open(io.BytesIO(variants[(64, "jpeg")])).convert("RGB")
+        assert flattened.getpixel((32, 32)) == (255, 255, 255)
+
+    def test_palette_images_are_converted(self):
+        data = encode(Image.new("RGB", (200, 120), "green").convert("P"), "GIF")
+
+        variants = process_profile_image.render_variants(data)
+
+        assert Image.open(io.BytesIO(variants[(128, "jpeg")])).size == (128, 128)
+
+    def test_thumbnails_are_much_smaller_than_the_original(self):
+        noise = Image.effect_noise((2000, 2000), 64).convert("RGB")
+        original = encode(noise, "PNG")
+
+        variants = process_profile_image.render_variants(original)
+
+        assert len(variants[(64, "webp")]) * 100 < len(original)
+
+
+class TestLambdaHandler:
+    def test_writes_thumbnails_under_predictable_keys(self, s3):
+        s3.put_object(Bucket=TEST_BUCKET_NAME, Key=ORIGINAL_KEY,
+                      Body=encode(Image.new("RGB", (800, 600), "teal"), "PNG"), ContentType="image/png")
+
+        result = process_profile_image.lambda_handler({"bucket": TEST_BUCKET_NAME, "key": ORIGINAL_KEY}, None)
+
+        assert sorted(result["processed"][ORIGINAL_KEY]) == sorted(profile_images.variant_keys(ORIGINAL_KEY))
+        head = s3.head_object(Bucket=TEST_BUCKET_NAME, Key="profile-images/sub-123/0b6f3c1e/128.webp")
+        assert head["ContentType"] == "image/webp"
+        assert "immutable" in head["CacheControl"]
+
+    def test_s3_events_are_accepted_and_thumbnails_are_skipped(self, s3):
+        s3.put_object(Bucket=TEST_BUCKET_NAME, Key=ORIGINAL_KEY,
+                      Body=encode(Image.new("RGB", (100, 100), "teal"), "PNG"))
+        thumbnail_key = profile_images.variant_key(ORIGINAL_KEY, 64)
+        event = {"Records": [
+            {"s3": {"bucket": {"name": TEST_BUCKET_NAME}, "object": {"key": ORIGINAL_KEY}}},
+            {"s3": {"bucket": {"name": TEST_BUCKET_NAME}, "object": {"key": thumbnail_key}}},
+        ]}
+
+        result = process_profile_image.lambda_handler(event, None)
+
+        assert list(result["processed"]) == [ORIGINAL_KEY]
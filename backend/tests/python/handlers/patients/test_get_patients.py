@@ -9,10 +9,11 @@ from backend.src.handlers.patients.get_patients import lambda_handler # Adjusted
 TEST_PATIENT_RECORDS_TABLE_NAME = "clinnet-patient-records-test"
 
 # Helper function to create a mock API Gateway event
-def create_api_gateway_event(method="GET", path_params=None, body=None):
+def create_api_gateway_event(method="GET", path_params=None, body=None, query_params=None):
     event = {
         "httpMethod": method,
         "pathParameters": path_params if path_params else {},
+        "queryStringParameters": query_params,
         "requestContext": {
             "requestId": "test-request-id-get-patients",
             "authorizer": {"claims": {"cognito:username": "testuser"}} 
@@ -65,7 +66,7 @@ def lambda_environment(monkeypatch):
 
 class TestGetPatients:
     def test_get_patients_empty_table(self, patient_records_table, lambda_environment):
-        event = create_api_gateway_event()
+        event = create_api_gateway_event(query_params={"all": "true"})
         context = {} 
 
         response = lambda_handler(event, context)
@@ -102,7 +103,7 @@ class TestGetPatients:
         })
 
 
-        event = create_api_gateway_event()
+        event = create_api_gateway_event(query_params={"all": "true"})
         context = {}
 
         response = lambda_handler(event, context)
@@ -0,0 +1,159 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import base64
+import gzip
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from backend.src.handlers.patients.get_patients import lambda_handler
+from utils import db_utils
+from utils.pagination import encode_next_token
+
+TEST_PATIENT_RECORDS_TABLE_NAME = "clinnet-patient-records-test-pagination"
+
+
+def create_api_gateway_event(query_params=None):
+    return {
+        "httpMethod": "GET",
+        "pathParameters": {},
+        "queryStringParameters": query_params,
+        "headers": {"Origin": "http://localhost:5173"},
+        "requestContext": {
+            "requestId": "test-request-id-get-patients-pagination",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def patient_records_table(aws_credentials, monkeypatch):
+    monkeypatch.setenv("PATIENT_RECORDS_TABLE", TEST_PATIENT_RECORDS_TABLE_NAME)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_PATIENT_RECORDS_TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"}
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"},
+                {"AttributeName": "type", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "type-index",
+                    "KeySchema": [{"AttributeName": "type", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"}
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        with table.batch_writer() as batch:
+            for i in range(12):
+                batch.put_item(Item={
+                    "PK": f"PATIENT#p{i:02d}",
+                    "SK": "METADATA",
+                    "id": f"p{i:02d}",
+                    "type": "patient",
+                    "firstName": f"First{i}",
+                    "lastName": "Last",
+                    "address": "1 Long Street, Somewhere" * 4
+                })
+            batch.put_item(Item={"PK": "SERVICE#s1", "SK": "METADATA", "type": "service"})
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+class TestGetPatientsPagination:
+    def test_pages_cover_every_patient_exactly_once(self, patient_records_table):
+        seen = []
+        params = {"limit": "5"}
+        for _ in range(10):
+            response = lambda_handler(create_api_gateway_event(params), {})
+            assert response["statusCode"] == 200
+            body = json.loads(response["body"])
+            assert len(body["items"]) <= 5
+            seen.extend(item["id"] for item in body["items"])
+            if not body["nextToken"]:
+                break
+            params = {"limit": "5", "nextToken": body["nextToken"]}
+
+        assert sorted(seen) == [f"p{i:02d}" for i in range(12)]
+
+    def test_default_page_is_an_envelope(self, patient_records_table):
+        response = lambda_handler(create_api_gateway_event(), {})
+
+        body = json.loads(response["body"])
+        assert len(body["items"]) == 12
+        assert body["nextToken"] is None
+
+    def test_fields_projection_keeps_keys_and_shrinks_body(self, patient_records_table):
+        full = lambda_handler(create_api_gateway_event({"limit": "12"}), {})
+        projected = lambda_handler(create_api_gateway_event({"limit": "12", "fields": "firstName"}), {})
+
+        items = json.loads(projected["body"])["items"]
+        assert all(set(item) == {"PK", "SK", "id", "firstName"} for item in items)
+        assert len(projected["body"]) < len(full["body"]) / 2
+
+    def test_all_flag_returns_legacy_bare_list(self, patient_records_table):
+        response = lambda_handler(create_api_gateway_event({"all": "true", "limit": "1"}), {})
+
+        body = json.loads(response["body"])
+        assert isinstance(body, list)
+        assert len(body) == 12
+
+    @pytest.mark.parametrize("query_params", [
+        {"limit": "0"},
+        {"limit": "many"},
+        {"nextToken": "not-a-token"},
+        {"nextToken": encode_next_token({"id": "a1"}, "appointments")},
+        {"fields": "first name"}
+    ])
+    def test_invalid_parameters_return_400(self, patient_records_table, query_params):
+        response = lambda_handler(create_api_gateway_event(query_params), {})
+
+        assert response["statusCode"] == 400
+        assert json.loads(response["body"])["error"] == "Bad Request"
+        assert response["headers"]["Access-Control-Allow-Origin"] == "http://localhost:5173"
+
+    def test_unchanged_page_returns_304_until_a_patient_changes(self, patient_records_table):
+        first = lambda_handler(create_api_gateway_event({"limit": "5"}), {})
+        revalidate = create_api_gateway_event({"limit": "5"})
+        revalidate["headers"]["If-None-Match"] = first["headers"]["ETag"]
+
+        not_modified = lambda_handler(revalidate, {})
+        patient_records_table.update_item(Key={"PK": "PATIENT#p00", "SK": "METADATA"},
+                                          UpdateExpression="SET firstName = :n", ExpressionAttributeValues={":n": "Renamed"})
+        changed = lambda_handler(revalidate, {})
+
+        assert not_modified["statusCode"] == 304
+        assert not_modified["body"] == ""
+        assert changed["statusCode"] == 200
+        assert changed["headers"]["ETag"] != first["headers"]["ETag"]
+
+    def test_gzip_is_negotiated_for_large_pages(self, patient_records_table):
+        plain = lambda_handler(create_api_gateway_event({"limit": "12"}), {})
+        event = create_api_gateway_event({"limit": "12"})
+        event["headers"]["Accept"] = "application/json"
+        event["headers"]["Accept-Encoding"] = "gzip, deflate"
+
+        response = lambda_handler(event, {})
+
+        assert response["isBase64Encoded"] is True
+        assert response["headers"]["Content-Encoding"] == "gzip"
+        assert gzip.decompress(base64.b64decode(response["body"])).decode("utf-8") == plain["body"]
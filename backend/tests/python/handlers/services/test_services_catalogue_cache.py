@@ -0,0 +1,165 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from decimal import Decimal
+from moto import mock_aws
+from backend.src.handlers.services import create_service, delete_service, get_services, update_service
+from backend.src.handlers.billing import create_billing
+from utils import db_utils, services_cache
+
+TEST_SERVICES_TABLE_NAME = "clinnet-services-test-catalogue"
+TEST_BILLING_TABLE_NAME = "clinnet-billing-test-catalogue"
+TEST_VERSIONS_TABLE_NAME = "clinnet-catalogue-versions-test-catalogue"
+
+
+def api_event(method, path_params=None, body=None, query=None):
+    return {
+        "httpMethod": method,
+        "headers": {"Origin": "http://localhost:5173"},
+        "pathParameters": path_params or {},
+        "queryStringParameters": query,
+        "body": json.dumps(body) if body is not None else None,
+        "requestContext": {
+            "requestId": "test-request-id-catalogue",
+            "authorizer": {"claims": {"cognito:username": "testuser"}}
+        }
+    }
+
+
+def list_services():
+    response = get_services.lambda_handler(api_event("GET"), {})
+    assert response["statusCode"] == 200
+    return {service["id"]: service for service in json.loads(response["body"])}
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def services_table(aws_credentials, monkeypatch):
+    monkeypatch.setenv("SERVICES_TABLE", TEST_SERVICES_TABLE_NAME)
+    monkeypatch.setenv("BILLING_TABLE", TEST_BILLING_TABLE_NAME)
+    monkeypatch.setenv("CATALOGUE_VERSIONS_TABLE", TEST_VERSIONS_TABLE_NAME)
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        tables = [
+            dynamodb.create_table(
+                TableName=name,
+                KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST"
+            )
+            for name in (TEST_SERVICES_TABLE_NAME, TEST_BILLING_TABLE_NAME, TEST_VERSIONS_TABLE_NAME)
+        ]
+        tables[0].put_item(Item={"id": "svc1", "name": "Consultation", "price": Decimal("100"),
+                                 "description": "General", "duration": 30, "active": True})
+        tables[0].put_item(Item={"id": "svc2", "name": "X-Ray", "price": Decimal("150"),
+                                 "description": "Imaging", "duration": 15, "active": True})
+        yield tables[0]
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+def count_calls():
+    counts = {}
+
+    def _count(model, **kwargs):
+        counts[model.name] = counts.get(model.name, 0) + 1
+
+    db_utils.get_dynamodb_resource().meta.client.meta.events.register('before-call.dynamodb', _count)
+    return counts
+
+
+class TestServicesCatalogueCache:
+    def test_warm_read_is_one_version_check(self, services_table):
+        list_services()
+        counts = count_calls()
+
+        services = list_services()
+
+        assert set(services) == {"svc1", "svc2"}
+        assert counts == {"GetItem": 1}
+        assert services_cache.get_cache_stats() == {"hits": 1, "misses": 1, "version_checks": 2}
+
+    def test_update_is_visible_on_next_read(self, services_table):
+        assert list_services()["svc1"]["price"] == 100
+
+        response = update_service.lambda_handler(api_event("PUT", {"id": "svc1"}, {"price": 120}), {})
+
+        assert response["statusCode"] == 200
+        assert list_services()["svc1"]["price"] == 120
+
+    def test_create_and_delete_are_visible_on_next_read(self, services_table):
+        list_services()
+
+        created = create_service.lambda_handler(api_event("POST", body={
+            "name": "Blood test", "description": "Panel", "price": 40, "duration": 10}), {})
+        new_id = json.loads(created["body"])["id"]
+        assert new_id in list_services()
+
+        delete_service.lambda_handler(api_event("DELETE", {"id": "svc2"}), {})
+        assert set(list_services()) == {"svc1", new_id}
+
+    def test_write_from_another_container_stops_stale_reads(self, services_table):
+        list_services()
+        # Another container changes the table and bumps the version; this
+        # container's cached copy is left untouched
+        services_table.update_item(Key={"id": "svc1"}, UpdateExpression="SET price = :p",
+                                   ExpressionAttributeValues={":p": Decimal("80")})
+        versions_table = boto3.resource("dynamodb", region_name="us-east-1").Table(TEST_VERSIONS_TABLE_NAME)
+        versions_table.update_item(Key={"id": TEST_SERVICES_TABLE_NAME},
+                                   UpdateExpression="ADD version :one", ExpressionAttributeValues={":one": 1})
+
+        assert list_services()["svc1"]["price"] == 80
+
+    def test_billing_prices_follow_catalogue_writes(self, services_table):
+        invoice = {"patientId": "P1", "paymentMethod": "card", "items": [{"serviceId": "svc1", "quantity": 1}]}
+        first = create_billing.lambda_handler(api_event("POST", body=invoice), {})
+        update_service.lambda_handler(api_event("PUT", {"id": "svc1"}, {"price": 125}), {})
+
+        second = create_billing.lambda_handler(api_event("POST", body=invoice), {})
+
+        assert json.loads(first["body"])["total"] == 100
+        assert json.loads(second["body"])["total"] == 125
+
+    def test_version_is_kept_out_of_the_services_table(self, services_table):
+        assert services_cache.bump_catalogue_version(TEST_SERVICES_TABLE_NAME) == 1
+        assert services_cache.bump_catalogue_version(TEST_SERVICES_TABLE_NAME) == 2
+
+        assert {item["id"] for item in services_table.scan()["Items"]} == {"svc1", "svc2"}
+        assert services_cache.get_catalogue_version(TEST_SERVICES_TABLE_NAME) == 2
+
+    def test_without_a_versions_table_the_catalogue_is_not_cached(self, services_table, monkeypatch):
+        monkeypatch.delenv("CATALOGUE_VERSIONS_TABLE")
+        list_services()
+        counts = count_calls()
+
+        assert set(list_services()) == {"svc1", "svc2"}
+        assert counts == {"Scan": 1}
+
+    def test_expired_catalogue_is_reloaded(self, services_table):
+        services_cache.get_catalogue(TEST_SERVICES_TABLE_NAME, ttl_seconds=0)
+        counts = count_calls()
+
+        services_cache.get_catalogue(TEST_SERVICES_TABLE_NAME, ttl_seconds=0)
+
+        assert counts.get("Scan") == 1
+
+    def test_unchanged_catalogue_returns_304(self, services_table):
+        first = get_services.lambda_handler(api_event("GET"), {})
+        revalidate = api_event("GET")
+        revalidate["headers"]["If-None-Match"] = first["headers"]["ETag"]
+
+        assert get_services.lambda_handler(revalidate, {})["statusCode"] == 304
+        update_service.lambda_handler(api_event("PUT", {"id": "svc1"}, {"price": 120}), {})
+        assert get_services.lambda_handler(revalidate, {})["statusCode"] == 200
@@ -0,0 +1,110 @@
+"""
+Cold-start guard for the Lambda handlers.
+
+Each handler is imported in a fresh interpreter under `python -X importtime`,
+the way Lambda imports it on a cold start (handler directory plus the utils
+layer on sys.path). The test fails when a handler pulls boto3 in at import
+time or when its cumulative import cost goes over the budget; the SDK must
+only load once a request actually reaches AWS.
+
+The budget can be raised on slow CI machines with HANDLER_IMPORT_BUDGET_MS.
+"""
+import os
+import subprocess
+import sys
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..'))
+HANDLERS_DIR = os.path.join(BACKEND_DIR, 'src', 'handlers')
+LAYER_DIR = os.path.join(BACKEND_DIR, 'lambda_layer', 'python')
+
+# boto3 alone costs roughly 200 ms to import; handlers currently load in 5-50 ms
+IMPORT_BUDGET_MS = float(os.environ.get('HANDLER_IMPORT_BUDGET_MS', '100'))
+# Modules that load the SDK's service models and must stay out of import time
+FORBIDDEN_MODULES = ('boto3', 'botocore.session', 'botocore.client')
+# Handlers invoked by other AWS services rather than API Gateway; they never see a preflight
+NON_API_HANDLERS = ('process_profile_image', 'sync_user_directory', 'reconcile_user_directory')
+
+
+def discover_handlers():
+    handlers = []
+    for area in sorted(os.listdir(HANDLERS_DIR)):
+        area_dir = os.path.join(HANDLERS_DIR, area)
+        if not os.path.isdir(area_dir):
+            continue
+        for filename in sorted(os.listdir(area_dir)):
+            if not filename.endswith('.py') or filename == '__init__.py':
+                continue
+            with open(os.path.join(area_dir, filename)) as source:
+                if 'def lambda_handler(' in source.read():
+                    handlers.append((area_dir, filename[:-3]))
+    return handlers
+
+
+HANDLERS = discover_handlers()
+
+
+def run_in_cold_interpreter(handler_dir, code, importtime=False):
+    env = dict(os.environ, AWS_DEFAULT_REGION='us-east-1', PYTHONDONTWRITEBYTECODE='1')
+    prelude = f"import sys; sys.path[:0] = [{handler_dir!r}, {LAYER_DIR!r}]\n"
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', prelude + code]
+    return subprocess.run(command, capture_output=True, text=True, env=env, cwd=BACKEND_DIR, timeout=60)
+
+
+def parse_importtime(stderr):
+    """Return {module: cumulative microseconds} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+@pytest.mark.parametrize("handler_dir, module_name", HANDLERS, ids=[name for _, name in HANDLERS])
+class TestHandlerImportTime:
+    def test_import_stays_within_budget_without_the_sdk(self, handler_dir, module_name):
+        result = run_in_cold_interpreter(handler_dir, f"import {module_name}", importtime=True)
+        assert result.returncode == 0, result.stderr[-2000:]
+
+        modules = parse_importtime(result.stderr)
+        loaded = sorted(name for name in FORBIDDEN_MODULES if name in modules)
+        assert loaded == [], f"{module_name} imports {loaded} at module load"
+        import_ms = modules[module_name] / 1000
+        assert import_ms <= IMPORT_BUDGET_MS, f"{module_name} took {import_ms:.1f} ms to import"
+
+    def test_preflight_is_answered_without_the_sdk(self, handler_dir, module_name):
+        if module_name in NON_API_HANDLERS:
+            pytest.skip(f"{module_name} is not behind API Gateway")
+        code = (
+            f"import {module_name}\n"
+            f"response = {module_name}.lambda_handler("
+            "{'httpMethod': 'OPTIONS', 'headers': {'Origin': 'http://localhost:5173'}}, None)\n"
+            "assert response['statusCode'] == 200, response\n"
+            "assert 'boto3' not in sys.modules, 'preflight loaded boto3'\n"
+        )
+        result = run_in_cold_interpreter(handler_dir, code)
+        assert result.returncode == 0, result.stderr[-2000:]
+
+
+class TestValidationFastPath:
+    @pytest.mark.parametrize("area, module_name, event, expected_status", [
+        ("ai", "summarize_note", {"httpMethod": "POST", "body": "{}"}, 400),
+        ("appointments", "create_appointment", {"httpMethod": "POST", "body": "{}"}, 400),
+        ("appointments", "get_appointment_by_id", {"httpMethod": "GET", "pathParameters": {}}, 400),
+        ("appointments", "get_appointments", {"httpMethod": "GET", "queryStringParameters": {"from": "07/01/2024"}}, 400),
+        ("patients", "create_patient", {"httpMethod": "POST", "headers": {}, "body": "{}"}, 400),
+        ("users", "create_cognito_user", {"httpMethod": "POST", "body": "{}"}, 400)
+    ])
+    def test_rejected_requests_do_not_load_the_sdk(self, area, module_name, event, expected_status):
+        code = (
+            "import os\n"
+            "os.environ.update(APPOINTMENTS_TABLE='t', PATIENT_RECORDS_TABLE='t', USER_POOL_ID='p')\n"
+            f"import {module_name}\n"
+            f"response = {module_name}.lambda_handler({event!r}, None)\n"
+            f"assert response['statusCode'] == {expected_status}, response\n"
+            "assert 'boto3' not in sys.modules, 'validation failure loaded boto3'\n"
+        )
+        result = run_in_cold_interpreter(os.path.join(HANDLERS_DIR, area), code)
+        assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from backend.src.handlers.users import list_users
+from utils import profile_image_cache, profile_images
+
+TEST_BUCKET_NAME = "clinnet-documents-test-list-avatars"
+WITH_IMAGE = "pictured@example.com"
+WITHOUT_IMAGE = "plain@example.com"
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def environment(aws_credentials, monkeypatch):
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=TEST_BUCKET_NAME)
+        cognito = boto3.client("cognito-idp", region_name="us-east-1")
+        user_pool_id = cognito.create_user_pool(
+            PoolName="clinnet-user-pool-test-list-avatars",
+            Schema=[{"Name": "profile_image", "AttributeDataType": "String", "Mutable": True, "Required": False}]
+        )["UserPool"]["Id"]
+        image_key = "profile-images/sub-1/7e4b.png"
+        cognito.admin_create_user(
+            UserPoolId=user_pool_id, Username=WITH_IMAGE, MessageAction="SUPPRESS",
+            UserAttributes=[{"Name": "email", "Value": WITH_IMAGE},
+                            {"Name": profile_images.PROFILE_IMAGE_ATTRIBUTE, "Value": image_key}])
+        cognito.admin_create_user(
+            UserPoolId=user_pool_id, Username=WITHOUT_IMAGE, MessageAction="SUPPRESS",
+            UserAttributes=[{"Name": "email", "Value": WITHOUT_IMAGE}])
+        monkeypatch.setenv("DOCUMENTS_BUCKET", TEST_BUCKET_NAME)
+        monkeypatch.setenv("USER_POOL_ID", user_pool_id)
+        yield {"image_key": image_key}
+
+
+def list_all(query=None):
+    event = {
+        "httpMethod": "GET",
+        "requestContext": {"authorizer": {"claims": {"cognito:username": "admin"}}},
+        "headers": {},
+        "queryStringParameters": query,
+    }
+    response = list_users.lambda_handler(event, {})
+    body = json.loads(response["body"])
+    return response["statusCode"], {user["username"]: user for user in body.get("users", [])} or body
+
+
+class TestIncludeAvatars:
+    def test_avatar_urls_are_returned_inline(self, environment):
+        status, users = list_all({"includeAvatars": "true"})
+
+        assert status == 200
+        assert environment["image_key"] in users[WITH_IMAGE]["avatarUrl"]
+        assert users[WITHOUT_IMAGE]["avatarUrl"] is None
+
+    def test_avatars_are_left_out_by_default(self, environment):
+        _, users = list_all()
+
+        assert "avatarUrl" not in users[WITH_IMAGE]
+
+    def test_no_s3_requests_are_made(self, environment, monkeypatch):
+        class NoRequestsS3:
+            """Presigning is allowed; any S3 API call fails the test."""
+
+            def __init__(self, client):
+                self._client = client
+
+            def __getattr__(self, name):
+                assert name == "generate_presigned_url", f"unexpected S3 call: {name}"
+                return getattr(self._client, name)
+
+        real_get_client = list_users.get_client
+        monkeypatch.setattr(list_users, "get_client",
+                            lambda name: NoRequestsS3(real_get_client(name)) if name == "s3" else real_get_client(name))
+
+        status, _ = list_all({"includeAvatars": "true", "avatarSize": "64"})
+
+        assert status == 200
+
+    def test_thumbnail_urls_for_the_requested_size(self, environment):
+        _, users = list_all({"includeAvatars": "true", "avatarSize": "64"})
+
+        assert profile_images.variant_key(environment["image_key"], 64) in users[WITH_IMAGE]["avatarThumbnailUrl"]
+        assert users[WITHOUT_IMAGE]["avatarThumbnailUrl"] is None
+
+    def test_urls_are_reused_across_pages(self, environment):
+        _, first = list_all({"includeAvatars": "true"})
+        _, second = list_all({"includeAvatars": "true"})
+
+        assert first[WITH_IMAGE]["avatarUrl"] == second[WITH_IMAGE]["avatarUrl"]
+        assert profile_image_cache.get_cache_stats() == {"key_hits": 0, "key_misses": 0, "url_hits": 1, "url_misses": 1}
+
+    def test_rejects_unknown_sizes(self, environment):
+        status, _ = list_all({"includeAvatars": "true", "avatarSize": "100"})
+
+        assert status == 400
@@ -0,0 +1,297 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import base64
+import json
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from backend.src.handlers.users import (
+    confirm_profile_image_upload, get_avatar_urls, get_profile_image, remove_profile_image
+)
+from utils import profile_image_cache, profile_images
+
+TEST_BUCKET_NAME = "clinnet-documents-test-image-cache"
+TEST_TABLE_NAME = "clinnet-users-test-image-cache"
+TEST_EMAIL = "cached@example.com"
+OTHER_EMAIL = "no-image@example.com"
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def environment(aws_credentials, monkeypatch):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=TEST_BUCKET_NAME)
+        table = boto3.resource("dynamodb", region_name="us-east-1").create_table(
+            TableName=TEST_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        cognito = boto3.client("cognito-idp", region_name="us-east-1")
+        user_pool_id = cognito.create_user_pool(
+            PoolName="clinnet-user-pool-test-image-cache",
+            Schema=[{"Name": "profile_image", "AttributeDataType": "String", "Mutable": True, "Required": False}]
+        )["UserPool"]["Id"]
+        user = cognito.admin_create_user(UserPoolId=user_pool_id, Username=TEST_EMAIL, MessageAction="SUPPRESS")["User"]
+        cognito.admin_create_user(UserPoolId=user_pool_id, Username=OTHER_EMAIL, MessageAction="SUPPRESS")
+        user_sub = next(attr["Value"] for attr in user["Attributes"] if attr["Name"] == "sub")
+        image_key = f"profile-images/{user_sub}/9c2e.png"
+        s3.put_object(Bucket=TEST_BUCKET_NAME, Key=image_key, Body=b"original", ContentType="image/png")
+        cognito.admin_update_user_attributes(
+            UserPoolId=user_pool_id, Username=TEST_EMAIL,
+            UserAttributes=[{"Name": profile_images.PROFILE_IMAGE_ATTRIBUTE, "Value": image_key}])
+        monkeypatch.setenv("DOCUMENTS_BUCKET", TEST_BUCKET_NAME)
+        monkeypatch.setenv("USER_POOL_ID", user_pool_id)
+        monkeypatch.setenv("USERS_TABLE", TEST_TABLE_NAME)
+        yield {"s3": s3, "table": table, "user_sub": user_sub, "image_key": image_key}
+
+
+class CallRecorder:
+    """Wraps a boto3 client and records the operations called on it."""
+
+    def __init__(self, client, calls):
+        self._client = client
+        self._calls = calls
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if callable(attribute) and not name.startswith("generate_presigned"):
+            self._calls.append(name)
+        return attribute
+
+
+@pytest.fixture
+def aws_calls(environment, monkeypatch):
+    calls = []
+    for module in (get_profile_image, get_avatar_urls):
+        real_get_client = module.get_client
+        monkeypatch.setattr(module, "get_client",
+                            lambda name, real_get_client=real_get_client: CallRecorder(real_get_client(name), calls))
+    return calls
+
+
+class FailingClient:
+    """Wraps a boto3 client and makes one operation raise a ClientError."""
+
+    def __init__(self, client, operation, code, when):
+        self._client = client
+        self._operation = operation
+        self._code = code
+        self._when = when
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if name != self._operation:
+            return attribute
+
+        def call(**kwargs):
+            if self._when(kwargs):
+                raise ClientError({"Error": {"Code": self._code, "Message": self._code}}, name)
+            return attribute(**kwargs)
+        return call
+
+
+def fail_calls(monkeypatch, operation, code, when=lambda kwargs: True):
+    real_get_client = get_avatar_urls.get_client
+    monkeypatch.setattr(get_avatar_urls, "get_client",
+                        lambda name: FailingClient(real_get_client(name), operation, code, when))
+
+
+def get_image(query=None):
+    event = {
+        "httpMethod": "GET",
+        "requestContext": {"authorizer": {"claims": {"email": TEST_EMAIL}}},
+        "headers": {},
+        "queryStringParameters": query,
+    }
+    response = get_profile_image.lambda_handler(event, {})
+    return response["statusCode"], json.loads(response["body"])
+
+
+def get_avatars(body, base64_encoded=False):
+    body = json.dumps(body)
+    if base64_encoded:
+        # ClinicAPI lists application/json as a binary media type, so API Gateway base64 encodes it
+        body = base64.b64encode(body.encode("utf-8")).decode("ascii")
+    event = {
+        "httpMethod": "POST",
+        "requestContext": {"authorizer": {"claims": {"email": TEST_EMAIL}}},
+        "headers": {},
+        "body": body,
+        "isBase64Encoded": base64_encoded,
+    }
+    response = get_avatar_urls.lambda_handler(event, {})
+    return response["statusCode"], json.loads(response["body"])
+
+
+class TestGetProfileImageCache:
+    def test_second_request_skips_cognito_and_s3(self, environment, aws_calls):
+        _, first = get_image()
+        assert aws_calls == ["admin_get_user", "head_object"]
+
+        del aws_calls[:]
+        status, second = get_image()
+
+        assert status == 200
+        assert aws_calls == []
+        assert second["imageUrl"] == first["imageUrl"]
+        assert second["imageKey"] == environment["image_key"]
+
+    def test_found_thumbnails_are_remembered(self, environment, aws_calls):
+        thumbnail_key = profile_images.variant_key(environment["image_key"], 64)
+        environment["s3"].put_object(Bucket=TEST_BUCKET_NAME, Key=thumbnail_key, Body=b"thumb")
+        get_image({"size": "64"})
+
+        del aws_calls[:]
+        status, body = get_image({"size": "64"})
+
+        assert status == 200
+        assert body["size"] == 64
+        assert aws_calls == []
+
+    def test_a_missing_original_is_cached_as_no_image(self, environment, aws_calls):
+        environment["s3"].delete_object(Bucket=TEST_BUCKET_NAME, Key=environment["image_key"])
+        _, first = get_image()
+
+        del aws_calls[:]
+        _, second = get_image()
+
+        assert first["hasImage"] is False and second["hasImage"] is False
+        assert aws_calls == []
+
+    def test_expired_entries_are_reloaded_from_cognito(self, environment, aws_calls):
+        get_image()
+        environment["table"].update_item(
+            Key={"id": profile_image_cache.cache_id(TEST_EMAIL)},
+            UpdateExpression="SET cacheExpiresAt = :expired",
+            ExpressionAttributeValues={":expired": 1})
+
+        del aws_calls[:]
+        get_image()
+
+        assert aws_calls[0] == "admin_get_user"
+
+    def test_without_a_users_table_every_request_reads_cognito(self, environment, aws_calls, monkeypatch):
+        monkeypatch.delenv("USERS_TABLE")
+        get_image()
+        get_image()
+
+        assert aws_calls.count("admin_get_user") == 2
+
+
+class TestWriteThrough:
+    def test_confirm_replaces_the_cached_key(self, environment):
+        get_image()
+        new_key = f"profile-images/{environment['user_sub']}/5d7a.png"
+        environment["s3"].put_object(Bucket=TEST_BUCKET_NAME, Key=new_key, Body=b"new", ContentType="image/png")
+        event = {
+            "httpMethod": "POST",
+            "requestContext": {"authorizer": {"claims": {
+                "sub": environment["user_sub"], "cognito:username": TEST_EMAIL, "email": TEST_EMAIL}}},
+            "headers": {},
+            "body": json.dumps({"imageKey": new_key}),
+        }
+
+        assert confirm_profile_image_upload.lambda_handler(event, {})["statusCode"] == 200
+
+        _, body = get_image()
+        assert body["imageKey"] == new_key
+
+    def test_remove_clears_the_cached_key(self, environment):
+        get_image()
+        event = {"httpMethod": "DELETE", "requestContext": {"authorizer": {"claims": {"email": TEST_EMAIL}}},
+                 "headers": {}}
+
+        assert remove_profile_image.lambda_handler(event, {})["statusCode"] == 200
+
+        _, body = get_image()
+        assert body["hasImage"] is False
+
+    def test_a_stale_cognito_read_does_not_overwrite_a_newer_key(self, environment):
+        profile_image_cache.set_image_key([TEST_EMAIL], "profile-images/new.png")
+
+        profile_image_cache._store_loaded_key(TEST_TABLE_NAME, TEST_EMAIL, environment["image_key"], 1)
+
+        item = environment["table"].get_item(Key={"id": profile_image_cache.cache_id(TEST_EMAIL)})["Item"]
+        assert item["imageKey"] == "profile-images/new.png"
+
+
+class TestGetAvatarUrls:
+    def test_resolves_many_users_in_one_request(self, environment):
+        status, body = get_avatars({"usernames": [TEST_EMAIL, OTHER_EMAIL, "unknown@example.com"]})
+
+        assert status == 200
+        assert environment["image_key"] in body["avatars"][TEST_EMAIL]["imageUrl"]
+        assert body["avatars"][OTHER_EMAIL] is None
+        assert body["avatars"]["unknown@example.com"] is None
+
+    def test_accepts_base64_encoded_bodies(self, environment):
+        status, body = get_avatars({"usernames": [TEST_EMAIL]}, base64_encoded=True)
+
+        assert status == 200
+        assert environment["image_key"] in body["avatars"][TEST_EMAIL]["imageUrl"]
+
+    def test_cached_users_cost_no_cognito_calls(self, environment, aws_calls):
+        get_avatars({"usernames": [TEST_EMAIL, OTHER_EMAIL]})
+
+        del aws_calls[:]
+        _, body = get_avatars({"usernames": [TEST_EMAIL, OTHER_EMAIL], "size": 128})
+
+        assert aws_calls == ["head_object"]
+        assert body["avatars"][TEST_EMAIL]["size"] is None
+
+    def test_a_forbidden_thumbnail_head_serves_the_original(self, environment, monkeypatch):
+        # Without s3:ListBucket, S3 answers HeadObject on a missing key with 403
+        fail_calls(monkeypatch, "head_object", "403")
+
+        status, body = get_avatars({"usernames": [TEST_EMAIL], "size": 128})
+
+        assert status == 200
+        assert body["avatars"][TEST_EMAIL]["size"] is None
+        assert environment["image_key"] in body["avatars"][TEST_EMAIL]["imageUrl"]
+
+    @pytest.mark.parametrize("operation, code", [("head_object", "InternalError"),
+                                                 ("admin_get_user", "TooManyRequestsException")])
+    def test_one_failing_user_does_not_fail_the_list(self, environment, monkeypatch, operation, code):
+        fail_calls(monkeypatch, operation, code, when=lambda kwargs: TEST_EMAIL in str(kwargs)
+                   or environment["user_sub"] in str(kwargs))
+        profile_image_cache.set_image_key([OTHER_EMAIL], "profile-images/other/1.png")
+
+        status, body = get_avatars({"usernames": [TEST_EMAIL, OTHER_EMAIL], "size": 128})
+
+        assert status == 200
+        assert body["avatars"][TEST_EMAIL] is None
+        assert "profile-images/other/1.png" in body["avatars"][OTHER_EMAIL]["imageUrl"]
+
+    @pytest.mark.parametrize("body", [{}, {"usernames": []}, {"usernames": "a@example.com"},
+                                      {"usernames": ["a@example.com"] * 101},
+                                      {"usernames": ["a@example.com"], "size": 100}])
+    def test_rejects_invalid_requests(self, environment, body):
+        status, _ = get_avatars(body)
+
+        assert status == 400
+
+
+class TestPresignedUrlCache:
+    def test_urls_are_reused_until_close_to_expiry(self, environment, monkeypatch):
+        first = profile_image_cache.presigned_url(environment["s3"], TEST_BUCKET_NAME, "profile-images/a.png")
+        assert profile_image_cache.presigned_url(environment["s3"], TEST_BUCKET_NAME, "profile-images/a.png") == first
+
+        later = profile_image_cache.time.time() + profile_images.PROFILE_IMAGE_URL_EXPIRES \
+            - profile_image_cache.PRESIGNED_URL_REFRESH_SECONDS + 1
+        monkeypatch.setattr(profile_image_cache.time, "time", lambda: later)
+        profile_image_cache.presigned_url(environment["s3"], TEST_BUCKET_NAME, "profile-images/a.png")
+
+        assert profile_image_cache.get_cache_stats()["url_misses"] == 2
@@ -0,0 +1,194 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import base64
+import json
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+from backend.src.handlers.users import confirm_profile_image_upload, request_profile_image_upload
+from utils import profile_images
+
+TEST_BUCKET_NAME = "clinnet-documents-test-direct-upload"
+TEST_USERNAME = "direct@example.com"
+
+
+def create_api_gateway_event(body=None, sub_claim="test-sub-direct-123", username_claim=TEST_USERNAME,
+                             base64_encoded=False):
+    claims = {"sub": sub_claim, "cognito:username": username_claim} if sub_claim else {}
+    body = json.dumps(body) if body is not None else None
+    if base64_encoded and body is not None:
+        # ClinicAPI lists application/json as a binary media type, so API Gateway base64 encodes it
+        body = base64.b64encode(body.encode("utf-8")).decode("ascii")
+    return {
+        "httpMethod": "POST",
+        "requestContext": {"requestId": "test-request-direct-upload", "authorizer": {"claims": claims}},
+        "headers": {"Content-Type": "application/json"},
+        "body": body,
+        "isBase64Encoded": base64_encoded,
+    }
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def environment(aws_credentials, monkeypatch):
+    with mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=TEST_BUCKET_NAME)
+        cognito = boto3.client("cognito-idp", region_name="us-east-1")
+        user_pool_id = cognito.create_user_pool(
+            PoolName="clinnet-user-pool-test-direct-upload",
+            Schema=[{"Name": "profile_image", "AttributeDataType": "String", "Mutable": True, "Required": False}]
+        )["UserPool"]["Id"]
+        user = cognito.admin_create_user(UserPoolId=user_pool_id, Username=TEST_USERNAME,
+                                         MessageAction="SUPPRESS")["User"]
+        user_sub = next(attr["Value"] for attr in user["Attributes"] if attr["Name"] == "sub")
+        monkeypatch.setenv("DOCUMENTS_BUCKET", TEST_BUCKET_NAME)
+        monkeypatch.setenv("USER_POOL_ID", user_pool_id)
+        yield {"user_pool_id": user_pool_id, "user_sub": user_sub}
+
+
+def profile_image_attribute(environment):
+    user = boto3.client("cognito-idp", region_name="us-east-1").admin_get_user(
+        UserPoolId=environment["user_pool_id"], Username=TEST_USERNAME)
+    return next((attr["Value"] for attr in user["UserAttributes"]
+                 if attr["Name"] == profile_images.PROFILE_IMAGE_ATTRIBUTE), None)
+
+
+def request_upload(environment, **body):
+    response = request_profile_image_upload.lambda_handler(
+        create_api_gateway_event(body, environment["user_sub"]), {})
+    return response["statusCode"], json.loads(response["body"])
+
+
+def confirm(environment, image_key):
+    response = confirm_profile_image_upload.lambda_handler(
+        create_api_gateway_event({"imageKey": image_key}, environment["user_sub"]), {})
+    return response["statusCode"], json.loads(response["body"])
+
+
+class TestRequestProfileImageUpload:
+    def test_returns_presigned_post_with_type_and_size_conditions(self, environment):
+        status, body = request_upload(environment, contentType="image/png", size=1024)
+
+        assert status == 200
+        assert body["imageKey"].startswith(f"profile-images/{environment['user_sub']}/")
+        assert body["imageKey"].endswith(".png")
+        assert body["maxBytes"] == profile_images.PROFILE_IMAGE_MAX_BYTES
+        fields = body["upload"]["fields"]
+        assert fields["key"] == body["imageKey"]
+        assert fields["Content-Type"] == "image/png"
+        policy = json.loads(base64.b64decode(fields["policy"]))
+        assert {"Content-Type": "image/png"} in policy["conditions"]
+        assert ["content-length-range", 1, profile_images.PROFILE_IMAGE_MAX_BYTES] in policy["conditions"]
+        assert {"key": body["imageKey"]} in policy["conditions"]
+
+    def test_accepts_base64_encoded_bodies(self, environment):
+        response = request_profile_image_upload.lambda_handler(
+            create_api_gateway_event({"contentType": "image/png"}, environment["user_sub"], base64_encoded=True), {})
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"])["imageKey"].endswith(".png")
+
+    def test_nothing_is_written_to_cognito(self, environment):
+        request_upload(environment, contentType="image/jpeg")
+
+        assert profile_image_attribute(environment) is None
+
+    @pytest.mark.parametrize("body", [
+        {"contentType": "application/pdf"},
+        {},
+        {"contentType": "image/png", "size": 0},
+        {"contentType": "image/png", "size": profile_images.PROFILE_IMAGE_MAX_BYTES + 1},
+    ])
+    def test_rejects_bad_requests(self, environment, body):
+        status, _ = request_upload(environment, **body)
+
+        assert status == 400
+
+    def test_requires_a_caller(self, environment):
+        response = request_profile_image_upload.lambda_handler(
+            create_api_gateway_event({"contentType": "image/png"}, sub_claim=None), {})
+
+        assert response["statusCode"] == 401
+
+
+class TestConfirmProfileImageUpload:
+    def upload(self, environment, content_type="image/png", body=b"\x89PNG fake image"):
+        _, issued = request_upload(environment, contentType=content_type)
+        # Stands in for the browser's POST to S3
+        boto3.client("s3", region_name="us-east-1").put_object(
+            Bucket=TEST_BUCKET_NAME, Key=issued["imageKey"], Body=body, ContentType=content_type)
+        return issued["imageKey"]
+
+    def test_records_the_uploaded_image(self, environment):
+        image_key = self.upload(environment)
+
+        status, body = confirm(environment, image_key)
+
+        assert status == 200
+        assert body["imageKey"] == image_key
+        assert image_key in body["imageUrl"]
+        assert profile_image_attribute(environment) == image_key
+
+    def test_accepts_base64_encoded_bodies(self, environment):
+        image_key = self.upload(environment)
+
+        response = confirm_profile_image_upload.lambda_handler(
+            create_api_gateway_event({"imageKey": image_key}, environment["user_sub"], base64_encoded=True), {})
+
+        assert response["statusCode"] == 200
+        assert profile_image_attribute(environment) == image_key
+
+    def test_missing_upload_is_rejected(self, environment):
+        _, issued = request_upload(environment, contentType="image/png")
+
+        status, body = confirm(environment, issued["imageKey"])
+
+        assert status == 400
+        assert body["message"] == "Uploaded image not found"
+        assert profile_image_attribute(environment) is None
+
+    def test_forbidden_head_is_a_missing_upload(self):
+        # S3 answers 403 for a missing key when the caller lacks s3:ListBucket
+        class ForbiddenS3:
+            def head_object(self, **kwargs):
+                raise ClientError({"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject")
+
+        assert profile_images.check_uploaded_image(ForbiddenS3(), TEST_BUCKET_NAME, "profile-images/a/b.png") == \
+            "Uploaded image not found"
+
+    def test_keys_of_other_users_are_rejected(self, environment):
+        status, _ = confirm(environment, "profile-images/someone-else/1234.png")
+
+        assert status == 400
+
+    def test_wrong_content_type_is_rejected(self, environment):
+        image_key = self.upload(environment)
+        boto3.client("s3", region_name="us-east-1").put_object(
+            Bucket=TEST_BUCKET_NAME, Key=image_key, Body=b"<html>", ContentType="text/html")
+
+        status, _ = confirm(environment, image_key)
+
+        assert status == 400
+        assert profile_image_attribute(environment) is None
+
+
+class TestProfileImageKeys:
+    def test_is_user_image_key(self):
+        key = profile_images.new_image_key("abc", "image/jpeg")
+
+        assert profile_images.is_user_image_key("abc", key)
+        assert not profile_images.is_user_image_key("ab", key)
+        assert not profile_images.is_user_image_key("abc", "profile-images/abc/nested/x.jpg")
+        assert not profile_images.is_user_image_key("abc", "profile-images/abc/x.exe")
+        assert not profile_images.is_user_image_key("abc", None)
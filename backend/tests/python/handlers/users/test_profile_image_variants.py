@@ -0,0 +1,183 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+
+import boto3
+import pytest
+from botocore.awsrequest import AWSResponse
+from moto import mock_aws
+
+from backend.src.handlers.users import confirm_profile_image_upload, get_profile_image, remove_profile_image
+from utils import aws_clients, profile_images
+
+TEST_BUCKET_NAME = "clinnet-documents-test-variants"
+TEST_EMAIL = "variants@example.com"
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def environment(aws_credentials, monkeypatch):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=TEST_BUCKET_NAME)
+        cognito = boto3.client("cognito-idp", region_name="us-east-1")
+        user_pool_id = cognito.create_user_pool(
+            PoolName="clinnet-user-pool-test-variants",
+            Schema=[{"Name": "profile_image", "AttributeDataType": "String", "Mutable": True, "Required": False}]
+        )["UserPool"]["Id"]
+        user = cognito.admin_create_user(UserPoolId=user_pool_id, Username=TEST_EMAIL, MessageAction="SUPPRESS")["User"]
+        user_sub = next(attr["Value"] for attr in user["Attributes"] if attr["Name"] == "sub")
+        image_key = f"profile-images/{user_sub}/3f1d.png"
+        s3.put_object(Bucket=TEST_BUCKET_NAME, Key=image_key, Body=b"original", ContentType="image/png")
+        cognito.admin_update_user_attributes(
+            UserPoolId=user_pool_id, Username=TEST_EMAIL,
+            UserAttributes=[{"Name": profile_images.PROFILE_IMAGE_ATTRIBUTE, "Value": image_key}])
+        monkeypatch.setenv("DOCUMENTS_BUCKET", TEST_BUCKET_NAME)
+        monkeypatch.setenv("USER_POOL_ID", user_pool_id)
+        yield {"s3": s3, "user_sub": user_sub, "image_key": image_key}
+
+
+class EmptyBody:
+    def stream(self, **kwargs):
+        yield b""
+
+
+def get_image(query=None):
+    event = {
+        "httpMethod": "GET",
+        "requestContext": {"authorizer": {"claims": {"email": TEST_EMAIL}}},
+        "headers": {},
+        "queryStringParameters": query,
+    }
+    response = get_profile_image.lambda_handler(event, {})
+    return response["statusCode"], json.loads(response["body"])
+
+
+class TestGetProfileImageSize:
+    def test_serves_the_rendered_thumbnail(self, environment):
+        thumbnail_key = profile_images.variant_key(environment["image_key"], 64)
+        environment["s3"].put_object(Bucket=TEST_BUCKET_NAME, Key=thumbnail_key, Body=b"thumb")
+
+        status, body = get_image({"size": "64"})
+
+        assert status == 200
+        assert body["size"] == 64
+        assert thumbnail_key in body["imageUrl"]
+        assert body["imageKey"] == environment["image_key"]
+
+    def test_jpeg_thumbnails_can_be_requested(self, environment):
+        thumbnail_key = profile_images.variant_key(environment["image_key"], 128, "jpeg")
+        environment["s3"].put_object(Bucket=TEST_BUCKET_NAME, Key=thumbnail_key, Body=b"thumb")
+
+        status, body = get_image({"size": "128", "format": "jpeg"})
+
+        assert status == 200
+        assert thumbnail_key in body["imageUrl"]
+
+    def test_falls_back_to_the_original_until_rendered(self, environment):
+        status, body = get_image({"size": "512"})
+
+        assert status == 200
+        assert body["size"] is None
+        assert body["hasImage"] is True
+        assert environment["image_key"] in body["imageUrl"]
+
+    def test_a_forbidden_thumbnail_head_serves_the_original(self, environment):
+        # Without s3:ListBucket, S3 answers HeadObject on a missing key with 403
+        def forbid_head(request=None, **kwargs):
+            if request.method == "HEAD" and "/512.webp" in request.url:
+                return AWSResponse(request.url, 403, {}, EmptyBody())
+        aws_clients.get_client("s3").meta.events.register_first("before-send.s3.HeadObject", forbid_head)
+
+        status, body = get_image({"size": "512"})
+
+        assert status == 200
+        assert body["size"] is None
+        assert environment["image_key"] in body["imageUrl"]
+
+    def test_without_size_the_original_is_served(self, environment):
+        status, body = get_image()
+
+        assert status == 200
+        assert body["size"] is None
+        assert environment["image_key"] in body["imageUrl"]
+
+    @pytest.mark.parametrize("query", [{"size": "100"}, {"size": "big"}, {"size": "64", "format": "tiff"}])
+    def test_rejects_unknown_sizes_and_formats(self, environment, query):
+        status, _ = get_image(query)
+
+        assert status == 400
+
+
+class TestRemoveProfileImageVariants:
+    def test_thumbnails_are_removed_with_the_original(self, environment):
+        for key in profile_images.variant_keys(environment["image_key"])[:2]:
+            environment["s3"].put_object(Bucket=TEST_BUCKET_NAME, Key=key, Body=b"thumb")
+        event = {"httpMethod": "DELETE", "requestContext": {"authorizer": {"claims": {"email": TEST_EMAIL}}},
+                 "headers": {}}
+
+        response = remove_profile_image.lambda_handler(event, {})
+
+        assert response["statusCode"] == 200
+        assert environment["s3"].list_objects_v2(Bucket=TEST_BUCKET_NAME).get("KeyCount") == 0
+
+
+class FakeLambdaClient:
+    def __init__(self):
+        self.invocations = []
+
+    def invoke(self, **kwargs):
+        self.invocations.append(kwargs)
+        return {"StatusCode": 202}
+
+
+class TestRequestVariants:
+    def test_processor_is_invoked_asynchronously(self, monkeypatch):
+        monkeypatch.setattr(profile_images, "PROFILE_IMAGE_PROCESSOR_FUNCTION", "process-profile-image")
+        client = FakeLambdaClient()
+
+        assert profile_images.request_variants(client, "bucket", "profile-images/a/b.png")
+
+        [invocation] = client.invocations
+        assert invocation["InvocationType"] == "Event"
+        assert json.loads(invocation["Payload"]) == {"bucket": "bucket", "key": "profile-images/a/b.png"}
+
+    def test_disabled_without_a_processor(self, monkeypatch):
+        monkeypatch.setattr(profile_images, "PROFILE_IMAGE_PROCESSOR_FUNCTION", None)
+
+        assert not profile_images.request_variants(FakeLambdaClient(), "bucket", "profile-images/a/b.png")
+
+    def test_failures_do_not_fail_the_upload(self, monkeypatch):
+        monkeypatch.setattr(profile_images, "PROFILE_IMAGE_PROCESSOR_FUNCTION", "process-profile-image")
+
+        class BrokenLambdaClient:
+            def invoke(self, **kwargs):
+                raise RuntimeError("throttled")
+
+        assert not profile_images.request_variants(BrokenLambdaClient(), "bucket", "profile-images/a/b.png")
+
+    def test_confirm_requests_thumbnails(self, environment, monkeypatch):
+        client = FakeLambdaClient()
+        monkeypatch.setattr(profile_images, "PROFILE_IMAGE_PROCESSOR_FUNCTION", "process-profile-image")
+        real_get_client = confirm_profile_image_upload.get_client
+        monkeypatch.setattr(confirm_profile_image_upload, "get_client",
+                            lambda name: client if name == "lambda" else real_get_client(name))
+        event = {
+            "httpMethod": "POST",
+            "requestContext": {"authorizer": {"claims": {"sub": environment["user_sub"], "cognito:username": TEST_EMAIL}}},
+            "headers": {},
+            "body": json.dumps({"imageKey": environment["image_key"]}),
+        }
+
+        response = confirm_profile_image_upload.lambda_handler(event, {})
+
+        assert response["statusCode"] == 200
+        assert json.loads(client.invocations[0]["Payload"])["key"] == environment["image_key"]
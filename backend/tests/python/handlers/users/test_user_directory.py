@@ -0,0 +1,263 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../../lambda_layer/python')))
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from backend.src.handlers.users import (
+    create_cognito_user, delete_user, disable_user, list_users, reconcile_user_directory, sync_user_directory,
+    update_user
+)
+from utils import user_directory
+
+TEST_TABLE_NAME = "clinnet-user-directory-test"
+PASSWORD = "Passw0rd!"
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+def create_users_table(dynamodb):
+    index = lambda name, *keys: {  # noqa: E731
+        "IndexName": name,
+        "KeySchema": [{"AttributeName": key, "KeyType": key_type} for key, key_type in zip(keys, ("HASH", "RANGE"))],
+        "Projection": {"ProjectionType": "ALL"},
+    }
+    return dynamodb.create_table(
+        TableName=TEST_TABLE_NAME,
+        KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": name, "AttributeType": "S"}
+                              for name in ("id", "entityType", "sortName", "role", "email")],
+        GlobalSecondaryIndexes=[
+            index(user_directory.DIRECTORY_INDEX, "entityType", "sortName"),
+            index(user_directory.ROLE_INDEX, "role", "sortName"),
+            index(user_directory.EMAIL_INDEX, "email"),
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+@pytest.fixture
+def environment(aws_credentials, monkeypatch):
+    with mock_aws():
+        table = create_users_table(boto3.resource("dynamodb", region_name="us-east-1"))
+        cognito = boto3.client("cognito-idp", region_name="us-east-1")
+        user_pool_id = cognito.create_user_pool(
+            PoolName="clinnet-user-pool-test-directory",
+            Schema=[{"Name": name, "AttributeDataType": "String", "Mutable": True, "Required": False}
+                    for name in ("role", "profile_image")]
+        )["UserPool"]["Id"]
+        monkeypatch.setenv("USER_POOL_ID", user_pool_id)
+        monkeypatch.setenv("USER_DIRECTORY_TABLE", TEST_TABLE_NAME)
+        yield {"cognito": cognito, "table": table, "user_pool_id": user_pool_id}
+
+
+def add_cognito_user(environment, email, first_name, last_name, role):
+    environment["cognito"].admin_create_user(
+        UserPoolId=environment["user_pool_id"], Username=email, MessageAction="SUPPRESS",
+        UserAttributes=[{"Name": "email", "Value": email}, {"Name": "given_name", "Value": first_name},
+                        {"Name": "family_name", "Value": last_name}, {"Name": "custom:role", "Value": role}])
+
+
+@pytest.fixture
+def staff(environment):
+    add_cognito_user(environment, "ada@example.com", "Ada", "Lovelace", "doctor")
+    add_cognito_user(environment, "grace@example.com", "Grace", "Hopper", "admin")
+    add_cognito_user(environment, "alan@example.com", "Alan", "Turing", "doctor")
+    add_cognito_user(environment, "joan@example.com", "Joan", "Clarke", "frontdesk")
+    reconcile_user_directory.lambda_handler({}, None)
+    return environment
+
+
+def api_event(method, path_parameters=None, body=None, query=None):
+    return {
+        "httpMethod": method,
+        "requestContext": {"authorizer": {"claims": {"cognito:username": "admin"}}},
+        "headers": {},
+        "pathParameters": path_parameters,
+        "queryStringParameters": query,
+        "body": json.dumps(body) if body is not None else None,
+    }
+
+
+def list_all(query=None):
+    response = list_users.lambda_handler(api_event("GET", query=query), {})
+    return response["statusCode"], json.loads(response["body"])
+
+
+def directory_item(username):
+    return user_directory.get_user(username)
+
+
+class TestReconcile:
+    def test_fills_the_directory_and_records_the_run(self, environment):
+        add_cognito_user(environment, "ada@example.com", "Ada", "Lovelace", "doctor")
+
+        stats = reconcile_user_directory.lambda_handler({}, None)
+
+        assert stats == {"written": 1, "deleted": 0, "unchanged": 0}
+        item = directory_item("ada@example.com")
+        assert (item["firstName"], item["role"], item["sortName"]) == ("Ada", "doctor", "lovelace ada ada@example.com")
+        assert directory_item(user_directory.STATE_ID)["written"] == 1
+
+    def test_repairs_drift(self, staff):
+        staff["table"].put_item(Item=user_directory.build_item("ghost@example.com", {"email": "ghost@example.com"}))
+        staff["table"].update_item(Key={"id": "ada@example.com"}, UpdateExpression="SET #r = :r",
+                                   ExpressionAttributeNames={"#r": "role"}, ExpressionAttributeValues={":r": "admin"})
+
+        stats = reconcile_user_directory.lambda_handler({}, None)
+
+        assert stats == {"written": 1, "deleted": 1, "unchanged": 3}
+        assert directory_item("ghost@example.com") is None
+        assert directory_item("ada@example.com")["role"] == "doctor"
+
+
+class TestListUsersFromDirectory:
+    def test_lists_from_cognito_until_reconciled(self, environment):
+        add_cognito_user(environment, "ada@example.com", "Ada", "Lovelace", "doctor")
+
+        status, body = list_all()
+
+        assert status == 200
+        assert [user["email"] for user in body["users"]] == ["ada@example.com"]
+        assert directory_item("ada@example.com") is None
+
+    def test_sorted_by_name_without_calling_cognito(self, staff, monkeypatch):
+        def list_from_cognito(*args):
+            raise AssertionError("listed from Cognito")
+        monkeypatch.setattr(list_users, "list_from_cognito", list_from_cognito)
+
+        _, body = list_all()
+
+        assert [user["lastName"] for user in body["users"]] == ["Clarke", "Hopper", "Lovelace", "Turing"]
+        joan = body["users"][0]
+        assert (joan["username"], joan["firstName"], joan["role"], joan["enabled"]) == \
+            ("joan@example.com", "Joan", "frontdesk", True)
+
+    def test_descending_order(self, staff):
+        _, body = list_all({"order": "desc"})
+
+        assert [user["lastName"] for user in body["users"]] == ["Turing", "Lovelace", "Hopper", "Clarke"]
+
+    def test_filter_by_role(self, staff):
+        _, body = list_all({"role": "doctor"})
+
+        assert [user["lastName"] for user in body["users"]] == ["Lovelace", "Turing"]
+
+    def test_search(self, staff):
+        _, body = list_all({"search": "GRACE"})
+
+        assert [user["email"] for user in body["users"]] == ["grace@example.com"]
+
+    def test_pages_with_signed_tokens(self, staff):
+        _, first = list_all({"limit": "3"})
+        _, second = list_all({"limit": "3", "nextToken": first["nextToken"]})
+
+        assert len(first["users"]) == 3
+        assert [user["lastName"] for user in second["users"]] == ["Turing"]
+        assert second["nextToken"] is None
+
+    @pytest.mark.parametrize("query", [{"nextToken": "forged.token"}, {"limit": "0"}, {"order": "sideways"}])
+    def test_rejects_invalid_parameters(self, staff, query):
+        status, _ = list_all(query)
+
+        assert status == 400
+
+    def test_a_token_cannot_resume_another_index(self, staff):
+        _, first = list_all({"limit": "1"})
+
+        status, _ = list_all({"role": "doctor", "nextToken": first["nextToken"]})
+
+        assert status == 400
+
+
+class TestMutationHandlersWriteThrough:
+    def test_created_users_are_added(self, environment):
+        body = {"username": "new@example.com", "email": "new@example.com", "password": PASSWORD,
+                "firstName": "New", "lastName": "Hire", "role": "doctor"}
+
+        response = create_cognito_user.lambda_handler(api_event("POST", body=body), {})
+
+        assert response["statusCode"] == 200
+        assert directory_item("new@example.com")["lastName"] == "Hire"
+
+    def test_disabled_users_are_marked(self, staff):
+        response = disable_user.lambda_handler(api_event("POST", {"username": "alan@example.com"}), {})
+
+        assert response["statusCode"] == 200
+        assert directory_item("alan@example.com")["enabled"] is False
+
+    def test_deleted_users_are_removed(self, staff):
+        response = delete_user.lambda_handler(api_event("DELETE", {"username": "joan@example.com"}), {})
+
+        assert response["statusCode"] == 200
+        assert directory_item("joan@example.com") is None
+
+    def test_update_maps_usernames_to_emails_and_saves_the_result(self, staff):
+        staff["table"].put_item(Item={**directory_item("ada@example.com"), "id": "ada-sub"})
+
+        response = update_user.lambda_handler(api_event("PUT", {"userId": "ada-sub"}, {"role": "admin"}), {})
+
+        assert response["statusCode"] == 200
+        assert directory_item("ada@example.com")["role"] == "admin"
+
+    def test_update_asks_cognito_until_reconciled(self, environment):
+        environment["cognito"].admin_create_user(
+            UserPoolId=environment["user_pool_id"], Username="ada", MessageAction="SUPPRESS",
+            UserAttributes=[{"Name": "email", "Value": "ada@example.com"}])
+
+        response = update_user.lambda_handler(api_event("PUT", {"userId": "ada"}, {"role": "admin"}), {})
+
+        assert response["statusCode"] == 200
+        assert json.loads(response["body"])["role"] == "admin"
+
+    def test_update_asks_cognito_for_users_missing_from_the_directory(self, staff):
+        staff["cognito"].admin_create_user(
+            UserPoolId=staff["user_pool_id"], Username="late", MessageAction="SUPPRESS",
+            UserAttributes=[{"Name": "email", "Value": "late@example.com"}])
+
+        response = update_user.lambda_handler(api_event("PUT", {"userId": "late"}, {"role": "doctor"}), {})
+        missing = update_user.lambda_handler(api_event("PUT", {"userId": "nobody"}, {"role": "doctor"}), {})
+
+        assert response["statusCode"] == 200
+        assert missing["statusCode"] == 404
+
+    def test_users_missing_from_the_directory_are_left_for_reconciliation(self, environment):
+        assert not user_directory.update_user_fields("nobody@example.com", enabled=False)
+        assert directory_item("nobody@example.com") is None
+
+
+class TestSyncTrigger:
+    def trigger(self, source, username, attributes):
+        event = {"triggerSource": source, "userName": username, "request": {"userAttributes": attributes},
+                 "response": {}}
+        assert sync_user_directory.lambda_handler(event, None) is event
+
+    def test_confirmed_sign_ups_are_added(self, environment):
+        self.trigger("PostConfirmation_ConfirmSignUp", "sub-1",
+                     {"sub": "sub-1", "email": "Self@Example.com", "given_name": "Self", "family_name": "Signup"})
+
+        item = directory_item("sub-1")
+        assert (item["email"], item["role"], item["enabled"]) == ("self@example.com", "user", True)
+        assert user_directory.find_username("self@example.com") == "sub-1"
+
+    def test_sign_ins_refresh_attributes(self, staff):
+        self.trigger("PostAuthentication_Authentication", "ada@example.com",
+                     {"email": "ada@example.com", "family_name": "King"})
+
+        item = directory_item("ada@example.com")
+        assert (item["lastName"], item["firstName"], item["role"]) == ("King", "Ada", "doctor")
+        assert item["sortName"].startswith("king ada")
+
+    def test_directory_errors_do_not_block_sign_in(self, environment, monkeypatch):
+        monkeypatch.setenv("USER_DIRECTORY_TABLE", "missing-table")
+
+        self.trigger("PostConfirmation_ConfirmSignUp", "sub-2", {"email": "x@example.com"})
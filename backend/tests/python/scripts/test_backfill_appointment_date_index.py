@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../scripts')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import boto3
+import pytest
+from moto import mock_aws
+
+from backfill_appointment_date_index import backfill_appointment_date_index
+from utils import db_utils
+
+TEST_APPOINTMENTS_TABLE_NAME = "clinnet-appointments-test-backfill"
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def appointments_table(aws_credentials):
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_APPOINTMENTS_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        table.put_item(Item={"id": "legacy-date", "date": "2024-07-01", "status": "scheduled"})
+        table.put_item(Item={"id": "legacy-start", "start": "2025-05-14T09:00:00Z"})
+        table.put_item(Item={"id": "no-date", "status": "scheduled"})
+        table.put_item(Item={
+            "id": "current", "date": "2024-07-02",
+            "entityType": "APPOINTMENT_ENTITY", "appointmentDate": "2024-07-02"
+        })
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+class TestBackfillAppointmentDateIndex:
+    def test_sets_index_keys_on_rows_missing_them(self, appointments_table):
+        counts = backfill_appointment_date_index(TEST_APPOINTMENTS_TABLE_NAME)
+
+        assert counts["updated"] == 2
+        assert counts["skipped"] == 1
+        assert appointments_table.get_item(Key={"id": "legacy-date"})["Item"] == {
+            "id": "legacy-date", "date": "2024-07-01", "status": "scheduled",
+            "entityType": "APPOINTMENT_ENTITY", "appointmentDate": "2024-07-01"
+        }
+        assert appointments_table.get_item(Key={"id": "legacy-start"})["Item"]["appointmentDate"] == "2025-05-14"
+        assert "entityType" not in appointments_table.get_item(Key={"id": "no-date"})["Item"]
+
+    def test_is_idempotent(self, appointments_table):
+        backfill_appointment_date_index(TEST_APPOINTMENTS_TABLE_NAME)
+
+        counts = backfill_appointment_date_index(TEST_APPOINTMENTS_TABLE_NAME)
+
+        assert counts["updated"] == 0
+        assert counts["skipped"] == 1
+
+    def test_dry_run_writes_nothing(self, appointments_table):
+        counts = backfill_appointment_date_index(TEST_APPOINTMENTS_TABLE_NAME, dry_run=True)
+
+        assert counts["updated"] == 2
+        assert "entityType" not in appointments_table.get_item(Key={"id": "legacy-date"})["Item"]
@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../scripts')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import json
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import backfill_profile_image_thumbnails as backfill
+from utils import aws_clients, profile_images
+
+TEST_BUCKET_NAME = "clinnet-documents-test-thumbnail-backfill"
+PROCESSOR = "clinnet-process-profile-image-test"
+
+
+class FakeLambdaClient:
+    def __init__(self):
+        self.payloads = []
+
+    def invoke(self, **kwargs):
+        assert kwargs["FunctionName"] == PROCESSOR
+        assert kwargs["InvocationType"] == "Event"
+        self.payloads.append(json.loads(kwargs["Payload"]))
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def environment(aws_credentials, monkeypatch):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=TEST_BUCKET_NAME)
+        cognito = boto3.client("cognito-idp", region_name="us-east-1")
+        user_pool_id = cognito.create_user_pool(
+            PoolName="clinnet-user-pool-test-thumbnail-backfill",
+            Schema=[{"Name": "profile_image", "AttributeDataType": "String", "Mutable": True, "Required": False}]
+        )["UserPool"]["Id"]
+        images = {
+            "pending@example.com": "profile-images/sub-1/aaaa.png",
+            "rendered@example.com": "profile-images/sub-2/bbbb.png",
+            "odd@example.com": "uploads/sub-3/cccc.png",
+            "none@example.com": None,
+        }
+        for username, key in images.items():
+            attributes = [{"Name": profile_images.PROFILE_IMAGE_ATTRIBUTE, "Value": key}] if key else []
+            cognito.admin_create_user(UserPoolId=user_pool_id, Username=username, MessageAction="SUPPRESS",
+                                      UserAttributes=attributes)
+        for key in profile_images.variant_keys(images["rendered@example.com"]):
+            s3.put_object(Bucket=TEST_BUCKET_NAME, Key=key, Body=b"thumbnail")
+        lambda_client = FakeLambdaClient()
+        real_get_client = aws_clients.get_client
+        monkeypatch.setattr(backfill, "get_client",
+                            lambda service: lambda_client if service == "lambda" else real_get_client(service))
+        yield {"user_pool_id": user_pool_id, "lambda": lambda_client}
+
+
+class TestBackfillProfileImageThumbnails:
+    def test_requests_thumbnails_for_images_without_them(self, environment):
+        counts = backfill.backfill_profile_image_thumbnails(environment["user_pool_id"], TEST_BUCKET_NAME, PROCESSOR)
+
+        assert counts == {"users": 3, "requested": 1, "rendered": 1, "skipped": 1, "failed": 0}
+        assert environment["lambda"].payloads == [{"bucket": TEST_BUCKET_NAME, "key": "profile-images/sub-1/aaaa.png"}]
+
+    def test_dry_run_invokes_nothing(self, environment):
+        counts = backfill.backfill_profile_image_thumbnails(
+            environment["user_pool_id"], TEST_BUCKET_NAME, PROCESSOR, dry_run=True)
+
+        assert counts["requested"] == 1
+        assert environment["lambda"].payloads == []
@@ -0,0 +1,134 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../scripts')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import synthetic_data
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+@pytest.fixture
+def dynamodb_client(aws_credentials):
+    with mock_aws():
+        yield boto3.client("dynamodb", region_name="us-east-1")
+
+
+def generate(dataset, counts, seed=synthetic_data.DEFAULT_SEED):
+    return list(synthetic_data.generate_dataset(dataset, counts, seed))
+
+
+class TestGenerators:
+    def test_same_seed_same_records(self):
+        counts = synthetic_data.default_counts(200)
+        for dataset in synthetic_data.DATASETS:
+            assert generate(dataset, counts) == generate(dataset, counts)
+        assert generate("patients", counts, seed=1) != generate("patients", counts, seed=2)
+
+    def test_datasets_do_not_depend_on_each_others_counts(self):
+        counts = synthetic_data.default_counts(200)
+        more_appointments = dict(counts, appointments=counts["appointments"] * 2)
+
+        assert generate("patients", counts) == generate("patients", more_appointments)
+        assert generate("appointments", counts) == generate("appointments", more_appointments)[:counts["appointments"]]
+
+    def test_counts_and_references(self):
+        counts = synthetic_data.default_counts(400)
+        patient_ids = {item["id"] for item in generate("patients", counts)}
+        services = {item["id"]: item for item in generate("services", counts)}
+        doctor_ids = {synthetic_data.make_id("doctors", index) for index in range(counts["doctors"])}
+
+        appointments = generate("appointments", counts)
+        billing = generate("billing", counts)
+        reports = generate("reports", counts)
+
+        assert len(patient_ids) == counts["patients"]
+        assert len({item["id"] for item in appointments}) == counts["appointments"]
+        assert {item["patientId"] for item in appointments} <= patient_ids
+        assert {item["doctorId"] for item in appointments} <= doctor_ids
+        assert {item["patientId"] for item in reports} <= patient_ids
+        for bill in billing:
+            assert bill["total"] == bill["subtotal"] + bill["tax"]
+            for line in bill["items"]:
+                assert line["unitPrice"] == services[line["serviceId"]]["price"]
+
+    def test_appointments_are_skewed_by_doctor_and_weekday(self):
+        counts = dict(synthetic_data.default_counts(2000), doctors=10)
+        appointments = generate("appointments", counts)
+
+        per_doctor = Counter(item["doctorId"] for item in appointments)
+        per_weekday = Counter(date.fromisoformat(item["date"]).weekday() for item in appointments)
+
+        busiest, quietest = per_doctor.most_common()[0][1], per_doctor.most_common()[-1][1]
+        assert busiest > 3 * quietest
+        assert per_weekday[0] > per_weekday[4] > per_weekday[5] > per_weekday[6]
+        assert all(item["appointmentDate"] == item["date"] for item in appointments)
+
+
+class TestJsonl:
+    def test_round_trip_keeps_decimals(self, tmp_path):
+        billing = generate("billing", synthetic_data.default_counts(50))
+        path = tmp_path / "billing.jsonl"
+
+        assert synthetic_data.write_jsonl(billing, path) == len(billing)
+
+        loaded = list(synthetic_data.read_jsonl(path))
+        assert loaded == billing
+        assert isinstance(loaded[0]["total"], Decimal)
+
+
+class TestLoad:
+    def test_batch_write_into_created_tables(self, dynamodb_client):
+        counts = synthetic_data.default_counts(60)
+        names = synthetic_data.table_names("synthetic-test")
+        synthetic_data.create_tables(dynamodb_client, names)
+
+        for dataset in synthetic_data.DATASETS:
+            written = synthetic_data.batch_write(dynamodb_client, names[dataset], generate(dataset, counts))
+            assert written == counts[dataset]
+            assert dynamodb_client.scan(TableName=names[dataset], Select="COUNT")["Count"] == counts[dataset]
+
+        item = dynamodb_client.get_item(TableName=names["patients"],
+                                        Key={"PK": {"S": "PATIENT#pat-0000000"}, "SK": {"S": "METADATA"}})["Item"]
+        assert item["type"] == {"S": "patient"}
+
+    def test_unprocessed_items_are_retried(self, monkeypatch):
+        monkeypatch.setattr(synthetic_data, "BATCH_WRITE_BASE_DELAY_SECONDS", 0)
+
+        class FlakyClient:
+            def __init__(self):
+                self.calls = []
+
+            def batch_write_item(self, RequestItems):
+                self.calls.append(len(RequestItems["things"]))
+                if len(self.calls) == 1:
+                    return {"UnprocessedItems": {"things": RequestItems["things"][:3]}}
+                return {"UnprocessedItems": {}}
+
+        client = FlakyClient()
+
+        assert synthetic_data.batch_write(client, "things", ({"id": str(i)} for i in range(30))) == 30
+        assert client.calls == [25, 3, 5]
+
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        monkeypatch.setattr(synthetic_data, "BATCH_WRITE_BASE_DELAY_SECONDS", 0)
+        monkeypatch.setattr(synthetic_data, "BATCH_WRITE_MAX_RETRIES", 2)
+
+        class ThrottledClient:
+            def batch_write_item(self, RequestItems):
+                return {"UnprocessedItems": RequestItems}
+
+        with pytest.raises(RuntimeError):
+            synthetic_data.batch_write(ThrottledClient(), "things", [{"id": "1"}])
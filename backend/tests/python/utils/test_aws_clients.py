@@ -0,0 +1,67 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import boto3
+import pytest
+
+from utils import aws_clients
+
+
+@pytest.fixture
+def aws_region(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.delenv("AWS_REGION", raising=False)
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+
+class TestClientRegistry:
+    def test_client_is_created_once_per_service_and_region(self, aws_region, monkeypatch):
+        created = []
+        original_client = boto3.client
+
+        def counting_client(service_name, *args, **kwargs):
+            created.append((service_name, kwargs.get("region_name")))
+            return original_client(service_name, *args, **kwargs)
+
+        monkeypatch.setattr(boto3, "client", counting_client)
+
+        first = aws_clients.get_client("s3")
+        second = aws_clients.get_client("s3")
+
+        assert first is second
+        assert created == [("s3", "us-east-1")]
+
+    def test_regions_and_services_are_cached_separately(self, aws_region):
+        default_region = aws_clients.get_client("s3")
+
+        assert aws_clients.get_client("s3", region_name="eu-west-1") is not default_region
+        assert aws_clients.get_client("s3", region_name="eu-west-1").meta.region_name == "eu-west-1"
+        assert aws_clients.get_client("cognito-idp") is not default_region
+
+    def test_aws_region_takes_precedence_over_default_region(self, aws_region, monkeypatch):
+        monkeypatch.setenv("AWS_REGION", "ap-southeast-2")
+
+        assert aws_clients.get_client("s3").meta.region_name == "ap-southeast-2"
+
+    def test_resource_is_cached(self, aws_region):
+        resource = aws_clients.get_resource("dynamodb")
+
+        assert aws_clients.get_resource("dynamodb") is resource
+        assert resource.meta.client.meta.region_name == "us-east-1"
+
+    def test_clients_use_tuned_config(self, aws_region):
+        config = aws_clients.get_client("dynamodb").meta.config
+
+        assert config.max_pool_connections == aws_clients.MAX_POOL_CONNECTIONS
+        assert config.tcp_keepalive is True
+        assert config.retries["mode"] == "adaptive"
+
+    def test_clear_cache_forces_new_clients(self, aws_region):
+        client = aws_clients.get_client("s3")
+        resource = aws_clients.get_resource("dynamodb")
+
+        aws_clients.clear_cache()
+
+        assert aws_clients.get_client("s3") is not client
+        assert aws_clients.get_resource("dynamodb") is not resource
@@ -0,0 +1,139 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import base64
+import gzip
+import json
+import zlib
+import pytest
+
+from utils import compression, db_utils
+from utils.responser_helper import build_error_response
+
+
+def request(accept_encoding=None, header="Accept-Encoding", accept="application/json"):
+    headers = {header: accept_encoding} if accept_encoding else {}
+    if accept:
+        headers["Accept"] = accept
+    return {"httpMethod": "GET", "headers": headers}
+
+
+def large_list(count=200):
+    return [{"id": f"p{i:04d}", "firstName": "Jane", "lastName": "Doe", "status": "active"} for i in range(count)]
+
+
+class FakeBrotli:
+    @staticmethod
+    def compress(data, quality):
+        return b"br:" + zlib.compress(data)
+
+
+@pytest.fixture
+def no_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "_brotli", False)
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "_brotli", FakeBrotli)
+
+
+class TestChooseEncoding:
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("gzip;q=0", None),
+        ("deflate", None),
+        ("*", "br"),
+        ("*, br;q=0", "gzip"),
+        ("GZIP; q=0.5", "gzip"),
+    ])
+    def test_negotiation(self, with_brotli, header, expected):
+        assert compression.choose_encoding(header) == expected
+
+    def test_br_is_skipped_without_the_brotli_package(self, no_brotli):
+        assert compression.choose_encoding("br, gzip") == "gzip"
+        assert compression.choose_encoding("br") is None
+
+
+class TestCompressResponse:
+    def test_large_body_is_gzipped_and_base64_encoded(self, no_brotli):
+        response = db_utils.generate_response(200, large_list())
+
+        compressed = compression.compress_response(request("gzip, deflate"), response)
+
+        assert compressed["isBase64Encoded"] is True
+        assert compressed["headers"]["Content-Encoding"] == "gzip"
+        assert compressed["headers"]["Vary"] == "Accept-Encoding"
+        assert compressed["headers"]["ETag"] == "W/" + response["headers"]["ETag"]
+        assert gzip.decompress(base64.b64decode(compressed["body"])).decode("utf-8") == response["body"]
+        assert len(compressed["body"]) * 5 < len(response["body"])
+        assert "isBase64Encoded" not in response
+
+    def test_brotli_is_preferred_when_available(self, with_brotli):
+        compressed = compression.compress_response(request("gzip, br"), db_utils.generate_response(200, large_list()))
+
+        assert compressed["headers"]["Content-Encoding"] == "br"
+        assert base64.b64decode(compressed["body"]).startswith(b"br:")
+
+    def test_lowercase_header_is_honoured(self, no_brotli):
+        compressed = compression.compress_response(request("gzip", "accept-encoding"), db_utils.generate_response(200, large_list()))
+
+        assert compressed["headers"]["Content-Encoding"] == "gzip"
+
+    def test_small_bodies_and_clients_without_gzip_are_untouched(self, no_brotli):
+        small = db_utils.generate_response(200, {"id": "p1"})
+        large = db_utils.generate_response(200, large_list())
+
+        assert compression.compress_response(request("gzip"), small) is small
+        assert compression.compress_response(request(), large) is large
+        assert compression.compress_response(request("identity"), large) is large
+
+    @pytest.mark.parametrize("accept", [None, "*/*", "text/html, application/json", "text/plain;q=1, */*"])
+    def test_clients_api_gateway_would_not_decode_for_are_untouched(self, no_brotli, accept):
+        # API Gateway only turns a base64 body back into bytes when the first Accept type is binary
+        large = db_utils.generate_response(200, large_list())
+
+        assert compression.compress_response(request("gzip", accept=accept), large) is large
+
+    @pytest.mark.parametrize("accept", ["application/json", "Application/JSON;q=0.9", "application/json, text/plain, */*"])
+    def test_json_first_accept_headers_are_compressed(self, no_brotli, accept):
+        compressed = compression.compress_response(request("gzip", accept=accept), db_utils.generate_response(200, large_list()))
+
+        assert compressed["isBase64Encoded"] is True
+
+    def test_threshold_can_be_overridden(self, no_brotli):
+        small = db_utils.generate_response(200, {"id": "p1"})
+
+        assert compression.compress_response(request("gzip"), small, min_bytes=0)["isBase64Encoded"] is True
+
+    def test_error_responses_are_compressed_too(self, no_brotli):
+        response = build_error_response(500, "Internal Server Error", "x" * 2000, "http://localhost:5173")
+
+        compressed = compression.compress_response(request("gzip"), response)
+
+        assert compressed["statusCode"] == 500
+        assert json.loads(gzip.decompress(base64.b64decode(compressed["body"])))["message"] == "x" * 2000
+        assert compressed["headers"]["Access-Control-Allow-Origin"] == "http://localhost:5173"
+
+    def test_already_encoded_bodies_are_left_alone(self, no_brotli):
+        binary = {"statusCode": 200, "headers": {}, "body": "a" * 5000, "isBase64Encoded": True}
+        encoded = {"statusCode": 200, "headers": {"Content-Encoding": "gzip"}, "body": "a" * 5000}
+        not_modified = {"statusCode": 304, "headers": {"ETag": '"x"'}, "body": ""}
+
+        for response in (binary, encoded, not_modified):
+            assert compression.compress_response(request("gzip"), response) is response
+
+    def test_decorator_wraps_every_response(self, no_brotli):
+        @compression.compress_responses
+        def lambda_handler(event, context):
+            """Handler docstring."""
+            return {"statusCode": 200, "headers": {"Vary": "Origin"}, "body": json.dumps(large_list())}
+
+        response = lambda_handler(request("gzip"), None)
+
+        assert response["headers"]["Vary"] == "Origin, Accept-Encoding"
+        assert lambda_handler.__doc__ == "Handler docstring."
@@ -0,0 +1,583 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import json
+import boto3
+import pytest
+from moto import mock_aws
+from unittest.mock import patch
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from datetime import date, datetime
+from decimal import Decimal
+
+from utils import db_utils
+
+TEST_TABLE_NAME = "clinnet-db-utils-test"
+
+
+@pytest.fixture(scope="function")
+def aws_credentials():
+    os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+    os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+    os.environ["AWS_SECURITY_TOKEN"] = "testing"
+    os.environ["AWS_SESSION_TOKEN"] = "testing"
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+
+
+@pytest.fixture(scope="function")
+def pk_sk_table(aws_credentials):
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_TABLE_NAME,
+            KeySchema=[
+                {"AttributeName": "PK", "KeyType": "HASH"},
+                {"AttributeName": "SK", "KeyType": "RANGE"}
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "PK", "AttributeType": "S"},
+                {"AttributeName": "SK", "AttributeType": "S"}
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+def count_calls(operation_names):
+    """Register a botocore hook on the shared resource and count calls per operation."""
+    counts = {name: 0 for name in operation_names}
+
+    def _count(model, **kwargs):
+        if model.name in counts:
+            counts[model.name] += 1
+
+    client = db_utils.get_dynamodb_resource().meta.client
+    client.meta.events.register('before-call.dynamodb', _count)
+    return counts
+
+
+class TestBatchGetItems:
+    def test_returns_found_items_and_skips_missing(self, pk_sk_table):
+        pk_sk_table.put_item(Item={"PK": "PATIENT#1", "SK": "METADATA", "firstName": "Ada"})
+        pk_sk_table.put_item(Item={"PK": "PATIENT#2", "SK": "METADATA", "firstName": "Alan"})
+
+        items = db_utils.batch_get_items(TEST_TABLE_NAME, [
+            {"PK": "PATIENT#1", "SK": "METADATA"},
+            {"PK": "PATIENT#2", "SK": "METADATA"},
+            {"PK": "PATIENT#404", "SK": "METADATA"}
+        ])
+
+        assert sorted(item["firstName"] for item in items) == ["Ada", "Alan"]
+
+    def test_dedupes_and_chunks_keys(self, pk_sk_table):
+        with pk_sk_table.batch_writer() as batch:
+            for i in range(250):
+                batch.put_item(Item={"PK": f"PATIENT#{i}", "SK": "METADATA"})
+        counts = count_calls(["BatchGetItem"])
+
+        keys = [{"PK": f"PATIENT#{i}", "SK": "METADATA"} for i in range(250)]
+        items = db_utils.batch_get_items(TEST_TABLE_NAME, keys + keys)
+
+        assert len(items) == 250
+        assert counts["BatchGetItem"] == 3
+
+    def test_projection_expression_is_applied(self, pk_sk_table):
+        pk_sk_table.put_item(Item={"PK": "PATIENT#1", "SK": "METADATA", "firstName": "Ada", "ssn": "secret"})
+
+        items = db_utils.batch_get_items(
+            TEST_TABLE_NAME,
+            [{"PK": "PATIENT#1", "SK": "METADATA"}],
+            projection_expression="PK, firstName"
+        )
+
+        assert items == [{"PK": "PATIENT#1", "firstName": "Ada"}]
+
+    def test_retries_unprocessed_keys(self, pk_sk_table):
+        responses = [
+            {
+                "Responses": {TEST_TABLE_NAME: [{"PK": "PATIENT#1"}]},
+                "UnprocessedKeys": {TEST_TABLE_NAME: {"Keys": [{"PK": "PATIENT#2", "SK": "METADATA"}]}}
+            },
+            {
+                "Responses": {TEST_TABLE_NAME: [{"PK": "PATIENT#2"}]},
+                "UnprocessedKeys": {}
+            }
+        ]
+        resource = db_utils.get_dynamodb_resource()
+
+        with patch.object(resource, "batch_get_item", side_effect=responses) as mock_batch_get, \
+                patch.object(db_utils.time, "sleep") as mock_sleep:
+            items = db_utils.batch_get_items(TEST_TABLE_NAME, [
+                {"PK": "PATIENT#1", "SK": "METADATA"},
+                {"PK": "PATIENT#2", "SK": "METADATA"}
+            ])
+
+        assert [item["PK"] for item in items] == ["PATIENT#1", "PATIENT#2"]
+        assert mock_batch_get.call_count == 2
+        retry_request = mock_batch_get.call_args_list[1].kwargs["RequestItems"]
+        assert retry_request == {TEST_TABLE_NAME: {"Keys": [{"PK": "PATIENT#2", "SK": "METADATA"}]}}
+        mock_sleep.assert_called_once()
+
+    def test_gives_up_after_max_retries(self, pk_sk_table):
+        stuck = {
+            "Responses": {TEST_TABLE_NAME: []},
+            "UnprocessedKeys": {TEST_TABLE_NAME: {"Keys": [{"PK": "PATIENT#1", "SK": "METADATA"}]}}
+        }
+        resource = db_utils.get_dynamodb_resource()
+
+        with patch.object(resource, "batch_get_item", return_value=stuck) as mock_batch_get, \
+                patch.object(db_utils.time, "sleep"):
+            items = db_utils.batch_get_items(TEST_TABLE_NAME, [{"PK": "PATIENT#1", "SK": "METADATA"}])
+
+        assert items == []
+        assert mock_batch_get.call_count == db_utils.BATCH_GET_MAX_RETRIES + 1
+
+    def test_empty_keys_makes_no_calls(self, pk_sk_table):
+        counts = count_calls(["BatchGetItem"])
+
+        assert db_utils.batch_get_items(TEST_TABLE_NAME, []) == []
+        assert counts["BatchGetItem"] == 0
+
+
+@pytest.fixture(scope="function")
+def indexed_table(aws_credentials):
+    with mock_aws():
+        db_utils.DYNAMODB_RESOURCE = None
+        dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+        table = dynamodb.create_table(
+            TableName=TEST_TABLE_NAME,
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[
+                {"AttributeName": "id", "AttributeType": "S"},
+                {"AttributeName": "patientId", "AttributeType": "S"}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    "IndexName": "PatientIdIndex",
+                    "KeySchema": [{"AttributeName": "patientId", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"}
+                }
+            ],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        yield table
+        db_utils.DYNAMODB_RESOURCE = None
+
+
+class TestQueryTable:
+    def test_query_index_returns_matching_items(self, indexed_table):
+        indexed_table.put_item(Item={"id": "a1", "patientId": "P1"})
+        indexed_table.put_item(Item={"id": "a2", "patientId": "P2"})
+        indexed_table.put_item(Item={"id": "a3", "patientId": "P1"})
+
+        items = list(db_utils.query_index(TEST_TABLE_NAME, "PatientIdIndex", Key("patientId").eq("P1")))
+
+        assert sorted(item["id"] for item in items) == ["a1", "a3"]
+
+    def test_pages_are_fetched_lazily(self, indexed_table):
+        with indexed_table.batch_writer() as batch:
+            for i in range(5):
+                batch.put_item(Item={"id": f"a{i}", "patientId": "P1"})
+        counts = count_calls(["Query", "Scan"])
+
+        results = db_utils.query_index(TEST_TABLE_NAME, "PatientIdIndex", Key("patientId").eq("P1"), Limit=2)
+        assert counts["Query"] == 0
+
+        first_two = [next(results), next(results)]
+        assert counts["Query"] == 1
+
+        remaining = list(results)
+        assert len(first_two) + len(remaining) == 5
+        assert counts["Query"] == 3
+        assert counts["Scan"] == 0
+
+
+class TestIterScan:
+    def test_yields_items_one_page_at_a_time(self, pk_sk_table):
+        with pk_sk_table.batch_writer() as batch:
+            for i in range(5):
+                batch.put_item(Item={"PK": f"PATIENT#{i}", "SK": "METADATA"})
+        counts = count_calls(["Scan"])
+
+        results = db_utils.iter_scan(TEST_TABLE_NAME, Limit=2)
+        assert counts["Scan"] == 0
+
+        next(results)
+        assert counts["Scan"] == 1
+
+        assert len(list(results)) == 4
+        assert counts["Scan"] == 3
+
+    def test_projection_expression_is_passed_through(self, pk_sk_table):
+        pk_sk_table.put_item(Item={"PK": "PATIENT#1", "SK": "METADATA", "firstName": "Ada", "notes": "x" * 100})
+
+        items = list(db_utils.iter_scan(TEST_TABLE_NAME, ProjectionExpression="PK, firstName"))
+
+        assert items == [{"PK": "PATIENT#1", "firstName": "Ada"}]
+
+    def test_stats_accumulate_pages_counts_and_capacity(self, pk_sk_table):
+        with pk_sk_table.batch_writer() as batch:
+            for i in range(5):
+                batch.put_item(Item={"PK": f"PATIENT#{i}", "SK": "METADATA"})
+        stats = {}
+
+        items = list(db_utils.iter_scan(TEST_TABLE_NAME, stats=stats, Limit=2))
+
+        assert len(items) == 5
+        assert stats["Pages"] == 3
+        assert stats["Count"] == 5
+        assert stats["ScannedCount"] == 5
+        assert stats["ConsumedCapacityUnits"] > 0
+
+    def test_iter_query_fills_stats(self, indexed_table):
+        indexed_table.put_item(Item={"id": "a1", "patientId": "P1"})
+        indexed_table.put_item(Item={"id": "a2", "patientId": "P2"})
+        stats = {}
+
+        items = list(db_utils.iter_query(
+            TEST_TABLE_NAME,
+            stats=stats,
+            IndexName="PatientIdIndex",
+            KeyConditionExpression=Key("patientId").eq("P1")
+        ))
+
+        assert [item["id"] for item in items] == ["a1"]
+        assert stats["Count"] == 1
+        assert stats["Pages"] == 1
+
+    def test_count_items_uses_select_count(self, pk_sk_table):
+        with pk_sk_table.batch_writer() as batch:
+            for i in range(7):
+                batch.put_item(Item={"PK": f"PATIENT#{i}", "SK": "METADATA"})
+        selects = []
+
+        def _record(params, **kwargs):
+            selects.append(params.get("Select"))
+
+        db_utils.get_dynamodb_resource().meta.client.meta.events.register(
+            'before-parameter-build.dynamodb.Scan', _record)
+
+        assert db_utils.count_items(TEST_TABLE_NAME) == 7
+        assert selects == ["COUNT"]
+
+    def test_scan_table_still_returns_a_list(self, pk_sk_table):
+        pk_sk_table.put_item(Item={"PK": "PATIENT#1", "SK": "METADATA"})
+
+        assert db_utils.scan_table(TEST_TABLE_NAME) == [{"PK": "PATIENT#1", "SK": "METADATA"}]
+
+
+class TestGenerateListResponse:
+    def test_body_matches_generate_response(self):
+        items = [{"id": "s1", "price": Decimal("10.5"), "qty": Decimal("2")}, {"id": "s2", "tags": []}]
+
+        streamed = db_utils.generate_list_response(200, iter(items))
+        buffered = db_utils.generate_response(200, items)
+
+        assert streamed == buffered
+        assert json.loads(streamed["body"]) == [{"id": "s1", "price": 10.5, "qty": 2}, {"id": "s2", "tags": []}]
+
+    def test_empty_iterable_renders_empty_list(self):
+        assert db_utils.generate_list_response(200, iter([]))["body"] == "[]"
+
+
+class TestConditionalResponse:
+    def _get(self, if_none_match=None, header="If-None-Match"):
+        return {"httpMethod": "GET", "headers": {header: if_none_match} if if_none_match else {}}
+
+    def test_etag_depends_only_on_the_body(self):
+        first = db_utils.generate_response(200, {"id": "p1", "age": Decimal("40")})
+        same = db_utils.generate_list_response(200, iter([{"id": "p1"}]))
+        changed = db_utils.generate_response(200, {"id": "p1", "age": Decimal("41")})
+
+        assert first["headers"]["ETag"] == db_utils.generate_response(200, {"id": "p1", "age": 40})["headers"]["ETag"]
+        assert same["headers"]["ETag"] == db_utils.generate_response(200, [{"id": "p1"}])["headers"]["ETag"]
+        assert first["headers"]["ETag"] != changed["headers"]["ETag"]
+
+    def test_only_200_responses_get_an_etag(self):
+        assert "ETag" not in db_utils.generate_response(201, {"id": "p1"})["headers"]
+
+    @pytest.mark.parametrize("header", ["If-None-Match", "if-none-match"])
+    def test_matching_if_none_match_returns_304_without_a_body(self, header):
+        response = db_utils.generate_response(200, {"id": "p1"})
+        etag = response["headers"]["ETag"]
+
+        not_modified = db_utils.conditional_response(self._get(f'"other", W/{etag}', header), response)
+
+        assert not_modified["statusCode"] == 304
+        assert not_modified["body"] == ""
+        assert not_modified["headers"]["ETag"] == etag
+        assert not_modified["headers"]["Access-Control-Allow-Origin"] == "*"
+
+    def test_stale_or_missing_validator_returns_the_full_response(self):
+        response = db_utils.generate_response(200, {"id": "p1"})
+
+        assert db_utils.conditional_response(self._get('"stale"'), response) is response
+        assert db_utils.conditional_response(self._get(), response) is response
+        assert db_utils.conditional_response({"headers": None}, response) is response
+
+    def test_wildcard_matches_any_etag(self):
+        response = db_utils.generate_response(200, [])
+
+        assert db_utils.conditional_response(self._get("*"), response)["statusCode"] == 304
+
+    def test_error_responses_are_never_304(self):
+        response = db_utils.generate_response(404, {"message": "missing"})
+
+        assert db_utils.conditional_response(self._get("*"), response) is response
+
+
+class TestParallelScan:
+    def _seed(self, table, count):
+        with table.batch_writer() as batch:
+            for i in range(count):
+                batch.put_item(Item={"PK": f"PATIENT#{i}", "SK": "METADATA", "n": i})
+
+    @pytest.mark.parametrize("total_segments", [1, 4, 8])
+    def test_returns_every_item_exactly_once(self, pk_sk_table, total_segments):
+        self._seed(pk_sk_table, 60)
+        stats = {}
+
+        items = list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=total_segments, stats=stats))
+
+        assert sorted(item["n"] for item in items) == list(range(60))
+        assert stats["Count"] == 60
+        assert stats["Segments"] == total_segments
+        assert stats["Throttles"] == 0
+
+    def test_each_segment_is_scanned_separately(self, pk_sk_table):
+        self._seed(pk_sk_table, 10)
+        segments = []
+
+        def _record(params, **kwargs):
+            segments.append((params.get("Segment"), params.get("TotalSegments")))
+
+        db_utils.get_dynamodb_resource().meta.client.meta.events.register(
+            'before-parameter-build.dynamodb.Scan', _record)
+
+        list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=4))
+
+        assert sorted(segments) == [(0, 4), (1, 4), (2, 4), (3, 4)]
+
+    def test_ordered_and_unordered_merge_return_the_same_items(self, pk_sk_table):
+        self._seed(pk_sk_table, 40)
+
+        ordered = list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=4, ordered=True))
+        unordered = list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=4, ordered=False))
+
+        assert ordered == list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=4, ordered=True))
+        assert sorted(item["n"] for item in unordered) == sorted(item["n"] for item in ordered)
+
+    def test_select_count_yields_nothing_but_counts(self, pk_sk_table):
+        self._seed(pk_sk_table, 25)
+        stats = {}
+
+        assert list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=4, stats=stats, Select="COUNT")) == []
+        assert stats["Count"] == 25
+
+    def test_throttled_segment_is_retried(self, pk_sk_table):
+        self._seed(pk_sk_table, 20)
+        throttled = []
+
+        def _throttle_once(params, **kwargs):
+            if params.get("Segment") == 1 and not throttled:
+                throttled.append(True)
+                raise ClientError(
+                    {"Error": {"Code": "ProvisionedThroughputExceededException", "Message": "slow down"}}, "Scan")
+
+        db_utils.get_dynamodb_resource().meta.client.meta.events.register(
+            'before-parameter-build.dynamodb.Scan', _throttle_once)
+        stats = {}
+
+        with patch.object(db_utils.time, "sleep") as mock_sleep:
+            items = list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=2, stats=stats))
+
+        assert len(items) == 20
+        assert stats["Throttles"] == 1
+        mock_sleep.assert_called_once()
+
+    def test_non_throttling_errors_propagate(self, pk_sk_table):
+        with pytest.raises(ClientError):
+            list(db_utils.parallel_scan("missing-table", total_segments=2))
+
+    def test_rejects_zero_segments(self, pk_sk_table):
+        with pytest.raises(ValueError):
+            list(db_utils.parallel_scan(TEST_TABLE_NAME, total_segments=0))
+
+
+class TestFetchPage:
+    def _seed(self, table, count):
+        with table.batch_writer() as batch:
+            for i in range(count):
+                batch.put_item(Item={"PK": f"PATIENT#{i:03d}", "SK": "METADATA", "even": i % 2 == 0})
+
+    def test_pages_resume_exactly_where_the_previous_one_stopped(self, pk_sk_table):
+        self._seed(pk_sk_table, 23)
+        seen = []
+        start_key = None
+
+        while True:
+            items, start_key = db_utils.fetch_page(TEST_TABLE_NAME, 5, exclusive_start_key=start_key)
+            assert len(items) <= 5
+            seen.extend(item["PK"] for item in items)
+            if not start_key:
+                break
+
+        assert sorted(seen) == [f"PATIENT#{i:03d}" for i in range(23)]
+
+    def test_fills_the_page_behind_a_filter(self, pk_sk_table):
+        self._seed(pk_sk_table, 40)
+
+        items, last_key = db_utils.fetch_page(
+            TEST_TABLE_NAME, 5, FilterExpression=Attr("even").eq(True))
+
+        assert len(items) == 5
+        assert all(item["even"] for item in items)
+        assert last_key is not None
+
+    def test_stops_after_max_requests_with_a_resume_key(self, pk_sk_table):
+        self._seed(pk_sk_table, 40)
+        counts = count_calls(["Scan"])
+
+        items, last_key = db_utils.fetch_page(
+            TEST_TABLE_NAME, 5, max_requests=2, FilterExpression=Attr("PK").eq("nope"))
+
+        assert items == []
+        assert last_key is not None
+        assert counts["Scan"] == 2
+
+
+class TestDynamoDbConversion:
+    def test_to_dynamodb_converts_nested_floats_without_touching_other_types(self):
+        item = {
+            "id": "b1",
+            "paid": True,
+            "quantity": 3,
+            "items": [{"unitPrice": 0.1, "tags": ("a", "b")}],
+            "rates": {1.5, 2.25},
+            "avatar": b"\x89PNG",
+            "amount": Decimal("10.50"),
+            "notes": None
+        }
+
+        converted = db_utils.to_dynamodb(item)
+
+        assert converted == {
+            "id": "b1",
+            "paid": True,
+            "quantity": 3,
+            "items": [{"unitPrice": Decimal("0.1"), "tags": ["a", "b"]}],
+            "rates": {Decimal("1.5"), Decimal("2.25")},
+            "avatar": b"\x89PNG",
+            "amount": Decimal("10.50"),
+            "notes": None
+        }
+        assert type(converted["paid"]) is bool
+        assert item["items"][0]["unitPrice"] == 0.1
+
+    def test_to_dynamodb_matches_the_json_round_trip(self):
+        item = {"subtotal": 1234.56, "items": [{"price": 19.99, "qty": 2}, {"price": 1e-7, "qty": 1}]}
+
+        assert db_utils.to_dynamodb(item) == json.loads(json.dumps(item), parse_float=Decimal)
+
+    def test_to_dynamodb_serialises_datetimes(self):
+        converted = db_utils.to_dynamodb({"at": datetime(2024, 7, 1, 9, 30), "on": date(2024, 7, 1)})
+
+        assert converted == {"at": "2024-07-01T09:30:00", "on": "2024-07-01"}
+
+    def test_from_dynamodb_produces_json_types(self):
+        item = {
+            "total": Decimal("251"),
+            "unitPrice": Decimal("125.50"),
+            "items": [{"quantity": Decimal("2")}],
+            "tags": {"a"},
+            "avatar": b"\x00\x01"
+        }
+
+        converted = db_utils.from_dynamodb(item)
+
+        assert converted == {
+            "total": 251,
+            "unitPrice": 125.5,
+            "items": [{"quantity": 2}],
+            "tags": ["a"],
+            "avatar": "AAE="
+        }
+        assert type(converted["total"]) is int
+
+    def test_generate_response_body_matches_decimal_encoder(self, monkeypatch):
+        monkeypatch.setattr(db_utils, "_json_serializer", (db_utils._stdlib_dumps, ", "))
+        body = {"items": [{"price": Decimal("9.99"), "qty": Decimal("3")}], "total": Decimal("29.97")}
+
+        response = db_utils.generate_response(200, body)
+
+        assert response["body"] == json.dumps(body, cls=db_utils.DecimalEncoder)
+
+    def test_put_item_round_trips_floats_and_sets(self, pk_sk_table):
+        db_utils.put_item(TEST_TABLE_NAME, {
+            "PK": "BILLING#1", "SK": "METADATA", "total": 99.95, "codes": {"A1", "B2"},
+            "lines": [{"price": 49.975, "qty": 2}]
+        })
+
+        stored = pk_sk_table.get_item(Key={"PK": "BILLING#1", "SK": "METADATA"})["Item"]
+
+        assert stored["total"] == Decimal("99.95")
+        assert stored["codes"] == {"A1", "B2"}
+        assert stored["lines"] == [{"price": Decimal("49.975"), "qty": Decimal("2")}]
+
+    def test_update_params_convert_values(self):
+        params = db_utils._build_update_params({"id": "b1", "total": 10.5, "lines": [{"price": 0.5}]}, exclude_keys=["id"])
+
+        assert params["ExpressionAttributeValues"] == {":val0": Decimal("10.5"), ":val1": [{"price": Decimal("0.5")}]}
+
+
+class TestJsonSerializer:
+    DOCUMENT = {
+        "id": "p1",
+        "age": Decimal("42"),
+        "balance": Decimal("-12.50"),
+        "huge": Decimal("123456789012345678901234567890"),
+        "ratio": 0.25,
+        "tags": {"a"},
+        "history": [{"total": Decimal("1E+2"), "when": datetime(2024, 1, 2, 3, 4, 5)}],
+        "avatar": b"\x00\x01",
+        "name": "Zoë",
+        "active": True,
+        "notes": None
+    }
+
+    @pytest.fixture(params=["json", "orjson"])
+    def serializer(self, request, monkeypatch):
+        if request.param == "orjson":
+            pytest.importorskip("orjson")
+        monkeypatch.setattr(db_utils, "JSON_SERIALIZER", request.param)
+        monkeypatch.setattr(db_utils, "_json_serializer", None)
+        return request.param
+
+    def test_values_and_types_match_the_decimal_encoder(self, serializer):
+        expected = json.loads(json.dumps(db_utils.from_dynamodb(self.DOCUMENT)))
+
+        decoded = json.loads(db_utils.json_dumps(self.DOCUMENT))
+
+        assert decoded == expected
+        assert type(decoded["age"]) is int and type(decoded["history"][0]["total"]) is int
+        assert type(decoded["balance"]) is float
+        assert decoded["huge"] == 123456789012345678901234567890
+
+    def test_list_response_matches_buffered_response(self, serializer):
+        items = [{"id": "s1", "price": Decimal("10.5")}, {"id": "s2", "qty": Decimal("2")}]
+
+        assert db_utils.generate_list_response(200, iter(items)) == db_utils.generate_response(200, items)
+
+    def test_auto_prefers_orjson_when_installed(self, monkeypatch):
+        pytest.importorskip("orjson")
+        monkeypatch.setattr(db_utils, "JSON_SERIALIZER", "auto")
+        monkeypatch.setattr(db_utils, "_json_serializer", None)
+
+        assert db_utils.generate_response(200, {"a": Decimal("1"), "b": [1, 2]})["body"] == '{"a":1,"b":[1,2]}'
+
+    def test_unserializable_values_still_raise(self, serializer):
+        with pytest.raises(TypeError):
+            db_utils.json_dumps({"value": object()})
@@ -0,0 +1,256 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import json
+import pytest
+from moto import mock_aws
+
+from botocore.awsrequest import AWSResponse
+
+from utils import aws_clients, db_utils, metrics
+
+
+class FakeContext:
+    function_name = "clinnet-GetThingsFunction"
+    aws_request_id = "lambda-request-1"
+
+
+@pytest.fixture
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.delenv("AWS_REGION", raising=False)
+
+
+@pytest.fixture
+def things_table(aws_credentials):
+    with mock_aws():
+        table = aws_clients.get_resource("dynamodb").create_table(
+            TableName="things",
+            KeySchema=[{"AttributeName": "id", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "id", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        for i in range(3):
+            table.put_item(Item={"id": str(i)})
+        yield table
+
+
+def metric_lines(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{"_aws"')]
+
+
+def api_event(**extra):
+    event = {"httpMethod": "GET", "resource": "/things", "requestContext": {"requestId": "apigw-request-1"}}
+    event.update(extra)
+    return event
+
+
+class TestInstrumentHandler:
+    def test_writes_one_emf_line_per_invocation(self, capsys):
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            return {"statusCode": 200, "body": "x" * 10}
+
+        lambda_handler(api_event(body="abc"), FakeContext())
+
+        [line] = metric_lines(capsys)
+        [directive] = line["_aws"]["CloudWatchMetrics"]
+        assert directive["Namespace"] == metrics.METRICS_NAMESPACE
+        assert directive["Dimensions"] == [["Handler"]]
+        names = {metric["Name"]: metric["Unit"] for metric in directive["Metrics"]}
+        assert names["Duration"] == "Milliseconds"
+        assert names["ResponseBytes"] == "Bytes"
+        assert line["Handler"] == "test_metrics"
+        assert line["functionName"] == "clinnet-GetThingsFunction"
+        assert line["awsRequestId"] == "lambda-request-1"
+        assert line["requestId"] == "apigw-request-1"
+        assert line["statusCode"] == 200
+        assert line["RequestBytes"] == 3
+        assert line["ResponseBytes"] == 10
+        assert line["Error"] == 0
+        assert line["Duration"] >= 0
+
+    def test_only_the_first_invocation_is_a_cold_start(self, capsys, monkeypatch):
+        monkeypatch.setattr(metrics, "_cold_start", True)
+        handler = metrics.instrument_handler(lambda event, context: {"statusCode": 200})
+
+        handler(api_event(), FakeContext())
+        handler(api_event(), FakeContext())
+
+        assert [line["ColdStart"] for line in metric_lines(capsys)] == [1, 0]
+
+    def test_time_and_items_per_aws_service(self, things_table, capsys):
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            things_table.scan()
+            things_table.get_item(Key={"id": "1"})
+            aws_clients.get_client("s3").list_buckets()
+            return {"statusCode": 200}
+
+        lambda_handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert line["DynamoDBCalls"] == 2
+        assert line["DynamoDBItems"] == 4
+        assert line["DynamoDBTime"] > 0
+        assert line["DynamoDBBytes"] > 0
+        assert line["S3Calls"] == 1
+        assert "CognitoCalls" not in line
+
+    def test_calls_outside_an_invocation_are_not_recorded(self, things_table, capsys):
+        things_table.scan()
+
+        handler = metrics.instrument_handler(lambda event, context: {"statusCode": 200})
+        handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert "DynamoDBCalls" not in line
+
+    def test_timed_sections_and_custom_metrics(self, capsys):
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            with metrics.timed("Enrichment"):
+                pass
+            metrics.add_metric("Rows", 2)
+            metrics.add_metric("Rows", 3)
+            return {"statusCode": 200}
+
+        lambda_handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert line["EnrichmentTime"] >= 0
+        assert line["Rows"] == 5
+
+    def test_errors_are_counted_and_reraised(self, capsys):
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            lambda_handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert line["Error"] == 1
+        assert metrics._current is None
+
+    def test_server_error_responses_are_counted(self, capsys):
+        metrics.instrument_handler(lambda event, context: {"statusCode": 503})(api_event(), FakeContext())
+
+        assert metric_lines(capsys)[0]["Error"] == 1
+
+    def test_disabled(self, capsys, monkeypatch):
+        monkeypatch.setattr(metrics, "METRICS_ENABLED", False)
+
+        assert metrics.instrument_handler(lambda event, context: "ok")(api_event(), FakeContext()) == "ok"
+        assert metric_lines(capsys) == []
+
+
+class FakeRaw:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+@pytest.fixture
+def capacity_metrics(monkeypatch, things_table):
+    monkeypatch.setattr(aws_clients, "DYNAMODB_CAPACITY_METRICS", True)
+    monkeypatch.setattr(db_utils, "DYNAMODB_RESOURCE", None)
+    aws_clients.clear_cache()
+    return db_utils.get_dynamodb_resource()
+
+
+class TestDynamoDBCapacity:
+    def test_capacity_is_requested_and_rolled_up_per_operation(self, capacity_metrics, capsys):
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            db_utils.scan_table("things")
+            db_utils.get_item_by_id("things", "1")
+            db_utils.batch_get_items("things", [{"id": "1"}, {"id": "2"}])
+            capacity_metrics.Table("things").put_item(Item={"id": "9"})
+            return {"statusCode": 200}
+
+        lambda_handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        operations = line["DynamoDBOperations"]
+        assert set(operations) == {"Scan things", "GetItem things", "BatchGetItem things", "PutItem things"}
+        assert operations["Scan things"]["calls"] == 1
+        assert operations["Scan things"]["capacity"] > 0
+        assert operations["Scan things"]["ms"] > 0
+        assert line["DynamoDBReadCapacity"] == sum(
+            operations[key]["capacity"] for key in ("Scan things", "GetItem things", "BatchGetItem things"))
+        assert line["DynamoDBWriteCapacity"] == operations["PutItem things"]["capacity"] > 0
+        assert line["DynamoDBRetries"] == 0
+        assert "DynamoDBThrottles" not in line
+
+    def test_explicit_capacity_settings_are_kept(self, capacity_metrics):
+        response = capacity_metrics.Table("things").get_item(Key={"id": "1"}, ReturnConsumedCapacity="NONE")
+
+        assert "ConsumedCapacity" not in response
+
+    def test_throttles_and_retries_are_counted(self, capacity_metrics, capsys):
+        throttled = []
+
+        def throttle_once(request=None, **kwargs):
+            if not throttled:
+                throttled.append(request.url)
+                return AWSResponse(request.url, 400, {}, FakeRaw(
+                    b'{"__type":"com.amazonaws.dynamodb.v20120810#ProvisionedThroughputExceededException"}'))
+
+        capacity_metrics.meta.client.meta.events.register_first("before-send.dynamodb", throttle_once)
+
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            capacity_metrics.Table("things").get_item(Key={"id": "1"})
+            return {"statusCode": 200}
+
+        lambda_handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert line["DynamoDBThrottles"] == 1
+        assert line["DynamoDBRetries"] == 1
+        assert line["DynamoDBOperations"]["GetItem things"]["throttles"] == 1
+
+    def test_clients_created_outside_db_utils_are_instrumented(self, capacity_metrics, capsys):
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            aws_clients.get_client("dynamodb").get_item(TableName="things", Key={"id": {"S": "1"}})
+            return {"statusCode": 200}
+
+        lambda_handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert line["DynamoDBOperations"]["GetItem things"]["capacity"] > 0
+        assert line["DynamoDBCalls"] == 1
+
+    def test_off_by_default(self, things_table, monkeypatch, capsys):
+        monkeypatch.setattr(db_utils, "DYNAMODB_RESOURCE", None)
+
+        @metrics.instrument_handler
+        def lambda_handler(event, context):
+            assert "ConsumedCapacity" not in db_utils.get_dynamodb_resource().Table("things").get_item(Key={"id": "1"})
+            return {"statusCode": 200}
+
+        lambda_handler(api_event(), FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert "DynamoDBOperations" not in line
+        assert line["DynamoDBCalls"] == 1
+
+
+class TestHandlersAreInstrumented:
+    def test_create_billing_reports_under_its_module_name(self, capsys, monkeypatch):
+        from src.handlers.billing import create_billing
+
+        monkeypatch.delenv("BILLING_TABLE", raising=False)
+
+        create_billing.lambda_handler({"httpMethod": "POST", "body": "{}"}, FakeContext())
+
+        [line] = metric_lines(capsys)
+        assert line["Handler"] == "create_billing"
+        assert line["statusCode"] == 500
@@ -0,0 +1,111 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import pytest
+from decimal import Decimal
+
+from utils import pagination
+from utils.pagination import InvalidPaginationParameter
+
+
+class TestContinuationTokens:
+    def test_round_trip_preserves_key_types(self):
+        key = {"PK": "PATIENT#42", "SK": "METADATA", "type": "patient", "seq": Decimal("7")}
+
+        token = pagination.encode_next_token(key, "patients")
+
+        assert pagination.decode_next_token(token, "patients") == key
+
+    def test_token_is_opaque_and_url_safe(self):
+        token = pagination.encode_next_token({"PK": "PATIENT#42"}, "patients")
+
+        assert "PATIENT#42" not in token
+        assert all(c.isalnum() or c in "-_." for c in token)
+
+    def test_no_key_means_no_token(self):
+        assert pagination.encode_next_token(None, "patients") is None
+        assert pagination.encode_next_token({}, "patients") is None
+        assert pagination.decode_next_token(None, "patients") is None
+
+    def test_tampered_payload_is_rejected(self):
+        token = pagination.encode_next_token({"PK": "PATIENT#1"}, "patients")
+        other = pagination.encode_next_token({"PK": "PATIENT#999"}, "patients")
+        forged = other.split(".")[0] + "." + token.split(".")[1]
+
+        with pytest.raises(InvalidPaginationParameter, match="signature"):
+            pagination.decode_next_token(forged, "patients")
+
+    def test_token_signed_with_another_secret_is_rejected(self, monkeypatch):
+        monkeypatch.setenv("PAGINATION_TOKEN_SECRET", "secret-a")
+        token = pagination.encode_next_token({"PK": "PATIENT#1"}, "patients")
+        monkeypatch.setenv("PAGINATION_TOKEN_SECRET", "secret-b")
+
+        with pytest.raises(InvalidPaginationParameter):
+            pagination.decode_next_token(token, "patients")
+
+    @pytest.mark.parametrize("environment", ["dev", "local"])
+    def test_development_secret_is_used_in_development(self, monkeypatch, environment):
+        monkeypatch.delenv("PAGINATION_TOKEN_SECRET")
+        monkeypatch.setenv("ENVIRONMENT", environment)
+
+        token = pagination.encode_next_token({"PK": "PATIENT#1"}, "patients")
+
+        assert pagination.decode_next_token(token, "patients") == {"PK": "PATIENT#1"}
+
+    @pytest.mark.parametrize("environment", ["test", "prod"])
+    def test_missing_secret_fails_outside_development(self, monkeypatch, environment):
+        monkeypatch.delenv("PAGINATION_TOKEN_SECRET")
+        monkeypatch.setenv("ENVIRONMENT", environment)
+
+        with pytest.raises(RuntimeError, match="PAGINATION_TOKEN_SECRET"):
+            pagination.encode_next_token({"PK": "PATIENT#1"}, "patients")
+
+    def test_scope_mismatch_is_rejected(self):
+        token = pagination.encode_next_token({"id": "a1"}, "appointments")
+
+        with pytest.raises(InvalidPaginationParameter, match="different listing"):
+            pagination.decode_next_token(token, "patients")
+
+    @pytest.mark.parametrize("token", ["garbage", "a.b.c", "!!!.???"])
+    def test_malformed_tokens_are_rejected(self, token):
+        with pytest.raises(InvalidPaginationParameter):
+            pagination.decode_next_token(token, "patients")
+
+
+class TestParseLimit:
+    def test_defaults_when_missing(self):
+        assert pagination.parse_limit(None) == pagination.DEFAULT_PAGE_SIZE
+        assert pagination.parse_limit("") == pagination.DEFAULT_PAGE_SIZE
+
+    def test_parses_integer(self):
+        assert pagination.parse_limit("25") == 25
+
+    @pytest.mark.parametrize("value", ["0", "-1", "abc", str(pagination.MAX_PAGE_SIZE + 1)])
+    def test_rejects_out_of_range_or_non_integer(self, value):
+        with pytest.raises(InvalidPaginationParameter):
+            pagination.parse_limit(value)
+
+
+class TestBuildProjection:
+    def test_no_fields_means_no_projection(self):
+        assert pagination.build_projection(None) == {}
+        assert pagination.build_projection("") == {}
+
+    def test_fields_map_to_placeholders_with_key_attributes_first(self):
+        projection = pagination.build_projection("firstName, lastName,PK", always_include=("PK", "SK"))
+
+        assert projection["ProjectionExpression"] == "#f0, #f1, #f2, #f3"
+        assert projection["ExpressionAttributeNames"] == {
+            "#f0": "PK", "#f1": "SK", "#f2": "firstName", "#f3": "lastName"
+        }
+
+    @pytest.mark.parametrize("fields", ["first name", "a.b", "x[0]", "#type"])
+    def test_rejects_non_attribute_names(self, fields):
+        with pytest.raises(InvalidPaginationParameter):
+            pagination.build_projection(fields)
+
+    def test_rejects_too_many_fields(self):
+        fields = ",".join(f"f{i}" for i in range(pagination.MAX_PROJECTED_FIELDS + 1))
+
+        with pytest.raises(InvalidPaginationParameter):
+            pagination.build_projection(fields)
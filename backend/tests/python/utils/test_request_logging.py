@@ -0,0 +1,129 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../lambda_layer/python')))
+import base64
+import json
+import logging
+import pytest
+
+from utils import request_logging
+
+IMAGE = "data:image/png;base64," + base64.b64encode(b"\x89PNG" + b"\x00" * 300000).decode("ascii")
+
+
+class FakeContext:
+    aws_request_id = "lambda-request-1"
+
+
+def api_event(body=None, **extra):
+    event = {
+        "httpMethod": "POST",
+        "resource": "/patients/{id}",
+        "path": "/patients/p-1",
+        "pathParameters": {"id": "p-1"},
+        "queryStringParameters": {"limit": "10", "search": "Jane Doe"},
+        "headers": {
+            "Origin": "http://localhost:5173",
+            "Authorization": "Bearer secret-token",
+            "Content-Type": "application/json",
+            "X-Forwarded-For": "10.0.0.1"
+        },
+        "requestContext": {
+            "requestId": "apigw-request-1",
+            "authorizer": {"claims": {"sub": "user-sub-1", "email": "doctor@example.com"}}
+        },
+        "body": body,
+        "isBase64Encoded": False
+    }
+    event.update(extra)
+    return event
+
+
+def logged_lines(caplog):
+    return [record.getMessage() for record in caplog.records if record.name == request_logging.logger.name]
+
+
+class TestLogRequest:
+    def test_summary_is_one_json_line_with_both_request_ids(self, caplog):
+        caplog.set_level(logging.INFO, logger=request_logging.logger.name)
+
+        assert request_logging.log_request(api_event(json.dumps({"firstName": "Jane"})), FakeContext()) is True
+
+        [line] = logged_lines(caplog)
+        summary = json.loads(line)
+        assert summary["requestId"] == "apigw-request-1"
+        assert summary["awsRequestId"] == "lambda-request-1"
+        assert summary["method"] == "POST"
+        assert summary["resource"] == "/patients/{id}"
+        assert summary["pathParameters"] == {"id": "p-1"}
+        assert summary["queryStringParameters"] == {"limit": "10", "search": request_logging.REDACTED}
+        assert summary["headers"] == {"origin": "http://localhost:5173", "content-type": "application/json"}
+        assert summary["userSub"] == "user-sub-1"
+        assert summary["bodyBytes"] == len(json.dumps({"firstName": "Jane"}))
+
+    def test_bodies_credentials_and_phi_never_reach_the_log(self, caplog):
+        caplog.set_level(logging.DEBUG, logger=request_logging.logger.name)
+
+        request_logging.log_request(api_event(json.dumps({"image": IMAGE, "firstName": "Jane"})), FakeContext())
+
+        text = "\n".join(logged_lines(caplog))
+        assert len(logged_lines(caplog)) == 2
+        for secret in ("iVBOR", "AAAA", "Jane", "secret-token", "doctor@example.com"):
+            assert secret not in text
+
+    def test_lines_are_capped(self, caplog, monkeypatch):
+        caplog.set_level(logging.INFO, logger=request_logging.logger.name)
+        monkeypatch.setattr(request_logging, "LOG_EVENT_MAX_BYTES", 120)
+
+        request_logging.log_request(api_event(pathParameters={f"key{i}": "v" * 100 for i in range(20)}))
+
+        [line] = logged_lines(caplog)
+        assert line.endswith("...(truncated)")
+        assert len(line) <= 120 + len("...(truncated)")
+
+    def test_long_values_are_cut(self):
+        summary = request_logging.summarize_event(api_event(pathParameters={"id": "x" * 1000}))
+
+        assert summary["pathParameters"]["id"].startswith("x" * request_logging.MAX_VALUE_CHARS + "...(+872 chars)")
+
+    @pytest.mark.parametrize("rate,draw,expected", [(0.0, 0.0, False), (0.25, 0.2, True), (0.25, 0.3, False), (1.0, 0.99, True)])
+    def test_sampling(self, caplog, monkeypatch, rate, draw, expected):
+        caplog.set_level(logging.INFO, logger=request_logging.logger.name)
+        monkeypatch.setattr(request_logging.random, "random", lambda: draw)
+
+        assert request_logging.log_request(api_event(), sample_rate=rate) is expected
+        assert len(logged_lines(caplog)) == int(expected)
+
+    def test_nothing_is_built_when_info_is_disabled(self, monkeypatch):
+        monkeypatch.setattr(request_logging.logger, "level", logging.WARNING)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("summary built although it will not be logged")
+
+        monkeypatch.setattr(request_logging, "summarize_event", fail)
+
+        assert request_logging.log_request(api_event()) is False
+
+    def test_handles_minimal_events(self, caplog):
+        caplog.set_level(logging.INFO, logger=request_logging.logger.name)
+
+        request_logging.log_request({})
+
+        assert json.loads(logged_lines(caplog)[0]) == {"message": "request", "bodyBytes": 0, "isBase64Encoded": False}
+
+
+class TestHandlersLogSummaries:
+    def test_upload_handler_never_logs_the_image(self, caplog, monkeypatch):
+        from src.handlers.users import upload_profile_image
+
+        monkeypatch.setenv("USER_POOL_ID", "")
+        caplog.set_level(logging.DEBUG)
+        event = api_event(json.dumps({"image": IMAGE}), path="/users/profile-image", resource="/users/profile-image")
+
+        upload_profile_image.lambda_handler(event, FakeContext())
+
+        text = "\n".join(record.getMessage() for record in caplog.records)
+        assert "apigw-request-1" in text
+        assert IMAGE[30:80] not in text
+        assert sum(len(record.getMessage()) for record in caplog.records) < 10000
@@ -17,6 +17,8 @@ const appointmentApi = {
       Object.entries(filters).forEach(([key, value]) => {
         if (value) queryParams.append(key, value);
       });
+      // The list endpoint is paginated; ask for the full legacy array
+      queryParams.append('all', 'true');
       
       const queryString = queryParams.toString();
       const endpoint = queryString ? `/appointments?${queryString}` : '/appointments';
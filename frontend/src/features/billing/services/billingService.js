@@ -17,6 +17,8 @@ const billingService = {
       Object.entries(filters).forEach(([key, value]) => {
         if (value) queryParams.append(key, value);
       });
+      // The list endpoint is paginated; ask for the full legacy array
+      queryParams.append('all', 'true');
       
       const queryString = queryParams.toString();
       const endpoint = queryString ? `/billing?${queryString}` : '/billing';
@@ -82,7 +84,7 @@ const billingService = {
    */
   getPatientBillingHistory: async (patientId) => {
     try {
-      const response = await api.get(`/billing?patientId=${patientId}`);
+      const response = await api.get(`/billing?patientId=${patientId}&all=true`);
       return response.data;
     } catch (error) {
       console.error(`Error fetching billing history for patient ${patientId}:`, error);
@@ -27,7 +27,8 @@ export const useUserManagement = () => {
     try {
       const result = await adminService.listUsers({
         limit: options.limit || 60,
-        nextToken: options.nextToken || pagination.nextToken
+        nextToken: options.nextToken || pagination.nextToken,
+        includeAvatars: true
       });
       
       // Transform users to ensure profile images are properly handled
@@ -21,7 +21,9 @@ function extractUsernameFromEmail(email) {
 export const adminService = {
   /**
    * List all users in the Cognito user pool
-   * @param {Object} options - Pagination options
+   * @param {Object} options - Pagination options; includeAvatars (and avatarSize)
+   *                           adds presigned avatar URLs to each user; role,
+   *                           search and order (asc|desc) filter and sort
    * @returns {Promise<Object>} - List of users
    */
   async listUsers(options = {}) {
@@ -31,11 +33,12 @@ export const adminService = {
       const idToken = await getAuthToken();
       if (!idToken) throw new Error('No authentication token available');
       // Call the API Gateway endpoint with proper authorization
-      const response = await fetch(`${import.meta.env.VITE_API_ENDPOINT}/users?limit=${options.limit || 60}${options.nextToken ? `&nextToken=${options.nextToken}` : ''}`, {
+      const response = await fetch(`${import.meta.env.VITE_API_ENDPOINT}/users?limit=${options.limit || 60}${options.nextToken ? `&nextToken=${options.nextToken}` : ''}${options.includeAvatars ? `&includeAvatars=true${options.avatarSize ? `&avatarSize=${options.avatarSize}` : ''}` : ''}${['role', 'search', 'order'].map((name) => (options[name] ? `&${name}=${encodeURIComponent(options[name])}` : '')).join('')}`, {
         method: 'GET',
         headers: {
           'Authorization': idToken,
-          'Content-Type': 'application/json'
+          'Content-Type': 'application/json',
+          'Accept': 'application/json'
         }
       });
       
@@ -84,7 +84,10 @@ const api = {
       try {
         const response = await get({
           apiName: 'clinnetApi',
-          path: '/patients'
+          path: '/patients',
+          options: {
+            queryParams: { all: 'true' }
+          }
         });
         return response.body;
       } catch (error) {
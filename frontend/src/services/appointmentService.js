@@ -4,7 +4,7 @@ import api from './api';
 // Get all appointments
 export const getAppointments = async () => {
   try {
-    const response = await api.get('/appointments');
+    const response = await api.get('/appointments', { params: { all: 'true' } });
     return response.data;
   } catch (error) {
     console.error('Error fetching appointments:', error);
@@ -61,7 +61,7 @@ export const deleteAppointment = async (appointmentId) => {
 // rely on appointment objects including 'patientId' and 'patientName'.
 export const getAppointmentsByDoctor = async (doctorId, filters = {}) => {
   try {
-    const queryParams = { doctorId, ...filters };
+    const queryParams = { doctorId, ...filters, all: 'true' };
     // Example: if filters = { date: 'YYYY-MM-DD' },
     // params will be { doctorId: 'doc123', date: 'YYYY-MM-DD' }
     const response = await api.get('/appointments', { params: queryParams });
@@ -77,7 +77,7 @@ export const getAppointmentsByDoctor = async (doctorId, filters = {}) => {
 // including details such as 'doctorName', 'type' (or 'serviceName'), and 'status'.
 export const getAppointmentsByPatient = async (patientId) => {
   try {
-    const response = await api.get('/appointments', { params: { patientId } });
+    const response = await api.get('/appointments', { params: { patientId, all: 'true' } });
     return response.data;
   } catch (error)
  {
@@ -91,7 +91,7 @@ export const getTodaysAppointments = async () => {
   try {
     // In a real API, we would filter by date on the server
     // With JSON Server, we need to get all and filter client-side
-    const response = await api.get('/appointments');
+    const response = await api.get('/appointments', { params: { all: 'true' } });
     const today = new Date().toISOString().split('T')[0];
     
     // Filter appointments for today
@@ -11,7 +11,7 @@ export const initializeAppData = async () => {
     console.log('Services loaded:', services);
     
     // Fetch patients
-    const patients = await apiGet('/patients');
+    const patients = await apiGet('/patients', { all: 'true' });
     console.log('Patients loaded:', patients);
     
     console.log('Data initialization complete');
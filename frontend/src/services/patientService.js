@@ -5,7 +5,7 @@ import { apiGet, apiPost, apiPut, apiDelete } from '../utils/api-helper';
 export const getPatients = async () => {
   try {
     console.log('Fetching patients from DynamoDB');
-    const data = await apiGet('/patients');
+    const data = await apiGet('/patients', { all: 'true' });
     console.log('Patients fetched successfully:', data);
     return data;
   } catch (error) {
@@ -5,7 +5,7 @@ import { apiGet, apiPost, apiPut, apiDelete } from '../utils/api-helper';
 // Fetch all patients
 export async function fetchPatients() {
   try {
-    const raw = await apiGet('/patients');
+    const raw = await apiGet('/patients', { all: 'true' });
     let transformedData = [];
     if (Array.isArray(raw)) {
       transformedData = raw.map(transformPatientFromDynamo);
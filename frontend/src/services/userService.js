@@ -96,18 +96,12 @@ export const userService = {
       console.log('Uploading profile image');
       // Get the current auth token
       const idToken = await getAuthToken();
-      let jsonPayload;
-      // Accept either a File or a string (data URI)
+      // Files go straight to S3; data URI strings still use the base64 endpoint
       if (imageData instanceof File) {
-        // Convert File to base64 data URI
-        const base64 = await new Promise((resolve, reject) => {
-          const reader = new FileReader();
-          reader.readAsDataURL(imageData);
-          reader.onload = () => resolve(reader.result);
-          reader.onerror = (error) => reject(error);
-        });
-        jsonPayload = JSON.stringify({ image: base64 });
-      } else if (typeof imageData === 'string') {
+        return await this.uploadProfileImageDirect(imageData, idToken);
+      }
+      let jsonPayload;
+      if (typeof imageData === 'string') {
         // Ensure the string is a full data URI
         if (!imageData.startsWith('data:image/')) {
           throw new Error('Image data must be a base64 data URI string (data:image/...)');
@@ -166,6 +160,52 @@ export const userService = {
     }
   },
   
+  /**
+   * Upload a profile image directly to S3 with a presigned POST, then
+   * record it on the user's profile
+   * @param {File} file - Image file
+   * @param {string} idToken - Cognito ID token
+   * @returns {Promise<Object>} - Upload result with image URL
+   */
+  async uploadProfileImageDirect(file, idToken) {
+    const apiRequest = async (path, body) => {
+      const response = await fetch(`${import.meta.env.VITE_API_ENDPOINT}${path}`, {
+        method: 'POST',
+        headers: {
+          'Authorization': `Bearer ${idToken}`,
+          'Content-Type': 'application/json'
+        },
+        body: JSON.stringify(body)
+      });
+      const data = await response.json().catch(() => ({}));
+      if (!response.ok) {
+        throw new Error(`Failed to upload profile image: ${data.message || `HTTP status ${response.status}`}`);
+      }
+      return data;
+    };
+
+    const { imageKey, upload } = await apiRequest('/users/profile-image/upload-url', {
+      contentType: file.type,
+      size: file.size
+    });
+
+    // The file has to be the last field of the form
+    const form = new FormData();
+    Object.entries(upload.fields).forEach(([name, value]) => form.append(name, value));
+    form.append('file', file);
+    const s3Response = await fetch(upload.url, { method: 'POST', body: form });
+    if (!s3Response.ok) {
+      throw new Error(`Failed to upload profile image: storage returned HTTP status ${s3Response.status}`);
+    }
+
+    const result = await apiRequest('/users/profile-image/confirm', { imageKey });
+    console.log('Profile image uploaded successfully:', result);
+    if (result.imageUrl) {
+      localStorage.setItem('userProfileImage', result.imageUrl);
+    }
+    return result;
+  },
+
   /**
    * Get the user's profile image URL
    * @returns {Promise<Object>} - Object containing image URL if available
@@ -229,7 +269,30 @@ export const userService = {
       throw error;
     }
   },
-  
+
+  /**
+   * Get the profile image URLs of many users in one request
+   * @param {string[]} usernames - Usernames (emails), at most 100
+   * @param {number} [size] - Thumbnail size (64, 128 or 512)
+   * @returns {Promise<Object>} - Map of username to { imageUrl, size }, or null without an image
+   */
+  async getAvatarUrls(usernames, size) {
+    const idToken = await getAuthToken();
+    const response = await fetch(`${import.meta.env.VITE_API_ENDPOINT}/users/avatars`, {
+      method: 'POST',
+      headers: {
+        'Authorization': `Bearer ${idToken}`,
+        'Content-Type': 'application/json'
+      },
+      body: JSON.stringify(size ? { usernames, size } : { usernames })
+    });
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok) {
+      throw new Error(`Failed to get avatar URLs: ${data.message || `HTTP status ${response.status}`}`);
+    }
+    return data.avatars;
+  },
+
   /**
    * Remove the user's profile image
    * @returns {Promise<Object>} - Result of the operation
@@ -11,6 +11,12 @@
 export const transformUserForFrontend = (user) => {
   const transformedUser = { ...user };
   
+  // Presigned avatar URL returned by GET /users?includeAvatars=true
+  if (user.avatarUrl && !user.profileImage) {
+    transformedUser.profileImage = user.avatarUrl;
+    transformedUser.avatar = user.avatarUrl;
+  }
+  
   // Ensure profile image is available in standard properties
   if (user.custom_profile_image && !user.profileImage) {
     transformedUser.profileImage = user.custom_profile_image;